@@ -0,0 +1,760 @@
+"""
+Analytics headless - semua perhitungan forecast, inventory dan finansial
+
+Tidak ada pemanggilan Streamlit di sini: peringatan/error dikembalikan lewat
+parameter `diagnostics` (lihat diagnostics.py).
+"""
+import numpy as np
+import pandas as pd
+
+from data_loader import add_product_info_to_data
+from demand import cover_status, rolling_mean, sales_matrix
+from diagnostics import add_diagnostic
+from replenishment import economic_order_quantity
+
+# --- ====================================================== ---
+# ---                FINANCIAL FUNCTIONS                    ---
+# --- ====================================================== ---
+
+def calculate_financial_metrics_all(df_sales, df_product, diagnostics=None):
+    """Calculate all financial metrics from sales data"""
+    
+    if df_sales.empty or df_product.empty:
+        return pd.DataFrame()
+    
+    try:
+        # Check if price columns exist
+        required_price_cols = ['Floor_Price', 'Net_Order_Price']
+        price_cols_exist = all(col in df_product.columns for col in required_price_cols)
+        
+        if not price_cols_exist:
+            add_diagnostic(diagnostics, 'warning', 'calculate_financial_metrics_all', "⚠️ Price columns missing in Product Master")
+            return pd.DataFrame()
+        
+        # Ensure sales data has product info with prices
+        if 'Floor_Price' not in df_sales.columns or 'Net_Order_Price' not in df_sales.columns:
+            df_sales = add_product_info_to_data(df_sales, df_product)
+        
+        # Fill missing prices
+        df_sales['Floor_Price'] = df_sales['Floor_Price'].fillna(0)
+        df_sales['Net_Order_Price'] = df_sales['Net_Order_Price'].fillna(0)
+        
+        # Calculate financial metrics
+        df_sales['Revenue'] = df_sales['Sales_Qty'] * df_sales['Floor_Price']
+        df_sales['Cost'] = df_sales['Sales_Qty'] * df_sales['Net_Order_Price']
+        df_sales['Gross_Margin'] = df_sales['Revenue'] - df_sales['Cost']
+        df_sales['Margin_Percentage'] = np.where(
+            df_sales['Revenue'] > 0,
+            (df_sales['Gross_Margin'] / df_sales['Revenue'] * 100),
+            0
+        )
+        
+        # Add additional metrics
+        df_sales['Avg_Selling_Price'] = np.where(
+            df_sales['Sales_Qty'] > 0,
+            df_sales['Revenue'] / df_sales['Sales_Qty'],
+            0
+        )
+        
+        return df_sales
+        
+    except Exception as e:
+        add_diagnostic(diagnostics, 'error', 'calculate_financial_metrics_all', f"Financial metrics calculation error: {str(e)}")
+        return pd.DataFrame()
+
+def calculate_inventory_financial(df_stock, df_product, diagnostics=None):
+    """Calculate inventory financial value"""
+    
+    if df_stock.empty or df_product.empty:
+        return pd.DataFrame()
+    
+    try:
+        # Check price columns
+        if 'Floor_Price' not in df_product.columns or 'Net_Order_Price' not in df_product.columns:
+            return pd.DataFrame()
+        
+        # Ensure stock data has prices
+        if 'Floor_Price' not in df_stock.columns or 'Net_Order_Price' not in df_stock.columns:
+            df_stock = add_product_info_to_data(df_stock, df_product)
+        
+        # Fill missing prices
+        df_stock['Floor_Price'] = df_stock['Floor_Price'].fillna(0)
+        df_stock['Net_Order_Price'] = df_stock['Net_Order_Price'].fillna(0)
+        
+        # Calculate inventory values
+        df_stock['Value_at_Cost'] = df_stock['Stock_Qty'] * df_stock['Net_Order_Price']
+        df_stock['Value_at_Retail'] = df_stock['Stock_Qty'] * df_stock['Floor_Price']
+        df_stock['Potential_Margin'] = df_stock['Value_at_Retail'] - df_stock['Value_at_Cost']
+        df_stock['Margin_Percentage'] = np.where(
+            df_stock['Value_at_Retail'] > 0,
+            (df_stock['Potential_Margin'] / df_stock['Value_at_Retail'] * 100),
+            0
+        )
+        
+        return df_stock
+        
+    except Exception as e:
+        add_diagnostic(diagnostics, 'error', 'calculate_inventory_financial', f"Inventory financial calculation error: {str(e)}")
+        return pd.DataFrame()
+
+def calculate_seasonality(df_financial, diagnostics=None):
+    """Calculate seasonal patterns from financial data"""
+    
+    if df_financial.empty:
+        return pd.DataFrame()
+    
+    try:
+        # Key bulan kalender sebagai Series terpisah (df_financial tidak diubah)
+        month_num = df_financial['Month'].dt.month.rename('Month_Num')
+        month_name = df_financial['Month'].dt.strftime('%b').rename('Month_Name')
+        
+        # Group by month across years
+        seasonal_pattern = df_financial.groupby([month_num, month_name]).agg({
+            'Revenue': 'mean',
+            'Gross_Margin': 'mean',
+            'Sales_Qty': 'mean'
+        }).reset_index()
+        
+        # Calculate seasonal indices
+        overall_avg_revenue = seasonal_pattern['Revenue'].mean()
+        seasonal_pattern['Seasonal_Index_Revenue'] = seasonal_pattern['Revenue'] / overall_avg_revenue
+        
+        overall_avg_margin = seasonal_pattern['Gross_Margin'].mean()
+        seasonal_pattern['Seasonal_Index_Margin'] = seasonal_pattern['Gross_Margin'] / overall_avg_margin
+        
+        # Classify seasons
+        conditions = [
+            seasonal_pattern['Seasonal_Index_Revenue'] >= 1.2,
+            (seasonal_pattern['Seasonal_Index_Revenue'] >= 0.9) & (seasonal_pattern['Seasonal_Index_Revenue'] < 1.2),
+            seasonal_pattern['Seasonal_Index_Revenue'] < 0.9
+        ]
+        choices = ['Peak Season', 'Normal Season', 'Low Season']
+        
+        seasonal_pattern['Season_Type'] = np.select(conditions, choices, default='Normal Season')
+        
+        return seasonal_pattern.sort_values('Month_Num')
+        
+    except Exception as e:
+        add_diagnostic(diagnostics, 'error', 'calculate_seasonality', f"Seasonality calculation error: {str(e)}")
+        return pd.DataFrame()
+
+def calculate_eoq(demand, order_cost, holding_cost_per_unit):
+    """Calculate Economic Order Quantity (skalar; versi batch: replenishment.economic_order_quantity)"""
+    return int(np.round(economic_order_quantity(demand, order_cost, holding_cost_per_unit)))
+
+def _forecast_po_join(df_forecast, df_po):
+    """Satu join Forecast x PO per SKU x bulan (inner); baris tanpa bulan dibuang"""
+    df_f = df_forecast[['SKU_ID', 'Month', 'Forecast_Qty']].dropna(subset=['Month'])
+    df_p = df_po[['SKU_ID', 'Month', 'PO_Qty']].dropna(subset=['Month'])
+    return pd.merge(df_f, df_p, on=['SKU_ID', 'Month'], how='inner')
+
+def calculate_forecast_bias(df_forecast, df_po, diagnostics=None):
+    """Calculate forecast bias (systematic over/under forecasting) - satu join + satu groupby"""
+    
+    if df_forecast.empty or df_po.empty:
+        return {}
+    
+    try:
+        df_merged = _forecast_po_join(df_forecast, df_po)
+        
+        if df_merged.empty:
+            return {}
+        
+        bias = df_merged['PO_Qty'] - df_merged['Forecast_Qty']
+        df_merged = df_merged.assign(
+            Bias=bias,
+            Bias_Percentage=np.where(
+                df_merged['Forecast_Qty'] > 0,
+                bias / df_merged['Forecast_Qty'].where(df_merged['Forecast_Qty'] > 0) * 100,
+                0
+            ),
+            Over=(bias > 0).astype(int),
+            Under=(bias < 0).astype(int)
+        )
+        
+        return df_merged.groupby('Month', sort=True).agg(
+            Avg_Bias=('Bias', 'mean'),
+            Avg_Bias_Percentage=('Bias_Percentage', 'mean'),
+            Over_Forecast_SKUs=('Over', 'sum'),
+            Under_Forecast_SKUs=('Under', 'sum')
+        ).reset_index()
+        
+    except Exception as e:
+        add_diagnostic(diagnostics, 'error', 'calculate_forecast_bias', f"Forecast bias calculation error: {str(e)}")
+        return pd.DataFrame()
+
+def _grouped_rolling_sum(values, group_codes, month_ordinal, window):
+    """
+    Jumlah rolling `window` bulan kalender per grup lewat cumsum (df urut per
+    grup, bulan). Batas bawah dicari per ordinal bulan, bukan per baris, jadi
+    bulan yang tidak ada di data tidak membuat window mundur lebih jauh.
+    """
+    position = np.arange(len(values))
+    # Key gabungan grup x bulan monoton naik di df yang sudah urut; jarak antar
+    # grup > window supaya pencarian tidak menyeberang ke grup sebelumnya
+    span = int(month_ordinal.max(initial=0)) + window
+    combined = group_codes * span + month_ordinal
+    lower = np.searchsorted(combined, combined - window + 1, side='left')
+    cumulative = np.concatenate([[0.0], np.cumsum(values, dtype='float64')])
+    return cumulative[position + 1] - cumulative[lower], position - lower + 1
+
+def _rolling_tracking(df, key, window, ts_limit):
+    """Rolling bias, MAD dan tracking signal per `key` (df sudah urut key, Month)"""
+    keys = df[key].to_numpy()
+    group_codes = np.cumsum(np.r_[True, keys[1:] != keys[:-1]]).astype('int64') - 1
+    months = pd.to_datetime(df['Month'], errors='coerce')
+    month_ordinal = (months.dt.year * 12 + months.dt.month - 1).to_numpy(dtype='int64')
+
+    rolling_sum, count = _grouped_rolling_sum(df['Bias'].to_numpy(dtype='float64'), group_codes, month_ordinal, window)
+    abs_sum, _ = _grouped_rolling_sum(df['Abs_Error'].to_numpy(dtype='float64'), group_codes, month_ordinal, window)
+    rolling_mad = abs_sum / count
+
+    df = df.assign(
+        Rolling_Bias=rolling_sum / count,
+        Rolling_MAD=rolling_mad,
+        Tracking_Signal=np.divide(rolling_sum, rolling_mad, out=np.zeros(len(df)), where=rolling_mad > 0)
+    )
+    df['Tracking_Status'] = np.select(
+        [df['Tracking_Signal'] > ts_limit, df['Tracking_Signal'] < -ts_limit],
+        ['Biased Under-Forecast', 'Biased Over-Forecast'],
+        default='In Control'
+    )
+    return df
+
+def calculate_bias_tracking(df_forecast, df_po, df_product, window=6, ts_limit=4.0, diagnostics=None):
+    """
+    Rolling bias dan tracking signal per SKU dan per Brand untuk setiap bulan.
+
+    Error = PO - Forecast (sama dengan calculate_forecast_bias).
+    Tracking signal = jumlah error `window` bulan terakhir / MAD `window` bulan
+    yang sama (maksimum |TS| = window); |TS| > ts_limit menandakan bias sistematis.
+    Window dihitung per bulan kalender: bulan tanpa data tidak ikut dihitung.
+    Return dict: 'sku' dan 'brand' (DataFrame per key x bulan), 'latest_sku'
+    (status bulan terakhir per SKU).
+    """
+    
+    if df_forecast.empty or df_po.empty:
+        return {}
+    
+    try:
+        df_merged = _forecast_po_join(df_forecast, df_po)
+        if df_merged.empty:
+            return {}
+        
+        df_merged = df_merged.groupby(['SKU_ID', 'Month'], sort=False, as_index=False)[['Forecast_Qty', 'PO_Qty']].sum()
+        
+        if not df_product.empty and 'Brand' in df_product.columns:
+            brands = df_product.drop_duplicates('SKU_ID').set_index('SKU_ID')['Brand']
+            df_merged['Brand'] = df_merged['SKU_ID'].map(brands).fillna('Unknown')
+        else:
+            df_merged['Brand'] = 'Unknown'
+        
+        df_merged['Bias'] = df_merged['PO_Qty'] - df_merged['Forecast_Qty']
+        df_merged['Abs_Error'] = df_merged['Bias'].abs()
+        
+        sku_df = _rolling_tracking(
+            df_merged.sort_values(['SKU_ID', 'Month'], kind='mergesort').reset_index(drop=True),
+            'SKU_ID', window, ts_limit
+        )
+        
+        brand_df = df_merged.groupby(['Brand', 'Month'], as_index=False)[['Forecast_Qty', 'PO_Qty', 'Bias']].sum()
+        brand_df['Abs_Error'] = brand_df['Bias'].abs()
+        brand_df = _rolling_tracking(brand_df.sort_values(['Brand', 'Month']).reset_index(drop=True), 'Brand', window, ts_limit)
+        
+        latest_sku = sku_df.groupby('SKU_ID', sort=False).tail(1).reset_index(drop=True)
+        
+        return {
+            'sku': sku_df,
+            'brand': brand_df,
+            'latest_sku': latest_sku
+        }
+        
+    except Exception as e:
+        add_diagnostic(diagnostics, 'error', 'calculate_bias_tracking', f"Bias tracking calculation error: {str(e)}")
+        return {}
+
+# --- ====================================================== ---
+# ---                ANALYTICS FUNCTIONS                    ---
+# --- ====================================================== ---
+
+def calculate_monthly_performance(df_forecast, df_po, df_product, diagnostics=None):
+    """Calculate performance for each month separately - HANYA SKU dengan Forecast_Qty > 0"""
+    
+    monthly_performance = {}
+    
+    if df_forecast.empty or df_po.empty:
+        return monthly_performance
+    
+    try:
+        # ADD PRODUCT INFO jika belum ada
+        df_forecast = add_product_info_to_data(df_forecast, df_product)
+        df_po = add_product_info_to_data(df_po, df_product)
+        
+        # Get unique months from both datasets
+        forecast_months = sorted(df_forecast['Month'].unique())
+        po_months = sorted(df_po['Month'].unique())
+        all_months = sorted(set(list(forecast_months) + list(po_months)))
+        
+        for month in all_months:
+            # Get data for this month - FILTER HANYA Forecast_Qty > 0
+            df_forecast_month = df_forecast[
+                (df_forecast['Month'] == month) & 
+                (df_forecast['Forecast_Qty'] > 0)
+            ].copy()
+            
+            df_po_month = df_po[df_po['Month'] == month].copy()
+            
+            if df_forecast_month.empty or df_po_month.empty:
+                continue
+            
+            # Merge forecast and PO for this month
+            df_merged = pd.merge(
+                df_forecast_month,
+                df_po_month,
+                on=['SKU_ID'],
+                how='inner',
+                suffixes=('_forecast', '_po')
+            )
+            
+            if not df_merged.empty:
+                # Add product info (jika belum ada dari merge)
+                if 'Product_Name' not in df_merged.columns or 'Brand' not in df_merged.columns:
+                    df_merged = add_product_info_to_data(df_merged, df_product)
+                
+                # Calculate ratio - Pastikan Forecast_Qty > 0
+                df_merged['PO_Rofo_Ratio'] = np.where(
+                    df_merged['Forecast_Qty'] > 0,
+                    (df_merged['PO_Qty'] / df_merged['Forecast_Qty']) * 100,
+                    0
+                )
+                
+                # Categorize
+                conditions = [
+                    df_merged['PO_Rofo_Ratio'] < 80,
+                    (df_merged['PO_Rofo_Ratio'] >= 80) & (df_merged['PO_Rofo_Ratio'] <= 120),
+                    df_merged['PO_Rofo_Ratio'] > 120
+                ]
+                choices = ['Under', 'Accurate', 'Over']
+                df_merged['Accuracy_Status'] = np.select(conditions, choices, default='Unknown')
+                
+                # Calculate metrics
+                df_merged['Absolute_Percentage_Error'] = abs(df_merged['PO_Rofo_Ratio'] - 100)
+                
+                # Hanya hitung MAPE untuk SKU dengan Forecast_Qty > 0
+                valid_skus = df_merged[df_merged['Forecast_Qty'] > 0]
+                if not valid_skus.empty:
+                    mape = valid_skus['Absolute_Percentage_Error'].mean()
+                else:
+                    mape = 0
+                    
+                monthly_accuracy = 100 - mape
+                
+                # Status counts
+                status_counts = df_merged['Accuracy_Status'].value_counts().to_dict()
+                total_records = len(df_merged)
+                status_percentages = {k: (v/total_records*100) for k, v in status_counts.items()}
+                
+                # Store results
+                monthly_performance[month] = {
+                    'accuracy': monthly_accuracy,
+                    'mape': mape,
+                    'status_counts': status_counts,
+                    'status_percentages': status_percentages,
+                    'total_records': total_records,
+                    'data': df_merged,
+                    'under_skus': df_merged[df_merged['Accuracy_Status'] == 'Under'].copy(),
+                    'over_skus': df_merged[df_merged['Accuracy_Status'] == 'Over'].copy(),
+                    'accurate_skus': df_merged[df_merged['Accuracy_Status'] == 'Accurate'].copy()
+                }
+        
+        return monthly_performance
+        
+    except Exception as e:
+        add_diagnostic(diagnostics, 'error', 'calculate_monthly_performance', f"Monthly performance calculation error: {str(e)}")
+        return monthly_performance
+
+def get_last_3_months_performance(monthly_performance):
+    """Get performance for last 3 months"""
+    
+    if not monthly_performance:
+        return {}
+    
+    # Get last 3 months
+    sorted_months = sorted(monthly_performance.keys())
+    if len(sorted_months) >= 3:
+        last_3_months = sorted_months[-3:]
+    else:
+        last_3_months = sorted_months
+    
+    last_3_data = {}
+    for month in last_3_months:
+        last_3_data[month] = monthly_performance[month]
+    
+    return last_3_data
+
+def calculate_inventory_metrics_with_3month_avg(df_stock, df_sales, df_product, diagnostics=None):
+    """Calculate inventory metrics using 3-month average sales (FIXED: AGGREGATE STOCK FIRST)"""
+    
+    metrics = {}
+    
+    if df_stock.empty:
+        return metrics
+    
+    try:
+        # --- FIX UTAMA: Agregasi Stok dari Level Batch ke Level SKU ---
+        # Kita jumlahkan dulu Stock_Qty berdasarkan SKU_ID agar 1 SKU = 1 Baris
+        df_stock_agg = df_stock.groupby('SKU_ID').agg({
+            'Stock_Qty': 'sum'
+        }).reset_index()
+        
+        # ADD PRODUCT INFO ke data yang sudah di-agregasi
+        df_stock_agg = add_product_info_to_data(df_stock_agg, df_product)
+        
+        # Rata-rata sales 3 bulan sales terakhir per SKU (rolling window demand engine)
+        if not df_sales.empty:
+            values, observed, sales_skus, _ = sales_matrix(df_sales)
+            avg_monthly_sales = pd.DataFrame({
+                'SKU_ID': sales_skus,
+                'Avg_Monthly_Sales_3M': rolling_mean(values, observed, 3)[:, -1]
+            }).dropna(subset=['Avg_Monthly_Sales_3M'])
+        else:
+            avg_monthly_sales = pd.DataFrame(columns=['SKU_ID', 'Avg_Monthly_Sales_3M'])
+        
+        # Merge Stock Aggregated dengan Product Info (redundant check but safe)
+        df_inventory = pd.merge(
+            df_stock_agg,
+            df_product[['SKU_ID', 'Product_Name', 'SKU_Tier', 'Brand', 'Status']],
+            on='SKU_ID',
+            how='left',
+            suffixes=('', '_master')
+        )
+        
+        # Bersihkan kolom duplikat jika ada setelah merge
+        df_inventory = df_inventory.loc[:,~df_inventory.columns.duplicated()]
+        
+        # Merge dengan Average Sales
+        df_inventory = pd.merge(df_inventory, avg_monthly_sales, on='SKU_ID', how='left')
+        df_inventory['Avg_Monthly_Sales_3M'] = df_inventory['Avg_Monthly_Sales_3M'].fillna(0)
+        
+        # Cover months (999 untuk SKU tanpa sales) + status inventory
+        cover, status = cover_status(df_inventory['Stock_Qty'], df_inventory['Avg_Monthly_Sales_3M'])
+        df_inventory['Cover_Months'] = cover
+        df_inventory['Inventory_Status'] = status
+        
+        # Get high/low stock items
+        high_stock_df = df_inventory[df_inventory['Inventory_Status'] == 'High Stock'].copy().sort_values('Cover_Months', ascending=False)
+        low_stock_df = df_inventory[df_inventory['Inventory_Status'] == 'Need Replenishment'].copy().sort_values('Cover_Months', ascending=True)
+        
+        # Tier analysis
+        if 'SKU_Tier' in df_inventory.columns:
+            tier_analysis = df_inventory.groupby('SKU_Tier').agg({
+                'SKU_ID': 'count',
+                'Stock_Qty': 'sum',
+                'Avg_Monthly_Sales_3M': 'sum',
+                'Cover_Months': 'mean'
+            }).reset_index()
+            tier_analysis.columns = ['Tier', 'SKU_Count', 'Total_Stock', 'Total_Sales_3M_Avg', 'Avg_Cover_Months']
+            tier_analysis['Turnover'] = tier_analysis['Total_Sales_3M_Avg'] / tier_analysis['Total_Stock']
+            metrics['tier_analysis'] = tier_analysis
+        
+        metrics['inventory_df'] = df_inventory
+        metrics['high_stock'] = high_stock_df
+        metrics['low_stock'] = low_stock_df
+        metrics['total_stock'] = df_inventory['Stock_Qty'].sum()
+        metrics['total_skus'] = len(df_inventory)
+        metrics['avg_cover'] = df_inventory[df_inventory['Cover_Months'] < 999]['Cover_Months'].mean()
+        
+        metrics['inventory_value_score'] = (len(df_inventory[df_inventory['Inventory_Status'] == 'Ideal/Healthy']) / 
+                                            len(df_inventory) * 100) if len(df_inventory) > 0 else 0
+        
+        return metrics
+        
+    except Exception as e:
+        add_diagnostic(diagnostics, 'error', 'calculate_inventory_metrics_with_3month_avg', f"Inventory metrics error: {str(e)}")
+        return metrics
+
+def calculate_sales_vs_forecast_po(df_sales, df_forecast, df_po, df_product, diagnostics=None):
+    """Calculate sales vs forecast and PO comparison - HANYA ACTIVE SKUS"""
+    
+    results = {}
+    
+    if df_sales.empty or df_forecast.empty:
+        return results
+    
+    try:
+        # ADD PRODUCT INFO jika belum ada
+        df_sales = add_product_info_to_data(df_sales, df_product)
+        df_forecast = add_product_info_to_data(df_forecast, df_product)
+        df_po = add_product_info_to_data(df_po, df_product)
+        
+        # FILTER HANYA ACTIVE SKUS
+        if 'Status' in df_product.columns:
+            active_skus = df_product[df_product['Status'].str.upper() == 'ACTIVE']['SKU_ID'].tolist()
+            
+            # Filter semua dataset untuk hanya active SKUs
+            df_sales = df_sales[df_sales['SKU_ID'].isin(active_skus)]
+            df_forecast = df_forecast[df_forecast['SKU_ID'].isin(active_skus)]
+            if not df_po.empty:
+                df_po = df_po[df_po['SKU_ID'].isin(active_skus)]
+        
+        # Get last 3 months for comparison
+        sales_months = sorted(df_sales['Month'].unique())
+        forecast_months = sorted(df_forecast['Month'].unique())
+        po_months = sorted(df_po['Month'].unique())
+        
+        # Find common months
+        common_months = sorted(set(sales_months) & set(forecast_months) & set(po_months))
+        
+        if not common_months:
+            return results
+        
+        # Use last common month
+        last_month = common_months[-1]
+        
+        # Get data for last month
+        df_sales_month = df_sales[df_sales['Month'] == last_month].copy()
+        df_forecast_month = df_forecast[df_forecast['Month'] == last_month].copy()
+        df_po_month = df_po[df_po['Month'] == last_month].copy()
+        
+        # Filter hanya SKU dengan Forecast_Qty > 0
+        df_forecast_month = df_forecast_month[df_forecast_month['Forecast_Qty'] > 0]
+        
+        # Merge all data
+        df_merged = pd.merge(
+            df_sales_month[['SKU_ID', 'Sales_Qty']],
+            df_forecast_month[['SKU_ID', 'Forecast_Qty']],
+            on='SKU_ID',
+            how='inner'
+        )
+        
+        df_merged = pd.merge(
+            df_merged,
+            df_po_month[['SKU_ID', 'PO_Qty']],
+            on='SKU_ID',
+            how='left'
+        )
+        
+        # Add product info
+        df_merged = add_product_info_to_data(df_merged, df_product)
+        
+        # Filter out SKU dengan PO_Qty = 0 (tidak ada PO) jika mau
+        # df_merged = df_merged[df_merged['PO_Qty'] > 0]
+        
+        # Calculate ratios
+        df_merged['Sales_vs_Forecast_Ratio'] = np.where(
+            df_merged['Forecast_Qty'] > 0,
+            (df_merged['Sales_Qty'] / df_merged['Forecast_Qty']) * 100,
+            0
+        )
+        
+        df_merged['Sales_vs_PO_Ratio'] = np.where(
+            df_merged['PO_Qty'] > 0,
+            (df_merged['Sales_Qty'] / df_merged['PO_Qty']) * 100,
+            0
+        )
+        
+        # Calculate deviations
+        df_merged['Forecast_Deviation'] = abs(df_merged['Sales_vs_Forecast_Ratio'] - 100)
+        df_merged['PO_Deviation'] = abs(df_merged['Sales_vs_PO_Ratio'] - 100)
+        
+        # Identify SKUs with high deviation (> 30%) - HANYA ACTIVE SKUS
+        high_deviation_skus = df_merged[
+            (df_merged['Forecast_Deviation'] > 30) | 
+            (df_merged['PO_Deviation'] > 30)
+        ].copy()
+        
+        high_deviation_skus = high_deviation_skus.sort_values('Forecast_Deviation', ascending=False)
+        
+        # Calculate overall metrics
+        avg_forecast_deviation = df_merged['Forecast_Deviation'].mean()
+        avg_po_deviation = df_merged['PO_Deviation'].mean()
+        
+        results = {
+            'last_month': last_month,
+            'comparison_data': df_merged,
+            'high_deviation_skus': high_deviation_skus,
+            'avg_forecast_deviation': avg_forecast_deviation,
+            'avg_po_deviation': avg_po_deviation,
+            'total_skus_compared': len(df_merged),
+            'active_skus_only': True
+        }
+        
+        return results
+        
+    except Exception as e:
+        add_diagnostic(diagnostics, 'error', 'calculate_sales_vs_forecast_po', f"Sales vs forecast calculation error: {str(e)}")
+        return results
+
+def calculate_brand_performance(df_forecast, df_po, df_product, diagnostics=None):
+    """Calculate forecast accuracy performance by brand"""
+    
+    if df_forecast.empty or df_po.empty or df_product.empty:
+        return pd.DataFrame()
+    
+    try:
+        # ADD PRODUCT INFO jika belum ada
+        df_forecast = add_product_info_to_data(df_forecast, df_product)
+        df_po = add_product_info_to_data(df_po, df_product)
+        
+        # Get last month data
+        forecast_months = sorted(df_forecast['Month'].unique())
+        po_months = sorted(df_po['Month'].unique())
+        common_months = sorted(set(forecast_months) & set(po_months))
+        
+        if not common_months:
+            return pd.DataFrame()
+        
+        last_month = common_months[-1]
+        
+        # Get data for last month
+        df_forecast_month = df_forecast[df_forecast['Month'] == last_month].copy()
+        df_po_month = df_po[df_po['Month'] == last_month].copy()
+        
+        # Merge forecast and PO
+        df_merged = pd.merge(
+            df_forecast_month,
+            df_po_month,
+            on=['SKU_ID'],
+            how='inner'
+        )
+        
+        # Add brand info jika belum ada
+        if 'Brand' not in df_merged.columns:
+            df_merged = add_product_info_to_data(df_merged, df_product)
+        
+        if 'Brand' not in df_merged.columns:
+            return pd.DataFrame()
+        
+        # Calculate ratio and accuracy
+        df_merged['PO_Rofo_Ratio'] = np.where(
+            df_merged['Forecast_Qty'] > 0,
+            (df_merged['PO_Qty'] / df_merged['Forecast_Qty']) * 100,
+            0
+        )
+        
+        # Categorize
+        conditions = [
+            df_merged['PO_Rofo_Ratio'] < 80,
+            (df_merged['PO_Rofo_Ratio'] >= 80) & (df_merged['PO_Rofo_Ratio'] <= 120),
+            df_merged['PO_Rofo_Ratio'] > 120
+        ]
+        choices = ['Under', 'Accurate', 'Over']
+        df_merged['Accuracy_Status'] = np.select(conditions, choices, default='Unknown')
+        
+        # Calculate brand performance
+        brand_performance = df_merged.groupby('Brand').agg({
+            'SKU_ID': 'count',
+            'Forecast_Qty': 'sum',
+            'PO_Qty': 'sum',
+            'PO_Rofo_Ratio': lambda x: 100 - abs(x - 100).mean()  # Accuracy
+        }).reset_index()
+        
+        brand_performance.columns = ['Brand', 'SKU_Count', 'Total_Forecast', 'Total_PO', 'Accuracy']
+        
+        # Calculate additional metrics
+        brand_performance['PO_vs_Forecast_Ratio'] = (brand_performance['Total_PO'] / brand_performance['Total_Forecast'] * 100)
+        brand_performance['Qty_Difference'] = brand_performance['Total_PO'] - brand_performance['Total_Forecast']
+        
+        # Get status counts
+        status_counts = df_merged.groupby(['Brand', 'Accuracy_Status']).size().unstack(fill_value=0).reset_index()
+        
+        # Merge with performance data
+        brand_performance = pd.merge(brand_performance, status_counts, on='Brand', how='left')
+        
+        # Fill NaN with 0 for status columns
+        for status in ['Under', 'Accurate', 'Over']:
+            if status not in brand_performance.columns:
+                brand_performance[status] = 0
+        
+        # Sort by accuracy
+        brand_performance = brand_performance.sort_values('Accuracy', ascending=False)
+        
+        return brand_performance
+        
+    except Exception as e:
+        add_diagnostic(diagnostics, 'error', 'calculate_brand_performance', f"Brand performance calculation error: {str(e)}")
+        return pd.DataFrame()
+
+def identify_profitability_segments(df_financial, diagnostics=None):
+    """Segment SKUs by profitability"""
+    
+    if df_financial.empty:
+        return pd.DataFrame()
+    
+    try:
+        sku_profitability = df_financial.groupby(['SKU_ID', 'Product_Name', 'Brand']).agg({
+            'Revenue': 'sum',
+            'Gross_Margin': 'sum',
+            'Sales_Qty': 'sum'
+        }).reset_index()
+        
+        # Calculate metrics
+        sku_profitability['Avg_Margin_Per_SKU'] = sku_profitability['Gross_Margin'] / sku_profitability['Sales_Qty']
+        sku_profitability['Margin_Percentage'] = np.where(
+            sku_profitability['Revenue'] > 0,
+            (sku_profitability['Gross_Margin'] / sku_profitability['Revenue'] * 100),
+            0
+        )
+        
+        # Segment by margin percentage
+        conditions = [
+            (sku_profitability['Margin_Percentage'] >= 40),
+            (sku_profitability['Margin_Percentage'] >= 20) & (sku_profitability['Margin_Percentage'] < 40),
+            (sku_profitability['Margin_Percentage'] < 20) & (sku_profitability['Margin_Percentage'] > 0),
+            (sku_profitability['Margin_Percentage'] <= 0)
+        ]
+        choices = ['High Margin (>40%)', 'Medium Margin (20-40%)', 'Low Margin (<20%)', 'Negative Margin']
+        
+        sku_profitability['Margin_Segment'] = np.select(conditions, choices, default='Unknown')
+        
+        return sku_profitability.sort_values('Gross_Margin', ascending=False)
+        
+    except Exception as e:
+        add_diagnostic(diagnostics, 'error', 'identify_profitability_segments', f"Profitability segmentation error: {str(e)}")
+        return pd.DataFrame()
+
+def validate_data_quality(df, df_name):
+    """Comprehensive data quality validation"""
+    
+    checks = {}
+    
+    if df.empty:
+        checks['Empty Dataset'] = '❌ Dataset kosong'
+        return checks
+    
+    # Basic checks
+    checks['Total Rows'] = f"📊 {len(df):,} rows"
+    checks['Total Columns'] = f"📋 {len(df.columns)} columns"
+    
+    # Missing values
+    missing_values = df.isnull().sum().sum()
+    missing_pct = (missing_values / (len(df) * len(df.columns)) * 100)
+    checks['Missing Values'] = f"⚠️ {missing_values:,} ({missing_pct:.1f}%)" if missing_values > 0 else f"✅ {missing_values:,}"
+    
+    # Duplicates
+    duplicates = df.duplicated().sum()
+    checks['Duplicate Rows'] = f"⚠️ {duplicates:,}" if duplicates > 0 else f"✅ {duplicates:,}"
+    
+    # Zero values (for numeric columns)
+    numeric_cols = df.select_dtypes(include=[np.number]).columns
+    if len(numeric_cols) > 0:
+        zero_values = (df[numeric_cols] == 0).sum().sum()
+        zero_pct = (zero_values / (len(df) * len(numeric_cols)) * 100)
+        checks['Zero Values'] = f"📉 {zero_values:,} ({zero_pct:.1f}%)"
+    
+    # Negative values
+    if len(numeric_cols) > 0:
+        negative_values = (df[numeric_cols] < 0).sum().sum()
+        if negative_values > 0:
+            checks['Negative Values'] = f"❌ {negative_values:,}"
+    
+    # Date range (if Month column exists)
+    if 'Month' in df.columns:
+        try:
+            min_date = df['Month'].min()
+            max_date = df['Month'].max()
+            checks['Date Range'] = f"📅 {min_date.strftime('%b %Y')} - {max_date.strftime('%b %Y')}"
+        except:
+            pass
+    
+    return checks
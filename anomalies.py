@@ -0,0 +1,147 @@
+"""
+Anomaly detection - outlier Sales_Qty, Forecast_Qty dan PO_Qty per SKU
+di seluruh matriks SKU x bulan sekaligus (tanpa loop per SKU)
+
+Hanya sel yang punya baris data (observed) yang dinilai:
+- Robust z = 0.6745 x (x - median) / MAD per SKU. Jika MAD = 0 (mis. demand
+  intermittent) dipakai mean absolute deviation: (x - median) / (1.2533 x MeanAD).
+  |z| >= Z_THRESHOLD -> 'Spike' / 'Drop'. SKU dengan < MIN_HISTORY bulan tidak dinilai.
+- MoM jump: x_t / x_{t-1} >= JUMP_RATIO (atau <= 1 / JUMP_RATIO), keduanya > 0,
+  dan selisih MoM-nya sendiri outlier (robust z selisih >= Z_THRESHOLD).
+  Transisi dari / ke 0 tidak dianggap jump (pola demand intermittent).
+
+Hasil 'alerts' (satu baris per SKU x measure x bulan yang ter-flag) dipakai
+juga untuk menandai tabel high deviation (annotate_deviation).
+"""
+import numpy as np
+import pandas as pd
+
+from diagnostics import add_diagnostic
+from range_index import dense_matrix, month_start
+
+MEASURES = [('sales', 'Sales_Qty'), ('forecast', 'Forecast_Qty'), ('po', 'PO_Qty')]
+Z_THRESHOLD = 3.5
+JUMP_RATIO = 3.0
+MIN_HISTORY = 6
+MAD_SCALE = 0.6745
+MEAN_AD_SCALE = 1.2533
+
+
+def robust_z(values):
+    """Robust z-score per baris matriks (NaN = tidak diobservasi); return (z, median)"""
+    n_obs = (~np.isnan(values)).sum(axis=1)
+    z = np.full(values.shape, np.nan)
+    median = np.full(values.shape[0], np.nan)
+    rows = n_obs > 0
+    if not rows.any():
+        return z, median
+
+    sub = values[rows]
+    med = np.nanmedian(sub, axis=1)
+    deviation = np.abs(sub - med[:, None])
+    mad = np.nanmedian(deviation, axis=1)
+    mean_ad = np.nanmean(deviation, axis=1)
+    scale = np.where(mad > 0, mad / MAD_SCALE, MEAN_AD_SCALE * mean_ad)
+    z[rows] = np.divide(sub - med[:, None], scale[:, None], out=np.zeros(sub.shape), where=scale[:, None] > 0)
+    z[rows] = np.where(np.isnan(sub), np.nan, z[rows])
+    median[rows] = med
+    return z, median
+
+
+def mom_change(values):
+    """Perubahan month-over-month (%) terhadap kolom sebelumnya; NaN jika salah satu tidak ada"""
+    previous = np.concatenate([np.full((values.shape[0], 1), np.nan), values[:, :-1]], axis=1)
+    change = np.divide(values - previous, previous, out=np.full(values.shape, np.nan), where=previous > 0)
+    # Dari 0 ke positif = lonjakan tak hingga
+    change[(previous == 0) & (values > 0)] = np.inf
+    return change * 100, previous
+
+
+def detect_matrix(values, z_threshold=Z_THRESHOLD, jump_ratio=JUMP_RATIO, min_history=MIN_HISTORY):
+    """Flag anomali di matriks (NaN = tidak diobservasi); return dict array"""
+    z, median = robust_z(values)
+    enough = (~np.isnan(values)).sum(axis=1) >= min_history
+    z[~enough] = np.nan
+
+    # Jump: rasio MoM ekstrem *dan* selisihnya outlier dibanding selisih MoM biasa SKU itu
+    change, previous = mom_change(values)
+    step_z, _ = robust_z(values - previous)
+    both = (values > 0) & (previous > 0)
+    jump_up = both & (values >= jump_ratio * previous) & (step_z >= z_threshold)
+    jump_down = both & (values * jump_ratio <= previous) & (step_z <= -z_threshold)
+
+    with np.errstate(invalid='ignore'):
+        flag = np.select(
+            [z >= z_threshold, z <= -z_threshold, jump_up, jump_down],
+            ['Spike', 'Drop', 'Jump Up', 'Jump Down'],
+            default=''
+        )
+    return {'z': z, 'step_z': step_z, 'median': median, 'change': change, 'previous': previous, 'flag': flag}
+
+
+def detect_anomalies(df, value_col, z_threshold=Z_THRESHOLD, jump_ratio=JUMP_RATIO, min_history=MIN_HISTORY):
+    """Long frame (SKU_ID, Month, value_col) -> alert per sel ter-flag"""
+    long = df[['SKU_ID', value_col]].assign(_month=month_start(df['Month'])).dropna(subset=['_month'])
+    skus = pd.Index(long['SKU_ID'].unique(), name='SKU_ID').sort_values()
+    months = pd.date_range(long['_month'].min(), long['_month'].max(), freq='MS')
+    values, observed = dense_matrix(long, value_col, skus, months, (len(skus), len(months)))
+    values = np.where(observed > 0, values, np.nan)
+
+    result = detect_matrix(values, z_threshold, jump_ratio, min_history)
+    rows, cols = np.nonzero(result['flag'] != '')
+    return pd.DataFrame({
+        'SKU_ID': skus.to_numpy()[rows],
+        'Measure': value_col,
+        'Month': months.to_numpy()[cols],
+        'Value': values[rows, cols],
+        'Previous_Value': result['previous'][rows, cols],
+        'SKU_Median': result['median'][rows],
+        'Robust_Z': result['z'][rows, cols],
+        'MoM_Change_Pct': result['change'][rows, cols],
+        'MoM_Z': result['step_z'][rows, cols],
+        'Flag': result['flag'][rows, cols],
+    })
+
+
+def calculate_anomalies(df_sales, df_forecast, df_po, df_product, z_threshold=Z_THRESHOLD,
+                        jump_ratio=JUMP_RATIO, diagnostics=None):
+    """
+    Anomali Sales / Forecast / PO untuk semua SKU.
+
+    Return dict: 'alerts' (per SKU x measure x bulan, urut severity) dan
+    'summary' (jumlah alert per measure x flag).
+    """
+    frames = {'sales': df_sales, 'forecast': df_forecast, 'po': df_po}
+    if all(frame.empty for frame in frames.values()):
+        return {}
+
+    try:
+        alerts = pd.concat(
+            [detect_anomalies(frames[name], value_col, z_threshold, jump_ratio)
+             for name, value_col in MEASURES if not frames[name].empty],
+            ignore_index=True
+        )
+        if not df_product.empty:
+            info = df_product.drop_duplicates('SKU_ID').set_index('SKU_ID')
+            for col in ['Brand', 'Product_Name']:
+                if col in info.columns:
+                    alerts.insert(1, col, alerts['SKU_ID'].map(info[col]))
+        alerts['Severity'] = alerts[['Robust_Z', 'MoM_Z']].abs().max(axis=1).fillna(0)
+        alerts = alerts.sort_values(['Severity', 'Value'], ascending=False).reset_index(drop=True)
+
+        summary = alerts.pivot_table(index='Measure', columns='Flag', values='SKU_ID', aggfunc='count',
+                                     fill_value=0).reset_index() if not alerts.empty else pd.DataFrame()
+        return {'alerts': alerts, 'summary': summary}
+
+    except Exception as e:
+        add_diagnostic(diagnostics, 'error', 'calculate_anomalies', f"Anomaly detection error: {str(e)}")
+        return {}
+
+
+def annotate_deviation(df, alerts, month):
+    """Tambah kolom Anomaly_Flags (mis. 'Forecast_Qty: Spike') ke tabel per SKU untuk `month`"""
+    if df.empty or alerts is None or alerts.empty:
+        return df.assign(Anomaly_Flags='')
+    in_month = alerts[alerts['Month'] == pd.Timestamp(month)]
+    labels = (in_month['Measure'] + ': ' + in_month['Flag']).groupby(in_month['SKU_ID']).agg(', '.join)
+    return df.assign(Anomaly_Flags=df['SKU_ID'].map(labels).fillna('').to_numpy())
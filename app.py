@@ -1,17 +1,38 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import altair as alt
-import plotly.graph_objects as go
-import plotly.express as px
-from datetime import datetime, date, timedelta
-import gspread
-from google.oauth2.service_account import Credentials
-from dateutil.relativedelta import relativedelta
+from datetime import datetime
 import warnings
-from tenacity import retry, stop_after_attempt, wait_exponential
-import math
+import functools
+import os
+from lazy_imports import lazy_import, get_import_timings
+from filters import build_filter_index, get_dimension_options, make_filter_key, apply_filters
+from data_store import enable_copy_on_write, freeze_datasets
+from data_sources import GSheetSource, WorkbookSource
+import data_loader
+import analytics
+from perf import instrument, perf_stage, start_recording, stop_recording
+from anomalies import annotate_deviation
+from cache_manager import (cached, clear_all, cache_stats_frame, cache_entries_frame,
+                           budget_summary, get_memory_budget, set_memory_budget)
+from dag import run_incremental
+from pipeline import ANALYTICS_STEPS
+from replenishment import DEFAULT_PARAMS as REPLENISHMENT_DEFAULTS, plan_replenishment
+from reconciliation import METHODS as RECONCILIATION_METHODS, build_reconciliation_base, reconcile_forecast
+from scenarios import (MEASURES as SCENARIO_MEASURES, build_scenario, compare_brands, compare_results,
+                       describe_adjustment, make_adjustment, run_scenario)
+from segmentation import attach_segments, calculate_abc_xyz, segment_matrix
+from slow_movers import DEFAULT_PARAMS as SLOW_MOVER_DEFAULTS, MOVER_CLASSES, classify_movers
+from telemetry import run_load_with_telemetry, read_history, load_history_frame, sheet_history_frame, summarize_trend
+from versioning import derive_version
 warnings.filterwarnings('ignore')
+enable_copy_on_write()
+
+# Performance panel: satu recorder per rerun, hanya aktif saat Debug Mode.
+# Recorder sisa rerun sebelumnya (mis. terhenti oleh st.stop) dibuang dulu.
+stop_recording()
+if st.session_state.get('debug_mode', False):
+    start_recording(track_memory=st.session_state.get('perf_track_memory', False))
 
 # ============================================================================
 # 📱 IMPORT MOBILE CONFIGURATION
@@ -61,9 +82,10 @@ st.set_page_config(
 device_type = get_device_type()
 is_mobile = is_mobile_device()
 
-# Apply mobile CSS
-mobile_css = apply_mobile_css()
-st.markdown(mobile_css, unsafe_allow_html=True)
+# Apply mobile CSS (desktop sudah tercakup media query di CSS utama)
+if device_type != 'desktop':
+    mobile_css = apply_mobile_css()
+    st.markdown(mobile_css, unsafe_allow_html=True)
 
 # ============================================================================
 # 📱 RESPONSIVE HELPER FUNCTIONS
@@ -100,7 +122,9 @@ def responsive_metric(label, value, delta=None):
 # ============================================================================
 
 # --- CSS KHUSUS PRINT PDF (FIX BLANK PAGE) ---
-st.markdown("""
+# Di-inject setiap run: hanya aturan @media print, jadi tidak memperlambat
+# first paint dan Ctrl+P dari browser tetap memakai fix print
+PRINT_CSS = """
 <style>
     @media print {
         /* FIX UTAMA: Reset SEMUA element ke block/visible */
@@ -211,7 +235,8 @@ st.markdown("""
         }
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+st.markdown(PRINT_CSS, unsafe_allow_html=True)
 
 # --- Custom CSS Premium dengan Mobile Support ---
 st.markdown(f"""
@@ -564,9 +589,9 @@ with st.sidebar:
     
     # TOMBOL CETAK PDF
     st.markdown("---")
-    import streamlit.components.v1 as components
     
     if st.button("🖨️ Save as PDF", use_container_width=True):
+        components = lazy_import('streamlit.components.v1')
         # Script JavaScript untuk memicu dialog print browser
         components.html(
             """
@@ -579,1156 +604,395 @@ with st.sidebar:
         )
     st.caption("Tip: Pilih Destination **'Save as PDF'** & centang **'Background graphics'** di settings print.")
 
+    # Mobile: Advanced Settings ada di tab "⚙️ More"
+    if not is_mobile:
+        st.markdown("---")
+        with st.expander("⚙️ Advanced Settings", expanded=False):
+            st.checkbox("Debug Mode", value=False, key="debug_mode")
+            if st.session_state.get('debug_mode', False):
+                st.checkbox("Track peak memory (slower)", value=False, key="perf_track_memory")
+
 # ============================================================================
 # 🔄 DATA LOADING FUNCTIONS (DARI APLIKASI UTAMA)
 # ============================================================================
 
 @st.cache_resource(show_spinner=False)
-@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
 def init_gsheet_connection():
-    """Inisialisasi koneksi ke Google Sheets dengan retry mechanism"""
-    try:
-        skey = st.secrets["gcp_service_account"]
-        scopes = ["https://www.googleapis.com/auth/spreadsheets"]
-        credentials = Credentials.from_service_account_info(skey, scopes=scopes)
-        client = gspread.authorize(credentials)
-        return client
-    except Exception as e:
-        st.error(f"❌ Koneksi Gagal: {str(e)}")
-        return None
-
-def validate_month_format(month_str):
-    """Validate and standardize month formats"""
-    if pd.isna(month_str):
-        return datetime.now()
-    
-    month_str = str(month_str).strip().upper()
-    
-    # Mapping bulan
-    month_map = {
-        'JAN': 1, 'FEB': 2, 'MAR': 3, 'APR': 4, 'MAY': 5, 'JUN': 6,
-        'JUL': 7, 'AUG': 8, 'SEP': 9, 'OCT': 10, 'NOV': 11, 'DEC': 12
-    }
-    
-    formats_to_try = ['%b-%Y', '%b-%y', '%B %Y', '%m/%Y', '%Y-%m']
-    
-    for fmt in formats_to_try:
-        try:
-            return datetime.strptime(month_str, fmt)
-        except:
-            continue
-    
-    # Fallback: cari bulan dalam string
-    for month_name, month_num in month_map.items():
-        if month_name in month_str:
-            # Cari tahun
-            year_part = month_str.replace(month_name, '').replace('-', '').replace(' ', '').strip()
-            if year_part and year_part.isdigit():
-                year = int('20' + year_part) if len(year_part) == 2 else int(year_part)
-            else:
-                year = datetime.now().year
-            
-            return datetime(year, month_num, 1)
-    
-    return datetime.now()
+    """Inisialisasi koneksi ke Google Sheets dengan retry mechanism (stack Google di-import lazily)"""
+    tenacity = lazy_import('tenacity')
 
-def add_product_info_to_data(df, df_product):
-    """Add Product_Name, Brand, SKU_Tier, Prices from Product_Master to any dataframe"""
-    if df.empty or df_product.empty or 'SKU_ID' not in df.columns:
-        return df
-    
-    # Get product info from Product_Master (including prices)
-    price_cols = ['Floor_Price', 'Net_Order_Price'] if 'Floor_Price' in df_product.columns and 'Net_Order_Price' in df_product.columns else []
-    
-    product_info_cols = ['SKU_ID', 'Product_Name', 'Brand', 'SKU_Tier', 'Status'] + price_cols
-    product_info_cols = [col for col in product_info_cols if col in df_product.columns]
-    
-    product_info = df_product[product_info_cols].copy()
-    product_info = product_info.drop_duplicates(subset=['SKU_ID'])
-    
-    # Remove existing columns if they exist (except SKU_ID)
-    cols_to_remove = []
-    for col in ['Product_Name', 'Brand', 'SKU_Tier', 'Status', 'Floor_Price', 'Net_Order_Price']:
-        if col in df.columns and col != 'SKU_ID':
-            cols_to_remove.append(col)
-    
-    if cols_to_remove:
-        df_temp = df.drop(columns=cols_to_remove)
-    else:
-        df_temp = df.copy()
-    
-    # Merge with product info
-    df_result = pd.merge(df_temp, product_info, on='SKU_ID', how='left')
-    return df_result
-
-@st.cache_data(ttl=300, max_entries=3, show_spinner=False)
-def load_and_process_data(_client):
-    """
-    Load semua data termasuk sheet baru: BS_Fullfilment_Cost
-    """
-    
-    sheet_id = "1jcs8L0CysdzxemPz1EYVVfVhsSR-ik46khIw5jhhBgw"
-    data = {}
-
-    # --- HELPER: Baca Sheet Manual ---
-    def safe_read_stock_sheet(sheet_name):
-        try:
-            ws = _client.open_by_key(sheet_id).worksheet(sheet_name)
-            raw_data = ws.get_all_values()
-            if len(raw_data) < 2: return pd.DataFrame()
-            headers = [str(h).strip() for h in raw_data[0]]
-            df = pd.DataFrame(raw_data[1:], columns=headers)
-            df = df.loc[:, df.columns != '']
-            return df
-        except: return pd.DataFrame()
-
-    try:
-        # 1. PRODUCT MASTER
-        ws_prod = _client.open_by_key(sheet_id).worksheet("Product_Master")
-        df_product = pd.DataFrame(ws_prod.get_all_records())
-        df_product.columns = [col.strip().replace(' ', '_') for col in df_product.columns]
-        
-        for col in ['Floor_Price', 'Net_Order_Price']:
-            if col in df_product.columns:
-                df_product[col] = pd.to_numeric(df_product[col], errors='coerce').fillna(0)
-        
-        if 'Status' not in df_product.columns: df_product['Status'] = 'Active'
-        df_product_active = df_product[df_product['Status'].str.upper() == 'ACTIVE'].copy()
-        active_skus = df_product_active['SKU_ID'].tolist()
-        
-        data['product'] = df_product
-        data['product_active'] = df_product_active
-
-        # 2. SALES DATA
-        ws_sales = _client.open_by_key(sheet_id).worksheet("Sales")
-        df_sales_raw = pd.DataFrame(ws_sales.get_all_records())
-        df_sales_raw.columns = [col.strip() for col in df_sales_raw.columns]
-        month_cols = [c for c in df_sales_raw.columns if any(m in c.upper() for m in ['JAN','FEB','MAR','APR','MAY','JUN','JUL','AUG','SEP','OCT','NOV','DEC'])]
-        if month_cols and 'SKU_ID' in df_sales_raw.columns:
-            id_cols = ['SKU_ID']
-            for col in ['SKU_Name', 'Product_Name', 'Brand', 'SKU_Tier']:
-                if col in df_sales_raw.columns: id_cols.append(col)
-            df_sales_long = df_sales_raw.melt(id_vars=id_cols, value_vars=month_cols, var_name='Month_Label', value_name='Sales_Qty')
-            df_sales_long['Sales_Qty'] = pd.to_numeric(df_sales_long['Sales_Qty'], errors='coerce').fillna(0)
-            df_sales_long['Month'] = df_sales_long['Month_Label'].apply(validate_month_format)
-            df_sales_long = df_sales_long[df_sales_long['SKU_ID'].isin(active_skus)]
-            df_sales_long = add_product_info_to_data(df_sales_long, df_product)
-            data['sales'] = df_sales_long.sort_values('Month')
-
-        # 3. ROFO DATA
-        ws_rofo = _client.open_by_key(sheet_id).worksheet("Rofo")
-        df_rofo_raw = pd.DataFrame(ws_rofo.get_all_records())
-        df_rofo_raw.columns = [col.strip() for col in df_rofo_raw.columns]
-        month_cols_rofo = [c for c in df_rofo_raw.columns if any(m in c.upper() for m in ['JAN','FEB','MAR','APR','MAY','JUN','JUL','AUG','SEP','OCT','NOV','DEC'])]
-        if month_cols_rofo:
-            id_cols_rofo = ['SKU_ID']
-            for col in ['Product_Name', 'Brand']:
-                if col in df_rofo_raw.columns: id_cols_rofo.append(col)
-            df_rofo_long = df_rofo_raw.melt(id_vars=id_cols_rofo, value_vars=month_cols_rofo, var_name='Month_Label', value_name='Forecast_Qty')
-            df_rofo_long['Forecast_Qty'] = pd.to_numeric(df_rofo_long['Forecast_Qty'], errors='coerce').fillna(0)
-            df_rofo_long['Month'] = df_rofo_long['Month_Label'].apply(validate_month_format)
-            df_rofo_long = df_rofo_long[df_rofo_long['SKU_ID'].isin(active_skus)]
-            df_rofo_long = add_product_info_to_data(df_rofo_long, df_product)
-            data['forecast'] = df_rofo_long
-
-        # 4. PO DATA
-        ws_po = _client.open_by_key(sheet_id).worksheet("PO")
-        df_po_raw = pd.DataFrame(ws_po.get_all_records())
-        df_po_raw.columns = [col.strip() for col in df_po_raw.columns]
-        month_cols_po = [c for c in df_po_raw.columns if any(m in c.upper() for m in ['JAN','FEB','MAR','APR','MAY','JUN','JUL','AUG','SEP','OCT','NOV','DEC'])]
-        if month_cols_po and 'SKU_ID' in df_po_raw.columns:
-            df_po_long = df_po_raw.melt(id_vars=['SKU_ID'], value_vars=month_cols_po, var_name='Month_Label', value_name='PO_Qty')
-            df_po_long['PO_Qty'] = pd.to_numeric(df_po_long['PO_Qty'], errors='coerce').fillna(0)
-            df_po_long['Month'] = df_po_long['Month_Label'].apply(validate_month_format)
-            df_po_long = df_po_long[df_po_long['SKU_ID'].isin(active_skus)]
-            df_po_long = add_product_info_to_data(df_po_long, df_product)
-            data['po'] = df_po_long
-
-        # 5. STOCK DATA
-        df_stock_raw = safe_read_stock_sheet("Stock_Onhand")
-        if not df_stock_raw.empty:
-            col_mapping = {
-                'SKU_ID': 'SKU_ID', 'Qty_Available': 'Stock_Qty', 'Product_Code': 'Anchanto_Code',
-                'Stock_Category': 'Stock_Category', 'Expiry_Date': 'Expiry_Date', 'Product_Name': 'Product_Name'
-            }
-            if 'SKU_ID' in df_stock_raw.columns and 'Qty_Available' in df_stock_raw.columns:
-                cols_to_use = [c for c in col_mapping.keys() if c in df_stock_raw.columns]
-                df_stock = df_stock_raw[cols_to_use].copy()
-                df_stock = df_stock.rename(columns=col_mapping)
-                df_stock['Stock_Qty'] = pd.to_numeric(df_stock['Stock_Qty'], errors='coerce').fillna(0)
-                df_stock['SKU_ID'] = df_stock['SKU_ID'].astype(str).str.strip()
-                if 'Floor_Price' in df_product.columns:
-                    df_stock = pd.merge(df_stock, df_product[['SKU_ID', 'Floor_Price', 'Net_Order_Price']], on='SKU_ID', how='left')
-                data['stock'] = df_stock
-            else:
-                data['stock'] = pd.DataFrame(columns=['SKU_ID', 'Stock_Qty'])
-        else:
-            data['stock'] = pd.DataFrame(columns=['SKU_ID', 'Stock_Qty'])
-
-        # 6. FORECAST 2026 ECOMM
-        try:
-            ws_ecomm = _client.open_by_key(sheet_id).worksheet("Forecast_2026_Ecomm")
-            df_ecomm_raw = pd.DataFrame(ws_ecomm.get_all_records())
-            df_ecomm_raw.columns = [col.strip().replace(' ', '_') for col in df_ecomm_raw.columns]
-            month_cols_ecomm = [c for c in df_ecomm_raw.columns if any(m in c.upper() for m in ['JAN','FEB','MAR','APR','MAY','JUN','JUL','AUG','SEP','OCT','NOV','DEC'])]
-            for col in month_cols_ecomm:
-                df_ecomm_raw[col] = pd.to_numeric(df_ecomm_raw[col], errors='coerce').fillna(0)
-            data['ecomm_forecast'] = df_ecomm_raw
-            data['ecomm_forecast_month_cols'] = month_cols_ecomm
-        except:
-            data['ecomm_forecast'] = pd.DataFrame()
-            data['ecomm_forecast_month_cols'] = []
-        
-        # 7. FORECAST 2026 RESELLER
-        try:
-            ws_reseller = _client.open_by_key(sheet_id).worksheet("Forecast_2026_Reseller")
-            df_reseller_raw = pd.DataFrame(ws_reseller.get_all_records())
-            df_reseller_raw.columns = [col.strip().replace(' ', '_') for col in df_reseller_raw.columns]
-            all_month_cols_res = [c for c in df_reseller_raw.columns if any(m in c.upper() for m in ['JAN','FEB','MAR','APR','MAY','JUN','JUL','AUG','SEP','OCT','NOV','DEC'])]
-            for col in all_month_cols_res:
-                df_reseller_raw[col] = pd.to_numeric(df_reseller_raw[col], errors='coerce').fillna(0)
-            
-            forecast_start_date = datetime(2026, 1, 1)
-            def is_forecast_month(month_str):
-                try:
-                    month_str = str(month_str).upper().replace('_', ' ').replace('-', ' ')
-                    if ' ' in month_str:
-                        month_part, year_part = month_str.split(' ')
-                        month_num = datetime.strptime(month_part[:3], '%b').month
-                        year_clean = ''.join(filter(str.isdigit, year_part))
-                        year = 2000 + int(year_clean) if len(year_clean) == 2 else int(year_clean)
-                        return datetime(year, month_num, 1) >= forecast_start_date
-                except: return False
-                return False
-            
-            hist_cols = [c for c in all_month_cols_res if not is_forecast_month(c)]
-            fcst_cols = [c for c in all_month_cols_res if is_forecast_month(c)]
-            data['reseller_forecast'] = df_reseller_raw
-            data['reseller_all_month_cols'] = all_month_cols_res
-            data['reseller_historical_cols'] = hist_cols
-            data['reseller_forecast_cols'] = fcst_cols
-        except:
-            data['reseller_forecast'] = pd.DataFrame()
-            data['reseller_all_month_cols'] = []
-            data['reseller_historical_cols'] = []
-            data['reseller_forecast_cols'] = []
-
-        # ==============================================================================
-        # 8. BS FULLFILMENT COST (NEW SHEET)
-        # ==============================================================================
+    @tenacity.retry(stop=tenacity.stop_after_attempt(3), wait=tenacity.wait_exponential(multiplier=1, min=4, max=10))
+    def connect():
         try:
-            ws_bs = _client.open_by_key(sheet_id).worksheet("BS_Fullfilment_Cost")
-            df_bs = pd.DataFrame(ws_bs.get_all_records())
-            
-            # Cleaning Headers & Data
-            # Hapus spasi di nama kolom
-            df_bs.columns = [c.strip() for c in df_bs.columns]
-            
-            # Helper untuk bersihkan angka (hapus koma dan persen)
-            def clean_currency(x):
-                if isinstance(x, str):
-                    return pd.to_numeric(x.replace(',', '').replace('%', ''), errors='coerce')
-                return x
-
-            # List kolom angka yang perlu dibersihkan
-            numeric_cols = ['Total Order(BS)', 'GMV (Fullfil By BS)', 'GMV Total (MP)', 'Total Cost', 'BSA', '%Cost']
-            
-            for col in numeric_cols:
-                if col in df_bs.columns:
-                    df_bs[col] = df_bs[col].apply(clean_currency).fillna(0)
-            
-            # Convert Percentages (karena 3.14% jadi 3.14, mungkin perlu dibagi 100 utk kalkulasi, tapi utk display biar saja)
-            # Kita tandai kolom ini
-            
-            # Parse Date (Apr-25)
-            df_bs['Month_Date'] = pd.to_datetime(df_bs['Month'], format='%b-%y', errors='coerce')
-            df_bs = df_bs.sort_values('Month_Date')
-            
-            data['fulfillment'] = df_bs
-            
+            gspread = lazy_import('gspread')
+            service_account = lazy_import('google.oauth2.service_account')
+            skey = st.secrets["gcp_service_account"]
+            scopes = ["https://www.googleapis.com/auth/spreadsheets"]
+            credentials = service_account.Credentials.from_service_account_info(skey, scopes=scopes)
+            client = gspread.authorize(credentials)
+            return client
         except Exception as e:
-            st.warning(f"Gagal load BS_Fullfilment_Cost: {e}")
-            data['fulfillment'] = pd.DataFrame()
+            st.error(f"❌ Koneksi Gagal: {str(e)}")
+            return None
 
-        return data
-        
-    except Exception as e:
-        st.error(f"Error loading data: {str(e)}")
-        return {}
+    return connect()
 
-# --- FUNGSI BARU: LOAD DATA RESELLER LENGKAP ---
-@st.cache_data(ttl=300, show_spinner=False)
-def load_reseller_complete_data(_client):
-    """
-    Load SEMUA data reseller: forecast, sales, past rofo, past PO
-    """
-    # Gunakan sheet_id yang sudah ada
-    sheet_id = "1jcs8L0CysdzxemPz1EYVVfVhsSR-ik46khIw5jhhBgw"
-    reseller_data = {}
-    
-    try:
-        # 1. FORECAST 2026 RESELLER
-        ws_fcst = _client.open_by_key(sheet_id).worksheet("Forecast_2026_Reseller")
-        df_fcst_raw = pd.DataFrame(ws_fcst.get_all_records())
-        df_fcst_raw.columns = [col.strip() for col in df_fcst_raw.columns]
-        
-        # Identifikasi kolom bulan
-        all_month_cols = [c for c in df_fcst_raw.columns if any(m in c.upper() for m in 
-                      ['JAN','FEB','MAR','APR','MAY','JUN','JUL','AUG','SEP','OCT','NOV','DEC'])]
-        
-        # Pisahkan 2025 (history) vs 2026+ (forecast)
-        hist_cols = []
-        fcst_cols = []
-        
-        for col in all_month_cols:
-            col_str = str(col).upper()
-            if '25' in col_str or '2025' in col_str:
-                hist_cols.append(col)
-            else:
-                fcst_cols.append(col)  # 2026, 2027, dll
-        
-        # Convert numeric
-        for col in all_month_cols:
-            df_fcst_raw[col] = pd.to_numeric(df_fcst_raw[col], errors='coerce').fillna(0)
-        
-        reseller_data['forecast'] = df_fcst_raw
-        reseller_data['forecast_month_cols'] = fcst_cols
-        reseller_data['historical_month_cols'] = hist_cols
-        
-        # 2. SALES RESELLER
-        try:
-            ws_sales = _client.open_by_key(sheet_id).worksheet("Sales_Reseller")
-            df_sales_raw = pd.DataFrame(ws_sales.get_all_records())
-            df_sales_raw.columns = [col.strip() for col in df_sales_raw.columns]
-            
-            # Transform ke long format
-            month_cols_sales = [c for c in df_sales_raw.columns if any(m in c.upper() for m in 
-                          ['JAN','FEB','MAR','APR','MAY','JUN','JUL','AUG','SEP','OCT','NOV','DEC'])]
-            
-            if month_cols_sales and 'SKU_ID' in df_sales_raw.columns:
-                id_cols_sales = ['SKU_ID', 'Brand', 'Product_Name', 'SKU_Tier', 'Floor_Price']
-                id_cols_sales = [c for c in id_cols_sales if c in df_sales_raw.columns]
-                
-                df_sales_long = df_sales_raw.melt(
-                    id_vars=id_cols_sales,
-                    value_vars=month_cols_sales,
-                    var_name='Month_Label',
-                    value_name='Sales_Qty'
-                )
-                df_sales_long['Sales_Qty'] = pd.to_numeric(df_sales_long['Sales_Qty'], errors='coerce').fillna(0)
-                df_sales_long['Month'] = df_sales_long['Month_Label'].apply(validate_month_format)
-                reseller_data['sales'] = df_sales_long
-        except Exception as e:
-            st.warning(f"⚠️ Sales_Reseller sheet not accessible: {str(e)}")
-        
-        # 3. PAST ROFO RESELLER
-        try:
-            ws_rofo = _client.open_by_key(sheet_id).worksheet("Past_Rofo_Reseller")
-            df_rofo_raw = pd.DataFrame(ws_rofo.get_all_records())
-            df_rofo_raw.columns = [col.strip() for col in df_rofo_raw.columns]
-            
-            month_cols_rofo = [c for c in df_rofo_raw.columns if any(m in c.upper() for m in 
-                          ['JAN','FEB','MAR','APR','MAY','JUN','JUL','AUG','SEP','OCT','NOV','DEC'])]
-            
-            if month_cols_rofo and 'SKU_ID' in df_rofo_raw.columns:
-                id_cols_rofo = ['SKU_ID', 'Brand', 'Product_Name', 'SKU_Tier', 'Floor_Price']
-                id_cols_rofo = [c for c in id_cols_rofo if c in df_rofo_raw.columns]
-                
-                df_rofo_long = df_rofo_raw.melt(
-                    id_vars=id_cols_rofo,
-                    value_vars=month_cols_rofo,
-                    var_name='Month_Label',
-                    value_name='Forecast_Qty'
-                )
-                df_rofo_long['Forecast_Qty'] = pd.to_numeric(df_rofo_long['Forecast_Qty'], errors='coerce').fillna(0)
-                df_rofo_long['Month'] = df_rofo_long['Month_Label'].apply(validate_month_format)
-                reseller_data['past_rofo'] = df_rofo_long
-        except Exception as e:
-            st.warning(f"⚠️ Past_Rofo_Reseller sheet not accessible: {str(e)}")
-        
-        # 4. PAST PO RESELLER
-        try:
-            ws_po = _client.open_by_key(sheet_id).worksheet("Past_PO_Reseller")
-            df_po_raw = pd.DataFrame(ws_po.get_all_records())
-            df_po_raw.columns = [col.strip() for col in df_po_raw.columns]
-            
-            month_cols_po = [c for c in df_po_raw.columns if any(m in c.upper() for m in 
-                          ['JAN','FEB','MAR','APR','MAY','JUN','JUL','AUG','SEP','OCT','NOV','DEC'])]
-            
-            if month_cols_po and 'SKU_ID' in df_po_raw.columns:
-                id_cols_po = ['SKU_ID', 'Brand', 'Product_Name', 'SKU_Tier', 'Floor_Price']
-                id_cols_po = [c for c in id_cols_po if c in df_po_raw.columns]
-                
-                df_po_long = df_po_raw.melt(
-                    id_vars=id_cols_po,
-                    value_vars=month_cols_po,
-                    var_name='Month_Label',
-                    value_name='PO_Qty'
-                )
-                df_po_long['PO_Qty'] = pd.to_numeric(df_po_long['PO_Qty'], errors='coerce').fillna(0)
-                df_po_long['Month'] = df_po_long['Month_Label'].apply(validate_month_format)
-                reseller_data['past_po'] = df_po_long
-        except Exception as e:
-            st.warning(f"⚠️ Past_PO_Reseller sheet not accessible: {str(e)}")
-        
-        return reseller_data
-        
-    except Exception as e:
-        st.error(f"❌ Error loading reseller data: {str(e)}")
-        return {}
+@st.cache_resource(show_spinner=False)
+def init_data_source():
+    """Data source dashboard: workbook lokal via SCM_WORKBOOK_PATH (dev/offline), selain itu Google Sheets"""
+    workbook_path = os.environ.get('SCM_WORKBOOK_PATH')
+    if workbook_path:
+        return WorkbookSource(workbook_path)
+
+    client = init_gsheet_connection()
+    return GSheetSource(client) if client is not None else None
+
+def render_diagnostics(diagnostics):
+    """Tampilkan diagnostics dari kode headless sebagai st.warning / st.error"""
+    for item in diagnostics:
+        if item['level'] == 'error':
+            st.error(item['message'])
+        elif item['level'] == 'warning':
+            st.warning(item['message'])
+        else:
+            st.info(item['message'])
+
+def with_diagnostics(func):
+    """Bungkus fungsi headless: kumpulkan diagnostics lalu tampilkan di UI"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        diagnostics = []
+        result = func(*args, diagnostics=diagnostics, **kwargs)
+        render_diagnostics(diagnostics)
+        return result
+    return wrapper
+
+def render_performance_panel(recorder):
+    """Waterfall per stage untuk rerun ini (Debug Mode)"""
+    with st.expander("⏱️ Performance (this rerun)", expanded=False):
+        profile = recorder.to_frame() if recorder is not None else pd.DataFrame()
+        if profile.empty:
+            st.caption("Belum ada stage tercatat - aktifkan Debug Mode lalu refresh.")
+        else:
+            go = lazy_import('plotly.graph_objects')
+            # Stage di worker thread analytics overlap dengan stage induknya - pakai rentang waktu, bukan jumlah
+            wall_seconds = (profile['start'] + profile['seconds']).max() - profile['start'].min()
+            st.caption(
+                f"{len(profile)} stages | wall {wall_seconds:,.2f}s | "
+                f"memory tracking {'on' if recorder.track_memory else 'off'}"
+            )
 
-# ============================================================================
-# 📊 FUNGSI ANALYTICS (DARI APLIKASI UTAMA - LENGKAP)
-# ============================================================================
+            labels = ['  ' * depth + stage for depth, stage in zip(profile['depth'], profile['stage'])]
+            fig = go.Figure(go.Bar(
+                y=labels,
+                x=profile['seconds'] * 1000,
+                base=profile['start'] * 1000,
+                orientation='h',
+                marker_color=['#1f77b4' if depth == 0 else '#aec7e8' for depth in profile['depth']],
+                hovertemplate='%{y}<br>%{x:,.1f} ms<extra></extra>',
+            ))
+            fig.update_layout(
+                height=max(300, 22 * len(profile)),
+                xaxis_title="ms since rerun start",
+                yaxis=dict(autorange='reversed'),
+                margin=dict(l=10, r=10, t=30, b=10),
+            )
+            st.plotly_chart(fig, use_container_width=True)
 
-# --- ====================================================== ---
-# ---                FINANCIAL FUNCTIONS                    ---
-# --- ====================================================== ---
+            table = profile.assign(ms=profile['seconds'] * 1000)
+            st.dataframe(
+                table[['stage', 'ms', 'rows_in', 'rows_out', 'mem_peak_mb', 'thread']],
+                use_container_width=True, hide_index=True
+            )
 
-@st.cache_data(ttl=300)
-def calculate_financial_metrics_all(df_sales, df_product):
-    """Calculate all financial metrics from sales data"""
-    
-    if df_sales.empty or df_product.empty:
-        return pd.DataFrame()
-    
-    try:
-        # Check if price columns exist
-        required_price_cols = ['Floor_Price', 'Net_Order_Price']
-        price_cols_exist = all(col in df_product.columns for col in required_price_cols)
-        
-        if not price_cols_exist:
-            st.warning("⚠️ Price columns missing in Product Master")
-            return pd.DataFrame()
-        
-        # Ensure sales data has product info with prices
-        if 'Floor_Price' not in df_sales.columns or 'Net_Order_Price' not in df_sales.columns:
-            df_sales = add_product_info_to_data(df_sales, df_product)
-        
-        # Fill missing prices
-        df_sales['Floor_Price'] = df_sales['Floor_Price'].fillna(0)
-        df_sales['Net_Order_Price'] = df_sales['Net_Order_Price'].fillna(0)
-        
-        # Calculate financial metrics
-        df_sales['Revenue'] = df_sales['Sales_Qty'] * df_sales['Floor_Price']
-        df_sales['Cost'] = df_sales['Sales_Qty'] * df_sales['Net_Order_Price']
-        df_sales['Gross_Margin'] = df_sales['Revenue'] - df_sales['Cost']
-        df_sales['Margin_Percentage'] = np.where(
-            df_sales['Revenue'] > 0,
-            (df_sales['Gross_Margin'] / df_sales['Revenue'] * 100),
-            0
+        import_timings = get_import_timings()
+        if import_timings:
+            st.caption("Lazy import time: " + " | ".join(f"{name} {seconds * 1000:,.0f} ms" for name, seconds in import_timings))
+
+def render_cache_panel():
+    """Statistik cache per fungsi (hit/miss/eviction, waktu dihemat, byte) + export"""
+    with st.expander("🗄️ Cache Statistics", expanded=False):
+        stats = cache_stats_frame()
+        if stats.empty:
+            st.caption("Belum ada fungsi ter-cache.")
+            return
+
+        budget = budget_summary()
+        budget_mb = st.number_input(
+            "Cache budget (MB)", min_value=16, value=int(get_memory_budget() / 1024**2), step=64,
+            help="Batas memori global semua cache; derived dibuang lebih dulu, hasil load terakhir"
         )
-        
-        # Add additional metrics
-        df_sales['Avg_Selling_Price'] = np.where(
-            df_sales['Sales_Qty'] > 0,
-            df_sales['Revenue'] / df_sales['Sales_Qty'],
-            0
-        )
-        
-        return df_sales
-        
-    except Exception as e:
-        st.error(f"Financial metrics calculation error: {str(e)}")
-        return pd.DataFrame()
+        if budget_mb * 1024**2 != get_memory_budget():
+            set_memory_budget(budget_mb * 1024**2)
+            budget = budget_summary()
 
-@st.cache_data(ttl=300)
-def calculate_inventory_financial(df_stock, df_product):
-    """Calculate inventory financial value"""
-    
-    if df_stock.empty or df_product.empty:
-        return pd.DataFrame()
-    
-    try:
-        # Check price columns
-        if 'Floor_Price' not in df_product.columns or 'Net_Order_Price' not in df_product.columns:
-            return pd.DataFrame()
-        
-        # Ensure stock data has prices
-        if 'Floor_Price' not in df_stock.columns or 'Net_Order_Price' not in df_stock.columns:
-            df_stock = add_product_info_to_data(df_stock, df_product)
-        
-        # Fill missing prices
-        df_stock['Floor_Price'] = df_stock['Floor_Price'].fillna(0)
-        df_stock['Net_Order_Price'] = df_stock['Net_Order_Price'].fillna(0)
-        
-        # Calculate inventory values
-        df_stock['Value_at_Cost'] = df_stock['Stock_Qty'] * df_stock['Net_Order_Price']
-        df_stock['Value_at_Retail'] = df_stock['Stock_Qty'] * df_stock['Floor_Price']
-        df_stock['Potential_Margin'] = df_stock['Value_at_Retail'] - df_stock['Value_at_Cost']
-        df_stock['Margin_Percentage'] = np.where(
-            df_stock['Value_at_Retail'] > 0,
-            (df_stock['Potential_Margin'] / df_stock['Value_at_Retail'] * 100),
-            0
+        col1, col2, col3 = create_responsive_columns(3)
+        with col1:
+            responsive_metric(
+                "Cache Memory",
+                f"{budget['used_bytes'] / 1024**2:,.1f} / {budget['budget_bytes'] / 1024**2:,.0f} MB"
+            )
+        with col2:
+            lookups = stats['hits'].sum() + stats['misses'].sum()
+            responsive_metric("Hit Rate", f"{stats['hits'].sum() / lookups * 100:.1f}%" if lookups else "-")
+        with col3:
+            responsive_metric("Compute Saved", f"{stats['saved_seconds'].sum():,.1f}s")
+        st.caption(f"Budget evictions: {budget['budget_evictions']:,}")
+
+        st.dataframe(
+            stats.assign(MB=stats['bytes'] / 1024**2).drop(columns=['bytes']),
+            use_container_width=True, hide_index=True
+        )
+        entries = cache_entries_frame()
+        st.dataframe(
+            entries.assign(MB=entries['bytes'] / 1024**2).drop(columns=['bytes']).sort_values('MB', ascending=False),
+            use_container_width=True, hide_index=True
         )
-        
-        return df_stock
-        
-    except Exception as e:
-        st.error(f"Inventory financial calculation error: {str(e)}")
-        return pd.DataFrame()
 
-@st.cache_data(ttl=300)
-def calculate_seasonality(df_financial):
-    """Calculate seasonal patterns from financial data"""
-    
-    if df_financial.empty:
-        return pd.DataFrame()
-    
-    try:
-        # Add month and year columns
-        df_financial['Year'] = df_financial['Month'].dt.year
-        df_financial['Month_Num'] = df_financial['Month'].dt.month
-        df_financial['Month_Name'] = df_financial['Month'].dt.strftime('%b')
-        
-        # Group by month across years
-        seasonal_pattern = df_financial.groupby(['Month_Num', 'Month_Name']).agg({
-            'Revenue': 'mean',
-            'Gross_Margin': 'mean',
-            'Sales_Qty': 'mean'
-        }).reset_index()
-        
-        # Calculate seasonal indices
-        overall_avg_revenue = seasonal_pattern['Revenue'].mean()
-        seasonal_pattern['Seasonal_Index_Revenue'] = seasonal_pattern['Revenue'] / overall_avg_revenue
-        
-        overall_avg_margin = seasonal_pattern['Gross_Margin'].mean()
-        seasonal_pattern['Seasonal_Index_Margin'] = seasonal_pattern['Gross_Margin'] / overall_avg_margin
-        
-        # Classify seasons
-        conditions = [
-            seasonal_pattern['Seasonal_Index_Revenue'] >= 1.2,
-            (seasonal_pattern['Seasonal_Index_Revenue'] >= 0.9) & (seasonal_pattern['Seasonal_Index_Revenue'] < 1.2),
-            seasonal_pattern['Seasonal_Index_Revenue'] < 0.9
-        ]
-        choices = ['Peak Season', 'Normal Season', 'Low Season']
-        
-        seasonal_pattern['Season_Type'] = np.select(conditions, choices, default='Normal Season')
-        
-        return seasonal_pattern.sort_values('Month_Num')
-        
-    except Exception as e:
-        st.error(f"Seasonality calculation error: {str(e)}")
-        return pd.DataFrame()
-
-def calculate_eoq(demand, order_cost, holding_cost_per_unit):
-    """Calculate Economic Order Quantity"""
-    if demand <= 0 or order_cost <= 0 or holding_cost_per_unit <= 0:
-        return 0
-    
-    eoq = math.sqrt((2 * demand * order_cost) / holding_cost_per_unit)
-    return round(eoq)
+        col_dl1, col_dl2 = create_responsive_columns(2)
+        with col_dl1:
+            st.download_button("📥 Export Stats (CSV)", stats.to_csv(index=False),
+                               file_name=f"cache_stats_{datetime.now():%Y%m%d_%H%M%S}.csv", mime="text/csv",
+                               use_container_width=True)
+        with col_dl2:
+            st.download_button("📥 Export Entries (CSV)", entries.to_csv(index=False),
+                               file_name=f"cache_entries_{datetime.now():%Y%m%d_%H%M%S}.csv", mime="text/csv",
+                               use_container_width=True)
+
+def render_telemetry_panel():
+    """Tren riwayat load: durasi, baris per worksheet, API call dan kegagalan"""
+    with st.expander("📈 Load Telemetry (history)", expanded=False):
+        records = read_history()
+        history = load_history_frame(records)
+        if history.empty:
+            st.caption("Belum ada riwayat load tersimpan.")
+            return
+
+        px = lazy_import('plotly.express')
+        limit_seconds = st.number_input("Load time limit (s)", min_value=1.0, value=60.0, step=5.0, key="telemetry_limit_s")
+
+        for loader in history['loader'].unique():
+            summary = summarize_trend(history, loader, limit_seconds)
+            if summary is None:
+                continue
+            col1, col2, col3 = create_responsive_columns(3)
+            with col1:
+                responsive_metric(f"{loader} rows", f"{summary['latest_rows']:,}")
+            with col2:
+                per_krow = summary['seconds_per_1k_rows']
+                responsive_metric("Sec / 1k rows", f"{per_krow:.3f}" if per_krow is not None else "-")
+            with col3:
+                projected = summary['projected_limit_date']
+                responsive_metric(f"Hits {limit_seconds:.0f}s", projected.strftime('%d %b %Y') if projected else "-")
 
-def calculate_forecast_bias(df_forecast, df_po):
-    """Calculate forecast bias (systematic over/under forecasting)"""
-    
-    if df_forecast.empty or df_po.empty:
-        return {}
-    
-    try:
-        # Get common months
-        forecast_months = sorted(df_forecast['Month'].unique())
-        po_months = sorted(df_po['Month'].unique())
-        common_months = sorted(set(forecast_months) & set(po_months))
-        
-        if not common_months:
-            return {}
-        
-        bias_results = []
-        
-        for month in common_months:
-            df_f_month = df_forecast[df_forecast['Month'] == month]
-            df_p_month = df_po[df_po['Month'] == month]
-            
-            # Merge forecast and PO
-            df_merged = pd.merge(
-                df_f_month[['SKU_ID', 'Forecast_Qty']],
-                df_p_month[['SKU_ID', 'PO_Qty']],
-                on='SKU_ID',
-                how='inner'
-            )
-            
-            # Calculate bias
-            df_merged['Bias'] = df_merged['PO_Qty'] - df_merged['Forecast_Qty']
-            df_merged['Bias_Percentage'] = np.where(
-                df_merged['Forecast_Qty'] > 0,
-                (df_merged['Bias'] / df_merged['Forecast_Qty'] * 100),
-                0
-            )
-            
-            avg_bias = df_merged['Bias'].mean()
-            avg_bias_pct = df_merged['Bias_Percentage'].mean()
-            
-            bias_results.append({
-                'Month': month,
-                'Avg_Bias': avg_bias,
-                'Avg_Bias_Percentage': avg_bias_pct,
-                'Over_Forecast_SKUs': len(df_merged[df_merged['Bias'] > 0]),
-                'Under_Forecast_SKUs': len(df_merged[df_merged['Bias'] < 0])
-            })
-        
-        return pd.DataFrame(bias_results)
-        
-    except Exception as e:
-        st.error(f"Forecast bias calculation error: {str(e)}")
-        return pd.DataFrame()
+        fig = px.line(history, x='started_at', y='duration_s', color='loader', markers=True, title="Load Duration")
+        fig.update_layout(height=300)
+        st.plotly_chart(fig, use_container_width=True)
 
-# --- ====================================================== ---
-# ---                ANALYTICS FUNCTIONS                    ---
-# --- ====================================================== ---
+        fig = px.scatter(history, x='total_rows', y='duration_s', color='loader', symbol='completed',
+                         title="Rows vs Load Duration")
+        fig.update_layout(height=300)
+        st.plotly_chart(fig, use_container_width=True)
 
-def calculate_monthly_performance(df_forecast, df_po, df_product):
-    """Calculate performance for each month separately - HANYA SKU dengan Forecast_Qty > 0"""
-    
-    monthly_performance = {}
-    
-    if df_forecast.empty or df_po.empty:
-        return monthly_performance
-    
-    try:
-        # ADD PRODUCT INFO jika belum ada
-        df_forecast = add_product_info_to_data(df_forecast, df_product)
-        df_po = add_product_info_to_data(df_po, df_product)
-        
-        # Get unique months from both datasets
-        forecast_months = sorted(df_forecast['Month'].unique())
-        po_months = sorted(df_po['Month'].unique())
-        all_months = sorted(set(list(forecast_months) + list(po_months)))
-        
-        for month in all_months:
-            # Get data for this month - FILTER HANYA Forecast_Qty > 0
-            df_forecast_month = df_forecast[
-                (df_forecast['Month'] == month) & 
-                (df_forecast['Forecast_Qty'] > 0)
-            ].copy()
-            
-            df_po_month = df_po[df_po['Month'] == month].copy()
-            
-            if df_forecast_month.empty or df_po_month.empty:
-                continue
-            
-            # Merge forecast and PO for this month
-            df_merged = pd.merge(
-                df_forecast_month,
-                df_po_month,
-                on=['SKU_ID'],
-                how='inner',
-                suffixes=('_forecast', '_po')
-            )
-            
-            if not df_merged.empty:
-                # Add product info (jika belum ada dari merge)
-                if 'Product_Name' not in df_merged.columns or 'Brand' not in df_merged.columns:
-                    df_merged = add_product_info_to_data(df_merged, df_product)
-                
-                # Calculate ratio - Pastikan Forecast_Qty > 0
-                df_merged['PO_Rofo_Ratio'] = np.where(
-                    df_merged['Forecast_Qty'] > 0,
-                    (df_merged['PO_Qty'] / df_merged['Forecast_Qty']) * 100,
-                    0
-                )
-                
-                # Categorize
-                conditions = [
-                    df_merged['PO_Rofo_Ratio'] < 80,
-                    (df_merged['PO_Rofo_Ratio'] >= 80) & (df_merged['PO_Rofo_Ratio'] <= 120),
-                    df_merged['PO_Rofo_Ratio'] > 120
-                ]
-                choices = ['Under', 'Accurate', 'Over']
-                df_merged['Accuracy_Status'] = np.select(conditions, choices, default='Unknown')
-                
-                # Calculate metrics
-                df_merged['Absolute_Percentage_Error'] = abs(df_merged['PO_Rofo_Ratio'] - 100)
-                
-                # Hanya hitung MAPE untuk SKU dengan Forecast_Qty > 0
-                valid_skus = df_merged[df_merged['Forecast_Qty'] > 0]
-                if not valid_skus.empty:
-                    mape = valid_skus['Absolute_Percentage_Error'].mean()
-                else:
-                    mape = 0
-                    
-                monthly_accuracy = 100 - mape
-                
-                # Status counts
-                status_counts = df_merged['Accuracy_Status'].value_counts().to_dict()
-                total_records = len(df_merged)
-                status_percentages = {k: (v/total_records*100) for k, v in status_counts.items()}
-                
-                # Store results
-                monthly_performance[month] = {
-                    'accuracy': monthly_accuracy,
-                    'mape': mape,
-                    'status_counts': status_counts,
-                    'status_percentages': status_percentages,
-                    'total_records': total_records,
-                    'data': df_merged,
-                    'under_skus': df_merged[df_merged['Accuracy_Status'] == 'Under'].copy(),
-                    'over_skus': df_merged[df_merged['Accuracy_Status'] == 'Over'].copy(),
-                    'accurate_skus': df_merged[df_merged['Accuracy_Status'] == 'Accurate'].copy()
-                }
-        
-        return monthly_performance
-        
-    except Exception as e:
-        st.error(f"Monthly performance calculation error: {str(e)}")
-        return monthly_performance
+        sheets = sheet_history_frame(records)
+        if not sheets.empty:
+            fig = px.line(sheets, x='started_at', y='rows', color='sheet', markers=True, title="Rows per Worksheet")
+            fig.update_layout(height=300)
+            st.plotly_chart(fig, use_container_width=True)
 
-def get_last_3_months_performance(monthly_performance):
-    """Get performance for last 3 months"""
-    
-    if not monthly_performance:
-        return {}
-    
-    # Get last 3 months
-    sorted_months = sorted(monthly_performance.keys())
-    if len(sorted_months) >= 3:
-        last_3_months = sorted_months[-3:]
-    else:
-        last_3_months = sorted_months
-    
-    last_3_data = {}
-    for month in last_3_months:
-        last_3_data[month] = monthly_performance[month]
-    
-    return last_3_data
+        st.dataframe(history.sort_values('started_at', ascending=False).head(50), use_container_width=True, hide_index=True)
+        failures = [dict(f, started_at=r['started_at'], loader=r['loader']) for r in records for f in r.get('failures', [])]
+        if failures:
+            st.markdown("**Worksheet failures**")
+            st.dataframe(pd.DataFrame(failures).tail(50), use_container_width=True, hide_index=True)
 
-@st.cache_data(ttl=300)
-def calculate_inventory_metrics_with_3month_avg(df_stock, df_sales, df_product):
-    """Calculate inventory metrics using 3-month average sales (FIXED: AGGREGATE STOCK FIRST)"""
-    
-    metrics = {}
-    
-    if df_stock.empty:
-        return metrics
-    
-    try:
-        # --- FIX UTAMA: Agregasi Stok dari Level Batch ke Level SKU ---
-        # Kita jumlahkan dulu Stock_Qty berdasarkan SKU_ID agar 1 SKU = 1 Baris
-        df_stock_agg = df_stock.groupby('SKU_ID').agg({
-            'Stock_Qty': 'sum'
-        }).reset_index()
-        
-        # ADD PRODUCT INFO ke data yang sudah di-agregasi
-        df_stock_agg = add_product_info_to_data(df_stock_agg, df_product)
-        
-        # Siapkan Sales Data
-        df_sales = add_product_info_to_data(df_sales, df_product)
-        
-        # Get last 3 months sales data
-        if not df_sales.empty:
-            sales_months = sorted(df_sales['Month'].unique())
-            if len(sales_months) >= 3:
-                last_3_sales_months = sales_months[-3:]
-                df_sales_last_3 = df_sales[df_sales['Month'].isin(last_3_sales_months)].copy()
-            else:
-                df_sales_last_3 = df_sales.copy()
-        
-        # Calculate average monthly sales per SKU
-        if not df_sales.empty and not df_sales_last_3.empty:
-            avg_monthly_sales = df_sales_last_3.groupby('SKU_ID')['Sales_Qty'].mean().reset_index()
-            avg_monthly_sales.columns = ['SKU_ID', 'Avg_Monthly_Sales_3M']
-        else:
-            avg_monthly_sales = pd.DataFrame(columns=['SKU_ID', 'Avg_Monthly_Sales_3M'])
-        
-        # Merge Stock Aggregated dengan Product Info (redundant check but safe)
-        df_inventory = pd.merge(
-            df_stock_agg,
-            df_product[['SKU_ID', 'Product_Name', 'SKU_Tier', 'Brand', 'Status']],
-            on='SKU_ID',
-            how='left',
-            suffixes=('', '_master')
-        )
-        
-        # Bersihkan kolom duplikat jika ada setelah merge
-        df_inventory = df_inventory.loc[:,~df_inventory.columns.duplicated()]
-        
-        # Merge dengan Average Sales
-        df_inventory = pd.merge(df_inventory, avg_monthly_sales, on='SKU_ID', how='left')
-        df_inventory['Avg_Monthly_Sales_3M'] = df_inventory['Avg_Monthly_Sales_3M'].fillna(0)
-        
-        # Calculate cover months
-        df_inventory['Cover_Months'] = np.where(
-            df_inventory['Avg_Monthly_Sales_3M'] > 0,
-            df_inventory['Stock_Qty'] / df_inventory['Avg_Monthly_Sales_3M'],
-            999  # For SKUs with no sales
-        )
-        
-        # Categorize inventory status
-        conditions = [
-            df_inventory['Cover_Months'] < 0.8,
-            (df_inventory['Cover_Months'] >= 0.8) & (df_inventory['Cover_Months'] <= 1.5),
-            df_inventory['Cover_Months'] > 1.5
-        ]
-        choices = ['Need Replenishment', 'Ideal/Healthy', 'High Stock']
-        df_inventory['Inventory_Status'] = np.select(conditions, choices, default='Unknown')
-        
-        # Get high/low stock items
-        high_stock_df = df_inventory[df_inventory['Inventory_Status'] == 'High Stock'].copy().sort_values('Cover_Months', ascending=False)
-        low_stock_df = df_inventory[df_inventory['Inventory_Status'] == 'Need Replenishment'].copy().sort_values('Cover_Months', ascending=True)
-        
-        # Tier analysis
-        if 'SKU_Tier' in df_inventory.columns:
-            tier_analysis = df_inventory.groupby('SKU_Tier').agg({
-                'SKU_ID': 'count',
-                'Stock_Qty': 'sum',
-                'Avg_Monthly_Sales_3M': 'sum',
-                'Cover_Months': 'mean'
-            }).reset_index()
-            tier_analysis.columns = ['Tier', 'SKU_Count', 'Total_Stock', 'Total_Sales_3M_Avg', 'Avg_Cover_Months']
-            tier_analysis['Turnover'] = tier_analysis['Total_Sales_3M_Avg'] / tier_analysis['Total_Stock']
-            metrics['tier_analysis'] = tier_analysis
-        
-        metrics['inventory_df'] = df_inventory
-        metrics['high_stock'] = high_stock_df
-        metrics['low_stock'] = low_stock_df
-        metrics['total_stock'] = df_inventory['Stock_Qty'].sum()
-        metrics['total_skus'] = len(df_inventory)
-        metrics['avg_cover'] = df_inventory[df_inventory['Cover_Months'] < 999]['Cover_Months'].mean()
-        
-        metrics['inventory_value_score'] = (len(df_inventory[df_inventory['Inventory_Status'] == 'Ideal/Healthy']) / 
-                                            len(df_inventory) * 100) if len(df_inventory) > 0 else 0
-        
-        return metrics
-        
-    except Exception as e:
-        st.error(f"Inventory metrics error: {str(e)}")
-        return metrics
+@with_diagnostics
+@cached('load.main', ttl=300, max_entries=3, tier='raw')
+def load_and_process_data(_source, diagnostics=None):
+    """
+    Load semua data termasuk sheet baru: BS_Fullfilment_Cost
+    Hasil disimpan sekali per proses (read-only) dan dibagikan ke semua session
+    """
+    data = run_load_with_telemetry('load_and_process_data', data_loader.load_and_process_data, _source, diagnostics)
+    return freeze_datasets(data)
 
-def calculate_sales_vs_forecast_po(df_sales, df_forecast, df_po, df_product):
-    """Calculate sales vs forecast and PO comparison - HANYA ACTIVE SKUS"""
-    
-    results = {}
-    
-    if df_sales.empty or df_forecast.empty:
-        return results
-    
-    try:
-        # ADD PRODUCT INFO jika belum ada
-        df_sales = add_product_info_to_data(df_sales, df_product)
-        df_forecast = add_product_info_to_data(df_forecast, df_product)
-        df_po = add_product_info_to_data(df_po, df_product)
-        
-        # FILTER HANYA ACTIVE SKUS
-        if 'Status' in df_product.columns:
-            active_skus = df_product[df_product['Status'].str.upper() == 'ACTIVE']['SKU_ID'].tolist()
-            
-            # Filter semua dataset untuk hanya active SKUs
-            df_sales = df_sales[df_sales['SKU_ID'].isin(active_skus)]
-            df_forecast = df_forecast[df_forecast['SKU_ID'].isin(active_skus)]
-            if not df_po.empty:
-                df_po = df_po[df_po['SKU_ID'].isin(active_skus)]
-        
-        # Get last 3 months for comparison
-        sales_months = sorted(df_sales['Month'].unique())
-        forecast_months = sorted(df_forecast['Month'].unique())
-        po_months = sorted(df_po['Month'].unique())
-        
-        # Find common months
-        common_months = sorted(set(sales_months) & set(forecast_months) & set(po_months))
-        
-        if not common_months:
-            return results
-        
-        # Use last common month
-        last_month = common_months[-1]
-        
-        # Get data for last month
-        df_sales_month = df_sales[df_sales['Month'] == last_month].copy()
-        df_forecast_month = df_forecast[df_forecast['Month'] == last_month].copy()
-        df_po_month = df_po[df_po['Month'] == last_month].copy()
-        
-        # Filter hanya SKU dengan Forecast_Qty > 0
-        df_forecast_month = df_forecast_month[df_forecast_month['Forecast_Qty'] > 0]
-        
-        # Merge all data
-        df_merged = pd.merge(
-            df_sales_month[['SKU_ID', 'Sales_Qty']],
-            df_forecast_month[['SKU_ID', 'Forecast_Qty']],
-            on='SKU_ID',
-            how='inner'
-        )
-        
-        df_merged = pd.merge(
-            df_merged,
-            df_po_month[['SKU_ID', 'PO_Qty']],
-            on='SKU_ID',
-            how='left'
-        )
-        
-        # Add product info
-        df_merged = add_product_info_to_data(df_merged, df_product)
-        
-        # Filter out SKU dengan PO_Qty = 0 (tidak ada PO) jika mau
-        # df_merged = df_merged[df_merged['PO_Qty'] > 0]
-        
-        # Calculate ratios
-        df_merged['Sales_vs_Forecast_Ratio'] = np.where(
-            df_merged['Forecast_Qty'] > 0,
-            (df_merged['Sales_Qty'] / df_merged['Forecast_Qty']) * 100,
-            0
-        )
-        
-        df_merged['Sales_vs_PO_Ratio'] = np.where(
-            df_merged['PO_Qty'] > 0,
-            (df_merged['Sales_Qty'] / df_merged['PO_Qty']) * 100,
-            0
-        )
-        
-        # Calculate deviations
-        df_merged['Forecast_Deviation'] = abs(df_merged['Sales_vs_Forecast_Ratio'] - 100)
-        df_merged['PO_Deviation'] = abs(df_merged['Sales_vs_PO_Ratio'] - 100)
-        
-        # Identify SKUs with high deviation (> 30%) - HANYA ACTIVE SKUS
-        high_deviation_skus = df_merged[
-            (df_merged['Forecast_Deviation'] > 30) | 
-            (df_merged['PO_Deviation'] > 30)
-        ].copy()
-        
-        high_deviation_skus = high_deviation_skus.sort_values('Forecast_Deviation', ascending=False)
-        
-        # Calculate overall metrics
-        avg_forecast_deviation = df_merged['Forecast_Deviation'].mean()
-        avg_po_deviation = df_merged['PO_Deviation'].mean()
-        
-        results = {
-            'last_month': last_month,
-            'comparison_data': df_merged,
-            'high_deviation_skus': high_deviation_skus,
-            'avg_forecast_deviation': avg_forecast_deviation,
-            'avg_po_deviation': avg_po_deviation,
-            'total_skus_compared': len(df_merged),
-            'active_skus_only': True
-        }
-        
-        return results
-        
-    except Exception as e:
-        st.error(f"Sales vs forecast calculation error: {str(e)}")
-        return results
+# --- FUNGSI BARU: LOAD DATA RESELLER LENGKAP ---
+@with_diagnostics
+@cached('load.reseller', ttl=300, max_entries=3, tier='raw')
+def load_reseller_complete_data(_source, diagnostics=None):
+    """
+    Load SEMUA data reseller: forecast, sales, past rofo, past PO
+    """
+    reseller_data = run_load_with_telemetry('load_reseller_complete_data', data_loader.load_reseller_complete_data, _source, diagnostics)
+    return freeze_datasets(reseller_data)
 
-def calculate_brand_performance(df_forecast, df_po, df_product):
-    """Calculate forecast accuracy performance by brand"""
-    
-    if df_forecast.empty or df_po.empty or df_product.empty:
-        return pd.DataFrame()
-    
-    try:
-        # ADD PRODUCT INFO jika belum ada
-        df_forecast = add_product_info_to_data(df_forecast, df_product)
-        df_po = add_product_info_to_data(df_po, df_product)
-        
-        # Get last month data
-        forecast_months = sorted(df_forecast['Month'].unique())
-        po_months = sorted(df_po['Month'].unique())
-        common_months = sorted(set(forecast_months) & set(po_months))
-        
-        if not common_months:
-            return pd.DataFrame()
-        
-        last_month = common_months[-1]
-        
-        # Get data for last month
-        df_forecast_month = df_forecast[df_forecast['Month'] == last_month].copy()
-        df_po_month = df_po[df_po['Month'] == last_month].copy()
-        
-        # Merge forecast and PO
-        df_merged = pd.merge(
-            df_forecast_month,
-            df_po_month,
-            on=['SKU_ID'],
-            how='inner'
-        )
-        
-        # Add brand info jika belum ada
-        if 'Brand' not in df_merged.columns:
-            df_merged = add_product_info_to_data(df_merged, df_product)
-        
-        if 'Brand' not in df_merged.columns:
-            return pd.DataFrame()
-        
-        # Calculate ratio and accuracy
-        df_merged['PO_Rofo_Ratio'] = np.where(
-            df_merged['Forecast_Qty'] > 0,
-            (df_merged['PO_Qty'] / df_merged['Forecast_Qty']) * 100,
-            0
-        )
-        
-        # Categorize
-        conditions = [
-            df_merged['PO_Rofo_Ratio'] < 80,
-            (df_merged['PO_Rofo_Ratio'] >= 80) & (df_merged['PO_Rofo_Ratio'] <= 120),
-            df_merged['PO_Rofo_Ratio'] > 120
-        ]
-        choices = ['Under', 'Accurate', 'Over']
-        df_merged['Accuracy_Status'] = np.select(conditions, choices, default='Unknown')
-        
-        # Calculate brand performance
-        brand_performance = df_merged.groupby('Brand').agg({
-            'SKU_ID': 'count',
-            'Forecast_Qty': 'sum',
-            'PO_Qty': 'sum',
-            'PO_Rofo_Ratio': lambda x: 100 - abs(x - 100).mean()  # Accuracy
-        }).reset_index()
-        
-        brand_performance.columns = ['Brand', 'SKU_Count', 'Total_Forecast', 'Total_PO', 'Accuracy']
-        
-        # Calculate additional metrics
-        brand_performance['PO_vs_Forecast_Ratio'] = (brand_performance['Total_PO'] / brand_performance['Total_Forecast'] * 100)
-        brand_performance['Qty_Difference'] = brand_performance['Total_PO'] - brand_performance['Total_Forecast']
-        
-        # Get status counts
-        status_counts = df_merged.groupby(['Brand', 'Accuracy_Status']).size().unstack(fill_value=0).reset_index()
-        
-        # Merge with performance data
-        brand_performance = pd.merge(brand_performance, status_counts, on='Brand', how='left')
-        
-        # Fill NaN with 0 for status columns
-        for status in ['Under', 'Accurate', 'Over']:
-            if status not in brand_performance.columns:
-                brand_performance[status] = 0
-        
-        # Sort by accuracy
-        brand_performance = brand_performance.sort_values('Accuracy', ascending=False)
-        
-        return brand_performance
-        
-    except Exception as e:
-        st.error(f"Brand performance calculation error: {str(e)}")
-        return pd.DataFrame()
+# ============================================================================
+# 🔎 GLOBAL FILTER FUNCTIONS
+# ============================================================================
 
-def identify_profitability_segments(df_financial):
-    """Segment SKUs by profitability"""
-    
-    if df_financial.empty:
-        return pd.DataFrame()
-    
-    try:
-        sku_profitability = df_financial.groupby(['SKU_ID', 'Product_Name', 'Brand']).agg({
-            'Revenue': 'sum',
-            'Gross_Margin': 'sum',
-            'Sales_Qty': 'sum'
-        }).reset_index()
-        
-        # Calculate metrics
-        sku_profitability['Avg_Margin_Per_SKU'] = sku_profitability['Gross_Margin'] / sku_profitability['Sales_Qty']
-        sku_profitability['Margin_Percentage'] = np.where(
-            sku_profitability['Revenue'] > 0,
-            (sku_profitability['Gross_Margin'] / sku_profitability['Revenue'] * 100),
-            0
-        )
-        
-        # Segment by margin percentage
-        conditions = [
-            (sku_profitability['Margin_Percentage'] >= 40),
-            (sku_profitability['Margin_Percentage'] >= 20) & (sku_profitability['Margin_Percentage'] < 40),
-            (sku_profitability['Margin_Percentage'] < 20) & (sku_profitability['Margin_Percentage'] > 0),
-            (sku_profitability['Margin_Percentage'] <= 0)
-        ]
-        choices = ['High Margin (>40%)', 'Medium Margin (20-40%)', 'Low Margin (<20%)', 'Negative Margin']
-        
-        sku_profitability['Margin_Segment'] = np.select(conditions, choices, default='Unknown')
-        
-        return sku_profitability.sort_values('Gross_Margin', ascending=False)
-        
-    except Exception as e:
-        st.error(f"Profitability segmentation error: {str(e)}")
-        return pd.DataFrame()
+@with_diagnostics
+@cached('segments.abc_xyz', max_entries=4, tier='index')
+def get_abc_xyz_segments(_df_sales, _df_product, sales_version, product_version, diagnostics=None):
+    """ABC/XYZ dihitung ulang hanya jika versi Sales atau Product_Master berubah"""
+    return calculate_abc_xyz(_df_sales, _df_product, diagnostics=diagnostics)
+
+@with_diagnostics
+@cached('reconciliation.base', max_entries=4)
+def get_reconciliation_base(_df_wide, _month_cols, _df_product, forecast_version, product_version, diagnostics=None):
+    """Matriks agregasi + forecast SKU dibangun sekali per versi sheet forecast / Product_Master"""
+    return build_reconciliation_base(_df_wide, _month_cols, _df_product, diagnostics=diagnostics)
+
+@cached('filters.index', max_entries=4, tier='index')
+def get_filter_index(_datasets, _df_product, data_version, _segments=None):
+    """Index filter dibangun sekali per data version (read-only, dipakai bersama)"""
+    if _segments is not None:
+        _df_product = attach_segments(_df_product, _segments)
+    return build_filter_index(_datasets, _df_product)
+
+@cached('filters.datasets', ttl=300, max_entries=32)
+def get_filtered_datasets(_datasets, _index, data_version, filter_key):
+    """Hasil filter di-cache per kombinasi filter, dibagikan read-only antar session"""
+    return freeze_datasets(apply_filters(_datasets, _index, filter_key))
 
-def validate_data_quality(df, df_name):
-    """Comprehensive data quality validation"""
-    
-    checks = {}
-    
-    if df.empty:
-        checks['Empty Dataset'] = '❌ Dataset kosong'
-        return checks
-    
-    # Basic checks
-    checks['Total Rows'] = f"📊 {len(df):,} rows"
-    checks['Total Columns'] = f"📋 {len(df.columns)} columns"
-    
-    # Missing values
-    missing_values = df.isnull().sum().sum()
-    missing_pct = (missing_values / (len(df) * len(df.columns)) * 100)
-    checks['Missing Values'] = f"⚠️ {missing_values:,} ({missing_pct:.1f}%)" if missing_values > 0 else f"✅ {missing_values:,}"
-    
-    # Duplicates
-    duplicates = df.duplicated().sum()
-    checks['Duplicate Rows'] = f"⚠️ {duplicates:,}" if duplicates > 0 else f"✅ {duplicates:,}"
-    
-    # Zero values (for numeric columns)
-    numeric_cols = df.select_dtypes(include=[np.number]).columns
-    if len(numeric_cols) > 0:
-        zero_values = (df[numeric_cols] == 0).sum().sum()
-        zero_pct = (zero_values / (len(df) * len(numeric_cols)) * 100)
-        checks['Zero Values'] = f"📉 {zero_values:,} ({zero_pct:.1f}%)"
-    
-    # Negative values
-    if len(numeric_cols) > 0:
-        negative_values = (df[numeric_cols] < 0).sum().sum()
-        if negative_values > 0:
-            checks['Negative Values'] = f"❌ {negative_values:,}"
-    
-    # Date range (if Month column exists)
-    if 'Month' in df.columns:
-        try:
-            min_date = df['Month'].min()
-            max_date = df['Month'].max()
-            checks['Date Range'] = f"📅 {min_date.strftime('%b %Y')} - {max_date.strftime('%b %Y')}"
-        except:
-            pass
-    
-    return checks
+# ============================================================================
+# 📊 FUNGSI ANALYTICS (DARI APLIKASI UTAMA - LENGKAP)
+# ============================================================================
+
+# Fungsi analytics ada di analytics.py (headless); di sini hanya dibungkus
+# cache (cache_manager). Langkah analytics dashboard sama dengan pipeline headless
+# dan dijalankan sebagai DAG (dag.py): hanya node yang versi input-nya berubah
+# yang dihitung ulang, paralel lewat executor; diagnostics ditampilkan setelah
+# join (st.* hanya di main thread). brand_performance dihitung on-demand di tab
+# Brand Analysis.
+DASHBOARD_ANALYTICS_STEPS = [step for step in ANALYTICS_STEPS if step[0] != 'brand_performance']
+SCENARIO_DIMENSIONS = ['Brand', 'SKU_Tier', 'ABC_Class', 'XYZ_Class', 'Status']
+calculate_brand_performance = instrument('analytics.calculate_brand_performance')(with_diagnostics(analytics.calculate_brand_performance))
+validate_data_quality = analytics.validate_data_quality
 
 # ============================================================================
 # 📱 MAIN CONTENT DENGAN RESPONSIVE DESIGN
 # ============================================================================
 
 # Initialize connection
-client = init_gsheet_connection()
+data_source = init_data_source()
 
-if client is None:
+if data_source is None:
     st.error("❌ Tidak dapat terhubung ke Google Sheets")
     st.stop()
 
 # Load and process data
 with st.spinner('🔄 Loading and processing data from Google Sheets...'):
-    all_data = load_and_process_data(client)
-    
-    df_product = all_data.get('product', pd.DataFrame())
-    df_product_active = all_data.get('product_active', pd.DataFrame())
-    df_sales = all_data.get('sales', pd.DataFrame())
-    df_forecast = all_data.get('forecast', pd.DataFrame())
-    df_po = all_data.get('po', pd.DataFrame())
-    df_stock = all_data.get('stock', pd.DataFrame())
-    df_ecomm_forecast = all_data.get('ecomm_forecast', pd.DataFrame())
-    ecomm_forecast_month_cols = all_data.get('ecomm_forecast_month_cols', [])
-    df_reseller_forecast = all_data.get('reseller_forecast', pd.DataFrame())
-    reseller_all_month_cols = all_data.get('reseller_all_month_cols', [])
-    reseller_historical_cols = all_data.get('reseller_historical_cols', [])
-    reseller_forecast_cols = all_data.get('reseller_forecast_cols', [])
-    df_fulfillment = all_data.get('fulfillment', pd.DataFrame())
-    
+    with perf_stage('load.main'):
+        all_data = load_and_process_data(data_source)
+
     # Load complete reseller data
-    with st.spinner('🔄 Loading Reseller Data...'):
-        reseller_complete_data = load_reseller_complete_data(client)
-        
-        df_sales_reseller = reseller_complete_data.get('sales', pd.DataFrame())
-        df_past_rofo_reseller = reseller_complete_data.get('past_rofo', pd.DataFrame())
-        df_past_po_reseller = reseller_complete_data.get('past_po', pd.DataFrame())
-
-# Calculate metrics
-monthly_performance = calculate_monthly_performance(df_forecast, df_po, df_product)
-last_3_months_performance = get_last_3_months_performance(monthly_performance)
-inventory_metrics = calculate_inventory_metrics_with_3month_avg(df_stock, df_sales, df_product)
-sales_vs_forecast = calculate_sales_vs_forecast_po(df_sales, df_forecast, df_po, df_product)
-
-# Calculate financial metrics
-df_financial = calculate_financial_metrics_all(df_sales, df_product)
-df_inventory_financial = calculate_inventory_financial(df_stock, df_product)
-seasonal_pattern = calculate_seasonality(df_financial) if not df_financial.empty else pd.DataFrame()
-forecast_bias = calculate_forecast_bias(df_forecast, df_po)
-profitability_segments = identify_profitability_segments(df_financial) if not df_financial.empty else pd.DataFrame()
+    with st.spinner('🔄 Loading Reseller Data...'), perf_stage('load.reseller'):
+        reseller_complete_data = load_reseller_complete_data(data_source)
+
+# ============================================================================
+# 🔎 GLOBAL FILTERS (BITMAP INDEX PER DIMENSI)
+# ============================================================================
+
+main_data_version = all_data.get('data_version', '')
+reseller_data_version = f"{main_data_version}:{reseller_complete_data.get('data_version', '')}"
+
+main_dataset_versions = all_data.get('dataset_versions') or {}
+# Versi segmen = input cache get_abc_xyz_segments (dipakai skenario ABC/XYZ)
+abc_xyz_version = derive_version('abc_xyz', main_dataset_versions.get('sales', main_data_version),
+                                 main_dataset_versions.get('product', main_data_version))
+with perf_stage('transform.segments'):
+    abc_xyz_segments = get_abc_xyz_segments(
+        all_data.get('sales', pd.DataFrame()), all_data.get('product', pd.DataFrame()),
+        main_dataset_versions.get('sales', main_data_version), main_dataset_versions.get('product', main_data_version)
+    )
+
+with perf_stage('transform.filter_index'):
+    filter_index = get_filter_index(all_data, all_data.get('product', pd.DataFrame()), main_data_version, abc_xyz_segments)
+    reseller_filter_index = get_filter_index(reseller_complete_data, all_data.get('product', pd.DataFrame()), reseller_data_version, abc_xyz_segments)
+
+filter_options = get_dimension_options(filter_index)
+filter_month_options = sorted(set().union(*[
+    set(pd.to_datetime(all_data[name]['Month']).dt.to_period('M').dt.to_timestamp())
+    for name in ['sales', 'forecast', 'po']
+    if name in all_data and not all_data[name].empty
+]))
+
+with st.sidebar:
+    st.markdown("---")
+    st.markdown("### 🔎 Global Filters")
+
+    filter_selections = {}
+    for dim, label in [('Brand', 'Brand'), ('SKU_Tier', 'SKU Tier'), ('Status', 'Status'), ('ABC_Class', 'ABC Class'),
+                       ('XYZ_Class', 'XYZ Class'), ('Stock_Category', 'Stock Category')]:
+        if filter_options.get(dim):
+            filter_selections[dim] = st.multiselect(label, filter_options[dim], key=f"filter_{dim}")
+
+    filter_month_range = None
+    if len(filter_month_options) > 1:
+        selected_range = st.select_slider(
+            "Month Range",
+            options=filter_month_options,
+            value=(filter_month_options[0], filter_month_options[-1]),
+            format_func=lambda m: m.strftime('%b %Y'),
+            key="filter_month_range"
+        )
+        if tuple(selected_range) != (filter_month_options[0], filter_month_options[-1]):
+            filter_month_range = tuple(selected_range)
+
+    filter_key = make_filter_key(filter_selections, filter_month_range)
+    if filter_key:
+        st.caption(f"🔎 {len(filter_key)} filter aktif")
+
+if filter_key:
+    with perf_stage('transform.apply_filters'):
+        all_data = get_filtered_datasets(all_data, filter_index, main_data_version, filter_key)
+        reseller_complete_data = get_filtered_datasets(reseller_complete_data, reseller_filter_index, reseller_data_version, filter_key)
+
+# Extract datasets (sudah terfilter jika ada filter aktif)
+df_product = all_data.get('product', pd.DataFrame())
+df_product_active = all_data.get('product_active', pd.DataFrame())
+df_sales = all_data.get('sales', pd.DataFrame())
+df_forecast = all_data.get('forecast', pd.DataFrame())
+df_po = all_data.get('po', pd.DataFrame())
+df_stock = all_data.get('stock', pd.DataFrame())
+df_ecomm_forecast = all_data.get('ecomm_forecast', pd.DataFrame())
+ecomm_forecast_month_cols = all_data.get('ecomm_forecast_month_cols', [])
+df_reseller_forecast = all_data.get('reseller_forecast', pd.DataFrame())
+reseller_all_month_cols = all_data.get('reseller_all_month_cols', [])
+reseller_historical_cols = all_data.get('reseller_historical_cols', [])
+reseller_forecast_cols = all_data.get('reseller_forecast_cols', [])
+df_fulfillment = all_data.get('fulfillment', pd.DataFrame())
+
+df_sales_reseller = reseller_complete_data.get('sales', pd.DataFrame())
+df_past_rofo_reseller = reseller_complete_data.get('past_rofo', pd.DataFrame())
+df_past_po_reseller = reseller_complete_data.get('past_po', pd.DataFrame())
+
+# Calculate metrics (operational + financial) - paralel sesuai dependensi, join sebelum render
+analytics_diagnostics = []
+with perf_stage('analytics.all'):
+    analytics_results, analytics_dag_info = run_incremental(DASHBOARD_ANALYTICS_STEPS, all_data, analytics_diagnostics)
+render_diagnostics(analytics_diagnostics)
+
+monthly_performance = analytics_results['monthly_performance']
+last_3_months_performance = analytics_results['last_3_months_performance']
+inventory_metrics = analytics_results['inventory_metrics']
+demand_rates = analytics_results['demand_rates']
+replenishment_plan = analytics_results['replenishment']
+stock_projection = analytics_results['stock_projection']
+sales_vs_forecast = analytics_results['sales_vs_forecast']
+anomaly_results = analytics_results['anomalies']
+df_financial = analytics_results['financial']
+df_inventory_financial = analytics_results['inventory_financial']
+expiry_risk = analytics_results['expiry_risk']
+slow_mover_stats = analytics_results['slow_movers']
+seasonal_pattern = analytics_results['seasonal_pattern']
+seasonal_indices = analytics_results['seasonal_indices']
+forecast_bias = analytics_results['forecast_bias']
+bias_tracking = analytics_results['bias_tracking']
+accuracy_metrics = analytics_results['accuracy_metrics']
+stat_forecast = analytics_results['stat_forecast']
+prefix_index = analytics_results['prefix_index']
+profitability_segments = analytics_results['profitability_segments']
 
 # ============================================================================
 # 📊 UPDATE SIDEBAR METRICS DENGAN DATA YANG SUDAH DIMUAT
@@ -1748,18 +1012,30 @@ with st.sidebar:
         accuracy = monthly_performance[last_month]['accuracy']
         responsive_metric("Latest Accuracy", f"{accuracy:.1f}%")
     
-    # Financial metrics in sidebar
-    if not df_financial.empty:
+    # Financial metrics in sidebar - total rentang dari prefix index (O(1), tanpa filter ulang)
+    if not df_financial.empty and prefix_index is not None and not prefix_index.empty:
         st.markdown("---")
         st.markdown("### 💰 Financial Overview")
-        
-        total_revenue = df_financial['Revenue'].sum()
-        total_margin = df_financial['Gross_Margin'].sum()
+
+        kpi_months = list(prefix_index.months)
+        kpi_start, kpi_end = kpi_months[0], kpi_months[-1]
+        if len(kpi_months) > 1:
+            kpi_start, kpi_end = st.select_slider(
+                "KPI Period",
+                options=kpi_months,
+                value=(kpi_months[0], kpi_months[-1]),
+                format_func=lambda m: m.strftime('%b %Y'),
+                key="kpi_period"
+            )
+
+        total_revenue = prefix_index.total('Revenue', kpi_start, kpi_end)
+        total_margin = prefix_index.total('Gross_Margin', kpi_start, kpi_end)
         avg_margin_pct = (total_margin / total_revenue * 100) if total_revenue > 0 else 0
         
         responsive_metric("Total Revenue", f"Rp {total_revenue:,.0f}")
         responsive_metric("Total Margin", f"Rp {total_margin:,.0f}")
         responsive_metric("Avg Margin %", f"{avg_margin_pct:.1f}%")
+        responsive_metric("Avg Monthly Sales", f"{prefix_index.monthly_average('Sales_Qty', kpi_start, kpi_end):,.0f}")
 
 # ============================================================================
 # 📱 RESPONSIVE TABS IMPLEMENTATION - MOBILE VS DESKTOP
@@ -1768,6 +1044,11 @@ with st.sidebar:
 # Display device info untuk debugging (opsional)
 if st.session_state.get('debug_mode', False):
     st.info(f"Device: {device_type.upper()} | Mobile: {is_mobile}")
+    st.caption(f"Shared dataset store: {all_data.memory_bytes() / 1024**2:,.1f} MB (satu salinan per proses)")
+    st.caption(
+        f"Analytics DAG: {len(analytics_dag_info['computed'])} recomputed "
+        f"({', '.join(analytics_dag_info['computed']) or '-'}) | {len(analytics_dag_info['reused'])} reused from cache"
+    )
 
 if is_mobile:
     # ============================================================================
@@ -1783,6 +1064,7 @@ if is_mobile:
     
     # Render content based on selected tab
     if mobile_tab == "📊 Overview":
+        px = lazy_import('plotly.express')
         st.subheader("📊 Dashboard Overview")
         
         # Quick metrics untuk mobile
@@ -1816,6 +1098,7 @@ if is_mobile:
                 st.plotly_chart(fig, use_container_width=True)
     
     elif mobile_tab == "📦 Inventory":
+        px = lazy_import('plotly.express')
         st.subheader("📦 Inventory Analysis")
         
         if 'inventory_df' in inventory_metrics:
@@ -1877,6 +1160,7 @@ if is_mobile:
                 responsive_metric("Over", over_count)
     
     elif mobile_tab == "📈 Sales":
+        px = lazy_import('plotly.express')
         st.subheader("📈 Sales Analysis")
         
         if not df_sales.empty:
@@ -1911,8 +1195,10 @@ if is_mobile:
         # Settings
         with st.expander("⚙️ Advanced Settings", expanded=False):
             st.checkbox("Debug Mode", value=False, key="debug_mode")
+            if st.session_state.get('debug_mode', False):
+                st.checkbox("Track peak memory (slower)", value=False, key="perf_track_memory")
             if st.button("Clear Cache", use_container_width=True):
-                st.cache_data.clear()
+                clear_all()
                 st.rerun()
 
 else:
@@ -1940,7 +1226,8 @@ else:
     # ============================================================================
     # TAB 1: MONTHLY PERFORMANCE DETAILS
     # ============================================================================
-    with tabs[0]:
+    with tabs[0], perf_stage('render.monthly_performance'):
+        go = lazy_import('plotly.graph_objects')
         st.subheader("📈 Forecast Accuracy Performance Trends")
 
         if monthly_performance:
@@ -2024,10 +1311,47 @@ else:
                             st.metric("Accuracy", f"{accuracy:.1f}%")
                             st.write(f"Under: {under} | Accurate: {accurate} | Over: {over}")
 
+                # --- D. FORECAST BIAS & TRACKING SIGNAL ---
+                if isinstance(forecast_bias, pd.DataFrame) and not forecast_bias.empty:
+                    st.subheader("📐 Forecast Bias & Tracking Signal")
+                    st.caption("Bias = PO - Forecast. Tracking signal = rolling 6-month error sum / MAD; |TS| > 4 = bias sistematis.")
+
+                    fig = go.Figure()
+                    fig.add_trace(go.Bar(
+                        x=forecast_bias['Month'].dt.strftime('%b %Y'),
+                        y=forecast_bias['Avg_Bias_Percentage'],
+                        name='Avg Bias %',
+                        marker_color=np.where(forecast_bias['Avg_Bias_Percentage'] >= 0, '#FF9800', '#2196F3')
+                    ))
+                    fig.update_layout(height=300, yaxis_title='Avg Bias %', hovermode='x unified')
+                    st.plotly_chart(fig, use_container_width=True)
+
+                    if bias_tracking:
+                        brand_ts = bias_tracking['brand']
+                        latest_brand = brand_ts.groupby('Brand').tail(1)
+                        col_b1, col_b2 = create_responsive_columns(2)
+                        with col_b1:
+                            st.markdown("**Brand tracking signal (latest month)**")
+                            st.dataframe(
+                                latest_brand[['Brand', 'Rolling_Bias', 'Tracking_Signal', 'Tracking_Status']]
+                                .sort_values('Tracking_Signal', key=np.abs, ascending=False),
+                                use_container_width=True, hide_index=True
+                            )
+                        with col_b2:
+                            latest_sku = bias_tracking['latest_sku']
+                            biased = latest_sku[latest_sku['Tracking_Status'] != 'In Control']
+                            st.markdown(f"**SKUs out of control: {len(biased):,} / {len(latest_sku):,}**")
+                            st.dataframe(
+                                biased[['SKU_ID', 'Brand', 'Rolling_Bias', 'Tracking_Signal', 'Tracking_Status']]
+                                .sort_values('Tracking_Signal', key=np.abs, ascending=False).head(50),
+                                use_container_width=True, hide_index=True
+                            )
+
     # ============================================================================
     # TAB 2: BRAND ANALYSIS
     # ============================================================================
-    with tabs[1]:
+    with tabs[1], perf_stage('render.brand_analysis'):
+        px = lazy_import('plotly.express')
         st.subheader("🏷️ Brand & Tier Strategic Analysis")
         
         brand_perf = calculate_brand_performance(df_forecast, df_po, df_product)
@@ -2047,10 +1371,76 @@ else:
             st.subheader("📊 Brand Performance Details")
             st.dataframe(brand_perf, use_container_width=True)
 
+        if accuracy_metrics:
+            st.subheader("🎯 Forecast Accuracy Metrics (Volume-Weighted)")
+            total_acc = accuracy_metrics['total'].iloc[0]
+            col_m1, col_m2, col_m3, col_m4, col_m5 = create_responsive_columns(5)
+            with col_m1:
+                responsive_metric("WAPE", f"{total_acc['WAPE']:.1f}%")
+            with col_m2:
+                responsive_metric("MAPE", f"{total_acc['MAPE']:.1f}%")
+            with col_m3:
+                responsive_metric("sMAPE", f"{total_acc['sMAPE']:.1f}%")
+            with col_m4:
+                responsive_metric("Bias %", f"{total_acc['Bias_Pct']:+.1f}%")
+            with col_m5:
+                responsive_metric("Tracking Signal", f"{total_acc['Tracking_Signal']:+.2f}")
+
+            metric_view = ['WAPE', 'MAPE', 'MAPE_Weighted', 'sMAPE', 'MAE', 'Bias_Pct', 'Tracking_Signal', 'Accuracy']
+            col_a1, col_a2 = create_responsive_columns(2)
+            with col_a1:
+                st.markdown("**By Brand**")
+                st.dataframe(
+                    accuracy_metrics['brand'][['Brand', 'PO_Qty'] + metric_view].sort_values('PO_Qty', ascending=False),
+                    use_container_width=True, hide_index=True
+                )
+            with col_a2:
+                st.markdown("**By Tier**")
+                st.dataframe(
+                    accuracy_metrics['tier'][['SKU_Tier', 'PO_Qty'] + metric_view],
+                    use_container_width=True, hide_index=True
+                )
+
+            wape_trend = accuracy_metrics['tier_month']
+            fig = px.line(wape_trend, x='Month', y='WAPE', color='SKU_Tier',
+                         title='WAPE Trend by Tier', markers=True)
+            fig.update_layout(height=350)
+            st.plotly_chart(fig, use_container_width=True)
+
+        if stat_forecast and 'comparison' in stat_forecast:
+            st.subheader("🤖 Statistical Baseline vs Rofo")
+            st.caption(f"Backtest vs actual sales on the last {stat_forecast['backtest']['Month'].nunique()} months "
+                       "(models fitted without those months)")
+            comparison = stat_forecast['comparison']
+            col_c1, col_c2 = create_responsive_columns(2)
+            with col_c1:
+                fig = px.bar(comparison, x='Model', y='WAPE', color='Model', title='WAPE by Model (lower is better)')
+                fig.update_layout(height=350, showlegend=False)
+                st.plotly_chart(fig, use_container_width=True)
+            with col_c2:
+                st.dataframe(comparison[['Model', 'WAPE', 'MAPE_Weighted', 'sMAPE', 'MAE', 'Bias_Pct']],
+                            use_container_width=True, hide_index=True)
+
+            brand_wape = stat_forecast['comparison_brand'].pivot(index='Brand', columns='Model', values='WAPE')
+            st.markdown("**WAPE by Brand**")
+            st.dataframe(brand_wape, use_container_width=True)
+
+            future = stat_forecast['forecast'].groupby('Month')[['Rofo', 'Auto']].sum().reset_index()
+            future = future.rename(columns={'Auto': 'Stat (Auto)'})
+            fig = px.line(future, x='Month', y=['Rofo', 'Stat (Auto)'], markers=True,
+                         title='Forward Forecast: Rofo vs Statistical Baseline')
+            fig.update_layout(height=350, yaxis_title='Qty')
+            st.plotly_chart(fig, use_container_width=True)
+
+            model_mix = stat_forecast['models']['Model'].value_counts()
+            st.caption("Selected model per SKU: " + " | ".join(f"{name}: {count:,}" for name, count in model_mix.items()))
+
     # ============================================================================
     # TAB 3: INVENTORY ANALYSIS
     # ============================================================================
-    with tabs[2]:
+    with tabs[2], perf_stage('render.inventory'):
+        px = lazy_import('plotly.express')
+        go = lazy_import('plotly.graph_objects')
         st.subheader("📦 Inventory Health & Optimization")
         
         if 'inventory_df' in inventory_metrics:
@@ -2099,10 +1489,251 @@ else:
                 fig.update_layout(height=400)
                 st.plotly_chart(fig, use_container_width=True)
 
+        if demand_rates:
+            st.subheader("📈 Demand Rate & Cover by Method")
+            demand_method = st.selectbox(
+                "Demand rate method",
+                demand_rates['methods'],
+                format_func=lambda m: m.replace('SMA_', 'Rolling ').replace('EWMA_', 'EWMA span ') + (' months' if m.startswith('SMA_') else ''),
+                key="demand_rate_method"
+            )
+            latest_demand = demand_rates['latest']
+            status_col = f"Status_{demand_method}"
+            method_counts = latest_demand[status_col].value_counts()
+
+            col_d1, col_d2, col_d3 = create_responsive_columns(3)
+            with col_d1:
+                st.metric("Need Replenishment", f"{method_counts.get('Need Replenishment', 0):,}")
+            with col_d2:
+                st.metric("Ideal/Healthy", f"{method_counts.get('Ideal/Healthy', 0):,}")
+            with col_d3:
+                st.metric("High Stock", f"{method_counts.get('High Stock', 0):,}")
+
+            history = demand_rates['status_history']
+            history = history[history['Method'] == demand_method]
+            fig = px.area(history, x='Month', y='SKU_Count', color='Inventory_Status',
+                         title='Status of Current Stock vs Demand Rate per Month')
+            fig.update_layout(height=350)
+            st.plotly_chart(fig, use_container_width=True)
+
+            show_cols = [col for col in ['SKU_ID', 'Product_Name', 'Brand', 'Stock_Qty'] if col in latest_demand.columns]
+            st.dataframe(
+                latest_demand[show_cols + [demand_method, f"Cover_{demand_method}", status_col]]
+                .sort_values(f"Cover_{demand_method}").head(50),
+                use_container_width=True, hide_index=True
+            )
+
+        if not replenishment_plan.empty:
+            st.subheader("🔁 Replenishment Plan")
+            col_p1, col_p2, col_p3, col_p4 = create_responsive_columns(4)
+            with col_p1:
+                service_level = st.slider("Service level", 0.80, 0.995,
+                                          REPLENISHMENT_DEFAULTS['service_level'], 0.005, key="repl_service_level")
+            with col_p2:
+                lead_time = st.number_input("Lead time (months)", 0.25, 12.0,
+                                            REPLENISHMENT_DEFAULTS['lead_time_months'], 0.25, key="repl_lead_time")
+            with col_p3:
+                order_cost = st.number_input("Order cost (Rp)", 0.0, None,
+                                             REPLENISHMENT_DEFAULTS['order_cost'], 50000.0, key="repl_order_cost")
+            with col_p4:
+                holding_rate = st.slider("Holding cost (%/yr)", 0.05, 0.60,
+                                         REPLENISHMENT_DEFAULTS['holding_rate'], 0.01, key="repl_holding_rate")
+
+            plan_params = {'service_level': service_level, 'lead_time_months': lead_time,
+                           'order_cost': order_cost, 'holding_rate': holding_rate}
+            plan = replenishment_plan
+            if plan_params != REPLENISHMENT_DEFAULTS:
+                # Statistik demand dipakai ulang; hanya rumus plan yang dihitung ulang
+                plan = plan_replenishment(replenishment_plan, **plan_params)
+
+            to_order = plan[plan['Action'] == 'Reorder Now']
+            col_o1, col_o2, col_o3 = create_responsive_columns(3)
+            with col_o1:
+                st.metric("SKUs to Reorder", f"{len(to_order):,} / {len(plan):,}")
+            with col_o2:
+                st.metric("Suggested Units", f"{to_order['Suggested_Order'].sum():,.0f}")
+            with col_o3:
+                st.metric("Order Value", f"Rp {to_order['Order_Value'].sum():,.0f}")
+
+            plan_cols = [col for col in ['SKU_ID', 'Product_Name', 'Brand', 'Avg_Monthly_Demand', 'Demand_CV',
+                                         'Inventory_Position', 'Safety_Stock', 'Reorder_Point', 'EOQ',
+                                         'Suggested_Order', 'Order_Value'] if col in plan.columns]
+            st.dataframe(to_order[plan_cols].sort_values('Order_Value', ascending=False).head(100),
+                        use_container_width=True, hide_index=True)
+            st.download_button("📥 Export Replenishment Plan (CSV)", plan.to_csv(index=False),
+                               file_name="replenishment_plan.csv", mime="text/csv", key="repl_download")
+
+        if stock_projection:
+            st.subheader("🔮 Projected Stock Timeline")
+            projection_summary = stock_projection['summary']
+            projection_monthly = stock_projection['monthly']
+            at_risk = projection_summary[projection_summary['First_Stockout_Month'].notna()]
+
+            col_s1, col_s2, col_s3 = create_responsive_columns(3)
+            with col_s1:
+                st.metric("SKUs Stocking Out", f"{len(at_risk):,} / {len(projection_summary):,}")
+            with col_s2:
+                st.metric("Stockouts Next Month", f"{int((at_risk['Months_To_Stockout'] == 1).sum()):,}")
+            with col_s3:
+                st.metric("Projected Shortage", f"{projection_monthly['Shortage_Qty'].iloc[-1]:,.0f} units")
+
+            fig = go.Figure()
+            fig.add_trace(go.Bar(x=projection_monthly['Month'], y=projection_monthly['Projected_Stock'],
+                                 name='Projected Stock', marker_color='#667eea'))
+            fig.add_trace(go.Scatter(x=projection_monthly['Month'], y=projection_monthly['SKUs_Stocked_Out'],
+                                     name='SKUs Stocked Out', yaxis='y2', mode='lines+markers',
+                                     line=dict(color='#F44336', width=3)))
+            fig.update_layout(height=350, hovermode='x unified',
+                              yaxis=dict(title='Projected Stock'),
+                              yaxis2=dict(title='SKUs Stocked Out', overlaying='y', side='right'))
+            st.plotly_chart(fig, use_container_width=True)
+
+            st.dataframe(
+                at_risk.sort_values(['Months_To_Stockout', 'Total_Shortage'], ascending=[True, False])
+                .drop(columns=['Months_To_Stockout']).head(100),
+                use_container_width=True, hide_index=True
+            )
+
+        if expiry_risk:
+            st.subheader("⏳ Expiry Risk (FEFO)")
+            st.caption(f"Days to expiry as of {expiry_risk['as_of']:%d %b %Y}; at-risk quantity assumes batches "
+                       "sell first-expiry-first-out at the SKU's 3-month average sales rate.")
+            expiry_buckets = expiry_risk['buckets']
+            expiry_sku = expiry_risk['sku']
+
+            col_e1, col_e2, col_e3 = create_responsive_columns(3)
+            with col_e1:
+                st.metric("Value at Risk", f"Rp {expiry_buckets['At_Risk_Value'].sum():,.0f}")
+            with col_e2:
+                st.metric("Qty at Risk", f"{expiry_buckets['At_Risk_Qty'].sum():,.0f} units")
+            with col_e3:
+                expired_value = expiry_buckets.loc[expiry_buckets['Expiry_Bucket'] == 'Expired', 'Stock_Value'].sum()
+                st.metric("Already Expired", f"Rp {expired_value:,.0f}")
+
+            fig = go.Figure()
+            fig.add_trace(go.Bar(x=expiry_buckets['Expiry_Bucket'], y=expiry_buckets['Stock_Value'],
+                                 name='Stock Value', marker_color='#667eea'))
+            fig.add_trace(go.Bar(x=expiry_buckets['Expiry_Bucket'], y=expiry_buckets['At_Risk_Value'],
+                                 name='Value at Risk', marker_color='#F44336'))
+            fig.update_layout(height=350, barmode='group', hovermode='x unified', yaxis=dict(title='Value (Rp)'))
+            st.plotly_chart(fig, use_container_width=True)
+
+            st.dataframe(expiry_sku[expiry_sku['At_Risk_Qty'] > 0].head(100),
+                         use_container_width=True, hide_index=True)
+            st.download_button("📥 Export Expiry Batches (CSV)", expiry_risk['batches'].to_csv(index=False),
+                               file_name="expiry_batches.csv", mime="text/csv", key="expiry_download")
+
+        if not slow_mover_stats.empty:
+            st.subheader("🐢 Dead Stock & Slow Movers")
+            col_m1, col_m2 = create_responsive_columns(2)
+            with col_m1:
+                dead_months = st.slider("Dead stock after (quiet months)", 2, 24,
+                                        SLOW_MOVER_DEFAULTS['dead_months'], key="dead_stock_months")
+            with col_m2:
+                slow_months = st.slider("Slow mover after (quiet months)", 1, 12,
+                                        SLOW_MOVER_DEFAULTS['slow_months'], key="slow_mover_months")
+
+            movers = slow_mover_stats
+            if (dead_months, slow_months) != (SLOW_MOVER_DEFAULTS['dead_months'], SLOW_MOVER_DEFAULTS['slow_months']):
+                movers = classify_movers(slow_mover_stats, dead_months=dead_months, slow_months=slow_months)
+
+            value_col = 'Value_at_Cost' if 'Value_at_Cost' in movers.columns else 'Stock_Qty'
+            mover_summary = movers.groupby('Mover_Class').agg(
+                SKUs=('SKU_ID', 'count'), Stock_Qty=('Stock_Qty', 'sum'), Stock_Value=(value_col, 'sum')
+            ).reindex(MOVER_CLASSES, fill_value=0)
+
+            metric_cols = create_responsive_columns(4)
+            for col, mover_class in zip(metric_cols, MOVER_CLASSES):
+                with col:
+                    st.metric(mover_class, f"{int(mover_summary.loc[mover_class, 'SKUs']):,} SKUs",
+                              f"Rp {mover_summary.loc[mover_class, 'Stock_Value']:,.0f}", delta_color="off")
+
+            mover_cols = [col for col in ['SKU_ID', 'Product_Name', 'Brand', 'Stock_Qty', 'Value_at_Cost',
+                                          'Quiet_Months', 'Months_Since_Last_Sale', 'Last_Sale_Month',
+                                          'Velocity_Trend_Pct', 'Cover_Months', 'Mover_Class'] if col in movers.columns]
+            st.dataframe(movers[movers['Mover_Class'] != 'Active'][mover_cols].head(100),
+                         use_container_width=True, hide_index=True)
+
+        st.subheader("🧭 What-if Scenarios")
+        st.caption("Adjust Rofo, sales or PO by dimension; only the affected analytics are recomputed "
+                   "against the cached baseline.")
+        # Skenario disimpan di session sebagai delta terhadap baseline (scenarios.Scenario)
+        saved_scenarios = st.session_state.setdefault('scenarios', {})
+        scenario_draft = st.session_state.setdefault('scenario_draft', [])
+        scenario_product = attach_segments(df_product, abc_xyz_segments)
+
+        col_w1, col_w2, col_w3, col_w4 = create_responsive_columns(4)
+        with col_w1:
+            adj_measure = st.selectbox("Measure", list(SCENARIO_MEASURES), format_func=SCENARIO_MEASURES.get,
+                                       key="scenario_measure")
+        with col_w2:
+            adj_dimension = st.selectbox("Dimension", ['All SKUs'] + [dim for dim in SCENARIO_DIMENSIONS
+                                                                      if filter_options.get(dim)],
+                                         key="scenario_dimension")
+        with col_w3:
+            adj_values = st.multiselect("Values", filter_options.get(adj_dimension, []),
+                                        key="scenario_values") if adj_dimension != 'All SKUs' else []
+        with col_w4:
+            adj_mode = st.radio("Mode", ['Change %', 'Add units'], horizontal=True, key="scenario_mode")
+            adj_amount = st.number_input("Amount", value=10.0, step=5.0, key="scenario_amount")
+
+        col_b1, col_b2, col_b3 = create_responsive_columns(3)
+        with col_b1:
+            if st.button("➕ Add adjustment", key="scenario_add"):
+                scenario_draft.append(make_adjustment(
+                    adj_measure,
+                    'multiply' if adj_mode == 'Change %' else 'add',
+                    1 + adj_amount / 100 if adj_mode == 'Change %' else adj_amount,
+                    adj_dimension if adj_dimension != 'All SKUs' else None,
+                    adj_values,
+                ))
+        with col_b2:
+            scenario_name = st.text_input("Scenario name", value=f"Scenario {len(saved_scenarios) + 1}",
+                                          key="scenario_name")
+        with col_b3:
+            if st.button("💾 Save scenario", key="scenario_save", disabled=not scenario_draft):
+                saved_scenarios[scenario_name] = build_scenario(scenario_name, all_data, scenario_product,
+                                                                list(scenario_draft), abc_xyz_version)
+                scenario_draft.clear()
+
+        if scenario_draft:
+            st.markdown("**Draft:** " + " · ".join(describe_adjustment(adj) for adj in scenario_draft))
+
+        if saved_scenarios:
+            selected_scenario = st.selectbox("Evaluate scenario", list(saved_scenarios), key="scenario_selected")
+            scenario = saved_scenarios[selected_scenario]
+            if not scenario.is_current(all_data, abc_xyz_version):
+                # Data, filter atau segmen berubah: delta dibangun ulang dari adjustment yang sama
+                scenario = saved_scenarios[selected_scenario] = build_scenario(
+                    scenario.name, all_data, scenario_product, scenario.adjustments, abc_xyz_version)
+
+            with perf_stage('analytics.scenario'):
+                scenario_diagnostics = []
+                baseline_results, _ = run_scenario(None, all_data, scenario_diagnostics)
+                scenario_results, scenario_info = run_scenario(scenario, all_data, scenario_diagnostics)
+            render_diagnostics(scenario_diagnostics)
+
+            st.caption(" · ".join(describe_adjustment(adj) for adj in scenario.adjustments))
+            st.caption(f"Recomputed: {', '.join(scenario_info['computed']) or '-'} · "
+                       f"reused: {', '.join(scenario_info['reused']) or '-'} · "
+                       f"delta size: {scenario.memory_bytes() / 1024:,.1f} KB")
+            st.dataframe(compare_results(baseline_results, scenario_results).style.format(
+                {'Baseline': '{:,.1f}', 'Scenario': '{:,.1f}', 'Change': '{:+,.1f}'}),
+                use_container_width=True, hide_index=True)
+
+            brand_comparison = compare_brands(baseline_results, scenario_results)
+            if not brand_comparison.empty:
+                st.dataframe(brand_comparison, use_container_width=True, hide_index=True)
+
+            if st.button("🗑️ Delete scenario", key="scenario_delete"):
+                del saved_scenarios[selected_scenario]
+                st.rerun()
+
     # ============================================================================
     # TAB 4: SKU EVALUATION
     # ============================================================================
-    with tabs[3]:
+    with tabs[3], perf_stage('render.sku_evaluation'):
+        px = lazy_import('plotly.express')
         st.subheader("🔍 SKU 360° Deep Dive Analysis")
         
         if monthly_performance and not df_sales.empty:
@@ -2160,7 +1791,8 @@ else:
     # ============================================================================
     # TAB 5: SALES ANALYSIS
     # ============================================================================
-    with tabs[4]:
+    with tabs[4], perf_stage('render.sales_analysis'):
+        px = lazy_import('plotly.express')
         st.subheader("📈 Sales & Forecast Analysis")
         
         if not df_sales.empty and monthly_performance:
@@ -2191,13 +1823,66 @@ else:
                 high_deviation = sales_vs_forecast.get('high_deviation_skus', pd.DataFrame())
                 if not high_deviation.empty:
                     st.subheader("🚨 High Deviation SKUs")
-                    st.dataframe(high_deviation[['SKU_ID', 'Product_Name', 'Forecast_Deviation', 'PO_Deviation']], 
+                    high_deviation = annotate_deviation(high_deviation, anomaly_results.get('alerts'), last_month)
+                    st.dataframe(high_deviation[['SKU_ID', 'Product_Name', 'Forecast_Deviation', 'PO_Deviation',
+                                                 'Anomaly_Flags']],
                                 use_container_width=True)
 
+            if anomaly_results and not anomaly_results['alerts'].empty:
+                st.subheader("🧪 Data Anomalies (Sales / Rofo / PO)")
+                st.caption("Robust z-score (median/MAD) per SKU and extreme month-over-month jumps - "
+                           "likely typos or double-counted rows.")
+                anomaly_alerts = anomaly_results['alerts']
+                col_a1, col_a2 = st.columns([1, 2])
+                with col_a1:
+                    st.dataframe(anomaly_results['summary'], use_container_width=True, hide_index=True)
+                with col_a2:
+                    anomaly_measure = st.selectbox("Measure", ['All'] + sorted(anomaly_alerts['Measure'].unique()),
+                                                   key="anomaly_measure")
+                if anomaly_measure != 'All':
+                    anomaly_alerts = anomaly_alerts[anomaly_alerts['Measure'] == anomaly_measure]
+                st.dataframe(anomaly_alerts.head(200), use_container_width=True, hide_index=True)
+
+        if prefix_index is not None and len(prefix_index.months) > 1:
+            st.subheader("📅 Period Breakdown")
+            range_months = list(prefix_index.months)
+            col_r1, col_r2 = st.columns([3, 1])
+            with col_r1:
+                range_start, range_end = st.select_slider(
+                    "Period",
+                    options=range_months,
+                    value=(range_months[max(0, len(range_months) - 3)], range_months[-1]),
+                    format_func=lambda m: m.strftime('%b %Y'),
+                    key="range_breakdown_period"
+                )
+            with col_r2:
+                range_level = st.selectbox("Group by", ['Brand', 'SKU_Tier', 'SKU_ID'], key="range_breakdown_level")
+
+            range_table = prefix_index.range_summary(range_start, range_end, by=range_level)
+            st.dataframe(range_table.sort_values('Revenue', ascending=False),
+                        use_container_width=True, hide_index=True)
+
+        if seasonal_indices:
+            st.subheader("🌦️ Seasonality Index")
+            season_level = st.radio("Profile", ['Brand', 'SKU_Tier'], horizontal=True, key="season_level")
+            profile = seasonal_indices['brand' if season_level == 'Brand' else 'tier'].set_index(season_level)
+            fig = px.imshow(profile, color_continuous_scale='RdYlGn', color_continuous_midpoint=1.0,
+                           aspect='auto', text_auto='.2f', title=f'Seasonal Index by {season_level} (1.0 = average month)')
+            fig.update_layout(height=max(300, 40 * len(profile) + 120))
+            st.plotly_chart(fig, use_container_width=True)
+
+            st.markdown("**Most seasonal SKUs** (index shrunk toward brand profile for sparse SKUs)")
+            sku_season = seasonal_indices['sku']
+            st.dataframe(
+                sku_season.sort_values('Amplitude', ascending=False)
+                [['SKU_ID', 'Brand', 'SKU_Tier', 'Peak_Month', 'Amplitude', 'Raw_Weight'] + list(profile.columns)].head(50),
+                use_container_width=True, hide_index=True
+            )
+
     # ============================================================================
     # TAB 6: DATA EXPLORER
     # ============================================================================
-    with tabs[5]:
+    with tabs[5], perf_stage('render.data_explorer'):
         st.subheader("📋 Data Explorer")
         
         dataset_options = {
@@ -2234,7 +1919,8 @@ else:
     # ============================================================================
     # TAB 7: ECOMMERCE FORECAST
     # ============================================================================
-    with tabs[6]:
+    with tabs[6], perf_stage('render.ecommerce'):
+        px = lazy_import('plotly.express')
         st.subheader("🛒 Ecommerce Forecast Intelligence")
         
         if not df_ecomm_forecast.empty:
@@ -2273,10 +1959,71 @@ else:
             
             st.dataframe(top_items[['SKU_ID', 'Product_Name', 'Total_Forecast']], use_container_width=True)
 
+        forecast_channels = {
+            'Ecommerce': ('ecomm_forecast', df_ecomm_forecast, ecomm_forecast_month_cols),
+            'Reseller': ('reseller_forecast', df_reseller_forecast, reseller_forecast_cols),
+        }
+        forecast_channels = {name: spec for name, spec in forecast_channels.items() if not spec[1].empty and spec[2]}
+        if forecast_channels:
+            st.subheader("🧮 Forecast Reconciliation (SKU → Brand → Tier → Total)")
+            col_h1, col_h2 = create_responsive_columns(2)
+            with col_h1:
+                recon_channel = st.radio("Channel", list(forecast_channels), horizontal=True, key="recon_channel")
+            with col_h2:
+                recon_method = st.selectbox("Method", RECONCILIATION_METHODS, index=RECONCILIATION_METHODS.index('ols'),
+                                            format_func=lambda m: {'bottom_up': 'Bottom-up',
+                                                                   'top_down': 'Top-down (proportional to SKU)',
+                                                                   'ols': 'Least squares (OLS)',
+                                                                   'wls_struct': 'MinT structural (WLS)'}[m],
+                                            key="recon_method")
+
+            dataset_name, df_channel, channel_month_cols = forecast_channels[recon_channel]
+            recon_base = get_reconciliation_base(
+                df_channel, channel_month_cols, df_product,
+                main_dataset_versions.get(dataset_name, main_data_version), main_dataset_versions.get('product', '')
+            )
+            if recon_base:
+                st.caption("Edit the submitted brand totals. Top-down meets them exactly; least squares finds the "
+                           "closest forecast that is coherent with SKU, tier and total numbers.")
+                hierarchy = recon_base['hierarchy']
+                brand_rows = hierarchy.node_rows('Brand')
+                brand_totals = pd.DataFrame({
+                    'Brand': hierarchy.nodes['Node'].to_numpy()[brand_rows],
+                    'SKUs': hierarchy.sizes[brand_rows].astype(int),
+                    'SKU_Sum': hierarchy.aggregate(recon_base['base'])[brand_rows].sum(axis=1),
+                })
+                brand_totals['Submitted'] = brand_totals['SKU_Sum']
+                edited_totals = st.data_editor(brand_totals, disabled=['Brand', 'SKUs', 'SKU_Sum'],
+                                               hide_index=True, use_container_width=True,
+                                               key=f"recon_brand_totals_{recon_channel}")
+                changed = (edited_totals['Submitted'] - edited_totals['SKU_Sum']).abs() > 0.5
+                recon_overrides = {('Brand', row['Brand']): row['Submitted'] for _, row in edited_totals[changed].iterrows()}
+
+                with perf_stage('analytics.reconciliation'):
+                    reconciled = reconcile_forecast(recon_base, recon_overrides, recon_method)
+                if reconciled:
+                    recon_levels = reconciled['levels']
+                    col_r1, col_r2, col_r3 = create_responsive_columns(3)
+                    total_row = recon_levels[recon_levels['Level'] == 'Total'].iloc[0]
+                    with col_r1:
+                        st.metric("Reconciled Total", f"{total_row['Reconciled']:,.0f}",
+                                  f"{total_row['Reconciled'] - total_row['Base']:+,.0f} vs SKU sum")
+                    with col_r2:
+                        st.metric("Brand Edits", f"{len(recon_overrides):,}")
+                    with col_r3:
+                        brand_gap = recon_levels.loc[recon_levels['Level'] == 'Brand', 'Gap_vs_Target'].abs().sum()
+                        st.metric("Gap vs Brand Targets", f"{brand_gap:,.0f}")
+
+                    st.dataframe(recon_levels, use_container_width=True, hide_index=True)
+                    st.download_button("📥 Export Reconciled SKU Forecast (CSV)", reconciled['sku'].to_csv(index=False),
+                                       file_name=f"reconciled_forecast_{recon_channel.lower()}.csv", mime="text/csv",
+                                       key="recon_download")
+
     # ============================================================================
     # TAB 8: PROFITABILITY
     # ============================================================================
-    with tabs[7]:
+    with tabs[7], perf_stage('render.profitability'):
+        px = lazy_import('plotly.express')
         st.subheader("💰 Profitability Analysis")
         
         if not df_financial.empty:
@@ -2312,10 +2059,32 @@ else:
                 st.dataframe(top_profitable[['SKU_ID', 'Product_Name', 'Gross_Margin', 'Margin_Percentage']], 
                             use_container_width=True)
 
+        if not abc_xyz_segments.empty:
+            st.subheader("🔠 ABC / XYZ Segmentation")
+            st.caption("ABC = revenue Pareto (80/95%), XYZ = demand CV (0.5 / 1.0), last 12 months, whole catalog. "
+                       "Use the ABC / XYZ Class filters in the sidebar to slice every view.")
+            col_x1, col_x2 = create_responsive_columns(2)
+            with col_x1:
+                fig = px.imshow(segment_matrix(abc_xyz_segments), text_auto=True, color_continuous_scale='Blues',
+                               title='SKU Count')
+                fig.update_layout(height=350)
+                st.plotly_chart(fig, use_container_width=True)
+            with col_x2:
+                revenue_matrix = segment_matrix(abc_xyz_segments, 'Revenue')
+                revenue_share = revenue_matrix / max(revenue_matrix.to_numpy().sum(), 1) * 100
+                fig = px.imshow(revenue_share, text_auto='.1f', color_continuous_scale='Greens',
+                               title='Revenue Share (%)')
+                fig.update_layout(height=350)
+                st.plotly_chart(fig, use_container_width=True)
+
+            visible_segments = abc_xyz_segments[abc_xyz_segments['SKU_ID'].isin(df_product['SKU_ID'])]
+            st.dataframe(visible_segments.head(100), use_container_width=True, hide_index=True)
+
     # ============================================================================
     # TAB 9: RESELLER
     # ============================================================================
-    with tabs[8]:
+    with tabs[8], perf_stage('render.reseller'):
+        px = lazy_import('plotly.express')
         st.subheader("🤝 Reseller Performance")
         
         if not df_reseller_forecast.empty:
@@ -2348,7 +2117,8 @@ else:
     # ============================================================================
     # TAB 10: FULFILLMENT
     # ============================================================================
-    with tabs[9]:
+    with tabs[9], perf_stage('render.fulfillment'):
+        px = lazy_import('plotly.express')
         st.subheader("🚚 Fulfillment Cost Analysis")
         
         if not df_fulfillment.empty:
@@ -2415,11 +2185,19 @@ else:
 
 st.markdown(footer, unsafe_allow_html=True)
 
+perf_recorder = stop_recording()
+if st.session_state.get('debug_mode', False):
+    render_performance_panel(perf_recorder)
+    render_cache_panel()
+    render_telemetry_panel()
+
 # ============================================================================
 # 📱 JAVASCRIPT FOR DEVICE DETECTION
 # ============================================================================
 
-st.markdown("""
+# Script deteksi hanya dikirim selama device belum terdeteksi lewat query param
+if 'mobile' not in st.query_params and 'tablet' not in st.query_params:
+    st.markdown("""
 <script>
 // Simple device detection
 function updateDeviceInfo() {
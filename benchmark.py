@@ -0,0 +1,183 @@
+"""
+Benchmark suite - waktu dan memori setiap loader dan fungsi analytics
+di atas data synthetic (lihat synthetic_data.py)
+
+    python benchmark.py --skus 1000 10000 --months 36
+    python benchmark.py --skus 10000 --compare benchmark_results/baseline.json
+
+Hasil disimpan sebagai JSON (meta + satu record per scale x fungsi) sehingga
+dua run bisa dibandingkan; --compare keluar dengan kode 1 jika ada regresi.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import data_loader
+from data_sources import MemorySource
+from filters import build_filter_index
+from pipeline import ANALYTICS_STEPS, run_step
+from synthetic_data import generate_workbook
+
+LOADER_STEPS = [
+    ('load_and_process_data', data_loader.load_and_process_data),
+    ('load_reseller_complete_data', data_loader.load_reseller_complete_data),
+]
+
+
+def _result_size(result):
+    """Jumlah baris output (DataFrame) atau jumlah entry (dict)"""
+    if isinstance(result, pd.DataFrame):
+        return len(result)
+    if isinstance(result, dict):
+        return len(result)
+    return None
+
+
+def _measure(func, args, repeat):
+    """Jalankan `repeat` kali untuk waktu, lalu sekali di bawah tracemalloc untuk peak memori"""
+    diagnostics = []
+    durations = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run_step(func, args, diagnostics)
+        durations.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    run_step(func, args, [])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return result, {
+        'seconds_min': min(durations),
+        'seconds_median': statistics.median(durations),
+        'peak_mb': (peak - baseline) / 1024 ** 2,
+        'rows_out': _result_size(result),
+        'diagnostics': len(diagnostics),
+    }
+
+
+def run_benchmarks(n_skus, n_months, repeat=3, sparsity=0.3, seed=42):
+    """Benchmark satu skala data; return list record hasil"""
+    sheets = generate_workbook(n_skus=n_skus, n_months=n_months, sparsity=sparsity, seed=seed)
+    scale = {'skus': n_skus, 'months': n_months}
+    records = []
+
+    outputs = {}
+    for name, func in LOADER_STEPS:
+        result, stats = _measure(func, [MemorySource(sheets)], repeat)
+        outputs[name] = result
+        records.append({**scale, 'kind': 'loader', 'name': name, **stats})
+
+    data = outputs['load_and_process_data']
+    result, stats = _measure(build_filter_index, [data, data.get('product', pd.DataFrame())], repeat)
+    records.append({**scale, 'kind': 'transform', 'name': 'build_filter_index', **stats})
+
+    namespace = dict(data)
+    for name, func, inputs in ANALYTICS_STEPS:
+        args = [namespace.get(key, pd.DataFrame()) for key in inputs]
+        result, stats = _measure(func, args, repeat)
+        namespace[name] = result
+        records.append({**scale, 'kind': 'analytics', 'name': name, **stats})
+
+    return records
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)), stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare_results(current, baseline, threshold=1.25, min_seconds=0.005):
+    """
+    Bandingkan median waktu per (skus, months, name).
+    Regresi = lebih lambat dari `threshold` x baseline dan selisih > min_seconds.
+    """
+    base_index = {(r['skus'], r['months'], r['name']): r for r in baseline['results']}
+    rows = []
+    for r in current['results']:
+        old = base_index.get((r['skus'], r['months'], r['name']))
+        if old is None:
+            continue
+        ratio = r['seconds_median'] / old['seconds_median'] if old['seconds_median'] > 0 else np.inf
+        regression = ratio > threshold and (r['seconds_median'] - old['seconds_median']) > min_seconds
+        rows.append({
+            'skus': r['skus'], 'months': r['months'], 'name': r['name'],
+            'baseline_s': old['seconds_median'], 'current_s': r['seconds_median'],
+            'ratio': ratio, 'regression': regression,
+        })
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark loaders and analytics on synthetic data")
+    parser.add_argument('--skus', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--months', type=int, default=36)
+    parser.add_argument('--sparsity', type=float, default=0.3)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--out', default=None, help="Output JSON (default benchmark_results/<timestamp>.json)")
+    parser.add_argument('--compare', default=None, help="Baseline JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=1.25, help="Slowdown ratio counted as regression")
+    args = parser.parse_args(argv)
+
+    records = []
+    for n_skus in args.skus:
+        print(f"Benchmarking {n_skus:,} SKUs x {args.months} months ...", flush=True)
+        records.extend(run_benchmarks(n_skus, args.months, repeat=args.repeat, sparsity=args.sparsity))
+
+    report = {
+        'meta': {
+            'created_at': datetime.now().isoformat(),
+            'git_commit': _git_commit(),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'repeat': args.repeat,
+            'sparsity': args.sparsity,
+        },
+        'results': records,
+    }
+
+    out_path = args.out or os.path.join('benchmark_results', f"{datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(out_path) or '.', exist_ok=True)
+    with open(out_path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"\n{'SKUs':>8} {'Function':<45}{'Median s':>10}{'Peak MB':>10}{'Rows':>10}")
+    for r in records:
+        rows = '' if r['rows_out'] is None else f"{r['rows_out']:,}"
+        print(f"{r['skus']:>8,} {r['name']:<45}{r['seconds_median']:>10.3f}{r['peak_mb']:>10.1f}{rows:>10}")
+    print(f"\nSaved results to {out_path}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        rows = compare_results(report, baseline, threshold=args.threshold)
+        regressions = [r for r in rows if r['regression']]
+        print(f"\nCompared with {args.compare}: {len(regressions)} regression(s)")
+        for r in rows:
+            flag = 'REGRESSION' if r['regression'] else ''
+            print(f"{r['skus']:>8,} {r['name']:<45}{r['baseline_s']:>9.3f}s -> {r['current_s']:>7.3f}s  x{r['ratio']:.2f} {flag}")
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,359 @@
+"""
+Cache manager - cache in-process untuk loader dan analytics dengan statistik
+
+Pengganti st.cache_data / st.cache_resource yang bisa diamati: per fungsi
+dicatat hit, miss, eviction, total waktu compute dan waktu yang dihemat,
+plus estimasi ukuran byte setiap entry.
+
+    @cached('analytics.financial', ttl=300)
+    def calculate_financial_metrics_all(df_sales, df_product, diagnostics=None): ...
+
+Aturan key mengikuti Streamlit: argumen berawalan underscore tidak di-hash.
+Argumen `diagnostics` juga tidak di-hash; diagnostics dari compute disimpan
+bersama hasil dan diputar ulang ke caller saat hit.
+Hasil dibagikan antar session: DataFrame dikembalikan sebagai shallow copy
+(Copy-on-Write), jadi mutasi di caller tidak mengubah entry cache.
+
+Compute per key diserialisasi (seperti st.cache_data): session yang miss pada
+key yang sama menunggu compute pertama lalu memakai hasilnya, bukan ikut
+menghitung dan menyimpan salinan sendiri (double-checked lock per key).
+
+Semua fungsi berbagi satu memory budget (SCM_CACHE_BUDGET_MB, default 512).
+Jika total byte melewati budget, entry dibuang per tier - 'derived' dulu,
+lalu 'index', terakhir 'raw' (hasil load) - dan di dalam tier yang paling
+besar x lama tidak dipakai / murah di-compute ulang dibuang lebih dulu.
+"""
+import functools
+import hashlib
+import inspect
+import os
+import sys
+import threading
+import time
+from collections.abc import Mapping
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from versioning import dataset_fingerprint
+
+# Urutan eviction: tier dengan rank terkecil dibuang lebih dulu
+TIERS = {'derived': 0, 'index': 1, 'raw': 2}
+
+_lock = threading.RLock()
+_registry = {}
+# (nama cache, key) -> [Lock, jumlah pemakai]; dibuang saat tidak ada yang memakai
+_key_locks = {}
+_budget = {'bytes': int(float(os.environ.get('SCM_CACHE_BUDGET_MB', 512)) * 1024 ** 2), 'evictions': 0}
+
+
+class _Entry:
+    __slots__ = ('value', 'diagnostics', 'bytes', 'compute_seconds', 'created', 'last_access', 'hits')
+
+    def __init__(self, value, diagnostics, nbytes, compute_seconds):
+        now = time.time()
+        self.value = value
+        self.diagnostics = diagnostics
+        self.bytes = nbytes
+        self.compute_seconds = compute_seconds
+        self.created = now
+        self.last_access = now
+        self.hits = 0
+
+
+class _FunctionCache:
+    """Entry dan statistik untuk satu fungsi ter-cache"""
+
+    def __init__(self, name, ttl, max_entries, tier):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.tier = tier
+        self.entries = {}
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'compute_seconds': 0.0, 'saved_seconds': 0.0}
+
+    def evict(self, key):
+        self.entries.pop(key, None)
+        self.stats['evictions'] += 1
+
+
+def estimate_bytes(value, _depth=0):
+    """Estimasi ukuran memori sebuah hasil (DataFrame deep, dict/list rekursif)"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if hasattr(value, 'memory_bytes'):
+        return int(value.memory_bytes())
+    if _depth < 4 and isinstance(value, Mapping):
+        return sys.getsizeof(value) + sum(estimate_bytes(v, _depth + 1) for v in value.values())
+    if _depth < 4 and isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_bytes(v, _depth + 1) for v in value)
+    return sys.getsizeof(value)
+
+
+def _fingerprint(value):
+    """Bagian key cache untuk satu argumen"""
+    if isinstance(value, pd.DataFrame):
+        return 'df:' + dataset_fingerprint(value)
+    if isinstance(value, pd.Series):
+        return 'series:' + dataset_fingerprint(value.to_frame())
+    if isinstance(value, np.ndarray):
+        return 'nd:' + hashlib.blake2b(np.ascontiguousarray(value).tobytes(), digest_size=8).hexdigest()
+    if isinstance(value, Mapping):
+        if 'data_version' in value:
+            return 'version:' + str(value['data_version'])
+        return '{' + ','.join(f"{k!r}:{_fingerprint(value[k])}" for k in sorted(value, key=repr)) + '}'
+    if isinstance(value, (list, tuple)):
+        return '[' + ','.join(_fingerprint(v) for v in value) + ']'
+    return repr(value)
+
+
+def _share(value):
+    """Salinan dangkal untuk caller: container baru, DataFrame shallow (CoW)"""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy(deep=False)
+    if isinstance(value, dict):
+        return {k: _share(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_share(v) for v in value]
+    return value
+
+
+def _get_cache(name, ttl, max_entries, tier):
+    with _lock:
+        cache = _registry.get(name)
+        if cache is None:
+            cache = _registry[name] = _FunctionCache(name, ttl, max_entries, tier)
+        else:
+            # Script Streamlit dieksekusi ulang setiap rerun: entry & statistik dipertahankan
+            cache.ttl, cache.max_entries, cache.tier = ttl, max_entries, tier
+        return cache
+
+
+def set_memory_budget(n_bytes):
+    """Ubah budget global (byte) lalu terapkan segera"""
+    with _lock:
+        _budget['bytes'] = int(n_bytes)
+        _enforce_budget()
+
+
+def get_memory_budget():
+    return _budget['bytes']
+
+
+def total_bytes():
+    with _lock:
+        return sum(e.bytes for cache in _registry.values() for e in cache.entries.values())
+
+
+def _purge_expired():
+    now = time.time()
+    for cache in _registry.values():
+        if cache.ttl is None:
+            continue
+        for key in [k for k, e in cache.entries.items() if now - e.created > cache.ttl]:
+            cache.evict(key)
+
+
+def _eviction_order(protect):
+    """
+    Kandidat eviction terurut: tier terendah dulu, lalu skor terbesar.
+    Skor = bytes x idle_seconds / compute_seconds -> entry besar, lama tidak
+    dipakai dan murah dihitung ulang dibuang lebih dulu (size-aware LRU).
+    """
+    now = time.time()
+    candidates = []
+    for cache in _registry.values():
+        for key, e in cache.entries.items():
+            if e is protect:
+                continue
+            score = e.bytes * (now - e.last_access + 1.0) / (e.compute_seconds + 1e-3)
+            candidates.append((TIERS.get(cache.tier, 0), -score, cache, key))
+    candidates.sort(key=lambda c: (c[0], c[1]))
+    return candidates
+
+
+def _enforce_budget(protect=None):
+    """Buang entry sampai total byte <= budget; entry `protect` (baru masuk) dipertahankan"""
+    _purge_expired()
+    total = sum(e.bytes for cache in _registry.values() for e in cache.entries.values())
+    if total <= _budget['bytes']:
+        return
+    for _, _, cache, key in _eviction_order(protect):
+        entry = cache.entries.get(key)
+        if entry is None:
+            continue
+        cache.evict(key)
+        _budget['evictions'] += 1
+        total -= entry.bytes
+        if total <= _budget['bytes']:
+            break
+
+
+def _lookup(cache, key):
+    """Entry valid untuk key (hit dicatat) atau None (belum dicatat sebagai miss)"""
+    with _lock:
+        entry = cache.entries.get(key)
+        if entry is not None and cache.ttl is not None and time.time() - entry.created > cache.ttl:
+            cache.evict(key)
+            entry = None
+        if entry is not None:
+            entry.hits += 1
+            entry.last_access = time.time()
+            cache.stats['hits'] += 1
+            cache.stats['saved_seconds'] += entry.compute_seconds
+            # Pindah ke akhir dict = paling baru dipakai
+            cache.entries[key] = cache.entries.pop(key)
+        return entry
+
+
+def _store(cache, key, value, diagnostics, compute_seconds):
+    entry = _Entry(value, diagnostics, estimate_bytes(value), compute_seconds)
+    with _lock:
+        cache.stats['misses'] += 1
+        cache.stats['compute_seconds'] += compute_seconds
+        cache.entries[key] = entry
+        while cache.max_entries is not None and len(cache.entries) > cache.max_entries:
+            cache.evict(next(iter(cache.entries)))
+        _enforce_budget(protect=entry)
+    return entry
+
+
+@contextmanager
+def compute_lock(name, key):
+    """Lock per (nama cache, key): hanya satu thread yang menghitung key yang sama"""
+    with _lock:
+        slot = _key_locks.setdefault((name, key), [threading.Lock(), 0])
+        slot[1] += 1
+    try:
+        with slot[0]:
+            yield
+    finally:
+        with _lock:
+            slot[1] -= 1
+            if slot[1] == 0:
+                _key_locks.pop((name, key), None)
+
+
+def lookup(name, key, ttl=None, max_entries=None, tier='derived'):
+    """
+    Cari entry dengan key eksplisit (mis. versi node DAG).
+    Return (True, value, diagnostics) saat hit, (False, None, None) saat miss.
+    """
+    entry = _lookup(_get_cache(name, ttl, max_entries, tier), key)
+    if entry is None:
+        return False, None, None
+    return True, _share(entry.value), list(entry.diagnostics)
+
+
+def store(name, key, value, diagnostics=None, compute_seconds=0.0, ttl=None, max_entries=None, tier='derived'):
+    """Simpan hasil dengan key eksplisit (dihitung sebagai miss)"""
+    cache = _get_cache(name, ttl, max_entries, tier)
+    _store(cache, key, value, list(diagnostics or []), compute_seconds)
+
+
+def cached(name, ttl=None, max_entries=None, tier='derived'):
+    """
+    Decorator cache dengan statistik; `name` unik per fungsi (dipakai di debug view).
+    tier: 'raw' (hasil load), 'index' atau 'derived' - menentukan prioritas eviction.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        accepts_diagnostics = 'diagnostics' in signature.parameters
+        cache = _get_cache(name, ttl, max_entries, tier)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            caller_diagnostics = bound.arguments.pop('diagnostics', None)
+            key = hashlib.blake2b(
+                '|'.join(f"{k}={_fingerprint(v)}" for k, v in bound.arguments.items() if not k.startswith('_')).encode(),
+                digest_size=16,
+            ).hexdigest()
+
+            entry = _lookup(cache, key)
+            if entry is None:
+                with compute_lock(name, key):
+                    # Cek ulang: session lain mungkin baru selesai menghitung key ini
+                    entry = _lookup(cache, key)
+                    if entry is None:
+                        diagnostics = []
+                        if accepts_diagnostics:
+                            bound.arguments['diagnostics'] = diagnostics
+                        start = time.perf_counter()
+                        value = func(*bound.args, **bound.kwargs)
+                        _store(cache, key, value, diagnostics, time.perf_counter() - start)
+
+                        if caller_diagnostics is not None:
+                            caller_diagnostics.extend(diagnostics)
+                        return _share(value)
+
+            if caller_diagnostics is not None:
+                caller_diagnostics.extend(entry.diagnostics)
+            return _share(entry.value)
+
+        def clear():
+            with _lock:
+                for key in list(cache.entries):
+                    cache.evict(key)
+
+        wrapper.clear = clear
+        wrapper.cache_name = name
+        return wrapper
+    return decorator
+
+
+def clear_all():
+    """Kosongkan semua cache (statistik tetap, dihitung sebagai eviction)"""
+    with _lock:
+        for cache in _registry.values():
+            for key in list(cache.entries):
+                cache.evict(key)
+
+
+def cache_stats_frame():
+    """Satu baris per fungsi ter-cache: hit/miss/eviction, waktu dan byte"""
+    with _lock:
+        rows = []
+        for cache in _registry.values():
+            lookups = cache.stats['hits'] + cache.stats['misses']
+            rows.append({
+                'function': cache.name,
+                'tier': cache.tier,
+                'entries': len(cache.entries),
+                'bytes': sum(e.bytes for e in cache.entries.values()),
+                'hits': cache.stats['hits'],
+                'misses': cache.stats['misses'],
+                'hit_rate': cache.stats['hits'] / lookups if lookups else None,
+                'evictions': cache.stats['evictions'],
+                'compute_seconds': cache.stats['compute_seconds'],
+                'saved_seconds': cache.stats['saved_seconds'],
+                'ttl': cache.ttl,
+                'max_entries': cache.max_entries,
+            })
+    return pd.DataFrame(rows, columns=[
+        'function', 'tier', 'entries', 'bytes', 'hits', 'misses', 'hit_rate', 'evictions',
+        'compute_seconds', 'saved_seconds', 'ttl', 'max_entries',
+    ])
+
+
+def budget_summary():
+    """Budget global: byte terpakai, batas dan jumlah eviction karena budget"""
+    with _lock:
+        return {'used_bytes': total_bytes(), 'budget_bytes': _budget['bytes'], 'budget_evictions': _budget['evictions']}
+
+
+def cache_entries_frame():
+    """Satu baris per entry: ukuran, umur, hit dan biaya compute"""
+    now = time.time()
+    with _lock:
+        rows = [
+            {'function': cache.name, 'tier': cache.tier, 'key': key[:12], 'bytes': e.bytes, 'age_seconds': now - e.created,
+             'idle_seconds': now - e.last_access, 'hits': e.hits, 'compute_seconds': e.compute_seconds}
+            for cache in _registry.values() for key, e in cache.entries.items()
+        ]
+    return pd.DataFrame(rows, columns=['function', 'tier', 'key', 'bytes', 'age_seconds', 'idle_seconds', 'hits', 'compute_seconds'])
@@ -0,0 +1,147 @@
+"""
+DAG dataset turunan - invalidasi terarah berdasarkan versi input
+
+Setiap langkah analytics (nama, fungsi, input) adalah node. Versi node
+diturunkan dari nama fungsi + versi semua inputnya (dataset hasil load atau
+node lain), jadi:
+
+    Stock_Onhand berubah -> versi 'stock' berubah
+        -> inventory_metrics & inventory_financial dihitung ulang
+        -> financial, seasonal_pattern, monthly_performance, ... dipakai dari cache
+
+Hasil node disimpan di cache_manager dengan key = versi node (tanpa hashing
+DataFrame setiap rerun); node yang perlu dihitung ulang dijalankan lewat
+executor.run_graph sehingga tetap paralel sesuai dependensi.
+"""
+from contextlib import ExitStack
+
+import pandas as pd
+
+from cache_manager import compute_lock, lookup, store
+from executor import run_graph, run_step, step_dependencies
+from versioning import dataset_fingerprint, derive_version
+
+MISSING_VERSION = 'missing'
+
+
+def _func_id(func):
+    func = getattr(func, '__wrapped__', func)
+    return f"{getattr(func, '__module__', '')}.{getattr(func, '__qualname__', repr(func))}"
+
+
+def input_versions(datasets, names):
+    """Versi setiap input; pakai 'dataset_versions' hasil load jika ada, selain itu fingerprint"""
+    known = datasets.get('dataset_versions') or {}
+    versions = {}
+    for name in names:
+        if name in known:
+            versions[name] = known[name]
+        elif isinstance(datasets.get(name), pd.DataFrame):
+            versions[name] = dataset_fingerprint(datasets[name])
+        else:
+            versions[name] = MISSING_VERSION
+    return versions
+
+
+def node_versions(steps, versions):
+    """Versi setiap node dalam urutan topologis: hash(fungsi, versi input)"""
+    deps = step_dependencies(steps)
+    by_name = {name: (func, inputs) for name, func, inputs in steps}
+    resolved = dict(versions)
+    result = {}
+
+    pending = [name for name, _, _ in steps]
+    while pending:
+        for name in list(pending):
+            if deps[name] <= set(result):
+                func, inputs = by_name[name]
+                result[name] = resolved[name] = derive_version(
+                    name, _func_id(func), *(f"{key}={resolved.get(key, MISSING_VERSION)}" for key in inputs)
+                )
+                pending.remove(name)
+    return result
+
+
+def affected_nodes(steps, changed_inputs):
+    """Node yang terdampak (langsung/transitif) oleh perubahan input tertentu"""
+    affected = set()
+    changed = set(changed_inputs)
+    # Iterasi sampai stabil supaya urutan deklarasi tidak berpengaruh
+    grew = True
+    while grew:
+        grew = False
+        for name, _, inputs in steps:
+            if name not in affected and (changed | affected) & set(inputs):
+                affected.add(name)
+                grew = True
+    return affected
+
+
+def run_incremental(steps, datasets, diagnostics=None, max_workers=None, timings=None,
+                    cache_prefix='dag', max_entries=8):
+    """
+    Jalankan DAG: node dengan versi yang sudah ada di cache dipakai ulang,
+    sisanya dihitung (paralel via executor) lalu disimpan.
+
+    Return (results, info); info berisi versions, computed dan reused.
+    """
+    diagnostics = [] if diagnostics is None else diagnostics
+    step_names = {name for name, _, _ in steps}
+    external = {key for _, _, inputs in steps for key in inputs if key not in step_names}
+    versions = node_versions(steps, input_versions(datasets, sorted(external)))
+
+    reused = {}
+    reused_diagnostics = {}
+
+    def reuse(names):
+        for name in names:
+            hit, value, node_diagnostics = lookup(f"{cache_prefix}.{name}", versions[name], max_entries=max_entries)
+            if hit:
+                reused[name] = value
+                reused_diagnostics[name] = node_diagnostics
+
+    reuse([name for name, _, _ in steps])
+    computed = {}
+    computed_diagnostics = {}
+    with ExitStack() as locks:
+        # Session lain yang miss di node yang sama menunggu di sini lalu memakai
+        # hasilnya (cek ulang); lock diambil urut nama supaya tidak deadlock
+        missing = sorted(name for name, _, _ in steps if name not in reused)
+        for name in missing:
+            locks.enter_context(compute_lock(f"{cache_prefix}.{name}", versions[name]))
+        reuse(missing)
+
+        to_run = [step for step in steps if step[0] not in reused]
+        if to_run:
+            run_timings = []
+            # Diagnostics per node dipisah supaya bisa disimpan bersama hasilnya
+            per_node = {name: [] for name, _, _ in to_run}
+            wrapped = [(name, _collecting(func, per_node[name]), inputs) for name, func, inputs in to_run]
+            computed = run_graph(wrapped, {**dict(datasets), **reused}, None, max_workers=max_workers,
+                                 timings=run_timings)
+            seconds = {t['stage'].split('.', 1)[1]: t['seconds'] for t in run_timings}
+            for name, _, _ in to_run:
+                computed_diagnostics[name] = per_node[name]
+                store(f"{cache_prefix}.{name}", versions[name], computed[name], per_node[name],
+                      compute_seconds=seconds.get(name, 0.0), max_entries=max_entries)
+            if timings is not None:
+                timings.extend(run_timings)
+
+    results = {}
+    for name, _, _ in steps:
+        results[name] = reused[name] if name in reused else computed[name]
+        diagnostics.extend(reused_diagnostics.get(name) or computed_diagnostics.get(name) or [])
+
+    info = {
+        'versions': versions,
+        'computed': [name for name, _, _ in steps if name not in reused],
+        'reused': [name for name, _, _ in steps if name in reused],
+    }
+    return results, info
+
+
+def _collecting(func, sink):
+    """Bungkus fungsi agar diagnostics-nya masuk ke `sink` (per node)"""
+    def node(*args):
+        return run_step(func, args, sink)
+    return node
@@ -0,0 +1,402 @@
+"""
+Data loader headless - load + transform semua worksheet tanpa dependensi Streamlit
+"""
+from datetime import datetime
+
+import pandas as pd
+
+from diagnostics import add_diagnostic
+from perf import perf_stage
+from versioning import compute_data_version, compute_dataset_versions
+
+
+def validate_month_format(month_str):
+    """Validate and standardize month formats"""
+    if pd.isna(month_str):
+        return datetime.now()
+    
+    month_str = str(month_str).strip().upper()
+    
+    # Mapping bulan
+    month_map = {
+        'JAN': 1, 'FEB': 2, 'MAR': 3, 'APR': 4, 'MAY': 5, 'JUN': 6,
+        'JUL': 7, 'AUG': 8, 'SEP': 9, 'OCT': 10, 'NOV': 11, 'DEC': 12
+    }
+    
+    formats_to_try = ['%b-%Y', '%b-%y', '%B %Y', '%m/%Y', '%Y-%m']
+    
+    for fmt in formats_to_try:
+        try:
+            return datetime.strptime(month_str, fmt)
+        except:
+            continue
+    
+    # Fallback: cari bulan dalam string
+    for month_name, month_num in month_map.items():
+        if month_name in month_str:
+            # Cari tahun
+            year_part = month_str.replace(month_name, '').replace('-', '').replace(' ', '').strip()
+            if year_part and year_part.isdigit():
+                year = int('20' + year_part) if len(year_part) == 2 else int(year_part)
+            else:
+                year = datetime.now().year
+            
+            return datetime(year, month_num, 1)
+    
+    return datetime.now()
+
+def add_product_info_to_data(df, df_product):
+    """Add Product_Name, Brand, SKU_Tier, Prices from Product_Master to any dataframe"""
+    if df.empty or df_product.empty or 'SKU_ID' not in df.columns:
+        return df
+    
+    # Get product info from Product_Master (including prices)
+    price_cols = ['Floor_Price', 'Net_Order_Price'] if 'Floor_Price' in df_product.columns and 'Net_Order_Price' in df_product.columns else []
+    
+    product_info_cols = ['SKU_ID', 'Product_Name', 'Brand', 'SKU_Tier', 'Status'] + price_cols
+    product_info_cols = [col for col in product_info_cols if col in df_product.columns]
+    
+    product_info = df_product[product_info_cols].copy()
+    product_info = product_info.drop_duplicates(subset=['SKU_ID'])
+    
+    # Remove existing columns if they exist (except SKU_ID)
+    cols_to_remove = []
+    for col in ['Product_Name', 'Brand', 'SKU_Tier', 'Status', 'Floor_Price', 'Net_Order_Price']:
+        if col in df.columns and col != 'SKU_ID':
+            cols_to_remove.append(col)
+    
+    if cols_to_remove:
+        df_temp = df.drop(columns=cols_to_remove)
+    else:
+        df_temp = df.copy()
+    
+    # Merge with product info
+    df_result = pd.merge(df_temp, product_info, on='SKU_ID', how='left')
+    return df_result
+
+def _read_records(source, sheet_name):
+    """get_all_records dengan instrumentation I/O per worksheet"""
+    with perf_stage(f"io.{sheet_name}") as stage:
+        records = source.get_all_records(sheet_name)
+        stage['rows_out'] = len(records)
+    return records
+
+def _melt_months(df_raw, sheet_name, **melt_kwargs):
+    """Wide -> long (satu baris per SKU x bulan) dengan instrumentation"""
+    with perf_stage(f"transform.{sheet_name}.melt", rows_in=len(df_raw)) as stage:
+        df_long = df_raw.melt(**melt_kwargs)
+        stage['rows_out'] = len(df_long)
+    return df_long
+
+def _parse_month_labels(labels, sheet_name):
+    """Parse label bulan via validate_month_format dengan instrumentation"""
+    with perf_stage(f"transform.{sheet_name}.validate_month_format", rows_in=len(labels)) as stage:
+        months = labels.apply(validate_month_format)
+        stage['rows_out'] = len(months)
+    return months
+
+def load_and_process_data(source, diagnostics=None):
+    """
+    Load semua data termasuk sheet baru: BS_Fullfilment_Cost
+    `source` adalah data source (GSheetSource / WorkbookSource)
+    """
+    
+    data = {}
+
+    # --- HELPER: Baca Sheet Manual ---
+    def safe_read_stock_sheet(sheet_name):
+        try:
+            with perf_stage(f"io.{sheet_name}") as stage:
+                raw_data = source.get_all_values(sheet_name)
+                stage['rows_out'] = max(len(raw_data) - 1, 0)
+            if len(raw_data) < 2: return pd.DataFrame()
+            headers = [str(h).strip() for h in raw_data[0]]
+            df = pd.DataFrame(raw_data[1:], columns=headers)
+            df = df.loc[:, df.columns != '']
+            return df
+        except: return pd.DataFrame()
+
+    try:
+        # 1. PRODUCT MASTER
+        df_product = pd.DataFrame(_read_records(source, "Product_Master"))
+        df_product.columns = [col.strip().replace(' ', '_') for col in df_product.columns]
+        
+        for col in ['Floor_Price', 'Net_Order_Price']:
+            if col in df_product.columns:
+                df_product[col] = pd.to_numeric(df_product[col], errors='coerce').fillna(0)
+        
+        if 'Status' not in df_product.columns: df_product['Status'] = 'Active'
+        df_product_active = df_product[df_product['Status'].str.upper() == 'ACTIVE'].copy()
+        active_skus = df_product_active['SKU_ID'].tolist()
+        
+        data['product'] = df_product
+        data['product_active'] = df_product_active
+
+        # 2. SALES DATA
+        df_sales_raw = pd.DataFrame(_read_records(source, "Sales"))
+        df_sales_raw.columns = [col.strip() for col in df_sales_raw.columns]
+        month_cols = [c for c in df_sales_raw.columns if any(m in c.upper() for m in ['JAN','FEB','MAR','APR','MAY','JUN','JUL','AUG','SEP','OCT','NOV','DEC'])]
+        if month_cols and 'SKU_ID' in df_sales_raw.columns:
+            id_cols = ['SKU_ID']
+            for col in ['SKU_Name', 'Product_Name', 'Brand', 'SKU_Tier']:
+                if col in df_sales_raw.columns: id_cols.append(col)
+            df_sales_long = _melt_months(df_sales_raw, "Sales", id_vars=id_cols, value_vars=month_cols, var_name='Month_Label', value_name='Sales_Qty')
+            df_sales_long['Sales_Qty'] = pd.to_numeric(df_sales_long['Sales_Qty'], errors='coerce').fillna(0)
+            df_sales_long['Month'] = _parse_month_labels(df_sales_long['Month_Label'], "Sales")
+            df_sales_long = df_sales_long[df_sales_long['SKU_ID'].isin(active_skus)]
+            df_sales_long = add_product_info_to_data(df_sales_long, df_product)
+            data['sales'] = df_sales_long.sort_values('Month')
+
+        # 3. ROFO DATA
+        df_rofo_raw = pd.DataFrame(_read_records(source, "Rofo"))
+        df_rofo_raw.columns = [col.strip() for col in df_rofo_raw.columns]
+        month_cols_rofo = [c for c in df_rofo_raw.columns if any(m in c.upper() for m in ['JAN','FEB','MAR','APR','MAY','JUN','JUL','AUG','SEP','OCT','NOV','DEC'])]
+        if month_cols_rofo:
+            id_cols_rofo = ['SKU_ID']
+            for col in ['Product_Name', 'Brand']:
+                if col in df_rofo_raw.columns: id_cols_rofo.append(col)
+            df_rofo_long = _melt_months(df_rofo_raw, "Rofo", id_vars=id_cols_rofo, value_vars=month_cols_rofo, var_name='Month_Label', value_name='Forecast_Qty')
+            df_rofo_long['Forecast_Qty'] = pd.to_numeric(df_rofo_long['Forecast_Qty'], errors='coerce').fillna(0)
+            df_rofo_long['Month'] = _parse_month_labels(df_rofo_long['Month_Label'], "Rofo")
+            df_rofo_long = df_rofo_long[df_rofo_long['SKU_ID'].isin(active_skus)]
+            df_rofo_long = add_product_info_to_data(df_rofo_long, df_product)
+            data['forecast'] = df_rofo_long
+
+        # 4. PO DATA
+        df_po_raw = pd.DataFrame(_read_records(source, "PO"))
+        df_po_raw.columns = [col.strip() for col in df_po_raw.columns]
+        month_cols_po = [c for c in df_po_raw.columns if any(m in c.upper() for m in ['JAN','FEB','MAR','APR','MAY','JUN','JUL','AUG','SEP','OCT','NOV','DEC'])]
+        if month_cols_po and 'SKU_ID' in df_po_raw.columns:
+            df_po_long = _melt_months(df_po_raw, "PO", id_vars=['SKU_ID'], value_vars=month_cols_po, var_name='Month_Label', value_name='PO_Qty')
+            df_po_long['PO_Qty'] = pd.to_numeric(df_po_long['PO_Qty'], errors='coerce').fillna(0)
+            df_po_long['Month'] = _parse_month_labels(df_po_long['Month_Label'], "PO")
+            df_po_long = df_po_long[df_po_long['SKU_ID'].isin(active_skus)]
+            df_po_long = add_product_info_to_data(df_po_long, df_product)
+            data['po'] = df_po_long
+
+        # 5. STOCK DATA
+        df_stock_raw = safe_read_stock_sheet("Stock_Onhand")
+        if not df_stock_raw.empty:
+            col_mapping = {
+                'SKU_ID': 'SKU_ID', 'Qty_Available': 'Stock_Qty', 'Product_Code': 'Anchanto_Code',
+                'Stock_Category': 'Stock_Category', 'Expiry_Date': 'Expiry_Date', 'Product_Name': 'Product_Name'
+            }
+            if 'SKU_ID' in df_stock_raw.columns and 'Qty_Available' in df_stock_raw.columns:
+                cols_to_use = [c for c in col_mapping.keys() if c in df_stock_raw.columns]
+                df_stock = df_stock_raw[cols_to_use].copy()
+                df_stock = df_stock.rename(columns=col_mapping)
+                df_stock['Stock_Qty'] = pd.to_numeric(df_stock['Stock_Qty'], errors='coerce').fillna(0)
+                df_stock['SKU_ID'] = df_stock['SKU_ID'].astype(str).str.strip()
+                if 'Floor_Price' in df_product.columns:
+                    df_stock = pd.merge(df_stock, df_product[['SKU_ID', 'Floor_Price', 'Net_Order_Price']], on='SKU_ID', how='left')
+                data['stock'] = df_stock
+            else:
+                data['stock'] = pd.DataFrame(columns=['SKU_ID', 'Stock_Qty'])
+        else:
+            data['stock'] = pd.DataFrame(columns=['SKU_ID', 'Stock_Qty'])
+
+        # 6. FORECAST 2026 ECOMM
+        try:
+            df_ecomm_raw = pd.DataFrame(_read_records(source, "Forecast_2026_Ecomm"))
+            df_ecomm_raw.columns = [col.strip().replace(' ', '_') for col in df_ecomm_raw.columns]
+            month_cols_ecomm = [c for c in df_ecomm_raw.columns if any(m in c.upper() for m in ['JAN','FEB','MAR','APR','MAY','JUN','JUL','AUG','SEP','OCT','NOV','DEC'])]
+            for col in month_cols_ecomm:
+                df_ecomm_raw[col] = pd.to_numeric(df_ecomm_raw[col], errors='coerce').fillna(0)
+            data['ecomm_forecast'] = df_ecomm_raw
+            data['ecomm_forecast_month_cols'] = month_cols_ecomm
+        except:
+            data['ecomm_forecast'] = pd.DataFrame()
+            data['ecomm_forecast_month_cols'] = []
+        
+        # 7. FORECAST 2026 RESELLER
+        try:
+            df_reseller_raw = pd.DataFrame(_read_records(source, "Forecast_2026_Reseller"))
+            df_reseller_raw.columns = [col.strip().replace(' ', '_') for col in df_reseller_raw.columns]
+            all_month_cols_res = [c for c in df_reseller_raw.columns if any(m in c.upper() for m in ['JAN','FEB','MAR','APR','MAY','JUN','JUL','AUG','SEP','OCT','NOV','DEC'])]
+            for col in all_month_cols_res:
+                df_reseller_raw[col] = pd.to_numeric(df_reseller_raw[col], errors='coerce').fillna(0)
+            
+            forecast_start_date = datetime(2026, 1, 1)
+            def is_forecast_month(month_str):
+                try:
+                    month_str = str(month_str).upper().replace('_', ' ').replace('-', ' ')
+                    if ' ' in month_str:
+                        month_part, year_part = month_str.split(' ')
+                        month_num = datetime.strptime(month_part[:3], '%b').month
+                        year_clean = ''.join(filter(str.isdigit, year_part))
+                        year = 2000 + int(year_clean) if len(year_clean) == 2 else int(year_clean)
+                        return datetime(year, month_num, 1) >= forecast_start_date
+                except: return False
+                return False
+            
+            hist_cols = [c for c in all_month_cols_res if not is_forecast_month(c)]
+            fcst_cols = [c for c in all_month_cols_res if is_forecast_month(c)]
+            data['reseller_forecast'] = df_reseller_raw
+            data['reseller_all_month_cols'] = all_month_cols_res
+            data['reseller_historical_cols'] = hist_cols
+            data['reseller_forecast_cols'] = fcst_cols
+        except:
+            data['reseller_forecast'] = pd.DataFrame()
+            data['reseller_all_month_cols'] = []
+            data['reseller_historical_cols'] = []
+            data['reseller_forecast_cols'] = []
+
+        # ==============================================================================
+        # 8. BS FULLFILMENT COST (NEW SHEET)
+        # ==============================================================================
+        try:
+            df_bs = pd.DataFrame(_read_records(source, "BS_Fullfilment_Cost"))
+            
+            # Cleaning Headers & Data
+            # Hapus spasi di nama kolom
+            df_bs.columns = [c.strip() for c in df_bs.columns]
+            
+            # Helper untuk bersihkan angka (hapus koma dan persen)
+            def clean_currency(x):
+                if isinstance(x, str):
+                    return pd.to_numeric(x.replace(',', '').replace('%', ''), errors='coerce')
+                return x
+
+            # List kolom angka yang perlu dibersihkan
+            numeric_cols = ['Total Order(BS)', 'GMV (Fullfil By BS)', 'GMV Total (MP)', 'Total Cost', 'BSA', '%Cost']
+            
+            for col in numeric_cols:
+                if col in df_bs.columns:
+                    df_bs[col] = df_bs[col].apply(clean_currency).fillna(0)
+            
+            # Convert Percentages (karena 3.14% jadi 3.14, mungkin perlu dibagi 100 utk kalkulasi, tapi utk display biar saja)
+            # Kita tandai kolom ini
+            
+            # Parse Date (Apr-25)
+            df_bs['Month_Date'] = pd.to_datetime(df_bs['Month'], format='%b-%y', errors='coerce')
+            df_bs = df_bs.sort_values('Month_Date')
+            
+            data['fulfillment'] = df_bs
+            
+        except Exception as e:
+            add_diagnostic(diagnostics, 'warning', 'load_and_process_data', f"Gagal load BS_Fullfilment_Cost: {e}")
+            data['fulfillment'] = pd.DataFrame()
+
+        data['dataset_versions'] = compute_dataset_versions(data)
+        data['data_version'] = compute_data_version(data, data['dataset_versions'])
+        return data
+        
+    except Exception as e:
+        add_diagnostic(diagnostics, 'error', 'load_and_process_data', f"Error loading data: {str(e)}")
+        return {}
+
+# --- FUNGSI BARU: LOAD DATA RESELLER LENGKAP ---
+def load_reseller_complete_data(source, diagnostics=None):
+    """
+    Load SEMUA data reseller: forecast, sales, past rofo, past PO
+    """
+    reseller_data = {}
+    
+    try:
+        # 1. FORECAST 2026 RESELLER
+        df_fcst_raw = pd.DataFrame(_read_records(source, "Forecast_2026_Reseller"))
+        df_fcst_raw.columns = [col.strip() for col in df_fcst_raw.columns]
+        
+        # Identifikasi kolom bulan
+        all_month_cols = [c for c in df_fcst_raw.columns if any(m in c.upper() for m in 
+                      ['JAN','FEB','MAR','APR','MAY','JUN','JUL','AUG','SEP','OCT','NOV','DEC'])]
+        
+        # Pisahkan 2025 (history) vs 2026+ (forecast)
+        hist_cols = []
+        fcst_cols = []
+        
+        for col in all_month_cols:
+            col_str = str(col).upper()
+            if '25' in col_str or '2025' in col_str:
+                hist_cols.append(col)
+            else:
+                fcst_cols.append(col)  # 2026, 2027, dll
+        
+        # Convert numeric
+        for col in all_month_cols:
+            df_fcst_raw[col] = pd.to_numeric(df_fcst_raw[col], errors='coerce').fillna(0)
+        
+        reseller_data['forecast'] = df_fcst_raw
+        reseller_data['forecast_month_cols'] = fcst_cols
+        reseller_data['historical_month_cols'] = hist_cols
+        
+        # 2. SALES RESELLER
+        try:
+            df_sales_raw = pd.DataFrame(_read_records(source, "Sales_Reseller"))
+            df_sales_raw.columns = [col.strip() for col in df_sales_raw.columns]
+            
+            # Transform ke long format
+            month_cols_sales = [c for c in df_sales_raw.columns if any(m in c.upper() for m in 
+                          ['JAN','FEB','MAR','APR','MAY','JUN','JUL','AUG','SEP','OCT','NOV','DEC'])]
+            
+            if month_cols_sales and 'SKU_ID' in df_sales_raw.columns:
+                id_cols_sales = ['SKU_ID', 'Brand', 'Product_Name', 'SKU_Tier', 'Floor_Price']
+                id_cols_sales = [c for c in id_cols_sales if c in df_sales_raw.columns]
+                
+                df_sales_long = _melt_months(df_sales_raw, "Sales_Reseller",
+                    id_vars=id_cols_sales,
+                    value_vars=month_cols_sales,
+                    var_name='Month_Label',
+                    value_name='Sales_Qty'
+                )
+                df_sales_long['Sales_Qty'] = pd.to_numeric(df_sales_long['Sales_Qty'], errors='coerce').fillna(0)
+                df_sales_long['Month'] = _parse_month_labels(df_sales_long['Month_Label'], "Sales_Reseller")
+                reseller_data['sales'] = df_sales_long
+        except Exception as e:
+            add_diagnostic(diagnostics, 'warning', 'load_reseller_complete_data', f"⚠️ Sales_Reseller sheet not accessible: {str(e)}")
+        
+        # 3. PAST ROFO RESELLER
+        try:
+            df_rofo_raw = pd.DataFrame(_read_records(source, "Past_Rofo_Reseller"))
+            df_rofo_raw.columns = [col.strip() for col in df_rofo_raw.columns]
+            
+            month_cols_rofo = [c for c in df_rofo_raw.columns if any(m in c.upper() for m in 
+                          ['JAN','FEB','MAR','APR','MAY','JUN','JUL','AUG','SEP','OCT','NOV','DEC'])]
+            
+            if month_cols_rofo and 'SKU_ID' in df_rofo_raw.columns:
+                id_cols_rofo = ['SKU_ID', 'Brand', 'Product_Name', 'SKU_Tier', 'Floor_Price']
+                id_cols_rofo = [c for c in id_cols_rofo if c in df_rofo_raw.columns]
+                
+                df_rofo_long = _melt_months(df_rofo_raw, "Past_Rofo_Reseller",
+                    id_vars=id_cols_rofo,
+                    value_vars=month_cols_rofo,
+                    var_name='Month_Label',
+                    value_name='Forecast_Qty'
+                )
+                df_rofo_long['Forecast_Qty'] = pd.to_numeric(df_rofo_long['Forecast_Qty'], errors='coerce').fillna(0)
+                df_rofo_long['Month'] = _parse_month_labels(df_rofo_long['Month_Label'], "Past_Rofo_Reseller")
+                reseller_data['past_rofo'] = df_rofo_long
+        except Exception as e:
+            add_diagnostic(diagnostics, 'warning', 'load_reseller_complete_data', f"⚠️ Past_Rofo_Reseller sheet not accessible: {str(e)}")
+        
+        # 4. PAST PO RESELLER
+        try:
+            df_po_raw = pd.DataFrame(_read_records(source, "Past_PO_Reseller"))
+            df_po_raw.columns = [col.strip() for col in df_po_raw.columns]
+            
+            month_cols_po = [c for c in df_po_raw.columns if any(m in c.upper() for m in 
+                          ['JAN','FEB','MAR','APR','MAY','JUN','JUL','AUG','SEP','OCT','NOV','DEC'])]
+            
+            if month_cols_po and 'SKU_ID' in df_po_raw.columns:
+                id_cols_po = ['SKU_ID', 'Brand', 'Product_Name', 'SKU_Tier', 'Floor_Price']
+                id_cols_po = [c for c in id_cols_po if c in df_po_raw.columns]
+                
+                df_po_long = _melt_months(df_po_raw, "Past_PO_Reseller",
+                    id_vars=id_cols_po,
+                    value_vars=month_cols_po,
+                    var_name='Month_Label',
+                    value_name='PO_Qty'
+                )
+                df_po_long['PO_Qty'] = pd.to_numeric(df_po_long['PO_Qty'], errors='coerce').fillna(0)
+                df_po_long['Month'] = _parse_month_labels(df_po_long['Month_Label'], "Past_PO_Reseller")
+                reseller_data['past_po'] = df_po_long
+        except Exception as e:
+            add_diagnostic(diagnostics, 'warning', 'load_reseller_complete_data', f"⚠️ Past_PO_Reseller sheet not accessible: {str(e)}")
+        
+        reseller_data['dataset_versions'] = compute_dataset_versions(reseller_data)
+        reseller_data['data_version'] = compute_data_version(reseller_data, reseller_data['dataset_versions'])
+        return reseller_data
+        
+    except Exception as e:
+        add_diagnostic(diagnostics, 'error', 'load_reseller_complete_data', f"❌ Error loading reseller data: {str(e)}")
+        return {}
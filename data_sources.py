@@ -0,0 +1,133 @@
+"""
+Data sources - sumber worksheet untuk loader (Google Sheets atau workbook lokal)
+
+Loader hanya butuh dua operasi ala gspread:
+- get_all_records(sheet_name): list of dict (baris header = key)
+- get_all_values(sheet_name): list of list string (baris pertama = header)
+"""
+import os
+
+import pandas as pd
+
+from lazy_imports import lazy_import
+
+DEFAULT_SHEET_ID = "1jcs8L0CysdzxemPz1EYVVfVhsSR-ik46khIw5jhhBgw"
+
+
+class GSheetSource:
+    """Worksheet dari Google Sheets lewat client gspread yang sudah ter-authorize"""
+
+    def __init__(self, client, sheet_id=DEFAULT_SHEET_ID):
+        self.client = client
+        self.sheet_id = sheet_id
+        self.api_calls = 0
+        self._spreadsheet = None
+
+    def _worksheet(self, sheet_name):
+        if self._spreadsheet is None:
+            self.api_calls += 1
+            self._spreadsheet = self.client.open_by_key(self.sheet_id)
+        self.api_calls += 1
+        return self._spreadsheet.worksheet(sheet_name)
+
+    def get_all_records(self, sheet_name):
+        ws = self._worksheet(sheet_name)
+        self.api_calls += 1
+        return ws.get_all_records()
+
+    def get_all_values(self, sheet_name):
+        ws = self._worksheet(sheet_name)
+        self.api_calls += 1
+        return ws.get_all_values()
+
+    @classmethod
+    def from_service_account_file(cls, credentials_path, sheet_id=DEFAULT_SHEET_ID):
+        """Buat source dari file JSON service account (untuk CLI / batch job)"""
+        gspread = lazy_import('gspread')
+        client = gspread.service_account(filename=credentials_path)
+        return cls(client, sheet_id)
+
+
+class WorkbookSource:
+    """
+    Worksheet dari file lokal: workbook .xlsx (satu sheet per worksheet)
+    atau folder berisi <Sheet_Name>.csv
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.api_calls = 0
+        self._frames = {}
+        self._signature = None
+
+    def signature(self):
+        """
+        (nama, ukuran, mtime) file sumber. Untuk folder dipakai setiap file CSV:
+        mtime folder tidak berubah saat file di dalamnya diedit in place.
+        """
+        if os.path.isdir(self.path):
+            with os.scandir(self.path) as entries:
+                files = [entry for entry in entries if entry.name.endswith('.csv') and entry.is_file()]
+                return tuple(sorted((f.name, f.stat().st_size, f.stat().st_mtime_ns) for f in files))
+        stat = os.stat(self.path)
+        return ((os.path.basename(self.path), stat.st_size, stat.st_mtime_ns),)
+
+    def _read(self, sheet_name):
+        # File berubah di disk -> buang sheet yang sudah terbaca
+        signature = self.signature()
+        if signature != self._signature:
+            self._frames = {}
+            self._signature = signature
+
+        if sheet_name not in self._frames:
+            self.api_calls += 1
+            if os.path.isdir(self.path):
+                csv_path = os.path.join(self.path, f"{sheet_name}.csv")
+                if not os.path.exists(csv_path):
+                    raise KeyError(f"Worksheet '{sheet_name}' not found in {self.path}")
+                df = pd.read_csv(csv_path, dtype=str, keep_default_na=False)
+            else:
+                try:
+                    df = pd.read_excel(self.path, sheet_name=sheet_name, dtype=object)
+                except ValueError as e:
+                    raise KeyError(f"Worksheet '{sheet_name}' not found in {self.path}") from e
+            df.columns = [str(c) for c in df.columns]
+            self._frames[sheet_name] = df.fillna('')
+        return self._frames[sheet_name]
+
+    def get_all_records(self, sheet_name):
+        return self._read(sheet_name).to_dict('records')
+
+    def get_all_values(self, sheet_name):
+        df = self._read(sheet_name)
+        return [list(df.columns)] + df.astype(str).values.tolist()
+
+
+class MemorySource:
+    """Worksheet dari dict nama_sheet -> DataFrame (synthetic data / benchmark, tanpa I/O)"""
+
+    def __init__(self, sheets):
+        self.sheets = sheets
+        self.api_calls = 0
+
+    def _frame(self, sheet_name):
+        self.api_calls += 1
+        if sheet_name not in self.sheets:
+            raise KeyError(f"Worksheet '{sheet_name}' not found")
+        return self.sheets[sheet_name]
+
+    def get_all_records(self, sheet_name):
+        return self._frame(sheet_name).to_dict('records')
+
+    def get_all_values(self, sheet_name):
+        df = self._frame(sheet_name)
+        return [list(df.columns)] + df.astype(str).values.tolist()
+
+
+def open_source(path=None, credentials_path=None, sheet_id=DEFAULT_SHEET_ID):
+    """Pilih source: workbook lokal jika `path` diisi, selain itu Google Sheets"""
+    if path:
+        return WorkbookSource(path)
+    if credentials_path:
+        return GSheetSource.from_service_account_file(credentials_path, sheet_id)
+    raise ValueError("Either a workbook path or a service account credentials file is required")
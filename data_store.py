@@ -0,0 +1,72 @@
+"""
+Shared read-only dataset store - satu salinan data per proses untuk semua session
+
+Hasil load disimpan sekali (lewat cache_manager) dan setiap session hanya
+memegang referensi. Proteksi mutasi:
+- Mapping read-only: key tidak bisa ditambah / diganti; dict bersarang
+  (dataset_versions, dasar semua key cache) dibungkus MappingProxyType.
+- List metadata (daftar kolom bulan) disimpan sebagai tuple dan dikembalikan
+  sebagai list baru, jadi tetap bisa dipakai untuk df[cols].
+- Setiap akses DataFrame mengembalikan shallow view dengan Copy-on-Write,
+  jadi penulisan di session (mis. menambah kolom Revenue) hanya mengubah
+  view milik session itu, buffer bersama tidak pernah ikut berubah.
+"""
+from collections.abc import Mapping
+from types import MappingProxyType
+
+import pandas as pd
+
+
+def enable_copy_on_write():
+    """Aktifkan Copy-on-Write pandas (default sejak pandas 3.0)"""
+    if int(pd.__version__.split('.')[0]) < 3:
+        pd.set_option('mode.copy_on_write', True)
+
+
+def _freeze_value(value):
+    """List metadata dibekukan menjadi tuple, dict (mis. dataset_versions) menjadi read-only"""
+    if isinstance(value, list):
+        return tuple(value)
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze_value(item) for key, item in value.items()})
+    return value
+
+
+class FrozenDatasets(Mapping):
+    """Dict dataset read-only yang dibagikan antar session tanpa menyalin data"""
+
+    def __init__(self, data):
+        self._data = {key: _freeze_value(value) for key, value in dict(data).items()}
+
+    def __getitem__(self, key):
+        value = self._data[key]
+        if isinstance(value, pd.DataFrame):
+            return value.copy(deep=False)
+        if isinstance(value, tuple):
+            # Kolom bulan dipakai sebagai df[cols]: tuple akan dibaca sebagai satu key
+            return list(value)
+        return value
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __repr__(self):
+        return f"FrozenDatasets({list(self._data)})"
+
+    def memory_bytes(self):
+        """Total memori DataFrame yang disimpan (satu kali per proses)"""
+        return sum(
+            int(value.memory_usage(deep=True).sum())
+            for value in self._data.values()
+            if isinstance(value, pd.DataFrame)
+        )
+
+
+def freeze_datasets(data):
+    """Bungkus dict hasil load menjadi FrozenDatasets (idempotent)"""
+    if isinstance(data, FrozenDatasets):
+        return data
+    return FrozenDatasets(data)
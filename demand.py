@@ -0,0 +1,167 @@
+"""
+Demand-rate engine - rolling mean (3/6/12 bulan, bebas) dan EWMA untuk semua
+SKU x bulan sekaligus di matriks SKU x bulan
+
+- Rolling mean = jumlah / jumlah bulan yang punya data dalam window. Baris
+  duplikat SKU x bulan dijumlah dulu menjadi total bulanan (rata-rata per
+  bulan, bukan per baris); untuk satu baris per SKU x bulan hasilnya sama
+  dengan mean baris perhitungan 3 bulan lama. Dihitung dari cumsum, jadi
+  biayanya sama untuk window berapa pun.
+- EWMA (adjust=False): s_t = alpha * x_t + (1 - alpha) * s_{t-1}, alpha =
+  2 / (span + 1); bulan tanpa data membawa nilai sebelumnya.
+- Sumbu bulan = bulan unik di data sales (window "3 bulan terakhir" sama
+  dengan 3 bulan sales terakhir).
+
+Cover dan status inventory dihitung untuk setiap bulan: stok saat ini dibagi
+demand rate per bulan, dengan threshold yang sama seperti inventory metrics.
+"""
+import numpy as np
+import pandas as pd
+
+from diagnostics import add_diagnostic
+from range_index import dense_matrix, month_start
+
+DEFAULT_WINDOWS = (3, 6, 12)
+DEFAULT_SPAN = 6
+
+# Cover (bulan) untuk SKU tanpa demand
+NO_DEMAND_COVER = 999
+STATUS_LOW = 'Need Replenishment'
+STATUS_IDEAL = 'Ideal/Healthy'
+STATUS_HIGH = 'High Stock'
+
+
+def sales_matrix(df_sales, value_col='Sales_Qty'):
+    """Return (values, observed, skus, months) dari data sales long"""
+    df = df_sales[['SKU_ID', 'Month', value_col]].assign(_month=month_start(df_sales['Month'])).dropna(subset=['_month'])
+    skus = pd.Index(df['SKU_ID'].unique(), name='SKU_ID').sort_values()
+    months = pd.DatetimeIndex(df['_month'].unique(), name='Month').sort_values()
+    values, observed = dense_matrix(df, value_col, skus, months, (len(skus), len(months)))
+    return values, observed, skus, months
+
+
+def rolling_mean(values, observed, window):
+    """Rolling mean per bulan atas bulan yang punya data; NaN jika window kosong"""
+    n_months = values.shape[1]
+    value_prefix = np.zeros((values.shape[0], n_months + 1))
+    count_prefix = np.zeros((values.shape[0], n_months + 1))
+    np.cumsum(values, axis=1, out=value_prefix[:, 1:])
+    np.cumsum(observed, axis=1, out=count_prefix[:, 1:])
+
+    end = np.arange(1, n_months + 1)
+    start = np.maximum(end - window, 0)
+    total = value_prefix[:, end] - value_prefix[:, start]
+    count = count_prefix[:, end] - count_prefix[:, start]
+    return np.divide(total, count, out=np.full(total.shape, np.nan), where=count > 0)
+
+
+def ewma(values, observed, span=DEFAULT_SPAN):
+    """EWMA per bulan (loop per bulan, vectorized per SKU); NaN sebelum data pertama"""
+    alpha = 2.0 / (span + 1)
+    result = np.full(values.shape, np.nan)
+    level = np.full(values.shape[0], np.nan)
+    has_data = observed.astype(bool)
+    for t in range(values.shape[1]):
+        x = values[:, t]
+        seen = has_data[:, t]
+        level = np.where(seen & np.isnan(level), x, level)
+        level = np.where(seen, alpha * x + (1 - alpha) * level, level)
+        result[:, t] = level
+    return result
+
+
+def cover_status(stock_qty, rate):
+    """Cover bulan + status inventory; stock_qty boleh vektor (broadcast ke semua bulan)"""
+    stock_qty = np.asarray(stock_qty, dtype='float64')
+    rate = np.asarray(rate, dtype='float64')
+    if stock_qty.ndim == 1 and rate.ndim == 2:
+        stock_qty = stock_qty[:, None]
+    valid = np.nan_to_num(rate) > 0
+    cover = np.divide(stock_qty, rate, out=np.full(np.broadcast(stock_qty, rate).shape, float(NO_DEMAND_COVER)), where=valid)
+    status = np.select(
+        [cover < 0.8, (cover >= 0.8) & (cover <= 1.5), cover > 1.5],
+        [STATUS_LOW, STATUS_IDEAL, STATUS_HIGH],
+        default='Unknown'
+    )
+    return cover, status
+
+
+def method_names(windows=DEFAULT_WINDOWS, span=DEFAULT_SPAN):
+    return [f"SMA_{w}" for w in windows] + [f"EWMA_{span}"]
+
+
+def demand_rate_matrices(values, observed, windows=DEFAULT_WINDOWS, span=DEFAULT_SPAN):
+    """Dict nama metode -> matriks rate SKU x bulan"""
+    rates = {f"SMA_{w}": rolling_mean(values, observed, w) for w in windows}
+    rates[f"EWMA_{span}"] = ewma(values, observed, span)
+    return rates
+
+
+def calculate_demand_rates(df_sales, df_stock, df_product, windows=DEFAULT_WINDOWS, span=DEFAULT_SPAN,
+                           diagnostics=None):
+    """
+    Demand rate semua metode untuk setiap SKU x bulan.
+
+    Return dict:
+    - 'rates': long frame SKU_ID, Month, Sales_Qty + satu kolom per metode
+    - 'latest': per SKU rate bulan terakhir + Stock_Qty, Cover_<metode>, Status_<metode>
+    - 'status_history': jumlah SKU per Month x Method x Inventory_Status
+      (stok saat ini vs demand rate di bulan tersebut)
+    - 'methods': daftar nama metode
+    """
+    if df_sales.empty:
+        return {}
+
+    try:
+        values, observed, skus, months = sales_matrix(df_sales)
+        if not len(months):
+            return {}
+
+        methods = method_names(windows, span)
+        rates = demand_rate_matrices(values, observed, windows, span)
+
+        n_skus, n_months = values.shape
+        long_df = pd.DataFrame({
+            'SKU_ID': np.repeat(skus.to_numpy(), n_months),
+            'Month': np.tile(months.to_numpy(), n_skus),
+            'Sales_Qty': np.where(observed, values, np.nan).ravel(),
+        })
+        for method in methods:
+            long_df[method] = rates[method].ravel()
+
+        stock = df_stock.groupby('SKU_ID')['Stock_Qty'].sum() if not df_stock.empty else pd.Series(dtype='float64')
+        stock_qty = stock.reindex(skus).fillna(0).to_numpy(dtype='float64')
+
+        latest = pd.DataFrame({'SKU_ID': skus, 'Stock_Qty': stock_qty})
+        if not df_product.empty:
+            product = df_product.drop_duplicates('SKU_ID').set_index('SKU_ID')
+            for col in ['Product_Name', 'Brand', 'SKU_Tier']:
+                if col in product.columns:
+                    latest[col] = latest['SKU_ID'].map(product[col])
+
+        history = []
+        for method in methods:
+            cover, status = cover_status(stock_qty, rates[method])
+            latest[method] = rates[method][:, -1]
+            latest[f"Cover_{method}"] = cover[:, -1]
+            latest[f"Status_{method}"] = status[:, -1]
+
+            counts = pd.DataFrame({
+                'Month': np.tile(months.to_numpy(), n_skus),
+                'Inventory_Status': status.ravel(),
+            }).value_counts().rename('SKU_Count').reset_index()
+            counts['Method'] = method
+            history.append(counts)
+
+        status_history = pd.concat(history, ignore_index=True).sort_values(['Method', 'Month', 'Inventory_Status'])
+
+        return {
+            'rates': long_df,
+            'latest': latest,
+            'status_history': status_history.reset_index(drop=True),
+            'methods': methods,
+        }
+
+    except Exception as e:
+        add_diagnostic(diagnostics, 'error', 'calculate_demand_rates', f"Demand rate calculation error: {str(e)}")
+        return {}
@@ -0,0 +1,19 @@
+"""
+Structured diagnostics - pengganti st.warning/st.error untuk kode headless
+
+Loader dan fungsi analytics menambahkan pesan ke list `diagnostics`;
+UI (app.py) menampilkannya, CLI menuliskannya ke file.
+"""
+import logging
+
+logger = logging.getLogger('scm_dashboard')
+
+LEVELS = {'info': logging.INFO, 'warning': logging.WARNING, 'error': logging.ERROR}
+
+
+def add_diagnostic(diagnostics, level, source, message):
+    """Catat satu diagnostic; jika tidak ada collector, kirim ke logging"""
+    if diagnostics is None:
+        logger.log(LEVELS.get(level, logging.WARNING), "[%s] %s", source, message)
+        return
+    diagnostics.append({'level': level, 'source': source, 'message': message})
@@ -0,0 +1,134 @@
+"""
+Dependency-aware executor - jalankan langkah analytics yang saling independen
+secara paralel di thread pool, lalu join sebelum hasil dipakai
+
+Langkah berbentuk (nama hasil, fungsi, nama input) seperti ANALYTICS_STEPS di
+pipeline.py. Input yang merupakan nama langkah lain menjadi dependensi; sisanya
+diambil dari dict dataset (DataFrame kosong jika tidak ada).
+
+Thread (bukan process) dipakai karena input berupa DataFrame besar yang mahal
+di-pickle; merge/groupby pandas dan operasi numpy melepas GIL di bagian
+beratnya. Setiap langkah menerima shallow copy DataFrame (Copy-on-Write), jadi
+langkah yang menambah kolom ke input-nya tidak mengganggu langkah lain.
+"""
+import contextvars
+import inspect
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import pandas as pd
+
+from perf import count_rows, perf_stage
+
+DEFAULT_WORKERS = int(os.environ.get('SCM_ANALYTICS_WORKERS', min(4, os.cpu_count() or 1)))
+
+
+def _accepts_diagnostics(func):
+    try:
+        return 'diagnostics' in inspect.signature(func).parameters
+    except (TypeError, ValueError):
+        return False
+
+
+def run_step(func, args, diagnostics):
+    """Panggil satu fungsi analytics, teruskan diagnostics jika didukung"""
+    if _accepts_diagnostics(func):
+        return func(*args, diagnostics=diagnostics)
+    return func(*args)
+
+
+def _isolate(value):
+    if isinstance(value, pd.DataFrame):
+        return value.copy(deep=False)
+    return value
+
+
+def step_dependencies(steps):
+    """Dict nama langkah -> set nama langkah yang menjadi inputnya; ValueError jika ada siklus"""
+    names = {name for name, _, _ in steps}
+    deps = {name: {key for key in inputs if key in names and key != name} for name, _, inputs in steps}
+
+    # Validasi siklus (Kahn)
+    remaining = {name: set(d) for name, d in deps.items()}
+    while remaining:
+        ready = [name for name, d in remaining.items() if not d]
+        if not ready:
+            raise ValueError(f"Cyclic analytics dependencies: {sorted(remaining)}")
+        for name in ready:
+            del remaining[name]
+        for d in remaining.values():
+            d.difference_update(ready)
+
+    return deps
+
+
+def _timed(execute, name):
+    start = time.perf_counter()
+    result = execute(name)
+    return result, time.perf_counter() - start
+
+
+def _topological_order(steps, deps):
+    """Urutan eksekusi berurutan: urutan `steps`, dependensi selalu lebih dulu"""
+    order, done = [], set()
+    while len(order) < len(steps):
+        for name, _, _ in steps:
+            if name not in done and deps[name] <= done:
+                order.append(name)
+                done.add(name)
+    return order
+
+
+def run_graph(steps, datasets, diagnostics=None, max_workers=None, timings=None):
+    """
+    Jalankan semua langkah sesuai dependensi; return dict nama -> hasil.
+
+    Diagnostics tiap langkah dikumpulkan terpisah lalu digabung sesuai urutan
+    `steps`, jadi urutan pesan sama seperti eksekusi berurutan.
+    max_workers=1 menjalankan langkah berurutan di thread pemanggil.
+    """
+    diagnostics = [] if diagnostics is None else diagnostics
+    max_workers = DEFAULT_WORKERS if max_workers is None else max_workers
+    deps = step_dependencies(steps)
+    by_name = {name: (func, inputs) for name, func, inputs in steps}
+    namespace = dict(datasets)
+    results = {}
+    step_diagnostics = {name: [] for name in by_name}
+
+    def execute(name):
+        func, inputs = by_name[name]
+        args = [_isolate(namespace.get(key, pd.DataFrame())) for key in inputs]
+        with perf_stage(f"analytics.{name}", rows_in=count_rows(args)) as stage:
+            result = run_step(func, args, step_diagnostics[name])
+            stage['rows_out'] = count_rows(result)
+        return result
+
+    def record(name, result, seconds=None):
+        results[name] = result
+        namespace[name] = result
+        if timings is not None and seconds is not None:
+            timings.append({'stage': f"analytics.{name}", 'seconds': seconds})
+
+    if max_workers <= 1:
+        for name in _topological_order(steps, deps):
+            record(name, *_timed(execute, name))
+    else:
+        pending = dict(deps)
+        running = {}
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='analytics') as pool:
+            while pending or running:
+                for name in [n for n, d in pending.items() if all(dep in results for dep in d)]:
+                    del pending[name]
+                    # Context (mis. recorder perf aktif) ikut ke worker thread
+                    ctx = contextvars.copy_context()
+                    running[pool.submit(ctx.run, _timed, execute, name)] = name
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    record(name, *future.result())
+
+    for name, _, _ in steps:
+        diagnostics.extend(step_diagnostics[name])
+
+    return {name: results[name] for name, _, _ in steps}
@@ -0,0 +1,188 @@
+"""
+Expiry risk & FEFO aging - analisa level batch Stock_Onhand (Expiry_Date,
+Stock_Category) yang hilang saat stok diagregasi ke SKU
+
+- Expiry_Date di-parse sekali per nilai unik (factorize + to_datetime).
+- Days to expiry dihitung terhadap `as_of` (default: awal bulan setelah bulan
+  sales terakhir, sama dengan titik awal proyeksi stok) lalu di-bucket.
+- FEFO: batch diurutkan per SKU menurut expiry terdekat, demand harian =
+  rata-rata sales 3 bulan / 30.4. Dengan Q_b = qty kumulatif batch 1..b dan
+  e_b = hari ke expiry batch b, stok yang sudah expired sampai batch b:
+      L_b = max(0, max_{j<=b} (Q_j - rate x max(e_j, 0)))
+  Qty at risk batch b = L_b - L_{b-1}. Semua batch dihitung sekaligus lewat
+  sort + cumsum + cummax per SKU, tanpa loop per SKU.
+- Batch non-sellable (Stock_Category 'Damaged') dan batch tanpa tanggal
+  expiry tidak ikut antrean FEFO.
+"""
+import numpy as np
+import pandas as pd
+
+from demand import rolling_mean, sales_matrix
+from diagnostics import add_diagnostic
+
+DAYS_PER_MONTH = 365 / 12
+DEFAULT_RATE_WINDOW = 3
+NON_SELLABLE_CATEGORIES = ('Damaged',)
+
+# Batas atas (hari, inklusif) tiap bucket; di atas batas terakhir = '> 365 days'
+EXPIRY_BUCKETS = [
+    (0, 'Expired'),
+    (30, '0-30 days'),
+    (90, '31-90 days'),
+    (180, '91-180 days'),
+    (365, '181-365 days'),
+]
+BUCKET_OVER = '> 365 days'
+BUCKET_UNKNOWN = 'No Expiry Date'
+BUCKET_ORDER = [label for _, label in EXPIRY_BUCKETS] + [BUCKET_OVER, BUCKET_UNKNOWN]
+
+
+def parse_expiry(series):
+    """Parse tanggal expiry sekali per nilai unik (NaT jika tidak valid)"""
+    codes, uniques = pd.factorize(series)
+    parsed = pd.to_datetime(pd.Series(uniques, dtype='object').astype(str).str.strip(), format='mixed', errors='coerce')
+    values = parsed.to_numpy(dtype='datetime64[ns]')
+    result = np.full(len(codes), np.datetime64('NaT'), dtype='datetime64[ns]')
+    found = codes >= 0
+    result[found] = values[codes[found]]
+    return pd.Series(result, index=series.index, name=series.name)
+
+
+def expiry_bucket(days):
+    """Label bucket days-to-expiry (NaN = tanpa tanggal)"""
+    days = np.asarray(days, dtype='float64')
+    edges = np.array([edge for edge, _ in EXPIRY_BUCKETS], dtype='float64')
+    labels = np.array([label for _, label in EXPIRY_BUCKETS] + [BUCKET_OVER], dtype=object)
+    buckets = labels[np.searchsorted(edges, np.nan_to_num(days, nan=0.0), side='left')]
+    buckets[np.isnan(days)] = BUCKET_UNKNOWN
+    return buckets
+
+
+def fefo_at_risk(sku_codes, qty, days, daily_rate):
+    """
+    Qty at risk per batch (array). Input sudah terurut per SKU lalu expiry
+    terdekat; days = inf untuk batch di luar antrean FEFO.
+    """
+    n = len(qty)
+    if n == 0:
+        return np.zeros(0)
+    # Awal setiap grup SKU di array terurut
+    start = np.r_[True, sku_codes[1:] != sku_codes[:-1]]
+    group = np.cumsum(start) - 1
+    total = np.cumsum(qty)
+    offset = (total - qty)[start]
+    cumulative = total - offset[group]
+
+    # Batch yang sudah expired (days <= 0) tidak punya sisa waktu jual
+    usable = np.isfinite(days)
+    exposure = np.where(usable, cumulative - daily_rate * np.where(usable, np.maximum(days, 0), 0), -np.inf)
+    lost = np.maximum(pd.Series(exposure).groupby(group).cummax().to_numpy(), 0)
+    previous = np.r_[0.0, lost[:-1]]
+    previous[start] = 0.0
+    return lost - previous
+
+
+def _reference_date(df_sales):
+    if not df_sales.empty:
+        last = pd.to_datetime(df_sales['Month'], errors='coerce').max()
+        if pd.notna(last):
+            return (last + pd.offsets.MonthBegin(1)).normalize()
+    return pd.Timestamp.today().normalize()
+
+
+def calculate_expiry_risk(df_stock, df_sales, df_product, as_of=None, rate_window=DEFAULT_RATE_WINDOW,
+                          diagnostics=None):
+    """
+    Expiry risk per batch dan ringkasannya.
+
+    Return dict:
+    - 'batches': per batch (Days_To_Expiry, Expiry_Bucket, Daily_Sales_Rate, At_Risk_Qty, At_Risk_Value)
+    - 'sku': per SKU (stok, qty/value at risk, expiry terdekat)
+    - 'buckets': total stok & value per bucket
+    - 'as_of': tanggal referensi
+    """
+    if df_stock.empty or 'Expiry_Date' not in df_stock.columns:
+        return {}
+
+    try:
+        as_of = _reference_date(df_sales) if as_of is None else pd.Timestamp(as_of)
+        batches = df_stock.reset_index(drop=True).copy()
+        batches['Expiry_Date'] = parse_expiry(batches['Expiry_Date'])
+        batches['Stock_Qty'] = pd.to_numeric(batches['Stock_Qty'], errors='coerce').fillna(0)
+        days = ((batches['Expiry_Date'] - as_of) / pd.Timedelta(days=1)).to_numpy(dtype='float64')
+        batches['Days_To_Expiry'] = days
+        batches['Expiry_Bucket'] = expiry_bucket(days)
+
+        raw = df_stock['Expiry_Date'].reset_index(drop=True)
+        given = raw.notna() & raw.astype(str).str.strip().ne('')
+        unparsed = int((given & batches['Expiry_Date'].isna()).sum())
+        if unparsed:
+            add_diagnostic(diagnostics, 'warning', 'calculate_expiry_risk',
+                           f"⚠️ {unparsed} stock batches have an unreadable Expiry_Date - treated as no expiry")
+
+        # Harga: kolom stok (merge di loader) atau Product_Master
+        price = batches['Net_Order_Price'] if 'Net_Order_Price' in batches.columns else None
+        if price is None and not df_product.empty and 'Net_Order_Price' in df_product.columns:
+            price = batches['SKU_ID'].map(df_product.drop_duplicates('SKU_ID').set_index('SKU_ID')['Net_Order_Price'])
+        batches['Net_Order_Price'] = (pd.to_numeric(price, errors='coerce').fillna(0)
+                                      if price is not None else 0.0)
+
+        # Demand harian dari rolling mean bulanan (sama dengan inventory metrics)
+        daily_rate = pd.Series(dtype='float64')
+        if not df_sales.empty:
+            values, observed, skus, _ = sales_matrix(df_sales)
+            monthly = np.nan_to_num(rolling_mean(values, observed, rate_window)[:, -1])
+            daily_rate = pd.Series(monthly / DAYS_PER_MONTH, index=skus)
+        batches['Daily_Sales_Rate'] = batches['SKU_ID'].map(daily_rate).fillna(0).to_numpy(dtype='float64')
+
+        sellable = np.ones(len(batches), dtype=bool)
+        if 'Stock_Category' in batches.columns:
+            sellable = ~batches['Stock_Category'].isin(NON_SELLABLE_CATEGORIES).to_numpy()
+        in_queue = sellable & ~np.isnan(days)
+
+        # FEFO: urutkan per SKU, batch di luar antrean di akhir (days = inf)
+        fefo_days = np.where(in_queue, days, np.inf)
+        sku_codes, _ = pd.factorize(batches['SKU_ID'])
+        order = np.lexsort((fefo_days, sku_codes))
+        qty = batches['Stock_Qty'].to_numpy(dtype='float64')
+        at_risk = np.zeros(len(batches))
+        at_risk[order] = fefo_at_risk(sku_codes[order], np.where(in_queue, qty, 0.0)[order],
+                                      fefo_days[order], batches['Daily_Sales_Rate'].to_numpy()[order])
+        batches['At_Risk_Qty'] = at_risk
+        batches['At_Risk_Value'] = at_risk * batches['Net_Order_Price']
+        batches['Stock_Value'] = qty * batches['Net_Order_Price']
+        batches['Sellable'] = sellable
+        batches = batches.iloc[order].reset_index(drop=True)
+
+        sku = batches.groupby('SKU_ID', sort=False).agg(
+            Stock_Qty=('Stock_Qty', 'sum'),
+            Stock_Value=('Stock_Value', 'sum'),
+            At_Risk_Qty=('At_Risk_Qty', 'sum'),
+            At_Risk_Value=('At_Risk_Value', 'sum'),
+            Daily_Sales_Rate=('Daily_Sales_Rate', 'first'),
+            Nearest_Expiry=('Expiry_Date', 'min'),
+            Batches=('Stock_Qty', 'size'),
+        ).reset_index()
+        sku['Nearest_Days_To_Expiry'] = (sku['Nearest_Expiry'] - as_of) / pd.Timedelta(days=1)
+        sku['At_Risk_Pct'] = np.divide(sku['At_Risk_Qty'], sku['Stock_Qty'],
+                                       out=np.zeros(len(sku)), where=sku['Stock_Qty'] > 0) * 100
+        if not df_product.empty:
+            info = df_product.drop_duplicates('SKU_ID').set_index('SKU_ID')
+            for col in ['SKU_Tier', 'Brand', 'Product_Name']:
+                if col in info.columns:
+                    sku.insert(1, col, sku['SKU_ID'].map(info[col]))
+        sku = sku.sort_values('At_Risk_Value', ascending=False).reset_index(drop=True)
+
+        buckets = batches.groupby('Expiry_Bucket').agg(
+            Stock_Qty=('Stock_Qty', 'sum'),
+            Stock_Value=('Stock_Value', 'sum'),
+            At_Risk_Qty=('At_Risk_Qty', 'sum'),
+            At_Risk_Value=('At_Risk_Value', 'sum'),
+            Batches=('Stock_Qty', 'size'),
+        ).reindex(BUCKET_ORDER, fill_value=0).rename_axis('Expiry_Bucket').reset_index()
+
+        return {'batches': batches, 'sku': sku, 'buckets': buckets, 'as_of': as_of}
+
+    except Exception as e:
+        add_diagnostic(diagnostics, 'error', 'calculate_expiry_risk', f"Expiry risk calculation error: {str(e)}")
+        return {}
@@ -0,0 +1,223 @@
+"""
+Global filter index - bitmap (boolean mask) per nilai dimensi untuk slicing cepat
+
+Index dibangun sekali per hasil load. Setiap kombinasi filter cukup digabung
+dengan operasi AND/OR vectorized, tanpa `isin` ulang pada frame besar.
+"""
+import numpy as np
+import pandas as pd
+
+from versioning import derive_version
+
+# Dimensi level SKU: diambil dari Product_Master, berlaku ke semua dataset lewat SKU_ID
+# (ABC_Class / XYZ_Class ditempel ke Product_Master oleh segmentation.attach_segments)
+SKU_DIMENSIONS = ['Brand', 'SKU_Tier', 'Status', 'ABC_Class', 'XYZ_Class']
+
+# Dimensi level baris: hanya ada di dataset yang punya kolomnya sendiri
+ROW_DIMENSIONS = ['Stock_Category']
+
+# Kolom tanggal yang dipakai untuk filter rentang bulan (urutan prioritas)
+MONTH_COLUMNS = ['Month', 'Month_Date']
+
+# Label bulan di sheet (mis. 'Apr-25'); parser umum membacanya sebagai tanggal 25 April
+MONTH_LABEL_FORMATS = ('%b-%y', '%b-%Y')
+
+BLANK_LABEL = '(Blank)'
+
+
+def _clean_labels(series):
+    """Normalisasi nilai dimensi menjadi label string"""
+    labels = series.astype(str).str.strip()
+    return labels.where(series.notna() & (labels != ''), BLANK_LABEL)
+
+
+def _value_masks(labels):
+    """Satu boolean mask per nilai unik dalam kolom"""
+    codes, uniques = pd.factorize(labels, sort=True)
+    return {value: codes == i for i, value in enumerate(uniques)}
+
+
+def _parse_months(series):
+    """Tanggal dari kolom datetime atau label bulan ('Apr-25', 'Apr-2025'), format lain via parser umum"""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    text = series.astype(str).str.strip()
+    dates = pd.Series(pd.NaT, index=series.index, dtype='datetime64[ns]')
+    for fmt in MONTH_LABEL_FORMATS + ('mixed',):
+        missing = dates.isna() & series.notna()
+        if not missing.any():
+            break
+        dates[missing] = pd.to_datetime(text[missing], format=fmt, errors='coerce')
+    return dates
+
+
+def _month_ordinals(series):
+    """Konversi tanggal ke ordinal bulan (year*12 + month), -1 untuk tanggal kosong"""
+    dates = _parse_months(series)
+    ordinals = (dates.dt.year * 12 + dates.dt.month - 1).to_numpy(dtype='float64')
+    return np.where(np.isnan(ordinals), -1, ordinals).astype(np.int64)
+
+
+def month_ordinal(value):
+    """Ordinal bulan dari satu tanggal"""
+    ts = pd.Timestamp(value)
+    return ts.year * 12 + ts.month - 1
+
+
+def build_filter_index(datasets, df_product):
+    """
+    Bangun index filter untuk semua DataFrame dalam `datasets`.
+
+    - SKU-level: mask per nilai Brand/SKU_Tier/Status di atas daftar SKU unik,
+      plus posisi SKU (sku_codes) untuk setiap baris dataset.
+    - Row-level: mask per nilai Stock_Category untuk dataset yang memilikinya.
+    - Month: ordinal bulan per baris untuk filter rentang.
+    """
+    index = {'sku_masks': {}, 'datasets': {}, 'n_skus': 0}
+
+    if df_product is not None and not df_product.empty and 'SKU_ID' in df_product.columns:
+        product_unique = df_product.drop_duplicates(subset=['SKU_ID'])
+        sku_index = pd.Index(product_unique['SKU_ID'].astype(str).str.strip())
+        index['n_skus'] = len(sku_index)
+
+        for dim in SKU_DIMENSIONS:
+            if dim in product_unique.columns:
+                index['sku_masks'][dim] = _value_masks(_clean_labels(product_unique[dim]))
+    else:
+        sku_index = pd.Index([])
+
+    for name, df in datasets.items():
+        if not isinstance(df, pd.DataFrame) or df.empty:
+            continue
+
+        entry = {'n_rows': len(df), 'sku_codes': None, 'row_masks': {}, 'month_ordinals': None}
+
+        if 'SKU_ID' in df.columns and len(sku_index) > 0:
+            entry['sku_codes'] = sku_index.get_indexer(df['SKU_ID'].astype(str).str.strip())
+
+        for dim in ROW_DIMENSIONS:
+            if dim in df.columns:
+                entry['row_masks'][dim] = _value_masks(_clean_labels(df[dim]))
+
+        # Utamakan kolom yang sudah bertipe datetime (mis. Month_Date vs label 'Apr-25')
+        month_cols = [col for col in MONTH_COLUMNS if col in df.columns]
+        month_cols.sort(key=lambda col: not pd.api.types.is_datetime64_any_dtype(df[col]))
+        if month_cols:
+            entry['month_ordinals'] = _month_ordinals(df[month_cols[0]])
+
+        index['datasets'][name] = entry
+
+    return index
+
+
+def get_dimension_options(index):
+    """Daftar nilai yang tersedia per dimensi (untuk widget filter)"""
+    options = {dim: sorted(masks.keys()) for dim, masks in index['sku_masks'].items()}
+
+    for entry in index['datasets'].values():
+        for dim, masks in entry['row_masks'].items():
+            options.setdefault(dim, [])
+            options[dim] = sorted(set(options[dim]) | set(masks.keys()))
+
+    return options
+
+
+def make_filter_key(selections, month_range=None):
+    """
+    Normalisasi pilihan filter menjadi key hashable.
+
+    selections: dict dimensi -> list nilai terpilih (kosong = tidak difilter)
+    month_range: (start, end) tanggal inklusif, atau None
+    """
+    key = []
+    for dim in sorted(selections):
+        values = selections[dim]
+        if values:
+            key.append((dim, tuple(sorted(str(v) for v in values))))
+
+    if month_range is not None:
+        start, end = month_range
+        key.append(('month_range', (month_ordinal(start), month_ordinal(end))))
+
+    return tuple(key)
+
+
+def _combine_or(masks, values, size):
+    """OR dari mask nilai-nilai terpilih dalam satu dimensi"""
+    selected = [masks[v] for v in values if v in masks]
+    if not selected:
+        return np.zeros(size, dtype=bool)
+    return np.logical_or.reduce(selected)
+
+
+def compute_row_masks(index, filter_key):
+    """
+    Hitung mask baris final per dataset: OR di dalam dimensi, AND antar dimensi.
+    Dataset yang tidak terfilter mendapat None.
+    """
+    filters = dict(filter_key)
+    month_range = filters.pop('month_range', None)
+
+    sku_filters = {dim: values for dim, values in filters.items() if dim in index['sku_masks']}
+    row_filters = {dim: values for dim, values in filters.items() if dim not in index['sku_masks']}
+
+    sku_selected = None
+    if sku_filters:
+        sku_selected = np.ones(index['n_skus'], dtype=bool)
+        for dim, values in sku_filters.items():
+            sku_selected &= _combine_or(index['sku_masks'][dim], values, index['n_skus'])
+
+    row_masks = {}
+    for name, entry in index['datasets'].items():
+        mask = None
+
+        if sku_selected is not None and entry['sku_codes'] is not None:
+            codes = entry['sku_codes']
+            # SKU yang tidak ada di Product_Master (code -1) ikut tersaring
+            mask = np.where(codes >= 0, sku_selected[codes], False)
+
+        for dim, values in row_filters.items():
+            if dim in entry['row_masks']:
+                dim_mask = _combine_or(entry['row_masks'][dim], values, entry['n_rows'])
+                mask = dim_mask if mask is None else mask & dim_mask
+
+        if month_range is not None and entry['month_ordinals'] is not None:
+            start, end = month_range
+            ordinals = entry['month_ordinals']
+            month_mask = (ordinals >= start) & (ordinals <= end)
+            mask = month_mask if mask is None else mask & month_mask
+
+        row_masks[name] = mask
+
+    return row_masks
+
+
+def apply_filters(datasets, index, filter_key):
+    """
+    Terapkan filter ke semua dataset; nilai non-DataFrame dikembalikan apa adanya.
+    Jika ada 'dataset_versions', versi dataset yang benar-benar tersaring ikut
+    diturunkan dari filter_key; dataset lain tetap memakai versi aslinya.
+    """
+    if not filter_key:
+        return dict(datasets)
+
+    row_masks = compute_row_masks(index, filter_key)
+    filtered = {}
+    changed = set()
+
+    for name, value in datasets.items():
+        mask = row_masks.get(name)
+        if mask is None or not isinstance(value, pd.DataFrame) or len(mask) != len(value) or mask.all():
+            filtered[name] = value
+        else:
+            filtered[name] = value[mask]
+            changed.add(name)
+
+    versions = datasets.get('dataset_versions')
+    if versions:
+        filtered['dataset_versions'] = {
+            name: derive_version(version, filter_key) if name in changed else version
+            for name, version in versions.items()
+        }
+
+    return filtered
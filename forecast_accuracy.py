@@ -0,0 +1,167 @@
+"""
+Forecast accuracy engine - MAPE, WAPE, sMAPE, MAE, bias dan tracking signal
+untuk semua SKU x bulan dalam satu pass vectorized
+
+Konvensi sama dengan calculate_monthly_performance: actual = PO_Qty,
+forecast = Forecast_Qty (Rofo), error = PO - Forecast.
+
+- APE  = |error| / forecast (hanya baris forecast > 0)
+- sAPE = 2|error| / (|PO| + |forecast|)
+- Rollup (SKU, Brand, SKU_Tier, total, per bulan) dihitung dari jumlahan,
+  jadi WAPE / bias % / MAPE volume-weighted otomatis berbobot volume.
+- Tracking signal dihitung atas deret error bulanan grup: kumulatif error /
+  MAD (rata-rata |error| bulanan) sampai bulan tersebut; rollup tanpa Month
+  memakai nilai bulan terakhir (seluruh periode). 'sku_month' membawa
+  tracking signal kumulatif per SKU sampai bulan baris tersebut.
+"""
+import numpy as np
+import pandas as pd
+
+from diagnostics import add_diagnostic
+
+METRIC_COLUMNS = [
+    'Rows', 'Forecast_Qty', 'PO_Qty', 'MAPE', 'MAPE_Weighted', 'WAPE', 'sMAPE', 'MAE',
+    'Bias', 'Bias_Pct', 'Tracking_Signal', 'Accuracy'
+]
+
+
+def build_error_frame(df_forecast, df_po, df_product):
+    """Satu join Forecast x PO per SKU x bulan + kolom error per baris"""
+    df_f = df_forecast.dropna(subset=['Month']).groupby(['SKU_ID', 'Month'], as_index=False)['Forecast_Qty'].sum()
+    df_p = df_po.dropna(subset=['Month']).groupby(['SKU_ID', 'Month'], as_index=False)['PO_Qty'].sum()
+    df = pd.merge(df_f, df_p, on=['SKU_ID', 'Month'], how='inner')
+
+    if not df_product.empty:
+        attrs = [col for col in ['Brand', 'SKU_Tier'] if col in df_product.columns]
+        product = df_product.drop_duplicates('SKU_ID').set_index('SKU_ID')
+        for col in attrs:
+            df[col] = df['SKU_ID'].map(product[col]).fillna('Unknown')
+    for col in ['Brand', 'SKU_Tier']:
+        if col not in df.columns:
+            df[col] = 'Unknown'
+
+    return add_error_columns(df)
+
+
+def add_error_columns(df):
+    """Tambah Error, Abs_Error, APE dan sAPE dari kolom Forecast_Qty dan PO_Qty (actual)"""
+    forecast = df['Forecast_Qty'].to_numpy(dtype='float64')
+    actual = df['PO_Qty'].to_numpy(dtype='float64')
+    error = actual - forecast
+    abs_error = np.abs(error)
+    denom = np.abs(actual) + np.abs(forecast)
+
+    df['Error'] = error
+    df['Abs_Error'] = abs_error
+    df['APE'] = np.divide(abs_error, forecast, out=np.full(len(df), np.nan), where=forecast > 0)
+    df['sAPE'] = np.divide(2 * abs_error, denom, out=np.zeros(len(df)), where=denom > 0)
+    return df
+
+
+def _tracking_signal(error_df, by):
+    """Tracking signal per grup dari deret error bulanan (kumulatif sampai tiap bulan)"""
+    keys = [col for col in by if col != 'Month']
+    monthly = error_df.groupby(keys + ['Month'], sort=True)['Error'].sum().reset_index()
+    abs_error = monthly['Error'].abs()
+
+    if keys:
+        grouper = [monthly[col] for col in keys]
+        cum_error = monthly['Error'].groupby(grouper, sort=False).cumsum()
+        cum_abs = abs_error.groupby(grouper, sort=False).cumsum()
+        months = monthly.groupby(keys, sort=False).cumcount() + 1
+    else:
+        cum_error = monthly['Error'].cumsum()
+        cum_abs = abs_error.cumsum()
+        months = pd.Series(np.arange(1, len(monthly) + 1), index=monthly.index)
+
+    mad = (cum_abs / months).to_numpy(dtype='float64')
+    monthly['Tracking_Signal'] = np.divide(cum_error.to_numpy(dtype='float64'), mad, out=np.zeros(len(monthly)), where=mad > 0)
+
+    if 'Month' in by:
+        return monthly[keys + ['Month', 'Tracking_Signal']]
+    if keys:
+        return monthly.groupby(keys, sort=False).tail(1)[keys + ['Tracking_Signal']]
+    return monthly[['Tracking_Signal']].tail(1).reset_index(drop=True)
+
+
+def aggregate_metrics(error_df, by):
+    """Rollup metrik per kolom `by` (list, boleh kosong = total) dari jumlahan"""
+    work = error_df.assign(
+        _ape_valid=error_df['APE'].notna().astype('int64'),
+        _ape=error_df['APE'].fillna(0.0),
+        _weighted_ape_forecast=error_df['Abs_Error'].where(error_df['Forecast_Qty'] > 0, 0.0),
+        _forecast_valid=error_df['Forecast_Qty'].where(error_df['Forecast_Qty'] > 0, 0.0),
+    )
+    sums = ['Forecast_Qty', 'PO_Qty', 'Error', 'Abs_Error', 'sAPE',
+            '_ape_valid', '_ape', '_weighted_ape_forecast', '_forecast_valid']
+
+    if by:
+        agg = work.groupby(by, sort=True)[sums].sum()
+        agg['Rows'] = work.groupby(by, sort=True).size()
+        agg = agg.reset_index()
+    else:
+        agg = work[sums].sum().to_frame().T
+        agg['Rows'] = len(work)
+
+    rows = agg['Rows'].to_numpy(dtype='float64')
+    forecast = agg['Forecast_Qty'].to_numpy(dtype='float64')
+    actual = agg['PO_Qty'].to_numpy(dtype='float64')
+    error = agg['Error'].to_numpy(dtype='float64')
+    abs_error = agg['Abs_Error'].to_numpy(dtype='float64')
+    ape_valid = agg['_ape_valid'].to_numpy(dtype='float64')
+    forecast_valid = agg['_forecast_valid'].to_numpy(dtype='float64')
+
+    def ratio(num, den, scale=100.0):
+        return np.divide(num * scale, den, out=np.full(len(agg), np.nan), where=den > 0)
+
+    mae = np.divide(abs_error, rows, out=np.zeros(len(agg)), where=rows > 0)
+    agg['MAPE'] = ratio(agg['_ape'].to_numpy(dtype='float64'), ape_valid)
+    # MAPE berbobot volume forecast = sum(APE x F) / sum(F) = sum(|E|) / sum(F)
+    agg['MAPE_Weighted'] = ratio(agg['_weighted_ape_forecast'].to_numpy(dtype='float64'), forecast_valid)
+    agg['WAPE'] = ratio(abs_error, np.abs(actual))
+    agg['sMAPE'] = ratio(agg['sAPE'].to_numpy(dtype='float64'), rows)
+    agg['MAE'] = mae
+    agg['Bias'] = np.divide(error, rows, out=np.zeros(len(agg)), where=rows > 0)
+    agg['Bias_Pct'] = ratio(error, forecast)
+    agg['Accuracy'] = np.clip(100 - agg['WAPE'], 0, None)
+
+    tracking = _tracking_signal(error_df, list(by))
+    if by:
+        agg = agg.merge(tracking, on=list(by), how='left')
+    else:
+        agg['Tracking_Signal'] = tracking['Tracking_Signal'].to_numpy()
+
+    return agg[list(by) + METRIC_COLUMNS]
+
+
+def calculate_accuracy_metrics(df_forecast, df_po, df_product, diagnostics=None):
+    """
+    Metric suite lengkap: per baris SKU x bulan ('sku_month', termasuk
+    Tracking_Signal kumulatif per SKU) dan rollup per SKU, Brand, SKU_Tier
+    dan total - masing-masing juga per bulan.
+    """
+    if df_forecast.empty or df_po.empty:
+        return {}
+
+    try:
+        error_df = build_error_frame(df_forecast, df_po, df_product)
+        if error_df.empty:
+            return {}
+
+        sku_month = error_df.merge(_tracking_signal(error_df, ['SKU_ID', 'Month']),
+                                   on=['SKU_ID', 'Month'], how='left')
+
+        return {
+            'sku_month': sku_month,
+            'sku': aggregate_metrics(error_df, ['SKU_ID', 'Brand', 'SKU_Tier']),
+            'brand': aggregate_metrics(error_df, ['Brand']),
+            'brand_month': aggregate_metrics(error_df, ['Brand', 'Month']),
+            'tier': aggregate_metrics(error_df, ['SKU_Tier']),
+            'tier_month': aggregate_metrics(error_df, ['SKU_Tier', 'Month']),
+            'total': aggregate_metrics(error_df, []),
+            'total_month': aggregate_metrics(error_df, ['Month']),
+        }
+
+    except Exception as e:
+        add_diagnostic(diagnostics, 'error', 'calculate_accuracy_metrics', f"Accuracy metrics calculation error: {str(e)}")
+        return {}
@@ -0,0 +1,28 @@
+"""
+Lazy import untuk modul berat (plotting, Google auth) + pencatatan waktu import per modul
+
+State modul ini bertahan antar rerun Streamlit (modul di-cache di sys.modules),
+jadi durasi import pertama tetap tercatat untuk ditampilkan di debug mode.
+"""
+import importlib
+import sys
+import time
+
+IMPORT_TIMINGS = {}
+
+
+def lazy_import(module_name):
+    """Import modul saat pertama kali dibutuhkan dan catat durasinya"""
+    module = sys.modules.get(module_name)
+    if module is not None:
+        return module
+
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    IMPORT_TIMINGS[module_name] = time.perf_counter() - start
+    return module
+
+
+def get_import_timings():
+    """Daftar (modul, detik) diurutkan dari import paling lambat"""
+    return sorted(IMPORT_TIMINGS.items(), key=lambda item: item[1], reverse=True)
@@ -0,0 +1,158 @@
+"""
+Hot-path instrumentation - wall time, baris in/out dan delta peak memori per stage
+
+Recorder aktif per rerun (per session) lewat ContextVar. Jika tidak ada recorder
+aktif, perf_stage / instrument hanya melakukan satu lookup ContextVar, jadi
+overhead saat dimatikan bisa diabaikan.
+
+    recorder = start_recording(track_memory=True)
+    with perf_stage('load.sales.melt', rows_in=len(df)) as stage:
+        ...
+        stage['rows_out'] = len(result)
+    stop_recording()
+    recorder.records  # list of dict
+"""
+import contextvars
+import functools
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import pandas as pd
+
+_current_recorder = contextvars.ContextVar('perf_recorder', default=None)
+
+
+def count_rows(value):
+    """Jumlah baris DataFrame; untuk dict/list/tuple dijumlahkan dari DataFrame di dalamnya"""
+    if isinstance(value, pd.DataFrame):
+        return len(value)
+    if isinstance(value, dict):
+        value = list(value.values())
+    if isinstance(value, (list, tuple)):
+        frames = [v for v in value if isinstance(v, pd.DataFrame)]
+        if frames:
+            return sum(len(v) for v in frames)
+    return None
+
+
+class PerfRecorder:
+    """Kumpulan record stage untuk satu rerun / satu run pipeline"""
+
+    def __init__(self, track_memory=False):
+        self.track_memory = track_memory
+        self.records = []
+        self.origin = time.perf_counter()
+        self._local = threading.local()
+        self._started_tracemalloc = False
+        if track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+    def _stack(self):
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        stack = self._stack()
+        handle = {'rows_out': None}
+        frame = {'max_peak': 0}
+
+        if self.track_memory and tracemalloc.is_tracing():
+            mem_start, outer_peak = tracemalloc.get_traced_memory()
+            frame['outer_peak'] = outer_peak
+            tracemalloc.reset_peak()
+        else:
+            mem_start = None
+
+        stack.append(frame)
+        start = time.perf_counter()
+        try:
+            yield handle
+        finally:
+            seconds = time.perf_counter() - start
+            stack.pop()
+
+            mem_peak_mb = None
+            if mem_start is not None and tracemalloc.is_tracing():
+                _, peak = tracemalloc.get_traced_memory()
+                peak = max(peak, frame['max_peak'])
+                mem_peak_mb = (peak - mem_start) / 1024 ** 2
+                # Peak global di-reset saat masuk stage ini; teruskan ke stage induk
+                if stack:
+                    stack[-1]['max_peak'] = max(stack[-1]['max_peak'], frame['outer_peak'], peak)
+
+            self.records.append({
+                'stage': name,
+                'start': start - self.origin,
+                'seconds': seconds,
+                'rows_in': rows_in,
+                'rows_out': handle['rows_out'],
+                'mem_peak_mb': mem_peak_mb,
+                'depth': len(stack),
+                'thread': threading.current_thread().name,
+            })
+
+    def close(self):
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def to_frame(self):
+        """Record sebagai DataFrame, urut berdasarkan waktu mulai (untuk waterfall)"""
+        columns = ['stage', 'start', 'seconds', 'rows_in', 'rows_out', 'mem_peak_mb', 'depth', 'thread']
+        if not self.records:
+            return pd.DataFrame(columns=columns)
+        return pd.DataFrame(self.records, columns=columns).sort_values('start').reset_index(drop=True)
+
+
+def start_recording(track_memory=False):
+    """Aktifkan recorder baru untuk context saat ini"""
+    recorder = PerfRecorder(track_memory=track_memory)
+    _current_recorder.set(recorder)
+    return recorder
+
+
+def stop_recording():
+    """Nonaktifkan recorder aktif dan kembalikan recorder tersebut"""
+    recorder = _current_recorder.get()
+    _current_recorder.set(None)
+    if recorder is not None:
+        recorder.close()
+    return recorder
+
+
+def get_recorder():
+    return _current_recorder.get()
+
+
+@contextmanager
+def perf_stage(name, rows_in=None):
+    """Catat satu stage jika recorder aktif; no-op jika tidak"""
+    recorder = _current_recorder.get()
+    if recorder is None:
+        yield {'rows_out': None}
+        return
+    with recorder.stage(name, rows_in=rows_in) as handle:
+        yield handle
+
+
+def instrument(name=None):
+    """Decorator: catat waktu, baris in (DataFrame args) dan baris out per panggilan"""
+    def decorator(func):
+        stage_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            recorder = _current_recorder.get()
+            if recorder is None:
+                return func(*args, **kwargs)
+            with recorder.stage(stage_name, rows_in=count_rows(list(args))) as handle:
+                result = func(*args, **kwargs)
+                handle['rows_out'] = count_rows(result)
+            return result
+        return wrapper
+    return decorator
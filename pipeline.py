@@ -0,0 +1,222 @@
+"""
+Headless pipeline: load -> transform -> analytics, tanpa Streamlit
+
+Dipakai untuk precompute nightly, profiling dan batch job:
+
+    python pipeline.py --workbook data.xlsx --out results/
+    python pipeline.py --credentials service_account.json --out results/
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+import pandas as pd
+
+import analytics
+import anomalies
+import data_loader
+import demand
+import expiry
+import forecast_accuracy
+import projection
+import range_index
+import replenishment
+import segmentation
+import seasonality
+import slow_movers
+import stat_forecast
+from data_sources import DEFAULT_SHEET_ID, open_source
+from filters import apply_filters, build_filter_index
+from executor import run_graph, run_step
+from perf import perf_stage, start_recording, stop_recording
+from telemetry import DEFAULT_TELEMETRY_PATH, run_load_with_telemetry
+
+# Urutan analytics sama dengan dashboard: (nama hasil, fungsi, nama input)
+# Input diambil dari dataset hasil load atau hasil analytics sebelumnya.
+ANALYTICS_STEPS = [
+    ('monthly_performance', analytics.calculate_monthly_performance, ['forecast', 'po', 'product']),
+    ('last_3_months_performance', analytics.get_last_3_months_performance, ['monthly_performance']),
+    ('inventory_metrics', analytics.calculate_inventory_metrics_with_3month_avg, ['stock', 'sales', 'product']),
+    ('demand_rates', demand.calculate_demand_rates, ['sales', 'stock', 'product']),
+    ('replenishment', replenishment.calculate_replenishment, ['sales', 'stock', 'po', 'product_active']),
+    ('stock_projection', projection.calculate_stock_projection, ['inventory_metrics', 'forecast', 'po', 'sales']),
+    ('sales_vs_forecast', analytics.calculate_sales_vs_forecast_po, ['sales', 'forecast', 'po', 'product']),
+    ('financial', analytics.calculate_financial_metrics_all, ['sales', 'product']),
+    ('inventory_financial', analytics.calculate_inventory_financial, ['stock', 'product']),
+    ('expiry_risk', expiry.calculate_expiry_risk, ['stock', 'sales', 'product']),
+    ('slow_movers', slow_movers.calculate_slow_movers, ['sales', 'inventory_financial', 'product']),
+    ('seasonal_pattern', analytics.calculate_seasonality, ['financial']),
+    ('seasonal_indices', seasonality.calculate_seasonal_indices, ['sales', 'product']),
+    ('anomalies', anomalies.calculate_anomalies, ['sales', 'forecast', 'po', 'product']),
+    ('forecast_bias', analytics.calculate_forecast_bias, ['forecast', 'po']),
+    ('bias_tracking', analytics.calculate_bias_tracking, ['forecast', 'po', 'product']),
+    ('accuracy_metrics', forecast_accuracy.calculate_accuracy_metrics, ['forecast', 'po', 'product']),
+    ('stat_forecast', stat_forecast.calculate_stat_forecast, ['sales', 'forecast', 'product']),
+    ('prefix_index', range_index.build_prefix_index, ['sales', 'forecast', 'po', 'product']),
+    ('profitability_segments', analytics.identify_profitability_segments, ['financial']),
+    ('brand_performance', analytics.calculate_brand_performance, ['forecast', 'po', 'product']),
+]
+
+
+def run_analytics(datasets, diagnostics=None, timings=None, steps=ANALYTICS_STEPS, max_workers=None):
+    """Jalankan semua langkah analytics; langkah yang independen berjalan paralel (executor.py)"""
+    return run_graph(steps, datasets, diagnostics, max_workers=max_workers, timings=timings)
+
+
+def _load(loader_name, loader, source, diagnostics, telemetry_path):
+    if telemetry_path:
+        return run_load_with_telemetry(loader_name, loader, source, diagnostics, telemetry_path)
+    return loader(source, diagnostics)
+
+
+def run_pipeline(source, filter_key=None, telemetry_path=None, max_workers=None):
+    """
+    Jalankan seluruh pipeline dari sebuah data source.
+
+    Return dict: data (hasil load), reseller_data, results (analytics),
+    timings (list stage/detik) dan diagnostics (list dict).
+    telemetry_path: jika diisi, setiap load ditambahkan ke riwayat telemetry.
+    max_workers: jumlah thread analytics (1 = berurutan, None = default executor).
+    """
+    diagnostics = []
+    timings = []
+
+    start = time.perf_counter()
+    with perf_stage('load.main'):
+        data = _load('load_and_process_data', data_loader.load_and_process_data, source, diagnostics, telemetry_path)
+    timings.append({'stage': 'load.main', 'seconds': time.perf_counter() - start})
+
+    start = time.perf_counter()
+    with perf_stage('load.reseller'):
+        reseller_data = _load('load_reseller_complete_data', data_loader.load_reseller_complete_data,
+                              source, diagnostics, telemetry_path)
+    timings.append({'stage': 'load.reseller', 'seconds': time.perf_counter() - start})
+
+    # Segmentasi ABC/XYZ dari data belum terfilter (juga dimensi filter)
+    start = time.perf_counter()
+    with perf_stage('transform.segments'):
+        segments = segmentation.calculate_abc_xyz(data.get('sales', pd.DataFrame()),
+                                                  data.get('product', pd.DataFrame()), diagnostics=diagnostics)
+    timings.append({'stage': 'transform.segments', 'seconds': time.perf_counter() - start})
+
+    if filter_key:
+        start = time.perf_counter()
+        with perf_stage('transform.filters'):
+            product = segmentation.attach_segments(data.get('product', pd.DataFrame()), segments)
+            index = build_filter_index(data, product)
+            data = apply_filters(data, index, filter_key)
+        timings.append({'stage': 'transform.filters', 'seconds': time.perf_counter() - start})
+
+    results = run_analytics(data, diagnostics, timings, max_workers=max_workers)
+    results['abc_xyz'] = segments
+
+    return {
+        'data': data,
+        'reseller_data': reseller_data,
+        'results': results,
+        'timings': timings,
+        'diagnostics': diagnostics,
+    }
+
+
+def _safe_name(key):
+    if isinstance(key, (datetime, pd.Timestamp)):
+        return key.strftime('%Y-%m')
+    return str(key).replace('/', '_').replace(' ', '_')
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, pd.Timestamp)):
+        return value.isoformat()
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+def write_results(results, out_dir):
+    """
+    Tulis hasil ke disk: DataFrame -> CSV, dict bersarang -> sub-folder,
+    nilai skalar per dict -> <nama>.json
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    written = []
+
+    for key, value in results.items():
+        name = _safe_name(key)
+        if isinstance(value, pd.DataFrame):
+            path = os.path.join(out_dir, f"{name}.csv")
+            value.to_csv(path, index=False)
+            written.append(path)
+        elif isinstance(value, dict):
+            frames = {k: v for k, v in value.items() if isinstance(v, (pd.DataFrame, dict))}
+            scalars = {_safe_name(k): v for k, v in value.items() if k not in frames}
+            if frames:
+                written.extend(write_results(frames, os.path.join(out_dir, name)))
+            if scalars:
+                path = os.path.join(out_dir, f"{name}.json")
+                with open(path, 'w') as f:
+                    json.dump(scalars, f, indent=2, default=_json_default)
+                written.append(path)
+
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the SCM dashboard pipeline headless")
+    parser.add_argument('--workbook', help="Local .xlsx workbook or folder of <Sheet>.csv files")
+    parser.add_argument('--credentials', help="Google service account JSON (reads the live spreadsheet)")
+    parser.add_argument('--sheet-id', default=DEFAULT_SHEET_ID, help="Spreadsheet ID for --credentials")
+    parser.add_argument('--out', default='pipeline_output', help="Output directory")
+    parser.add_argument('--profile', action='store_true',
+                        help="Record per-stage timing, rows and peak memory to <out>/profile.csv")
+    parser.add_argument('--telemetry', nargs='?', const=DEFAULT_TELEMETRY_PATH, default=None,
+                        help=f"Append load telemetry to a JSON lines history (default {DEFAULT_TELEMETRY_PATH})")
+    parser.add_argument('--workers', type=int, default=None, help="Analytics threads (1 = sequential)")
+    args = parser.parse_args(argv)
+
+    try:
+        source = open_source(args.workbook, args.credentials, args.sheet_id)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.profile:
+        start_recording(track_memory=True)
+    run = run_pipeline(source, telemetry_path=args.telemetry, max_workers=args.workers)
+    recorder = stop_recording()
+
+    written = write_results(run['data'], os.path.join(args.out, 'data'))
+    written += write_results(run['reseller_data'], os.path.join(args.out, 'reseller_data'))
+    written += write_results(run['results'], os.path.join(args.out, 'results'))
+
+    with open(os.path.join(args.out, 'run.json'), 'w') as f:
+        json.dump({
+            'finished_at': datetime.now().isoformat(),
+            'timings': run['timings'],
+            'diagnostics': run['diagnostics'],
+            'files_written': len(written),
+        }, f, indent=2, default=_json_default)
+
+    print(f"{'Stage':<45}{'Seconds':>10}")
+    for item in run['timings']:
+        print(f"{item['stage']:<45}{item['seconds']:>10.3f}")
+    print(f"{'TOTAL':<45}{sum(t['seconds'] for t in run['timings']):>10.3f}")
+
+    if recorder is not None:
+        profile = recorder.to_frame()
+        profile.to_csv(os.path.join(args.out, 'profile.csv'), index=False)
+        print(f"\n{'Profile stage':<60}{'Seconds':>10}{'Peak MB':>10}")
+        for row in profile.itertuples():
+            print(f"{'  ' * row.depth + row.stage:<60}{row.seconds:>10.3f}{row.mem_peak_mb:>10.1f}")
+
+    for item in run['diagnostics']:
+        print(f"[{item['level'].upper()}] {item['source']}: {item['message']}", file=sys.stderr)
+
+    print(f"Wrote {len(written)} files to {args.out}")
+    return 1 if any(d['level'] == 'error' for d in run['diagnostics']) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""
+Projected stock timeline - stok akhir per SKU per bulan ke depan
+(stok saat ini - forecast + PO) dengan operasi kumulatif di matriks SKU x bulan
+
+- Horizon: bulan forecast setelah bulan sales terakhir (stok = snapshot saat ini).
+- Net flow per bulan = PO - forecast; posisi tanpa batas bawah = stok + cumsum.
+- Stok proyeksi (lost sales, tidak bisa negatif) tanpa loop per bulan:
+  stok_t = posisi_t - min(0, min_{s<=t} posisi_s)
+  Shortage kumulatif = bagian yang terpotong.
+- Weeks of cover = stok akhir / forecast mingguan bulan berikutnya
+  (bulan terakhir memakai forecast bulan itu sendiri).
+- First stockout = bulan pertama stok akhir <= 0 padahal ada forecast.
+"""
+import numpy as np
+import pandas as pd
+
+from diagnostics import add_diagnostic
+from range_index import dense_matrix, month_start
+
+WEEKS_PER_MONTH = 52 / 12
+NO_DEMAND_WEEKS = 999
+
+
+def _horizon_months(df_forecast, df_sales, start_month=None):
+    months = pd.DatetimeIndex(month_start(df_forecast['Month']).dropna().unique()).sort_values()
+    if start_month is None and not df_sales.empty:
+        last_actual = month_start(df_sales['Month']).max()
+        if pd.notna(last_actual):
+            return months[months > last_actual]
+    if start_month is not None:
+        return months[months >= pd.Timestamp(start_month)]
+    return months
+
+
+def project_stock(stock_qty, forecast, po):
+    """
+    Inti proyeksi (array): stock_qty (n,), forecast & po (n, m).
+    Return dict array: position, projected, shortage, weeks_cover, stockout_idx (-1 = aman).
+    """
+    position = stock_qty[:, None] + np.cumsum(po - forecast, axis=1)
+    running_min = np.minimum.accumulate(position, axis=1)
+    shortage = -np.minimum(running_min, 0)
+    projected = position + shortage
+
+    next_demand = np.concatenate([forecast[:, 1:], forecast[:, -1:]], axis=1) / WEEKS_PER_MONTH
+    weeks_cover = np.divide(projected, next_demand, out=np.full(projected.shape, float(NO_DEMAND_WEEKS)),
+                            where=next_demand > 0)
+
+    stocked_out = (projected <= 0) & (forecast > 0)
+    stockout_idx = np.where(stocked_out.any(axis=1), stocked_out.argmax(axis=1), -1)
+    return {
+        'position': position, 'projected': projected, 'shortage': shortage,
+        'weeks_cover': weeks_cover, 'stockout_idx': stockout_idx,
+    }
+
+
+def calculate_stock_projection(inventory_metrics, df_forecast, df_po, df_sales, start_month=None, diagnostics=None):
+    """
+    Proyeksi stok semua SKU sepanjang horizon forecast.
+
+    Stok awal = stok teragregasi per SKU dari inventory_metrics['inventory_df'].
+    Return dict: 'timeline' (long SKU x bulan), 'summary' (per SKU),
+    'monthly' (total per bulan).
+    """
+    if not inventory_metrics or 'inventory_df' not in inventory_metrics or df_forecast.empty:
+        return {}
+
+    try:
+        horizon = _horizon_months(df_forecast, df_sales, start_month)
+        if not len(horizon):
+            add_diagnostic(diagnostics, 'info', 'calculate_stock_projection',
+                           "No forecast months after the last sales month - stock projection skipped")
+            return {}
+
+        inventory = inventory_metrics['inventory_df'].drop_duplicates('SKU_ID')
+        skus = pd.Index(inventory['SKU_ID'], name='SKU_ID')
+        shape = (len(skus), len(horizon))
+
+        forecast_long = df_forecast[['SKU_ID', 'Forecast_Qty']].assign(_month=month_start(df_forecast['Month']))
+        forecast, _ = dense_matrix(forecast_long, 'Forecast_Qty', skus, horizon, shape)
+        po = np.zeros(shape)
+        if not df_po.empty:
+            po_long = df_po[['SKU_ID', 'PO_Qty']].assign(_month=month_start(df_po['Month']))
+            po, _ = dense_matrix(po_long, 'PO_Qty', skus, horizon, shape)
+
+        stock_qty = inventory['Stock_Qty'].fillna(0).to_numpy(dtype='float64')
+        result = project_stock(stock_qty, forecast, po)
+
+        n_skus, n_months = shape
+        timeline = pd.DataFrame({
+            'SKU_ID': np.repeat(skus.to_numpy(), n_months),
+            'Month': np.tile(horizon.to_numpy(), n_skus),
+            'Forecast_Qty': forecast.ravel(),
+            'PO_Qty': po.ravel(),
+            'Projected_Stock': result['projected'].ravel(),
+            'Shortage_Qty': result['shortage'].ravel(),
+            'Weeks_Of_Cover': result['weeks_cover'].ravel(),
+        })
+
+        stockout_idx = result['stockout_idx']
+        has_stockout = stockout_idx >= 0
+        summary = inventory[[col for col in ['SKU_ID', 'Product_Name', 'Brand', 'SKU_Tier', 'Stock_Qty']
+                             if col in inventory.columns]].reset_index(drop=True)
+        summary['Horizon_Forecast'] = forecast.sum(axis=1)
+        summary['Horizon_PO'] = po.sum(axis=1)
+        summary['Ending_Stock'] = result['projected'][:, -1]
+        summary['Total_Shortage'] = result['shortage'][:, -1]
+        summary['Min_Weeks_Of_Cover'] = result['weeks_cover'].min(axis=1)
+        summary['First_Stockout_Month'] = pd.Series(horizon[np.maximum(stockout_idx, 0)]).where(has_stockout)
+        summary['Months_To_Stockout'] = np.where(has_stockout, stockout_idx + 1, np.nan)
+
+        monthly = pd.DataFrame({
+            'Month': horizon,
+            'Forecast_Qty': forecast.sum(axis=0),
+            'PO_Qty': po.sum(axis=0),
+            'Projected_Stock': result['projected'].sum(axis=0),
+            'Shortage_Qty': result['shortage'].sum(axis=0),
+            'SKUs_Stocked_Out': ((result['projected'] <= 0) & (forecast > 0)).sum(axis=0),
+        })
+
+        return {'timeline': timeline, 'summary': summary, 'monthly': monthly}
+
+    except Exception as e:
+        add_diagnostic(diagnostics, 'error', 'calculate_stock_projection', f"Stock projection error: {str(e)}")
+        return {}
@@ -0,0 +1,205 @@
+"""
+Prefix-sum index - total / rata-rata rentang bulan dalam O(1)
+
+Per load, Sales / Forecast / PO / Revenue / Gross_Margin dipadatkan menjadi
+array SKU x bulan lalu di-cumsum sepanjang sumbu bulan (dengan kolom nol di
+depan). Total bulan i..j untuk satu baris = P[:, j + 1] - P[:, i].
+
+Prefix juga disimpan untuk level Brand, SKU_Tier dan total, jadi KPI rentang
+per SKU, brand, tier maupun keseluruhan tidak perlu filter + groupby ulang.
+Selain nilai, jumlah bulan yang punya data (observasi) ikut di-prefix supaya
+rata-rata bulanan sama dengan groupby(...).mean() di data long.
+"""
+import numpy as np
+import pandas as pd
+
+from diagnostics import add_diagnostic
+from filters import month_ordinal
+
+METRICS = ['Sales_Qty', 'Forecast_Qty', 'PO_Qty', 'Revenue', 'Gross_Margin']
+LEVELS = ['Brand', 'SKU_Tier']
+
+
+def month_start(series):
+    dates = pd.to_datetime(series, errors='coerce').to_numpy(dtype='datetime64[ns]')
+    return pd.Series(dates.astype('datetime64[M]').astype('datetime64[ns]'), index=series.index)
+
+
+def dense_matrix(df, value_col, sku_pos, month_pos, shape):
+    """
+    Long frame (SKU_ID, _month = month_start) -> (nilai, observasi) array SKU x bulan.
+    Baris duplikat SKU x bulan dijumlah jadi satu sel (total bulanan) dan sel
+    dihitung sekali sebagai observasi; nilai NaN dilewati.
+    """
+    values = np.zeros(shape)
+    observed = np.zeros(shape, dtype='int32')
+    if df.empty:
+        return values, observed
+    rows = sku_pos.get_indexer(df['SKU_ID'])
+    cols = month_pos.get_indexer(df['_month'])
+    amounts = df[value_col].to_numpy(dtype='float64')
+    valid = (rows >= 0) & (cols >= 0) & ~np.isnan(amounts)
+    rows, cols = rows[valid], cols[valid]
+    np.add.at(values, (rows, cols), amounts[valid])
+    observed[rows, cols] = 1
+    return values, observed
+
+
+def _prefix(matrix):
+    """Cumsum sepanjang bulan dengan kolom nol di depan"""
+    out = np.zeros((matrix.shape[0], matrix.shape[1] + 1), dtype=matrix.dtype if matrix.dtype.kind == 'f' else 'int64')
+    np.cumsum(matrix, axis=1, out=out[:, 1:])
+    return out
+
+
+class PrefixSumIndex:
+    """Prefix sum SKU x bulan untuk METRICS + rollup per LEVELS dan total"""
+
+    def __init__(self, skus, months, attributes, values, observed):
+        self.skus = pd.Index(skus, name='SKU_ID')
+        self.months = pd.DatetimeIndex(months, name='Month')
+        self.attributes = attributes
+        self._month_ordinals = (self.months.year * 12 + self.months.month - 1).to_numpy()
+        self._prefix = {}
+        self._observed = {}
+        self._groups = {}
+
+        for metric in METRICS:
+            self._prefix[metric] = _prefix(values[metric])
+            self._observed[metric] = _prefix(observed[metric])
+
+        # Rollup: jumlahkan prefix SKU per grup (sekali per load)
+        for level in LEVELS:
+            codes, labels = pd.factorize(attributes[level], sort=True)
+            group_prefix = {}
+            for metric in METRICS:
+                summed = np.zeros((len(labels), len(self.months) + 1))
+                np.add.at(summed, codes, self._prefix[metric])
+                group_prefix[metric] = summed
+            self._groups[level] = (pd.Index(labels, name=level), group_prefix)
+
+        self._total = {metric: self._prefix[metric].sum(axis=0) for metric in METRICS}
+        self._total_observed = {
+            metric: np.concatenate([[0], np.cumsum(observed[metric].any(axis=0))]) for metric in METRICS
+        }
+
+    def __repr__(self):
+        return f"PrefixSumIndex({len(self.skus)} SKUs x {len(self.months)} months)"
+
+    @property
+    def empty(self):
+        return len(self.skus) == 0 or len(self.months) == 0
+
+    def memory_bytes(self):
+        arrays = list(self._prefix.values()) + list(self._observed.values())
+        arrays += [a for _, prefix in self._groups.values() for a in prefix.values()]
+        return int(sum(a.nbytes for a in arrays) + self.attributes.memory_usage(deep=True).sum())
+
+    def month_bounds(self, start=None, end=None):
+        """Rentang tanggal inklusif -> (i, j) posisi prefix; bulan di luar data dipotong"""
+        ordinals = self._month_ordinals
+        i = 0 if start is None else int(np.searchsorted(ordinals, month_ordinal(start), side='left'))
+        j = len(ordinals) if end is None else int(np.searchsorted(ordinals, month_ordinal(end), side='right'))
+        return i, max(i, j)
+
+    def sku_totals(self, metric, start=None, end=None):
+        """Total rentang per SKU"""
+        i, j = self.month_bounds(start, end)
+        prefix = self._prefix[metric]
+        return pd.Series(prefix[:, j] - prefix[:, i], index=self.skus, name=metric)
+
+    def sku_means(self, metric, start=None, end=None):
+        """Rata-rata per bulan yang punya data (setara groupby('SKU_ID').mean())"""
+        i, j = self.month_bounds(start, end)
+        prefix, observed = self._prefix[metric], self._observed[metric]
+        counts = observed[:, j] - observed[:, i]
+        total = prefix[:, j] - prefix[:, i]
+        return pd.Series(np.divide(total, counts, out=np.full(len(total), np.nan), where=counts > 0),
+                         index=self.skus, name=metric)
+
+    def group_totals(self, metric, level, start=None, end=None):
+        """Total rentang per Brand / SKU_Tier"""
+        i, j = self.month_bounds(start, end)
+        labels, prefix = self._groups[level]
+        return pd.Series(prefix[metric][:, j] - prefix[metric][:, i], index=labels, name=metric)
+
+    def total(self, metric, start=None, end=None, skus=None):
+        """Total rentang keseluruhan; `skus` membatasi ke subset SKU (O(jumlah SKU))"""
+        i, j = self.month_bounds(start, end)
+        if skus is None:
+            prefix = self._total[metric]
+            return float(prefix[j] - prefix[i])
+        rows = self.skus.get_indexer(pd.Index(skus).unique())
+        prefix = self._prefix[metric][rows[rows >= 0]]
+        return float((prefix[:, j] - prefix[:, i]).sum())
+
+    def monthly_average(self, metric, start=None, end=None):
+        """Total rentang / jumlah bulan yang punya data"""
+        i, j = self.month_bounds(start, end)
+        months = self._total_observed[metric][j] - self._total_observed[metric][i]
+        return self.total(metric, start, end) / months if months > 0 else 0.0
+
+    def range_summary(self, start=None, end=None, by=None):
+        """Tabel KPI rentang: total tiap metrik + margin %, per `by` (None / 'SKU_ID' / level)"""
+        if by is None:
+            summary = pd.DataFrame({metric: [self.total(metric, start, end)] for metric in METRICS})
+        elif by == 'SKU_ID':
+            summary = pd.concat([self.sku_totals(metric, start, end) for metric in METRICS], axis=1)
+            summary = self.attributes.join(summary).reset_index()
+        else:
+            summary = pd.concat([self.group_totals(metric, by, start, end) for metric in METRICS], axis=1).reset_index()
+
+        revenue = summary['Revenue'].to_numpy(dtype='float64')
+        summary['Margin_Percentage'] = np.divide(summary['Gross_Margin'].to_numpy(dtype='float64') * 100, revenue,
+                                                 out=np.zeros(len(summary)), where=revenue > 0)
+        summary['Forecast_vs_PO_Pct'] = np.divide(summary['PO_Qty'].to_numpy(dtype='float64') * 100,
+                                                  summary['Forecast_Qty'].to_numpy(dtype='float64'),
+                                                  out=np.zeros(len(summary)),
+                                                  where=summary['Forecast_Qty'].to_numpy(dtype='float64') > 0)
+        return summary
+
+
+def build_prefix_index(df_sales, df_forecast, df_po, df_product, diagnostics=None):
+    """
+    Bangun PrefixSumIndex dari data long. Revenue / Gross_Margin dihitung
+    seperti calculate_financial_metrics_all (harga kosong = 0).
+    Return None jika tidak ada data bulanan.
+    """
+    sources = {
+        'Sales_Qty': df_sales, 'Forecast_Qty': df_forecast, 'PO_Qty': df_po,
+    }
+    frames = {
+        metric: df[['SKU_ID', 'Month', metric]].assign(_month=month_start(df['Month'])).dropna(subset=['_month'])
+        for metric, df in sources.items()
+        if not df.empty and {'SKU_ID', 'Month', metric} <= set(df.columns)
+    }
+    if not frames:
+        return None
+
+    try:
+        skus = pd.Index(pd.concat([df['SKU_ID'] for df in frames.values()]).unique(), name='SKU_ID').sort_values()
+        months = pd.DatetimeIndex(pd.concat([df['_month'] for df in frames.values()]).unique(), name='Month').sort_values()
+        shape = (len(skus), len(months))
+
+        product = df_product.drop_duplicates('SKU_ID').set_index('SKU_ID') if not df_product.empty else pd.DataFrame()
+        attributes = pd.DataFrame(index=skus)
+        for level in LEVELS:
+            attributes[level] = skus.map(product[level]).fillna('Unknown') if level in product.columns else 'Unknown'
+
+        values, observed = {}, {}
+        for metric in ['Sales_Qty', 'Forecast_Qty', 'PO_Qty']:
+            values[metric], observed[metric] = dense_matrix(frames.get(metric, pd.DataFrame()), metric, skus, months, shape)
+
+        prices = {}
+        for col in ['Floor_Price', 'Net_Order_Price']:
+            price = skus.map(product[col]) if col in product.columns else pd.Series(np.nan, index=skus)
+            prices[col] = pd.to_numeric(pd.Series(price), errors='coerce').fillna(0).to_numpy(dtype='float64')[:, None]
+        values['Revenue'] = values['Sales_Qty'] * prices['Floor_Price']
+        values['Gross_Margin'] = values['Revenue'] - values['Sales_Qty'] * prices['Net_Order_Price']
+        observed['Revenue'] = observed['Gross_Margin'] = observed['Sales_Qty']
+
+        return PrefixSumIndex(skus, months, attributes, values, observed)
+
+    except Exception as e:
+        add_diagnostic(diagnostics, 'error', 'build_prefix_index', f"Prefix index build error: {str(e)}")
+        return None
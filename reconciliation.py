@@ -0,0 +1,205 @@
+"""
+Rekonsiliasi forecast hierarkis SKU -> Brand -> SKU_Tier -> Total
+
+Forecast per SKU (Forecast_2026_Ecomm / Forecast_2026_Reseller) dan target
+level atas (mis. total brand dari brand manager) dibuat koheren di semua
+level sekaligus lewat matriks agregasi A (node atas x SKU, indikator 0/1);
+summing matrix S = [A; I]. Brand dan SKU_Tier adalah grouping paralel di
+atas SKU (tidak harus nested).
+
+Metode (b = forecast SKU, a = forecast level atas, semua bulan sekaligus):
+- bottom_up : SKU apa adanya, level atas = A b (override level atas diabaikan)
+- top_down  : SKU = b x target grup / jumlah b grup, untuk satu level
+              (default Brand); target level itu dipenuhi persis
+- ols       : b~ = (S'WS)^-1 S'W y dengan W = I
+- wls_struct: idem, W = diag(1 / jumlah SKU di node) (MinT structural scaling)
+
+S'WS = D + A' Wa A diinvers lewat Woodbury, jadi yang di-solve hanya matriks
+m x m (m = jumlah node atas), bukan n x n:
+    (D + A' Wa A)^-1 = D^-1 - D^-1 A' (Wa^-1 + A D^-1 A')^-1 A D^-1
+"""
+import numpy as np
+import pandas as pd
+
+from diagnostics import add_diagnostic
+
+LEVELS = ['Total', 'SKU_Tier', 'Brand']
+METHODS = ['bottom_up', 'top_down', 'ols', 'wls_struct']
+UNKNOWN = 'Unknown'
+
+
+class Hierarchy:
+    """Matriks agregasi A (node atas x SKU) + label node per level"""
+
+    def __init__(self, skus, attributes):
+        self.skus = pd.Index(skus, name='SKU_ID')
+        blocks, labels = [], []
+        for level in LEVELS:
+            if level == 'Total':
+                codes, names = np.zeros(len(self.skus), dtype='int64'), pd.Index(['Total'])
+            else:
+                codes, names = pd.factorize(attributes[level], sort=True)
+            block = np.zeros((len(names), len(self.skus)))
+            block[codes, np.arange(len(self.skus))] = 1.0
+            blocks.append(block)
+            labels.append(pd.DataFrame({'Level': level, 'Node': np.asarray(names, dtype=object)}))
+        self.aggregation = np.vstack(blocks)
+        self.nodes = pd.concat(labels, ignore_index=True)
+        self.sizes = self.aggregation.sum(axis=1)
+
+    def memory_bytes(self):
+        return int(self.aggregation.nbytes + self.sizes.nbytes)
+
+    def aggregate(self, bottom):
+        """Forecast level atas (m x T) dari forecast SKU (n x T)"""
+        return self.aggregation @ bottom
+
+    def node_rows(self, level):
+        return np.flatnonzero(self.nodes['Level'].to_numpy() == level)
+
+
+def build_hierarchy(skus, df_product, df_wide=None):
+    """Hierarchy dari atribut Product_Master (fallback: kolom sheet forecast, lalu 'Unknown')"""
+    attributes = pd.DataFrame(index=pd.Index(skus, name='SKU_ID'))
+    product = df_product.drop_duplicates('SKU_ID').set_index('SKU_ID') if not df_product.empty else pd.DataFrame()
+    sheet = df_wide.drop_duplicates('SKU_ID').set_index('SKU_ID') if df_wide is not None else pd.DataFrame()
+    for level in LEVELS[1:]:
+        values = pd.Series(np.nan, index=attributes.index, dtype='object')
+        for source in (product, sheet):
+            if level in source.columns:
+                values = values.fillna(attributes.index.to_series().map(source[level]))
+        attributes[level] = values.fillna(UNKNOWN).astype(str).to_numpy()
+    return Hierarchy(attributes.index, attributes), attributes
+
+
+def build_reconciliation_base(df_wide, month_cols, df_product, diagnostics=None):
+    """
+    Sheet forecast wide -> base untuk reconcile_forecast: dict hierarchy,
+    attributes, months dan base (forecast SKU n x T, SKU duplikat dijumlah).
+    """
+    if df_wide.empty or not month_cols or 'SKU_ID' not in df_wide.columns:
+        return {}
+
+    try:
+        months = list(month_cols)
+        wide = df_wide.assign(SKU_ID=df_wide['SKU_ID'].astype(str).str.strip())
+        base = wide.groupby('SKU_ID', sort=True)[months].sum()
+        hierarchy, attributes = build_hierarchy(base.index, df_product, wide)
+        return {'hierarchy': hierarchy, 'attributes': attributes, 'months': months,
+                'base': base.to_numpy(dtype='float64')}
+
+    except Exception as e:
+        add_diagnostic(diagnostics, 'error', 'build_reconciliation_base', f"Reconciliation setup error: {str(e)}")
+        return {}
+
+
+def apply_overrides(hierarchy, upper, overrides):
+    """
+    Ganti forecast node atas dengan override {(level, node): total horizon
+    atau array per bulan}. Total horizon disebar mengikuti profil bulanan node
+    (rata jika node tidak punya forecast).
+    """
+    upper = upper.copy()
+    positions = {key: i for i, key in enumerate(zip(hierarchy.nodes['Level'], hierarchy.nodes['Node']))}
+    for key, value in (overrides or {}).items():
+        row = positions.get(key)
+        if row is None:
+            continue
+        value = np.asarray(value, dtype='float64')
+        if value.ndim == 0:
+            total = upper[row].sum()
+            profile = upper[row] / total if total > 0 else np.full(upper.shape[1], 1.0 / upper.shape[1])
+            value = float(value) * profile
+        upper[row] = value
+    return upper
+
+
+def top_down(hierarchy, bottom, upper, level='Brand'):
+    """Sebar target node `level` ke SKU secara proporsional terhadap forecast SKU"""
+    rows = hierarchy.node_rows(level)
+    block = hierarchy.aggregation[rows]
+    codes = block.argmax(axis=0)
+    group_sum = (block @ bottom)[codes]
+    target = upper[rows][codes]
+    share = np.divide(bottom, group_sum, out=np.zeros(bottom.shape), where=group_sum > 0)
+    # Grup tanpa forecast SKU: target dibagi rata ke SKU di grup itu
+    even = (1.0 / hierarchy.sizes[rows])[codes][:, None]
+    share = np.where(group_sum > 0, share, even)
+    return share * target
+
+
+def least_squares(hierarchy, bottom, upper, weights='ols'):
+    """
+    Rekonsiliasi GLS dengan W diagonal: b~ = (D + A'WaA)^-1 (D b + A'Wa a),
+    diinvers lewat Woodbury (solve m x m).
+    """
+    A = hierarchy.aggregation
+    d = np.ones(A.shape[1])
+    w = np.ones(A.shape[0]) if weights == 'ols' else 1.0 / np.maximum(hierarchy.sizes, 1)
+
+    rhs = d[:, None] * bottom + A.T @ (w[:, None] * upper)
+    scaled = rhs / d[:, None]
+    inner = np.diag(1.0 / w) + (A / d[None, :]) @ A.T
+    correction = np.linalg.solve(inner, A @ scaled)
+    return scaled - (A.T @ correction) / d[:, None]
+
+
+def reconcile(hierarchy, bottom, upper=None, method='ols', top_down_level='Brand'):
+    """Forecast SKU koheren (n x T) dari forecast SKU + forecast level atas"""
+    if upper is None:
+        upper = hierarchy.aggregate(bottom)
+    if method == 'bottom_up':
+        return bottom.copy()
+    if method == 'top_down':
+        return top_down(hierarchy, bottom, upper, top_down_level)
+    if method in ('ols', 'wls_struct'):
+        return np.clip(least_squares(hierarchy, bottom, upper, 'ols' if method == 'ols' else 'struct'), 0, None)
+    raise ValueError(f"Unknown reconciliation method '{method}' - use one of {METHODS}")
+
+
+def reconcile_forecast(base, overrides=None, method='ols', top_down_level='Brand', diagnostics=None):
+    """
+    Rekonsiliasi base (build_reconciliation_base) dengan override level atas.
+
+    Return dict:
+    - 'sku': forecast SKU koheren (wide, kolom bulan + Total)
+    - 'levels': per node (Level, Node) total horizon Base / Target / Reconciled
+    - 'months': forecast koheren per node x bulan (long)
+    """
+    if not base:
+        return {}
+
+    try:
+        hierarchy, bottom = base['hierarchy'], base['base']
+        coherent_upper = hierarchy.aggregate(bottom)
+        upper = apply_overrides(hierarchy, coherent_upper, overrides)
+        reconciled = reconcile(hierarchy, bottom, upper, method, top_down_level)
+        reconciled_upper = hierarchy.aggregate(reconciled)
+
+        sku = pd.DataFrame(reconciled, columns=base['months'])
+        sku.insert(0, 'SKU_ID', hierarchy.skus)
+        for i, level in enumerate(LEVELS[1:]):
+            sku.insert(1 + i, level, base['attributes'][level].to_numpy())
+        sku['Total'] = reconciled.sum(axis=1)
+        sku['Base_Total'] = bottom.sum(axis=1)
+
+        levels = hierarchy.nodes.copy()
+        levels['SKUs'] = hierarchy.sizes.astype('int64')
+        levels['Base'] = coherent_upper.sum(axis=1)
+        levels['Target'] = upper.sum(axis=1)
+        levels['Reconciled'] = reconciled_upper.sum(axis=1)
+        levels['Gap_vs_Target'] = levels['Reconciled'] - levels['Target']
+
+        n_nodes, n_months = reconciled_upper.shape
+        months = pd.DataFrame({
+            'Level': np.repeat(hierarchy.nodes['Level'].to_numpy(), n_months),
+            'Node': np.repeat(hierarchy.nodes['Node'].to_numpy(), n_months),
+            'Month': np.tile(np.asarray(base['months'], dtype=object), n_nodes),
+            'Target': upper.ravel(),
+            'Reconciled': reconciled_upper.ravel(),
+        })
+        return {'sku': sku, 'levels': levels, 'months': months}
+
+    except Exception as e:
+        add_diagnostic(diagnostics, 'error', 'reconcile_forecast', f"Forecast reconciliation error: {str(e)}")
+        return {}
@@ -0,0 +1,157 @@
+"""
+Replenishment engine - safety stock, reorder point, EOQ dan suggested order
+untuk semua SKU aktif sekaligus (NumPy, tanpa loop per SKU)
+
+Demand per bulan (rata-rata & standar deviasi) diambil dari `window` bulan
+sales terakhir di matriks SKU x bulan (demand.sales_matrix). Lalu:
+
+- Safety stock     = z(service level) x std demand x sqrt(lead time)
+- Reorder point    = demand x lead time + safety stock
+- EOQ              = sqrt(2 x demand tahunan x order cost / holding cost)
+                     holding cost = holding rate tahunan x Net_Order_Price
+- Inventory position = stok on hand + PO di bulan setelah sales terakhir
+- Suggested order  = (reorder point + EOQ) - position jika position <= ROP
+
+Statistik demand (bagian mahal) dihitung sekali per data version lewat DAG;
+plan_replenishment bisa dijalankan ulang dengan parameter lain tanpa
+menghitung ulang statistik.
+"""
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from demand import sales_matrix
+from diagnostics import add_diagnostic
+
+DEFAULT_PARAMS = {
+    'service_level': 0.95,
+    'lead_time_months': 1.0,
+    'order_cost': 500000.0,
+    'holding_rate': 0.25,
+}
+DEFAULT_WINDOW = 6
+
+
+SERVICE_LEVEL_RANGE = (0.5, 0.9999)
+
+
+def service_level_z(service_level, diagnostics=None):
+    """
+    Z-score distribusi normal untuk service level (pecahan 0-1, eksklusif).
+    Di luar (0, 1) -> ValueError (mis. 95 bukan 0.95); di luar SERVICE_LEVEL_RANGE
+    dibatasi ke rentang itu dengan warning.
+    """
+    value = float(service_level)
+    if not 0 < value < 1:
+        raise ValueError(f"Service level must be a fraction between 0 and 1 (e.g. 0.95), got {service_level}")
+    low, high = SERVICE_LEVEL_RANGE
+    clamped = min(max(value, low), high)
+    if clamped != value:
+        add_diagnostic(diagnostics, 'warning', 'service_level_z',
+                       f"⚠️ Service level {value:g} outside {low:g}-{high:g} - using {clamped:g}")
+    return NormalDist().inv_cdf(clamped)
+
+
+def economic_order_quantity(annual_demand, order_cost, holding_cost_per_unit):
+    """EOQ vectorized; 0 jika demand / order cost / holding cost tidak positif"""
+    annual_demand = np.asarray(annual_demand, dtype='float64')
+    holding = np.asarray(holding_cost_per_unit, dtype='float64')
+    order_cost = np.asarray(order_cost, dtype='float64')
+    valid = (annual_demand > 0) & (order_cost > 0) & (holding > 0)
+    numerator = 2 * annual_demand * order_cost
+    return np.sqrt(np.divide(numerator, holding, out=np.zeros(np.broadcast(numerator, holding).shape), where=valid))
+
+
+def demand_statistics(df_sales, df_stock, df_po, df_product, window=DEFAULT_WINDOW):
+    """Per SKU di df_product (pipeline: product_active): rata-rata, std dan CV demand + stok dan on-order"""
+    products = df_product.drop_duplicates('SKU_ID')
+
+    stats = pd.DataFrame({'SKU_ID': products['SKU_ID'].to_numpy()})
+    for col in ['Product_Name', 'Brand', 'SKU_Tier']:
+        if col in products.columns:
+            stats[col] = products[col].to_numpy()
+    unit_cost = products['Net_Order_Price'] if 'Net_Order_Price' in products.columns else pd.Series(0, index=products.index)
+    stats['Unit_Cost'] = pd.to_numeric(unit_cost, errors='coerce').fillna(0).to_numpy()
+
+    # Demand: `window` bulan sales terakhir, hanya bulan yang punya data
+    values, observed, skus, months = sales_matrix(df_sales)
+    values, observed = values[:, -window:], observed[:, -window:].astype('float64')
+    count = observed.sum(axis=1)
+    mean = np.divide(values.sum(axis=1), count, out=np.zeros(len(skus)), where=count > 0)
+    squared = ((values - mean[:, None]) ** 2 * observed).sum(axis=1)
+    std = np.sqrt(np.divide(squared, count - 1, out=np.zeros(len(skus)), where=count > 1))
+
+    rows = skus.get_indexer(stats['SKU_ID'])
+    found = rows >= 0
+    for col, source in [('Avg_Monthly_Demand', mean), ('Demand_Std', std), ('Demand_Months', count)]:
+        stats[col] = np.where(found, source[rows], 0.0)
+    stats['Demand_CV'] = np.divide(stats['Demand_Std'], stats['Avg_Monthly_Demand'],
+                                   out=np.zeros(len(stats)), where=stats['Avg_Monthly_Demand'] > 0)
+
+    stock = df_stock.groupby('SKU_ID')['Stock_Qty'].sum() if not df_stock.empty else pd.Series(dtype='float64')
+    stats['Stock_Qty'] = stats['SKU_ID'].map(stock).fillna(0).to_numpy(dtype='float64')
+
+    # On order: PO untuk bulan setelah bulan sales terakhir
+    on_order = pd.Series(dtype='float64')
+    if not df_po.empty and len(months):
+        future_po = df_po[pd.to_datetime(df_po['Month'], errors='coerce') > months[-1]]
+        on_order = future_po.groupby('SKU_ID')['PO_Qty'].sum()
+    stats['On_Order'] = stats['SKU_ID'].map(on_order).fillna(0).to_numpy(dtype='float64')
+
+    return stats
+
+
+def plan_replenishment(stats, service_level=None, lead_time_months=None, order_cost=None, holding_rate=None,
+                       diagnostics=None):
+    """Hitung safety stock, ROP, EOQ dan suggested order dari hasil demand_statistics"""
+    params = {
+        'service_level': service_level, 'lead_time_months': lead_time_months,
+        'order_cost': order_cost, 'holding_rate': holding_rate,
+    }
+    params = {key: DEFAULT_PARAMS[key] if value is None else value for key, value in params.items()}
+
+    plan = stats.copy()
+    demand = plan['Avg_Monthly_Demand'].to_numpy(dtype='float64')
+    std = plan['Demand_Std'].to_numpy(dtype='float64')
+    lead_time = float(params['lead_time_months'])
+    z = service_level_z(params['service_level'], diagnostics)
+
+    safety_stock = z * std * np.sqrt(lead_time)
+    reorder_point = demand * lead_time + safety_stock
+    holding_cost = params['holding_rate'] * plan['Unit_Cost'].to_numpy(dtype='float64')
+    eoq = np.ceil(economic_order_quantity(demand * 12, params['order_cost'], holding_cost))
+    position = plan['Stock_Qty'].to_numpy(dtype='float64') + plan['On_Order'].to_numpy(dtype='float64')
+
+    reorder = (position <= reorder_point) & (demand > 0)
+    suggested = np.where(reorder, np.maximum(np.ceil(reorder_point + eoq - position), 0), 0)
+
+    plan['Safety_Stock'] = np.ceil(safety_stock)
+    plan['Reorder_Point'] = np.ceil(reorder_point)
+    plan['EOQ'] = eoq
+    plan['Inventory_Position'] = position
+    plan['Suggested_Order'] = suggested
+    plan['Order_Value'] = suggested * plan['Unit_Cost'].to_numpy(dtype='float64')
+    plan['Action'] = np.select(
+        [demand <= 0, reorder, position > reorder_point + eoq],
+        ['No Demand', 'Reorder Now', 'Overstocked'],
+        default='OK'
+    )
+    return plan
+
+
+def calculate_replenishment(df_sales, df_stock, df_po, df_product, window=DEFAULT_WINDOW, diagnostics=None, **params):
+    """Statistik demand + plan replenishment (parameter default) untuk semua SKU aktif"""
+    if df_sales.empty or df_product.empty:
+        return pd.DataFrame()
+
+    try:
+        stats = demand_statistics(df_sales, df_stock, df_po, df_product, window)
+        if 'Net_Order_Price' not in df_product.columns:
+            add_diagnostic(diagnostics, 'warning', 'calculate_replenishment',
+                           "⚠️ Net_Order_Price missing in Product Master - EOQ set to 0")
+        return plan_replenishment(stats, diagnostics=diagnostics, **params)
+
+    except Exception as e:
+        add_diagnostic(diagnostics, 'error', 'calculate_replenishment', f"Replenishment calculation error: {str(e)}")
+        return pd.DataFrame()
@@ -0,0 +1,199 @@
+"""
+What-if scenario - penyesuaian multiplikatif / aditif pada Forecast, Sales
+atau PO per dimensi, lalu hitung ulang hanya analytics yang terdampak
+
+- Adjustment: measure ('forecast' / 'sales' / 'po'), mode ('multiply' / 'add'),
+  amount, filter dimensi opsional (Brand, SKU_Tier, ABC_Class, SKU_ID, ...)
+  dan rentang bulan opsional. Hasil tidak pernah negatif.
+- Scenario menyimpan hasilnya sebagai delta terhadap baseline: posisi baris
+  (int32) + selisih nilai (float64, presisi penuh) per measure, hanya untuk
+  baris yang berubah. Versi dataset dan segmen ABC/XYZ saat delta dibuat
+  disimpan, supaya delta dibangun ulang jika salah satunya berubah.
+- Menjalankan skenario = dataset baseline + delta, dengan versi dataset yang
+  diturunkan dari isi adjustment. SCENARIO_STEPS dijalankan lewat DAG
+  (dag.run_incremental, prefix cache yang sama dengan dashboard): node yang
+  inputnya tidak tersentuh skenario langsung dipakai dari cache baseline.
+"""
+import numpy as np
+import pandas as pd
+
+from dag import affected_nodes, run_incremental
+from pipeline import ANALYTICS_STEPS
+from range_index import month_start
+from versioning import derive_version
+
+MEASURES = {'forecast': 'Forecast_Qty', 'sales': 'Sales_Qty', 'po': 'PO_Qty'}
+MODES = ('multiply', 'add')
+SCENARIO_OUTPUTS = ['inventory_metrics', 'stock_projection', 'accuracy_metrics', 'brand_performance']
+SCENARIO_STEPS = [step for step in ANALYTICS_STEPS if step[0] in SCENARIO_OUTPUTS]
+
+
+def make_adjustment(measure, mode, amount, dimension=None, values=None, start=None, end=None):
+    """Adjustment sebagai dict (amount: faktor untuk 'multiply', qty per baris untuk 'add')"""
+    if measure not in MEASURES:
+        raise ValueError(f"Unknown measure '{measure}' - use one of {list(MEASURES)}")
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode '{mode}' - use one of {list(MODES)}")
+    return {
+        'measure': measure,
+        'mode': mode,
+        'amount': float(amount),
+        'dimension': dimension if values else None,
+        'values': tuple(sorted(str(value) for value in values)) if values else (),
+        'start': pd.Timestamp(start) if start is not None else None,
+        'end': pd.Timestamp(end) if end is not None else None,
+    }
+
+
+def describe_adjustment(adjustment):
+    """Label singkat, mis. 'Forecast_Qty x1.20 | Brand: Elara'"""
+    amount = adjustment['amount']
+    change = f"x{amount:.2f}" if adjustment['mode'] == 'multiply' else f"{amount:+,.0f}"
+    label = f"{MEASURES[adjustment['measure']]} {change}"
+    if adjustment['dimension']:
+        label += f" | {adjustment['dimension']}: {', '.join(adjustment['values'])}"
+    if adjustment['start'] is not None or adjustment['end'] is not None:
+        start = adjustment['start'].strftime('%b %Y') if adjustment['start'] is not None else '...'
+        end = adjustment['end'].strftime('%b %Y') if adjustment['end'] is not None else '...'
+        label += f" | {start} - {end}"
+    return label
+
+
+def adjustment_mask(df, adjustment, df_product):
+    """Mask baris dataset yang terkena adjustment"""
+    mask = np.ones(len(df), dtype=bool)
+    dimension = adjustment['dimension']
+    if dimension:
+        if dimension in df.columns:
+            labels = df[dimension]
+        elif df_product is not None and dimension in df_product.columns:
+            labels = df['SKU_ID'].map(df_product.drop_duplicates('SKU_ID').set_index('SKU_ID')[dimension])
+        else:
+            return np.zeros(len(df), dtype=bool)
+        mask &= labels.astype(str).isin(adjustment['values']).to_numpy()
+    if adjustment['start'] is not None or adjustment['end'] is not None:
+        months = month_start(df['Month'])
+        if adjustment['start'] is not None:
+            mask &= (months >= adjustment['start']).to_numpy()
+        if adjustment['end'] is not None:
+            mask &= (months <= adjustment['end']).to_numpy()
+    return mask
+
+
+class Scenario:
+    """Skenario bernama: daftar adjustment + delta per measure terhadap baseline"""
+
+    def __init__(self, name, adjustments, deltas, base_versions):
+        self.name = name
+        self.adjustments = list(adjustments)
+        self.deltas = deltas
+        self.base_versions = base_versions
+        self.key = derive_version(*(repr(sorted(adjustment.items())) for adjustment in self.adjustments))
+
+    def memory_bytes(self):
+        return sum(rows.nbytes + delta.nbytes for rows, delta in self.deltas.values())
+
+    def changed_rows(self):
+        return {measure: len(rows) for measure, (rows, _) in self.deltas.items()}
+
+    def is_current(self, datasets, segments_version=None):
+        """True jika delta dibuat dari versi dataset & segmen yang sama (filter/data tidak berubah)"""
+        versions = dict(datasets.get('dataset_versions') or {}, segments=segments_version)
+        return all(versions.get(name) == version for name, version in self.base_versions.items())
+
+    def apply(self, datasets):
+        """Dataset baseline + delta; dataset lain dipakai apa adanya (tanpa copy)"""
+        result = dict(datasets)
+        versions = dict(datasets.get('dataset_versions') or {})
+        for measure, (rows, delta) in self.deltas.items():
+            df, col = datasets[measure], MEASURES[measure]
+            values = df[col].to_numpy(dtype='float64', copy=True)
+            values[rows] += delta
+            result[measure] = df.assign(**{col: values})
+            versions[measure] = derive_version(versions.get(measure, ''), 'scenario', self.key)
+        result['dataset_versions'] = versions
+        return result
+
+
+def build_scenario(name, datasets, df_product, adjustments, segments_version=None):
+    """
+    Hitung delta semua adjustment (berurutan per measure) terhadap dataset
+    baseline. segments_version: versi segmen ABC/XYZ yang ada di df_product.
+    """
+    deltas = {}
+    for measure in dict.fromkeys(adjustment['measure'] for adjustment in adjustments):
+        df = datasets.get(measure)
+        if not isinstance(df, pd.DataFrame) or df.empty:
+            continue
+        base = df[MEASURES[measure]].to_numpy(dtype='float64')
+        values = base.copy()
+        for adjustment in adjustments:
+            if adjustment['measure'] != measure:
+                continue
+            mask = adjustment_mask(df, adjustment, df_product)
+            if adjustment['mode'] == 'multiply':
+                values[mask] *= adjustment['amount']
+            else:
+                values[mask] += adjustment['amount']
+        delta = np.clip(values, 0, None) - base
+        rows = np.flatnonzero(delta != 0)
+        deltas[measure] = (rows.astype('int32'), delta[rows])
+
+    versions = datasets.get('dataset_versions') or {}
+    base_versions = {name: versions.get(name) for name in list(deltas) + ['product']}
+    base_versions['segments'] = segments_version
+    return Scenario(name, adjustments, deltas, base_versions)
+
+
+def run_scenario(scenario, datasets, diagnostics=None, max_workers=None):
+    """
+    Jalankan SCENARIO_STEPS untuk skenario (None = baseline). Return (results, info)
+    seperti run_incremental; info['affected'] = node yang dipengaruhi skenario.
+    """
+    scenario_data = datasets if scenario is None else scenario.apply(datasets)
+    results, info = run_incremental(SCENARIO_STEPS, scenario_data, diagnostics, max_workers=max_workers)
+    info['affected'] = sorted(affected_nodes(SCENARIO_STEPS, scenario.deltas)) if scenario is not None else []
+    return results, info
+
+
+def scenario_kpis(results):
+    """KPI ringkas dari hasil SCENARIO_STEPS"""
+    kpis = {}
+    inventory = results.get('inventory_metrics') or {}
+    if 'inventory_df' in inventory:
+        status = inventory['inventory_df']['Inventory_Status'].value_counts()
+        kpis['SKUs Need Replenishment'] = status.get('Need Replenishment', 0)
+        kpis['SKUs High Stock'] = status.get('High Stock', 0)
+        kpis['Avg Cover (months)'] = inventory.get('avg_cover', np.nan)
+
+    projection = results.get('stock_projection') or {}
+    if projection:
+        kpis['Projected Ending Stock'] = projection['monthly']['Projected_Stock'].iloc[-1]
+        kpis['Projected Shortage'] = projection['monthly']['Shortage_Qty'].iloc[-1]
+        kpis['SKUs Stocking Out'] = projection['summary']['First_Stockout_Month'].notna().sum()
+
+    accuracy = results.get('accuracy_metrics') or {}
+    if accuracy:
+        kpis['Forecast Accuracy (%)'] = accuracy['total']['Accuracy'].iloc[0]
+        kpis['Forecast Bias (%)'] = accuracy['total']['Bias_Pct'].iloc[0]
+    return kpis
+
+
+def compare_results(baseline, scenario):
+    """Tabel KPI baseline vs skenario"""
+    base, alt = scenario_kpis(baseline), scenario_kpis(scenario)
+    rows = [(kpi, float(base[kpi]), float(alt.get(kpi, np.nan))) for kpi in base]
+    table = pd.DataFrame(rows, columns=['KPI', 'Baseline', 'Scenario'])
+    table['Change'] = table['Scenario'] - table['Baseline']
+    return table
+
+
+def compare_brands(baseline, scenario):
+    """Brand performance baseline vs skenario (Total_Forecast, Total_PO, Accuracy)"""
+    base, alt = baseline.get('brand_performance'), scenario.get('brand_performance')
+    if base is None or alt is None or base.empty or alt.empty:
+        return pd.DataFrame()
+    cols = ['Brand', 'Total_Forecast', 'Total_PO', 'Accuracy']
+    table = base[cols].merge(alt[cols], on='Brand', how='outer', suffixes=('_Baseline', '_Scenario'))
+    table['Accuracy_Change'] = table['Accuracy_Scenario'] - table['Accuracy_Baseline']
+    return table.sort_values('Accuracy_Change').reset_index(drop=True)
@@ -0,0 +1,110 @@
+"""
+Seasonal index per SKU x bulan kalender (Jan-Dec) dalam satu pass vectorized
+
+- Matriks sales SKU x bulan (bulan tanpa baris = 0) dijumlah per bulan
+  kalender lewat perkalian dengan matriks one-hot (bulan x 12).
+- Index mentah = rata-rata bulan kalender / rata-rata semua bulan.
+- SKU dengan data sedikit di-shrink ke profil grup (Brand / SKU_Tier):
+  index = w x mentah + (1 - w) x profil grup, w = n / (n + k), n = jumlah
+  bulan ber-demand. Profil grup sendiri di-shrink ke profil global.
+- Profil Brand, SKU_Tier dan global diambil dari jumlahan matriks yang sama
+  (berbobot volume), jadi tampilan seasonality tidak perlu groupby ulang.
+"""
+import numpy as np
+import pandas as pd
+
+from diagnostics import add_diagnostic
+from range_index import dense_matrix, month_start
+
+MONTH_NAMES = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+DEFAULT_SHRINKAGE = 12
+LEVELS = ['Brand', 'SKU_Tier']
+
+
+def calendar_sums(y, months):
+    """Return (jumlah per bulan kalender (n, 12), jumlah kemunculan tiap bulan kalender (12,))"""
+    one_hot = np.zeros((len(months), 12))
+    one_hot[np.arange(len(months)), months.month - 1] = 1
+    return y @ one_hot, one_hot.sum(axis=0)
+
+
+def seasonal_index(sums, counts):
+    """Index mentah dari jumlah bulan kalender; 1.0 untuk baris tanpa demand"""
+    calendar_mean = np.divide(sums, counts, out=np.zeros(sums.shape), where=counts > 0)
+    overall = np.divide(sums.sum(axis=1), counts.sum(), out=np.zeros(sums.shape[0]), where=counts.sum() > 0)
+    index = np.divide(calendar_mean, overall[:, None], out=np.ones(sums.shape), where=overall[:, None] > 0)
+    # Bulan kalender yang tidak pernah muncul di data = netral
+    index[:, counts == 0] = 1.0
+    return index
+
+
+def shrink(raw, prior, n_obs, strength=DEFAULT_SHRINKAGE):
+    """Shrinkage empiris: w = n / (n + strength)"""
+    weight = n_obs / (n_obs + strength)
+    return weight[:, None] * raw + (1 - weight[:, None]) * prior, weight
+
+
+def _frame(index, labels, name):
+    frame = pd.DataFrame(index, columns=MONTH_NAMES)
+    frame.insert(0, name, labels)
+    return frame
+
+
+def calculate_seasonal_indices(df_sales, df_product, prior_level='Brand', strength=DEFAULT_SHRINKAGE,
+                               diagnostics=None):
+    """
+    Seasonal index Sales_Qty per SKU (di-shrink ke profil `prior_level`) +
+    profil per Brand, per SKU_Tier dan global.
+
+    Return dict: 'sku' (wide, kolom Jan..Dec + Raw_Weight), 'brand', 'tier', 'global'.
+    """
+    if df_sales.empty:
+        return {}
+
+    try:
+        sales = df_sales[['SKU_ID', 'Sales_Qty']].assign(_month=month_start(df_sales['Month'])).dropna(subset=['_month'])
+        skus = pd.Index(sales['SKU_ID'].unique(), name='SKU_ID').sort_values()
+        months = pd.date_range(sales['_month'].min(), sales['_month'].max(), freq='MS')
+        y, _ = dense_matrix(sales, 'Sales_Qty', skus, months, (len(skus), len(months)))
+
+        sums, counts = calendar_sums(y, months)
+        n_obs = (y > 0).sum(axis=1).astype('float64')
+
+        product = df_product.drop_duplicates('SKU_ID').set_index('SKU_ID') if not df_product.empty else pd.DataFrame()
+        attrs = pd.DataFrame(index=skus)
+        for level in LEVELS:
+            attrs[level] = skus.map(product[level]).fillna('Unknown') if level in product.columns else 'Unknown'
+
+        global_index = seasonal_index(sums.sum(axis=0, keepdims=True), counts)
+
+        profiles = {}
+        for level in LEVELS:
+            codes, labels = pd.factorize(attrs[level], sort=True)
+            group_sums = np.zeros((len(labels), 12))
+            np.add.at(group_sums, codes, sums)
+            group_obs = np.bincount(codes, weights=n_obs, minlength=len(labels))
+            group_index, group_weight = shrink(seasonal_index(group_sums, counts), global_index, group_obs, strength)
+            profiles[level] = (codes, labels, group_index, group_weight)
+
+        codes, _, group_index, _ = profiles[prior_level]
+        sku_index, weight = shrink(seasonal_index(sums, counts), group_index[codes], n_obs, strength)
+
+        sku = _frame(sku_index, skus, 'SKU_ID')
+        for level in LEVELS:
+            sku[level] = attrs[level].to_numpy()
+        sku['Raw_Weight'] = weight
+        sku['Amplitude'] = sku_index.max(axis=1) - sku_index.min(axis=1)
+        sku['Peak_Month'] = np.array(MONTH_NAMES)[sku_index.argmax(axis=1)]
+
+        _, brand_labels, brand_index, _ = profiles['Brand']
+        _, tier_labels, tier_index, _ = profiles['SKU_Tier']
+        return {
+            'sku': sku,
+            'brand': _frame(brand_index, brand_labels, 'Brand'),
+            'tier': _frame(tier_index, tier_labels, 'SKU_Tier'),
+            'global': _frame(global_index, ['All'], 'Level'),
+        }
+
+    except Exception as e:
+        add_diagnostic(diagnostics, 'error', 'calculate_seasonal_indices', f"Seasonal index calculation error: {str(e)}")
+        return {}
@@ -0,0 +1,108 @@
+"""
+ABC/XYZ segmentation - Pareto revenue (ABC) dan variabilitas demand (XYZ)
+untuk semua SKU sekaligus di matriks sales SKU x bulan
+
+- ABC: revenue `window` bulan terakhir (Sales_Qty x Floor_Price), diurutkan
+  menurun lalu cumsum share. SKU masuk A selama share kumulatif *sebelum*
+  SKU itu < 80%, B < 95%, sisanya C (revenue 0 selalu C).
+- XYZ: koefisien variasi demand bulanan di window yang sama (bulan tanpa
+  baris = 0): X <= 0.5, Y <= 1.0, Z > 1.0 atau tanpa demand.
+
+Hasil dihitung dari data belum terfilter dan ditempel ke Product_Master
+(attach_segments), sehingga ABC_Class / XYZ_Class bisa dipakai sebagai
+dimensi filter global.
+"""
+import numpy as np
+import pandas as pd
+
+from diagnostics import add_diagnostic
+from range_index import dense_matrix, month_start
+
+DEFAULT_WINDOW = 12
+ABC_THRESHOLDS = (0.80, 0.95)
+XYZ_THRESHOLDS = (0.5, 1.0)
+SEGMENT_COLUMNS = ['ABC_Class', 'XYZ_Class', 'ABC_XYZ']
+
+
+def abc_classes(revenue, thresholds=ABC_THRESHOLDS):
+    """Return (kelas ABC, share, share kumulatif) dalam urutan input"""
+    revenue = np.clip(np.asarray(revenue, dtype='float64'), 0, None)
+    total = revenue.sum()
+    order = np.argsort(-revenue, kind='stable')
+    share = np.divide(revenue, total, out=np.zeros(len(revenue)), where=total > 0)
+
+    cumulative = np.empty(len(revenue))
+    cumulative[order] = np.cumsum(share[order])
+    before = cumulative - share
+    classes = np.select([before < thresholds[0], before < thresholds[1]], ['A', 'B'], default='C')
+    classes[revenue <= 0] = 'C'
+    return classes, share, cumulative
+
+
+def xyz_classes(y, thresholds=XYZ_THRESHOLDS):
+    """Return (kelas XYZ, mean, CV) dari matriks demand (n, bulan)"""
+    mean = y.mean(axis=1)
+    std = y.std(axis=1, ddof=1) if y.shape[1] > 1 else np.zeros(y.shape[0])
+    cv = np.divide(std, mean, out=np.full(len(mean), np.inf), where=mean > 0)
+    classes = np.select([cv <= thresholds[0], cv <= thresholds[1]], ['X', 'Y'], default='Z')
+    return classes, mean, cv
+
+
+def calculate_abc_xyz(df_sales, df_product, window=DEFAULT_WINDOW, diagnostics=None):
+    """Segmentasi ABC/XYZ per SKU di Product_Master (SKU tanpa sales = CZ)"""
+    if df_product.empty:
+        return pd.DataFrame()
+
+    try:
+        product = df_product.drop_duplicates('SKU_ID')
+        skus = pd.Index(product['SKU_ID'], name='SKU_ID')
+
+        if df_sales.empty:
+            y = np.zeros((len(skus), 1))
+        else:
+            sales = df_sales[['SKU_ID', 'Sales_Qty']].assign(_month=month_start(df_sales['Month'])).dropna(subset=['_month'])
+            last = sales['_month'].max()
+            months = pd.date_range(last - pd.DateOffset(months=window - 1), last, freq='MS')
+            y, _ = dense_matrix(sales, 'Sales_Qty', skus, months, (len(skus), len(months)))
+
+        price = product['Floor_Price'] if 'Floor_Price' in product.columns else pd.Series(0, index=product.index)
+        price = pd.to_numeric(price, errors='coerce').fillna(0).to_numpy(dtype='float64')
+        revenue = y.sum(axis=1) * price
+
+        abc, share, cumulative = abc_classes(revenue)
+        xyz, mean, cv = xyz_classes(y)
+
+        segments = pd.DataFrame({'SKU_ID': skus})
+        for col in ['Product_Name', 'Brand', 'SKU_Tier']:
+            if col in product.columns:
+                segments[col] = product[col].to_numpy()
+        segments['Revenue'] = revenue
+        segments['Revenue_Share'] = share * 100
+        segments['Cumulative_Share'] = cumulative * 100
+        segments['Avg_Monthly_Demand'] = mean
+        segments['Demand_CV'] = cv
+        segments['ABC_Class'] = abc
+        segments['XYZ_Class'] = xyz
+        segments['ABC_XYZ'] = np.char.add(abc.astype(str), xyz.astype(str))
+        return segments.sort_values('Revenue', ascending=False).reset_index(drop=True)
+
+    except Exception as e:
+        add_diagnostic(diagnostics, 'error', 'calculate_abc_xyz', f"ABC/XYZ segmentation error: {str(e)}")
+        return pd.DataFrame()
+
+
+def attach_segments(df_product, segments):
+    """Product_Master + kolom ABC_Class / XYZ_Class / ABC_XYZ (frame baru, input tidak diubah)"""
+    if df_product.empty or segments.empty:
+        return df_product
+    product = df_product.drop(columns=[col for col in SEGMENT_COLUMNS if col in df_product.columns])
+    return product.merge(segments[['SKU_ID'] + SEGMENT_COLUMNS], on='SKU_ID', how='left')
+
+
+def segment_matrix(segments, value='SKU_ID'):
+    """Tabel 3x3 ABC x XYZ: jumlah SKU ('SKU_ID') atau total kolom lain (mis. 'Revenue')"""
+    if segments.empty:
+        return pd.DataFrame()
+    aggfunc = 'count' if value == 'SKU_ID' else 'sum'
+    return segments.pivot_table(index='ABC_Class', columns='XYZ_Class', values=value, aggfunc=aggfunc,
+                                fill_value=0).reindex(index=['A', 'B', 'C'], columns=['X', 'Y', 'Z'], fill_value=0)
@@ -0,0 +1,129 @@
+"""
+Dead stock & slow mover - run-length analisa di matriks sales SKU x bulan
+untuk SKU yang masih punya stok
+
+Per SKU (semua vectorized di matriks, bulan tanpa baris = 0):
+- Quiet_Months: panjang run bulan "sepi" di ujung histori. Bulan sepi =
+  sales <= near_zero_ratio x rata-rata bulanan SKU (sales 0 selalu sepi).
+- Months_Since_Last_Sale: bulan sejak sales > 0 terakhir (jumlah bulan
+  histori jika tidak pernah terjual).
+- Velocity_Slope: slope OLS sales `trend_window` bulan terakhir, dan
+  Velocity_Trend_Pct = slope / rata-rata window (% per bulan).
+
+Stok dan nilainya diambil dari calculate_inventory_financial (level batch,
+dijumlah per SKU). Klasifikasi (classify_movers) murah dan bisa dijalankan
+ulang dengan threshold lain tanpa menghitung ulang statistik.
+"""
+import numpy as np
+import pandas as pd
+
+from demand import NO_DEMAND_COVER
+from diagnostics import add_diagnostic
+from range_index import dense_matrix, month_start
+
+DEFAULT_PARAMS = {
+    'dead_months': 6,
+    'slow_months': 3,
+    'decline_pct': -10.0,
+}
+NEAR_ZERO_RATIO = 0.1
+DEFAULT_TREND_WINDOW = 6
+MOVER_CLASSES = ['Dead Stock', 'Slow Mover', 'Declining', 'Active']
+
+
+def trailing_run(mask):
+    """Panjang run True di ujung kanan setiap baris (n, bulan)"""
+    n_months = mask.shape[1]
+    active = ~mask[:, ::-1]
+    first_active = active.argmax(axis=1)
+    return np.where(active.any(axis=1), first_active, n_months)
+
+
+def velocity_slope(y, window=DEFAULT_TREND_WINDOW):
+    """Return (slope OLS per bulan, rata-rata) atas `window` bulan terakhir"""
+    recent = y[:, -window:]
+    t = np.arange(recent.shape[1], dtype='float64')
+    t_centered = t - t.mean()
+    denominator = (t_centered ** 2).sum()
+    mean = recent.mean(axis=1)
+    slope = ((recent - mean[:, None]) * t_centered).sum(axis=1) / denominator if denominator > 0 \
+        else np.zeros(len(recent))
+    return slope, mean
+
+
+def movement_statistics(y, near_zero_ratio=NEAR_ZERO_RATIO, trend_window=DEFAULT_TREND_WINDOW):
+    """Statistik run-length & velocity dari matriks sales (n, bulan) -> dict array"""
+    average = y.mean(axis=1)
+    quiet = (y <= 0) | (y <= near_zero_ratio * average[:, None])
+    slope, recent_mean = velocity_slope(y, trend_window)
+    return {
+        'Quiet_Months': trailing_run(quiet),
+        'Months_Since_Last_Sale': trailing_run(y <= 0),
+        'Avg_Monthly_Sales': average,
+        'Recent_Avg_Sales': recent_mean,
+        'Velocity_Slope': slope,
+        'Velocity_Trend_Pct': np.divide(slope, recent_mean, out=np.zeros(len(slope)), where=recent_mean > 0) * 100,
+    }
+
+
+def classify_movers(stats, dead_months=None, slow_months=None, decline_pct=None):
+    """Tambah kolom Mover_Class (Dead Stock / Slow Mover / Declining / Active)"""
+    params = {'dead_months': dead_months, 'slow_months': slow_months, 'decline_pct': decline_pct}
+    params = {key: DEFAULT_PARAMS[key] if value is None else value for key, value in params.items()}
+
+    result = stats.copy()
+    quiet = result['Quiet_Months'].to_numpy()
+    result['Mover_Class'] = np.select(
+        [quiet >= params['dead_months'], quiet >= params['slow_months'],
+         result['Velocity_Trend_Pct'].to_numpy() <= params['decline_pct']],
+        MOVER_CLASSES[:3],
+        default='Active'
+    )
+    return result
+
+
+def calculate_slow_movers(df_sales, df_inventory_financial, df_product, near_zero_ratio=NEAR_ZERO_RATIO,
+                          trend_window=DEFAULT_TREND_WINDOW, diagnostics=None, **params):
+    """
+    Deteksi dead stock / slow mover untuk semua SKU dengan stok > 0.
+
+    Return DataFrame per SKU: stok & nilai (Value_at_Cost), statistik
+    run-length / velocity, dan Mover_Class (threshold default).
+    """
+    if df_inventory_financial.empty or df_sales.empty:
+        return pd.DataFrame()
+
+    try:
+        value_cols = [col for col in ['Stock_Qty', 'Value_at_Cost', 'Value_at_Retail']
+                      if col in df_inventory_financial.columns]
+        stock = df_inventory_financial.groupby('SKU_ID')[value_cols].sum()
+        stock = stock[stock['Stock_Qty'] > 0]
+        skus = pd.Index(stock.index, name='SKU_ID')
+
+        sales = df_sales[['SKU_ID', 'Sales_Qty']].assign(_month=month_start(df_sales['Month'])).dropna(subset=['_month'])
+        months = pd.date_range(sales['_month'].min(), sales['_month'].max(), freq='MS')
+        y, _ = dense_matrix(sales, 'Sales_Qty', skus, months, (len(skus), len(months)))
+
+        result = stock.reset_index()
+        if not df_product.empty:
+            info = df_product.drop_duplicates('SKU_ID').set_index('SKU_ID')
+            for col in ['SKU_Tier', 'Brand', 'Product_Name']:
+                if col in info.columns:
+                    result.insert(1, col, result['SKU_ID'].map(info[col]))
+        for col, values in movement_statistics(y, near_zero_ratio, trend_window).items():
+            result[col] = values
+        result['Last_Sale_Month'] = pd.Series(
+            months[np.clip(len(months) - 1 - result['Months_Since_Last_Sale'].to_numpy(), 0, None)]
+        ).where(result['Months_Since_Last_Sale'] < len(months))
+        result['Cover_Months'] = np.divide(result['Stock_Qty'], result['Recent_Avg_Sales'],
+                                           out=np.full(len(result), float(NO_DEMAND_COVER)),
+                                           where=result['Recent_Avg_Sales'] > 0)
+
+        return classify_movers(result, **params).sort_values(
+            ['Quiet_Months', 'Value_at_Cost' if 'Value_at_Cost' in result.columns else 'Stock_Qty'],
+            ascending=False
+        ).reset_index(drop=True)
+
+    except Exception as e:
+        add_diagnostic(diagnostics, 'error', 'calculate_slow_movers', f"Slow mover detection error: {str(e)}")
+        return pd.DataFrame()
@@ -0,0 +1,261 @@
+"""
+Statistical baseline forecast - SES, Holt-Winters (aditif, damped trend) dan
+Croston (SBA) untuk semua SKU sekaligus di matriks sales SKU x bulan
+
+Setiap model di-vectorize lintas SKU *dan* lintas grid parameter: state
+berbentuk (n_sku, n_param) dan loop hanya berjalan sepanjang bulan. Parameter
+terbaik per SKU = MAE one-step-ahead in-sample terkecil.
+
+Pemilihan model per SKU (tanpa melihat data uji):
+- Intermittent (ADI > 1.32) -> Croston
+- Selain itu SES vs Holt-Winters (jika >= 2 musim data), MAE in-sample terkecil
+  atas window yang sama (bulan setelah musim pertama)
+
+Benchmark: model di-fit pada data sebelum `backtest_months` bulan terakhir,
+lalu semua model + Rofo dibandingkan terhadap Sales aktual di bulan uji
+(hanya sel yang punya Rofo). Metrik memakai forecast_accuracy.aggregate_metrics.
+"""
+import numpy as np
+import pandas as pd
+
+from diagnostics import add_diagnostic
+from forecast_accuracy import add_error_columns, aggregate_metrics
+from range_index import dense_matrix, month_start
+
+SEASON_LENGTH = 12
+ADI_THRESHOLD = 1.32
+DAMPING = 0.9
+DEFAULT_HORIZON = 6
+DEFAULT_BACKTEST_MONTHS = 6
+
+SES_ALPHAS = np.array([0.05, 0.1, 0.2, 0.3, 0.5, 0.7])
+CROSTON_ALPHAS = np.array([0.05, 0.1, 0.2, 0.3])
+HW_GRID = np.array([
+    (alpha, beta, gamma)
+    for alpha in (0.1, 0.3, 0.5)
+    for beta in (0.01, 0.1)
+    for gamma in (0.05, 0.2)
+])
+
+MODELS = ['SES', 'Holt_Winters', 'Croston']
+
+
+def _pick(values, best):
+    return values[np.arange(values.shape[0]), best]
+
+
+def fit_ses(y, horizon, alphas=SES_ALPHAS, score_from=1):
+    """
+    SES per SKU; return (forecast (n, horizon), mae (n,), alpha (n,)).
+    Alpha dipilih atas seluruh histori; mae dihitung atas t >= score_from
+    (mis. = SEASON_LENGTH supaya sebanding dengan MAE Holt-Winters).
+    """
+    n, T = y.shape
+    alpha = alphas[None, :]
+    level = np.repeat(y[:, :1], len(alphas), axis=1)
+    abs_error = np.zeros((n, len(alphas)))
+    scored_error = np.zeros((n, len(alphas)))
+    score_from = max(score_from, 1)
+    for t in range(1, T):
+        error = y[:, t:t + 1] - level
+        abs_error += np.abs(error)
+        if t >= score_from:
+            scored_error += np.abs(error)
+        level = level + alpha * error
+    best = abs_error.argmin(axis=1)
+    mae = _pick(scored_error, best) / max(T - score_from, 1)
+    forecast = np.repeat(_pick(level, best)[:, None], horizon, axis=1)
+    return forecast, mae, alphas[best]
+
+
+def fit_holt_winters(y, horizon, grid=HW_GRID, m=SEASON_LENGTH, phi=DAMPING):
+    """
+    Holt-Winters aditif dengan damped trend. Butuh >= 2 musim; jika kurang
+    return (None, inf, None). Inisialisasi dari dua musim pertama.
+    """
+    n, T = y.shape
+    if T < 2 * m:
+        return None, np.full(n, np.inf), None
+
+    k = len(grid)
+    alpha, beta, gamma = (grid[None, :, i] for i in range(3))
+    first, second = y[:, :m].mean(axis=1), y[:, m:2 * m].mean(axis=1)
+    level = np.repeat(first[:, None], k, axis=1)
+    trend = np.repeat(((second - first) / m)[:, None], k, axis=1)
+    season = np.repeat((y[:, :m] - first[:, None])[:, None, :], k, axis=1)
+    abs_error = np.zeros((n, k))
+
+    for t in range(m, T):
+        idx = t % m
+        s = season[:, :, idx]
+        y_t = y[:, t:t + 1]
+        abs_error += np.abs(y_t - (level + phi * trend + s))
+        new_level = alpha * (y_t - s) + (1 - alpha) * (level + phi * trend)
+        trend = beta * (new_level - level) + (1 - beta) * phi * trend
+        season[:, :, idx] = gamma * (y_t - new_level) + (1 - gamma) * s
+        level = new_level
+
+    best = abs_error.argmin(axis=1)
+    mae = _pick(abs_error, best) / (T - m)
+    rows = np.arange(n)
+    steps = np.arange(1, horizon + 1)
+    damped = np.cumsum(phi ** steps)
+    season_idx = (T - 1 + steps) % m
+    forecast = (level[rows, best][:, None] + damped[None, :] * trend[rows, best][:, None]
+                + season[rows, best][:, season_idx])
+    return np.clip(forecast, 0, None), mae, grid[best]
+
+
+def fit_croston(y, horizon, alphas=CROSTON_ALPHAS):
+    """Croston dengan koreksi SBA; return (forecast, mae, alpha)"""
+    n, T = y.shape
+    k = len(alphas)
+    alpha = alphas[None, :]
+    size = np.zeros((n, k))
+    interval = np.ones((n, k))
+    since = np.zeros((n, k))
+    started = np.zeros((n, k), dtype=bool)
+    abs_error = np.zeros((n, k))
+    counted = np.zeros((n, 1))
+
+    for t in range(T):
+        y_t = y[:, t:t + 1]
+        demand = np.broadcast_to(y_t > 0, (n, k))
+        rate = (1 - alpha / 2) * size / interval
+        abs_error += np.where(started, np.abs(y_t - rate), 0)
+        counted += started[:, :1]
+        since += 1
+        first = demand & ~started
+        update = demand & started
+        size = np.where(first, y_t, np.where(update, size + alpha * (y_t - size), size))
+        interval = np.where(first, since, np.where(update, interval + alpha * (since - interval), interval))
+        since = np.where(demand, 0, since)
+        started |= demand
+
+    best = abs_error.argmin(axis=1)
+    mae = _pick(abs_error, best) / np.maximum(counted[:, 0], 1)
+    rate = _pick((1 - alpha / 2) * size / interval, best)
+    forecast = np.repeat(np.where(_pick(started, best), rate, 0.0)[:, None], horizon, axis=1)
+    return forecast, mae, alphas[best]
+
+
+def average_demand_interval(y):
+    """ADI = jumlah bulan / jumlah bulan dengan demand (inf jika tidak ada demand)"""
+    nonzero = (y > 0).sum(axis=1)
+    return np.divide(y.shape[1], nonzero, out=np.full(y.shape[0], np.inf), where=nonzero > 0)
+
+
+def forecast_all(y, horizon):
+    """
+    Fit semua model + pilih per SKU. Return dict nama model -> forecast (n, horizon),
+    plus 'Auto', 'selected' (nama model per SKU) dan 'adi'.
+    """
+    # MAE SES dan Holt-Winters dibandingkan di window yang sama (t >= satu musim,
+    # setelah inisialisasi HW), bukan termasuk error warm-up SES
+    ses, ses_mae, _ = fit_ses(y, horizon, score_from=SEASON_LENGTH)
+    hw, hw_mae, _ = fit_holt_winters(y, horizon)
+    croston, _, _ = fit_croston(y, horizon)
+    adi = average_demand_interval(y)
+
+    intermittent = adi > ADI_THRESHOLD
+    use_hw = ~intermittent & (hw_mae < ses_mae)
+    selected = np.where(intermittent, 'Croston', np.where(use_hw, 'Holt_Winters', 'SES'))
+    if hw is None:
+        hw = ses
+    auto = np.where(intermittent[:, None], croston, np.where(use_hw[:, None], hw, ses))
+    return {'SES': ses, 'Holt_Winters': hw, 'Croston': croston, 'Auto': auto,
+            'selected': selected, 'adi': adi}
+
+
+def _long(skus, months, matrices):
+    n, h = len(skus), len(months)
+    frame = pd.DataFrame({'SKU_ID': np.repeat(skus.to_numpy(), h), 'Month': np.tile(months.to_numpy(), n)})
+    for name, matrix in matrices.items():
+        frame[name] = matrix.ravel()
+    return frame
+
+
+def _benchmark(backtest, attrs):
+    """Rofo + semua model vs Sales aktual: metrik per model (total & per Brand)"""
+    frames = []
+    for model in ['Rofo'] + MODELS + ['Auto']:
+        frame = backtest[['SKU_ID', 'Month', 'Actual_Qty']].rename(columns={'Actual_Qty': 'PO_Qty'})
+        frame['Forecast_Qty'] = backtest[model].to_numpy()
+        frame['Model'] = 'Stat (Auto)' if model == 'Auto' else model
+        frames.append(frame)
+    errors = add_error_columns(pd.concat(frames, ignore_index=True))
+    errors = errors.join(attrs, on='SKU_ID')
+
+    rename = {'PO_Qty': 'Actual_Qty'}
+    return (aggregate_metrics(errors, ['Model']).rename(columns=rename),
+            aggregate_metrics(errors, ['Brand', 'Model']).rename(columns=rename))
+
+
+def calculate_stat_forecast(df_sales, df_forecast, df_product, horizon=None,
+                            backtest_months=DEFAULT_BACKTEST_MONTHS, diagnostics=None):
+    """
+    Baseline forecast semua SKU + benchmark vs Rofo.
+
+    Return dict:
+    - 'forecast': long SKU x bulan ke depan (SES, Holt_Winters, Croston, Auto, Rofo)
+    - 'models': per SKU model terpilih, ADI dan tipe demand
+    - 'backtest': long SKU x bulan uji (Actual_Qty, Rofo, tiap model)
+    - 'comparison' / 'comparison_brand': metrik akurasi per model
+    """
+    if df_sales.empty:
+        return {}
+
+    try:
+        sales = df_sales[['SKU_ID', 'Sales_Qty']].assign(_month=month_start(df_sales['Month'])).dropna(subset=['_month'])
+        skus = pd.Index(sales['SKU_ID'].unique(), name='SKU_ID').sort_values()
+        last_actual = sales['_month'].max()
+        months = pd.date_range(sales['_month'].min(), last_actual, freq='MS')
+        # Bulan tanpa baris sales = demand 0
+        y, _ = dense_matrix(sales, 'Sales_Qty', skus, months, (len(skus), len(months)))
+
+        rofo = pd.DataFrame(columns=['SKU_ID', 'Forecast_Qty', '_month'])
+        if not df_forecast.empty:
+            rofo = df_forecast[['SKU_ID', 'Forecast_Qty']].assign(_month=month_start(df_forecast['Month']))
+
+        if horizon is None:
+            future = pd.DatetimeIndex(rofo['_month'].dropna().unique()).sort_values()
+            horizon = int((future > last_actual).sum()) or DEFAULT_HORIZON
+        future_months = pd.date_range(last_actual + pd.DateOffset(months=1), periods=horizon, freq='MS')
+
+        attrs = pd.DataFrame(index=skus)
+        product = df_product.drop_duplicates('SKU_ID').set_index('SKU_ID') if not df_product.empty else pd.DataFrame()
+        for col in ['Brand', 'SKU_Tier']:
+            attrs[col] = skus.map(product[col]).fillna('Unknown') if col in product.columns else 'Unknown'
+
+        # 1. Forecast ke depan (fit pada seluruh histori)
+        result = forecast_all(y, horizon)
+        future_rofo, _ = dense_matrix(rofo, 'Forecast_Qty', skus, future_months, (len(skus), horizon))
+        forecast_long = _long(skus, future_months, {
+            **{model: result[model] for model in MODELS + ['Auto']}, 'Rofo': future_rofo
+        })
+        models = attrs.reset_index()
+        models['Model'] = result['selected']
+        models['ADI'] = result['adi']
+        models['Demand_Type'] = np.where(result['adi'] > ADI_THRESHOLD, 'Intermittent', 'Smooth')
+
+        output = {'forecast': forecast_long, 'models': models}
+
+        # 2. Backtest: fit tanpa bulan uji, bandingkan dengan Rofo
+        if len(months) > backtest_months + 2:
+            train, test_months = y[:, :-backtest_months], months[-backtest_months:]
+            backtest_result = forecast_all(train, backtest_months)
+            test_rofo, rofo_seen = dense_matrix(rofo, 'Forecast_Qty', skus, test_months, (len(skus), backtest_months))
+            backtest = _long(skus, test_months, {
+                'Actual_Qty': y[:, -backtest_months:], 'Rofo': test_rofo,
+                **{model: backtest_result[model] for model in MODELS + ['Auto']},
+            })
+            backtest = backtest[rofo_seen.ravel().astype(bool)].reset_index(drop=True)
+            if not backtest.empty:
+                output['backtest'] = backtest
+                output['comparison'], output['comparison_brand'] = _benchmark(backtest, attrs)
+
+        return output
+
+    except Exception as e:
+        add_diagnostic(diagnostics, 'error', 'calculate_stat_forecast', f"Statistical forecast error: {str(e)}")
+        return {}
@@ -0,0 +1,184 @@
+"""
+Synthetic workbook generator - data dummy dengan skema worksheet asli
+
+Dipakai untuk benchmark dan uji skala (mis. 10k / 50k SKU x 36 bulan):
+
+    python synthetic_data.py --skus 10000 --months 36 --out synthetic_10k/
+
+Output berupa folder <Sheet_Name>.csv yang bisa dibaca WorkbookSource
+(atau dashboard lewat SCM_WORKBOOK_PATH).
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+BRANDS = ['Aurora', 'Bloom', 'Cerise', 'Dahlia', 'Elara', 'Flora', 'Gaia', 'Helio', 'Iris', 'Juno']
+TIERS = ['Tier 1', 'Tier 2', 'Tier 3', 'Tier 4']
+STOCK_CATEGORIES = ['Good Stock', 'Near ED', 'Damaged']
+
+
+def _month_labels(start, n_months):
+    """Label kolom bulan format sheet asli, mis. 'Jan-25'"""
+    months = pd.date_range(start=start, periods=n_months, freq='MS')
+    return months, [m.strftime('%b-%y') for m in months]
+
+
+def _monthly_demand(rng, n_skus, months, sparsity):
+    """Matrix SKU x bulan: base demand lognormal x musiman x noise, dengan bulan kosong acak"""
+    base = rng.lognormal(mean=3.5, sigma=1.2, size=(n_skus, 1))
+    phase = rng.uniform(0, 2 * np.pi, size=(n_skus, 1))
+    amplitude = rng.uniform(0.0, 0.5, size=(n_skus, 1))
+    month_num = np.asarray(months.month).reshape(1, -1)
+    seasonal = 1 + amplitude * np.sin(2 * np.pi * month_num / 12 + phase)
+    trend = 1 + rng.normal(0, 0.01, size=(n_skus, 1)) * np.arange(len(months)).reshape(1, -1)
+
+    demand = rng.poisson(np.clip(base * seasonal * trend, 0, None)).astype(float)
+
+    # Sparsity: SKU intermittent punya peluang bulan nol lebih besar
+    intermittent = rng.random((n_skus, 1)) < sparsity
+    zero_prob = np.where(intermittent, 0.6, sparsity * 0.2)
+    demand[rng.random(demand.shape) < zero_prob] = 0
+    return demand
+
+
+def _wide_frame(id_frame, labels, values):
+    month_frame = pd.DataFrame(np.rint(values).astype(np.int64), columns=labels)
+    return pd.concat([id_frame.reset_index(drop=True), month_frame], axis=1)
+
+
+def generate_workbook(n_skus=1000, n_months=36, start='2023-01-01', forecast_horizon=6,
+                      sparsity=0.3, batches_per_sku=3, inactive_share=0.1, seed=42):
+    """
+    Bangun semua worksheet sebagai dict nama_sheet -> DataFrame.
+
+    - n_months: panjang histori Sales / Rofo / PO
+    - forecast_horizon: bulan Rofo ke depan setelah histori
+    - sparsity: proporsi SKU intermittent (banyak bulan tanpa penjualan)
+    - batches_per_sku: rata-rata jumlah batch (baris) per SKU di Stock_Onhand
+    """
+    rng = np.random.default_rng(seed)
+
+    sku_ids = np.array([f"SKU{i:06d}" for i in range(n_skus)])
+    brands = rng.choice(BRANDS, size=n_skus)
+    tiers = rng.choice(TIERS, size=n_skus, p=[0.15, 0.25, 0.35, 0.25])
+    status = np.where(rng.random(n_skus) < inactive_share, 'Inactive', 'Active')
+    floor_price = np.round(rng.uniform(20_000, 500_000, size=n_skus), -2)
+    net_order_price = np.round(floor_price * rng.uniform(0.4, 0.85, size=n_skus), -2)
+    product_names = np.char.add(np.char.add(brands.astype(str), ' Product '), np.arange(n_skus).astype(str))
+
+    product = pd.DataFrame({
+        'SKU_ID': sku_ids,
+        'Product_Name': product_names,
+        'Brand': brands,
+        'SKU_Tier': tiers,
+        'Status': status,
+        'Floor_Price': floor_price,
+        'Net_Order_Price': net_order_price,
+    })
+
+    months, labels = _month_labels(start, n_months)
+    fcst_months, fcst_labels = _month_labels(start, n_months + forecast_horizon)
+
+    sales = _monthly_demand(rng, n_skus, months, sparsity)
+    future = _monthly_demand(rng, n_skus, fcst_months[n_months:], sparsity) if forecast_horizon else np.zeros((n_skus, 0))
+    rofo = np.hstack([sales, future]) * rng.normal(1.0, 0.2, size=(n_skus, n_months + forecast_horizon)).clip(0.2)
+    po = rofo[:, :n_months] * rng.normal(1.0, 0.25, size=(n_skus, n_months)).clip(0.0)
+
+    ids = product[['SKU_ID', 'Product_Name', 'Brand', 'SKU_Tier']]
+    sheets = {
+        'Product_Master': product,
+        'Sales': _wide_frame(ids, labels, sales),
+        'Rofo': _wide_frame(product[['SKU_ID', 'Product_Name', 'Brand']], fcst_labels, rofo),
+        'PO': _wide_frame(product[['SKU_ID']], labels, po),
+    }
+
+    # Stock_Onhand: beberapa batch per SKU dengan tanggal expiry berbeda
+    n_batches = rng.poisson(batches_per_sku, size=n_skus).clip(1)
+    batch_sku = np.repeat(np.arange(n_skus), n_batches)
+    avg_sales = sales[:, -3:].mean(axis=1)
+    batch_qty = rng.poisson(avg_sales[batch_sku] * rng.uniform(0.1, 1.5, size=len(batch_sku)))
+    days_to_expiry = rng.integers(-30, 720, size=len(batch_sku))
+    expiry = pd.Timestamp(months[-1]) + pd.to_timedelta(days_to_expiry, unit='D')
+    sheets['Stock_Onhand'] = pd.DataFrame({
+        'SKU_ID': sku_ids[batch_sku],
+        'Product_Code': np.char.add('ANC-', batch_sku.astype(str)),
+        'Product_Name': product_names[batch_sku],
+        'Qty_Available': batch_qty,
+        'Stock_Category': rng.choice(STOCK_CATEGORIES, size=len(batch_sku), p=[0.85, 0.1, 0.05]),
+        'Expiry_Date': expiry.strftime('%Y-%m-%d'),
+    })
+
+    # Forecast 2026 (ecomm) dan reseller (histori 2025 + forecast 2026)
+    months_2026, labels_2026 = _month_labels('2026-01-01', 12)
+    months_2025, labels_2025 = _month_labels('2025-01-01', 12)
+    sheets['Forecast_2026_Ecomm'] = _wide_frame(
+        product[['SKU_ID', 'Product_Name', 'Brand']], labels_2026,
+        _monthly_demand(rng, n_skus, months_2026, sparsity)
+    )
+    reseller_ids = product[['SKU_ID', 'Brand', 'Product_Name', 'SKU_Tier', 'Floor_Price']]
+    reseller_hist = _monthly_demand(rng, n_skus, months_2025, sparsity) * 0.3
+    sheets['Forecast_2026_Reseller'] = _wide_frame(
+        product[['SKU_ID', 'Product_Name', 'Brand']], labels_2025 + labels_2026,
+        np.hstack([reseller_hist, _monthly_demand(rng, n_skus, months_2026, sparsity) * 0.3])
+    )
+    sheets['Sales_Reseller'] = _wide_frame(reseller_ids, labels_2025, reseller_hist)
+    sheets['Past_Rofo_Reseller'] = _wide_frame(
+        reseller_ids, labels_2025, reseller_hist * rng.normal(1.0, 0.2, size=reseller_hist.shape).clip(0.2)
+    )
+    sheets['Past_PO_Reseller'] = _wide_frame(
+        reseller_ids, labels_2025, reseller_hist * rng.normal(1.0, 0.25, size=reseller_hist.shape).clip(0.0)
+    )
+
+    # BS_Fullfilment_Cost: angka diformat string seperti di sheet asli ('1,234' / '3.14%')
+    n_bs = min(n_months, 24)
+    bs_months, bs_labels = _month_labels(months[-n_bs], n_bs)
+    orders = rng.integers(5_000, 50_000, size=n_bs)
+    gmv_bs = orders * rng.uniform(80_000, 150_000, size=n_bs)
+    gmv_total = gmv_bs * rng.uniform(1.2, 2.0, size=n_bs)
+    total_cost = orders * rng.uniform(3_000, 8_000, size=n_bs)
+    sheets['BS_Fullfilment_Cost'] = pd.DataFrame({
+        'Month': bs_labels,
+        'Total Order(BS)': [f"{v:,.0f}" for v in orders],
+        'GMV (Fullfil By BS)': [f"{v:,.0f}" for v in gmv_bs],
+        'GMV Total (MP)': [f"{v:,.0f}" for v in gmv_total],
+        'Total Cost': [f"{v:,.0f}" for v in total_cost],
+        'BSA': [f"{v:,.0f}" for v in total_cost * 0.1],
+        '%Cost': [f"{v:.2f}%" for v in total_cost / gmv_bs * 100],
+    })
+
+    return sheets
+
+
+def write_workbook(sheets, out_dir):
+    """Tulis setiap worksheet ke <out_dir>/<Sheet_Name>.csv"""
+    os.makedirs(out_dir, exist_ok=True)
+    for name, df in sheets.items():
+        df.to_csv(os.path.join(out_dir, f"{name}.csv"), index=False)
+    return out_dir
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic SCM workbook")
+    parser.add_argument('--skus', type=int, default=1000)
+    parser.add_argument('--months', type=int, default=36)
+    parser.add_argument('--start', default='2023-01-01')
+    parser.add_argument('--sparsity', type=float, default=0.3)
+    parser.add_argument('--batches-per-sku', type=float, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--out', default='synthetic_workbook')
+    args = parser.parse_args(argv)
+
+    sheets = generate_workbook(
+        n_skus=args.skus, n_months=args.months, start=args.start,
+        sparsity=args.sparsity, batches_per_sku=args.batches_per_sku, seed=args.seed
+    )
+    write_workbook(sheets, args.out)
+    for name, df in sheets.items():
+        print(f"{name:<25}{len(df):>10,} rows")
+    print(f"Wrote workbook to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+"""
+Load telemetry - riwayat per load (durasi, baris per worksheet, API call, kegagalan)
+
+Setiap eksekusi loader menambah satu baris JSON ke file append-only
+(default telemetry/load_history.jsonl, bisa diganti lewat SCM_TELEMETRY_PATH).
+Riwayat dipakai untuk melihat tren: pertumbuhan sheet vs latency, dan kapan
+durasi load diperkirakan melewati batas tertentu.
+"""
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from diagnostics import add_diagnostic
+
+DEFAULT_TELEMETRY_PATH = os.environ.get('SCM_TELEMETRY_PATH', os.path.join('telemetry', 'load_history.jsonl'))
+
+_write_lock = threading.Lock()
+
+
+class RecordingSource:
+    """Bungkus data source: catat baris, durasi dan error per worksheet yang dibaca"""
+
+    def __init__(self, source):
+        self.source = source
+        self.sheets = {}
+        self.failures = []
+        self.calls = 0
+
+    def _call(self, method, sheet_name):
+        self.calls += 1
+        start = time.perf_counter()
+        try:
+            values = getattr(self.source, method)(sheet_name)
+        except Exception as e:
+            self.failures.append({'sheet': sheet_name, 'error': f"{type(e).__name__}: {e}"})
+            raise
+        rows = len(values) - 1 if method == 'get_all_values' else len(values)
+        entry = self.sheets.setdefault(sheet_name, {'rows': 0, 'seconds': 0.0})
+        entry['rows'] = max(rows, 0)
+        entry['seconds'] += time.perf_counter() - start
+        return values
+
+    def get_all_records(self, sheet_name):
+        return self._call('get_all_records', sheet_name)
+
+    def get_all_values(self, sheet_name):
+        return self._call('get_all_values', sheet_name)
+
+
+def append_record(record, path=None):
+    """Tambah satu record ke file JSON lines (append-only)"""
+    path = path or DEFAULT_TELEMETRY_PATH
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    line = json.dumps(record, default=str)
+    with _write_lock, open(path, 'a', encoding='utf-8') as f:
+        f.write(line + '\n')
+
+
+def run_load_with_telemetry(loader_name, loader, source, diagnostics=None, path=None):
+    """
+    Jalankan loader(source, diagnostics) lalu simpan satu record telemetry.
+    Gagal menulis telemetry tidak menggagalkan load (cukup jadi diagnostic).
+    """
+    diagnostics = [] if diagnostics is None else diagnostics
+    recording = RecordingSource(source)
+    api_calls_before = getattr(source, 'api_calls', None)
+    diagnostics_before = len(diagnostics)
+    started_at = datetime.now()
+    start = time.perf_counter()
+    result = None
+    exception = None
+
+    try:
+        result = loader(recording, diagnostics)
+        return result
+    except Exception as e:
+        exception = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        new_diagnostics = diagnostics[diagnostics_before:]
+        errors = sum(1 for d in new_diagnostics if d['level'] == 'error')
+        data_version = result.get('data_version') if isinstance(result, dict) else None
+        api_calls_after = getattr(source, 'api_calls', None)
+        record = {
+            'started_at': started_at.isoformat(timespec='seconds'),
+            'loader': loader_name,
+            'source': type(source).__name__,
+            'duration_s': round(time.perf_counter() - start, 4),
+            'api_calls': (api_calls_after - api_calls_before) if api_calls_before is not None else recording.calls,
+            'total_rows': sum(s['rows'] for s in recording.sheets.values()),
+            'sheets': recording.sheets,
+            'failures': recording.failures,
+            'errors': errors,
+            'warnings': sum(1 for d in new_diagnostics if d['level'] == 'warning'),
+            # Loader menangkap error sendiri dan return {} -> hanya hasil non-kosong
+            # dengan data_version dan tanpa error yang dihitung selesai
+            'completed': bool(result) and data_version is not None and errors == 0 and exception is None,
+            'exception': exception,
+            'data_version': data_version,
+        }
+        try:
+            append_record(record, path)
+        except OSError as e:
+            add_diagnostic(diagnostics, 'warning', 'telemetry', f"⚠️ Load telemetry not saved: {str(e)}")
+
+
+def read_history(path=None):
+    """Baca semua record; baris rusak (mis. tulisan terpotong) dilewati"""
+    path = path or DEFAULT_TELEMETRY_PATH
+    records = []
+    if not os.path.exists(path):
+        return records
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return records
+
+
+def load_history_frame(records):
+    """Satu baris per load"""
+    columns = ['started_at', 'loader', 'source', 'duration_s', 'api_calls', 'total_rows',
+               'n_failures', 'errors', 'warnings', 'completed', 'exception', 'data_version']
+    if not records:
+        return pd.DataFrame(columns=columns)
+    df = pd.DataFrame(records).reindex(columns=list(dict.fromkeys(columns + ['failures'])))
+    df['started_at'] = pd.to_datetime(df['started_at'], errors='coerce')
+    df['n_failures'] = df['failures'].apply(lambda f: len(f) if isinstance(f, list) else 0)
+    df['completed'] = df['completed'].fillna(False).astype(bool)
+    return df.reindex(columns=columns).sort_values('started_at').reset_index(drop=True)
+
+
+def sheet_history_frame(records):
+    """Satu baris per load x worksheet"""
+    rows = [
+        {'started_at': r['started_at'], 'loader': r['loader'], 'sheet': sheet,
+         'rows': stats['rows'], 'seconds': stats['seconds']}
+        for r in records for sheet, stats in r.get('sheets', {}).items()
+    ]
+    if not rows:
+        return pd.DataFrame(columns=['started_at', 'loader', 'sheet', 'rows', 'seconds'])
+    df = pd.DataFrame(rows)
+    df['started_at'] = pd.to_datetime(df['started_at'], errors='coerce')
+    return df.sort_values('started_at').reset_index(drop=True)
+
+
+def summarize_trend(history, loader='load_and_process_data', limit_seconds=60.0):
+    """
+    Tren kapasitas satu loader dari riwayat:
+    - seconds_per_1k_rows: slope regresi durasi vs total baris
+    - rows_per_day: slope pertumbuhan total baris terhadap waktu
+    - projected_limit_date: kapan durasi diperkirakan melewati limit_seconds
+    Return None jika data belum cukup (butuh >= 3 load sukses).
+    """
+    done = history['completed'] if 'completed' in history.columns else True
+    df = history[(history['loader'] == loader) & (history['total_rows'] > 0) & done].dropna(subset=['started_at'])
+    if len(df) < 3:
+        return None
+
+    rows = df['total_rows'].to_numpy(dtype=float)
+    duration = df['duration_s'].to_numpy(dtype=float)
+    days = (df['started_at'] - df['started_at'].iloc[0]).dt.total_seconds().to_numpy() / 86400
+
+    summary = {
+        'loads': len(df),
+        'latest_rows': int(rows[-1]),
+        'latest_duration_s': float(duration[-1]),
+        'seconds_per_1k_rows': None,
+        'rows_per_day': None,
+        'projected_limit_date': None,
+    }
+
+    if np.ptp(rows) > 0:
+        slope, intercept = np.polyfit(rows, duration, 1)
+        summary['seconds_per_1k_rows'] = float(slope * 1000)
+    else:
+        slope, intercept = None, None
+
+    if np.ptp(days) > 0 and np.ptp(rows) > 0:
+        summary['rows_per_day'] = float(np.polyfit(days, rows, 1)[0])
+
+    if slope and slope > 0 and summary['rows_per_day'] and summary['rows_per_day'] > 0:
+        rows_at_limit = (limit_seconds - intercept) / slope
+        days_left = (rows_at_limit - rows[-1]) / summary['rows_per_day']
+        if days_left >= 0:
+            summary['projected_limit_date'] = (df['started_at'].iloc[-1] + pd.Timedelta(days=days_left)).date()
+
+    return summary
@@ -0,0 +1,43 @@
+"""
+Fixture bersama - modul dashboard berupa file flat di root repo, jadi root
+ditambahkan ke sys.path. Data dari synthetic_data.generate_workbook (kecil,
+seed tetap) lewat MemorySource, sama seperti benchmark.py.
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cache_manager  # noqa: E402
+import data_loader  # noqa: E402
+from data_sources import MemorySource  # noqa: E402
+from synthetic_data import generate_workbook  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def workbook():
+    """Worksheet synthetic; copy dulu sebelum diubah di test"""
+    return generate_workbook(n_skus=60, n_months=18, seed=7)
+
+
+@pytest.fixture
+def load_data():
+    """Jalankan loader utama pada dict worksheet -> dataset (dengan dataset_versions)"""
+    def load(sheets):
+        diagnostics = []
+        data = data_loader.load_and_process_data(MemorySource(sheets), diagnostics)
+        assert not [d for d in diagnostics if d['level'] == 'error'], diagnostics
+        return data
+    return load
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache():
+    """Cache global & budget dikembalikan seperti semula setelah setiap test"""
+    budget = cache_manager.get_memory_budget()
+    cache_manager.clear_all()
+    yield
+    cache_manager.clear_all()
+    cache_manager.set_memory_budget(budget)
@@ -0,0 +1,70 @@
+"""
+Forecast bias & tracking signal (analytics.py) terhadap perhitungan referensi
+"""
+import numpy as np
+import pandas as pd
+
+import analytics
+
+
+def forecast_bias_loop(df_forecast, df_po):
+    """Implementasi lama calculate_forecast_bias (loop per bulan) sebagai referensi"""
+    common_months = sorted(set(df_forecast['Month'].unique()) & set(df_po['Month'].unique()))
+    rows = []
+    for month in common_months:
+        merged = pd.merge(
+            df_forecast[df_forecast['Month'] == month][['SKU_ID', 'Forecast_Qty']],
+            df_po[df_po['Month'] == month][['SKU_ID', 'PO_Qty']],
+            on='SKU_ID', how='inner'
+        )
+        merged['Bias'] = merged['PO_Qty'] - merged['Forecast_Qty']
+        merged['Bias_Percentage'] = np.where(
+            merged['Forecast_Qty'] > 0, merged['Bias'] / merged['Forecast_Qty'] * 100, 0
+        )
+        rows.append({
+            'Month': month,
+            'Avg_Bias': merged['Bias'].mean(),
+            'Avg_Bias_Percentage': merged['Bias_Percentage'].mean(),
+            'Over_Forecast_SKUs': len(merged[merged['Bias'] > 0]),
+            'Under_Forecast_SKUs': len(merged[merged['Bias'] < 0]),
+        })
+    return pd.DataFrame(rows)
+
+
+def test_forecast_bias_matches_month_loop(workbook, load_data):
+    data = load_data(workbook)
+    forecast, po = data['forecast'], data['po']
+    result = analytics.calculate_forecast_bias(forecast, po)
+    expected = forecast_bias_loop(forecast, po)
+    assert len(result) == len(expected) > 0
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+
+def tracking_frame(months, bias):
+    months = pd.to_datetime(months)
+    return (
+        pd.DataFrame({'SKU_ID': 'A', 'Month': months, 'Forecast_Qty': 100.0}),
+        pd.DataFrame({'SKU_ID': 'A', 'Month': months, 'PO_Qty': 100.0 + np.asarray(bias, dtype='float64')}),
+    )
+
+
+def test_tracking_window_counts_calendar_months():
+    # Jan-Mar lalu loncat ke Aug: window 3 bulan di Aug hanya berisi Aug
+    forecast, po = tracking_frame(['2024-01-01', '2024-02-01', '2024-03-01', '2024-08-01'], [10, 10, 10, -5])
+    result = analytics.calculate_bias_tracking(forecast, po, pd.DataFrame(), window=3)
+    sku = result['sku'].set_index('Month')
+    assert sku.loc['2024-03-01', 'Rolling_Bias'] == 10
+    assert sku.loc['2024-08-01', 'Rolling_Bias'] == -5
+    assert sku.loc['2024-08-01', 'Tracking_Signal'] == -1
+    assert result['brand'].set_index('Month').loc['2024-08-01', 'Rolling_Bias'] == -5
+
+
+def test_tracking_window_does_not_cross_skus():
+    forecast_a, po_a = tracking_frame(['2024-01-01', '2024-02-01'], [8, 8])
+    forecast_b, po_b = tracking_frame(['2024-02-01', '2024-03-01'], [-4, -4])
+    forecast = pd.concat([forecast_a, forecast_b.assign(SKU_ID='B')], ignore_index=True)
+    po = pd.concat([po_a, po_b.assign(SKU_ID='B')], ignore_index=True)
+    result = analytics.calculate_bias_tracking(forecast, po, pd.DataFrame(), window=6)
+    latest = result['latest_sku'].set_index('SKU_ID')
+    assert latest.loc['A', 'Tracking_Signal'] == 2
+    assert latest.loc['B', 'Tracking_Signal'] == -2
@@ -0,0 +1,75 @@
+"""
+Anomaly detection (anomalies.py) dibanding median/MAD per SKU dan anomali yang disuntikkan
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from anomalies import (MAD_SCALE, MEAN_AD_SCALE, Z_THRESHOLD, annotate_deviation, calculate_anomalies,
+                       detect_matrix, robust_z)
+
+
+def direct_robust_z(row):
+    """Robust z satu SKU dari nilai yang diobservasi saja"""
+    observed = row[~np.isnan(row)]
+    median = np.median(observed)
+    deviation = np.abs(observed - median)
+    mad = np.median(deviation)
+    scale = mad / MAD_SCALE if mad > 0 else MEAN_AD_SCALE * deviation.mean()
+    z = np.full(len(row), np.nan)
+    z[~np.isnan(row)] = (observed - median) / scale if scale > 0 else 0.0
+    return z
+
+
+def test_robust_z_matches_direct_median_mad():
+    rng = np.random.default_rng(2)
+    values = rng.gamma(2.0, 50.0, (40, 14))
+    values[rng.random(values.shape) < 0.2] = np.nan
+    values[0] = [0.0] * 10 + [30.0, 0.0, 0.0, 0.0]  # MAD = 0 -> mean absolute deviation
+    values[1] = 7.0  # tanpa variasi -> z = 0
+
+    z, median = robust_z(values)
+    np.testing.assert_allclose(z, np.array([direct_robust_z(row) for row in values]), atol=1e-10)
+    np.testing.assert_allclose(median, np.nanmedian(values, axis=1))
+    assert np.all(z[1] == 0)
+
+
+def test_detect_matrix_flags_and_min_history():
+    base = np.array([100.0, 104, 98, 101, 97, 103, 99, 102, 100, 96, 101, 98])
+    spike, drop, short = base.copy(), base.copy(), np.full(12, np.nan)
+    spike[7], drop[4], short[:5] = 400.0, 5.0, [100.0, 100, 101, 900, 99]
+    shift = np.array([10.0, 11, 10, 12, 11, 40, 41, 39, 40, 42, 41, 40])
+
+    flag = detect_matrix(np.vstack([base, spike, drop, short, shift]))['flag']
+    assert (flag[0] == '').all()
+    assert flag[1, 7] == 'Spike'
+    assert flag[2, 4] == 'Drop'
+    assert (flag[3] == '').all()
+    assert flag[4, 5] == 'Jump Up'
+
+
+def test_injected_spike_detected_on_workbook(workbook, load_data):
+    data = load_data(workbook)
+    sales = data['sales'].copy()
+    months = sorted(sales['Month'].unique())
+    sku = sales.groupby('SKU_ID')['Sales_Qty'].median().idxmax()
+    target = (sales['SKU_ID'] == sku) & (sales['Month'] == months[9])
+    sales.loc[target, 'Sales_Qty'] = sales.loc[sales['SKU_ID'] == sku, 'Sales_Qty'].median() * 20
+
+    alerts = calculate_anomalies(sales, data['forecast'], data['po'], data['product'])['alerts']
+    hit = alerts[(alerts['SKU_ID'] == sku) & (alerts['Measure'] == 'Sales_Qty') & (alerts['Month'] == months[9])]
+    assert list(hit['Flag']) == ['Spike']
+    assert hit['Robust_Z'].iloc[0] >= Z_THRESHOLD
+
+    # Setiap alert Spike/Drop sales sama dengan robust z langsung dari histori SKU-nya
+    scored = alerts[(alerts['Measure'] == 'Sales_Qty') & alerts['Flag'].isin(['Spike', 'Drop'])]
+    wide = sales.pivot_table(index='SKU_ID', columns='Month', values='Sales_Qty', aggfunc='sum')
+    for _, alert in scored.iterrows():
+        row = wide.loc[alert['SKU_ID']].to_numpy(dtype='float64')
+        expected = direct_robust_z(row)[list(wide.columns).index(alert['Month'])]
+        assert alert['Robust_Z'] == pytest.approx(expected, rel=1e-10)
+
+    table = pd.DataFrame({'SKU_ID': [sku, 'OTHER']})
+    annotated = annotate_deviation(table, alerts, months[9])
+    assert 'Sales_Qty: Spike' in annotated.loc[0, 'Anomaly_Flags']
+    assert annotated.loc[1, 'Anomaly_Flags'] == ''
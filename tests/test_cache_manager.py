@@ -0,0 +1,67 @@
+"""
+cache_manager.cached: compute per key diserialisasi antar thread (session)
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+import cache_manager
+from dag import run_incremental
+from pipeline import ANALYTICS_STEPS
+
+
+def test_concurrent_miss_computes_once():
+    calls = []
+
+    @cache_manager.cached('test.slow')
+    def slow(x, diagnostics=None):
+        calls.append(x)
+        time.sleep(0.2)
+        diagnostics.append({'level': 'info', 'source': 'slow', 'message': 'computed'})
+        return pd.DataFrame({'x': [x]})
+
+    start = threading.Barrier(6)
+
+    def session():
+        start.wait()
+        diagnostics = []
+        return slow(1, diagnostics=diagnostics), diagnostics
+
+    with ThreadPoolExecutor(6) as pool:
+        results = list(pool.map(lambda _: session(), range(6)))
+
+    assert calls == [1]
+    for frame, diagnostics in results:
+        pd.testing.assert_frame_equal(frame, pd.DataFrame({'x': [1]}))
+        assert [d['message'] for d in diagnostics] == ['computed']
+    stats = cache_manager.cache_stats_frame().set_index('function').loc['test.slow']
+    assert (stats['misses'], stats['hits']) == (1, 5)
+
+
+def test_different_keys_compute_in_parallel():
+    both_inside = threading.Barrier(2, timeout=5)
+
+    @cache_manager.cached('test.parallel')
+    def meet(x):
+        both_inside.wait()
+        return x
+
+    with ThreadPoolExecutor(2) as pool:
+        assert sorted(pool.map(meet, [1, 2])) == [1, 2]
+
+
+def test_concurrent_dag_runs_compute_each_node_once(workbook, load_data):
+    data = load_data(workbook)
+    start = threading.Barrier(3)
+
+    def session():
+        start.wait()
+        return run_incremental(ANALYTICS_STEPS, data, cache_prefix='test_concurrent')[1]
+
+    with ThreadPoolExecutor(3) as pool:
+        infos = list(pool.map(lambda _: session(), range(3)))
+
+    computed = [name for info in infos for name in info['computed']]
+    assert sorted(computed) == sorted(name for name, _, _ in ANALYTICS_STEPS)
@@ -0,0 +1,128 @@
+"""
+Invalidasi DAG per dataset (dag.run_incremental) dan eviction cache_manager
+di bawah memory budget
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+import cache_manager
+from dag import affected_nodes, run_incremental
+from pipeline import ANALYTICS_STEPS
+
+STEPS = ANALYTICS_STEPS
+
+
+def assert_same(left, right, path='result'):
+    """Bandingkan hasil analytics (dict / list / DataFrame / array) secara rekursif"""
+    if isinstance(left, pd.DataFrame):
+        pd.testing.assert_frame_equal(left, right, obj=path)
+    elif isinstance(left, pd.Series):
+        pd.testing.assert_series_equal(left, right, obj=path)
+    elif isinstance(left, np.ndarray):
+        np.testing.assert_array_equal(left, right, err_msg=path)
+    elif isinstance(left, dict):
+        assert set(left) == set(right), path
+        for key in left:
+            assert_same(left[key], right[key], f"{path}[{key!r}]")
+    elif isinstance(left, (list, tuple)):
+        assert len(left) == len(right), path
+        for i, (a, b) in enumerate(zip(left, right)):
+            assert_same(a, b, f"{path}[{i}]")
+    elif isinstance(left, float) and np.isnan(left):
+        assert isinstance(right, float) and np.isnan(right), path
+    elif hasattr(left, 'memory_bytes'):
+        assert type(left) is type(right), path
+    else:
+        assert left == right, path
+
+
+def with_stock_change(workbook):
+    sheets = dict(workbook)
+    stock = workbook['Stock_Onhand'].copy()
+    stock.loc[stock.index[0], 'Qty_Available'] = stock['Qty_Available'].iloc[0] + 500
+    sheets['Stock_Onhand'] = stock
+    return sheets
+
+
+def test_same_data_reuses_every_node(workbook, load_data):
+    data = load_data(workbook)
+    _, first = run_incremental(STEPS, data, cache_prefix='test')
+    assert first['computed'] == [name for name, _, _ in STEPS]
+
+    _, second = run_incremental(STEPS, load_data(workbook), cache_prefix='test')
+    assert second['computed'] == []
+    assert second['versions'] == first['versions']
+
+
+def test_changed_dataset_recomputes_only_dependents(workbook, load_data):
+    before = load_data(workbook)
+    run_incremental(STEPS, before, cache_prefix='test')
+
+    after = load_data(with_stock_change(workbook))
+    changed = {name for name, version in after['dataset_versions'].items()
+               if before['dataset_versions'].get(name) != version}
+    assert changed == {'stock'}
+
+    results, info = run_incremental(STEPS, after, cache_prefix='test')
+    expected = affected_nodes(STEPS, changed)
+    assert {'inventory_metrics', 'inventory_financial', 'stock_projection', 'slow_movers'} <= expected
+    assert set(info['computed']) == expected
+    assert set(info['reused']) == {name for name, _, _ in STEPS} - expected
+
+    # Hasil campuran cache + compute harus sama dengan hitung penuh dari nol
+    fresh, fresh_info = run_incremental(STEPS, after, cache_prefix='test_fresh')
+    assert fresh_info['reused'] == []
+    assert_same(results, fresh)
+
+
+def test_fingerprint_fallback_detects_in_place_edit(workbook, load_data):
+    data = load_data(workbook)
+    data.pop('dataset_versions')
+    run_incremental(STEPS, data, cache_prefix='test')
+
+    sales = data['sales'].copy()
+    sales.loc[sales.index[0], 'Sales_Qty'] += 1
+    data['sales'] = sales
+    _, info = run_incremental(STEPS, data, cache_prefix='test')
+    assert set(info['computed']) == affected_nodes(STEPS, {'sales'})
+
+
+def test_budget_evicts_derived_before_raw():
+    cache_manager.set_memory_budget(64 * 1024 ** 2)
+    raw = np.zeros(1024 ** 2 // 8)
+    derived = np.zeros(1024 ** 2 // 8)
+    cache_manager.store('test.raw', 'a', raw, tier='raw')
+    for key in 'abc':
+        cache_manager.store('test.derived', key, derived, tier='derived')
+    assert cache_manager.total_bytes() == 4 * 1024 ** 2
+
+    cache_manager.set_memory_budget(int(2.5 * 1024 ** 2))
+    assert cache_manager.total_bytes() <= cache_manager.get_memory_budget()
+    assert cache_manager.lookup('test.raw', 'a', tier='raw')[0]
+    assert sum(cache_manager.lookup('test.derived', key)[0] for key in 'abc') == 1
+
+
+def test_new_entry_survives_its_own_store():
+    cache_manager.set_memory_budget(1024 ** 2)
+    cache_manager.store('test.derived', 'old', np.zeros(1024 ** 2 // 16))
+    cache_manager.store('test.derived', 'new', np.zeros(1024 ** 2 // 8))
+    assert cache_manager.lookup('test.derived', 'new')[0]
+    assert not cache_manager.lookup('test.derived', 'old')[0]
+
+
+@pytest.mark.parametrize('budget_mb', [0, 1])
+def test_evicted_nodes_are_recomputed_not_stale(workbook, load_data, budget_mb):
+    cache_manager.set_memory_budget(budget_mb * 1024 ** 2)
+    before = load_data(workbook)
+    evictions = cache_manager.budget_summary()['budget_evictions']
+    run_incremental(STEPS, before, cache_prefix='test')
+    assert cache_manager.budget_summary()['budget_evictions'] > evictions
+
+    after = load_data(with_stock_change(workbook))
+    results, info = run_incremental(STEPS, after, cache_prefix='test')
+    assert affected_nodes(STEPS, {'stock'}) <= set(info['computed'])
+
+    cache_manager.set_memory_budget(512 * 1024 ** 2)
+    fresh, _ = run_incremental(STEPS, after, cache_prefix='test_fresh')
+    assert_same(results, fresh)
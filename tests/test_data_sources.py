@@ -0,0 +1,41 @@
+"""
+WorkbookSource (data_sources.py): sheet yang sudah terbaca dibuang saat file sumber berubah
+"""
+import os
+
+import pandas as pd
+
+from data_sources import WorkbookSource
+
+
+def write_csv(path, rows, mtime_ns):
+    pd.DataFrame(rows).to_csv(path, index=False)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_csv_folder_edit_in_place_is_reloaded(tmp_path):
+    sheet = tmp_path / 'Sales.csv'
+    write_csv(sheet, {'SKU_ID': ['A'], 'Qty': ['1']}, 1_000_000_000_000_000_000)
+    os.utime(tmp_path, ns=(1_000_000_000_000_000_000,) * 2)
+    source = WorkbookSource(str(tmp_path))
+    assert source.get_all_values('Sales') == [['SKU_ID', 'Qty'], ['A', '1']]
+    source.get_all_values('Sales')
+    assert source.api_calls == 1
+
+    # Edit file in place; mtime folder dikembalikan supaya tidak ikut berubah
+    folder_mtime = os.stat(tmp_path).st_mtime_ns
+    write_csv(sheet, {'SKU_ID': ['A'], 'Qty': ['2']}, 1_000_000_001_000_000_000)
+    os.utime(tmp_path, ns=(folder_mtime, folder_mtime))
+
+    assert source.get_all_values('Sales') == [['SKU_ID', 'Qty'], ['A', '2']]
+    assert source.api_calls == 2
+
+
+def test_size_change_with_same_mtime_is_detected(tmp_path):
+    path = tmp_path / 'Sales.csv'
+    write_csv(path, {'SKU_ID': ['A']}, 1_000_000_000_000_000_000)
+    folder, single = WorkbookSource(str(tmp_path)), WorkbookSource(str(path))
+    before = folder.signature(), single.signature()
+    write_csv(path, {'SKU_ID': ['A', 'B']}, 1_000_000_000_000_000_000)
+    assert folder.signature() != before[0]
+    assert single.signature() != before[1]
@@ -0,0 +1,34 @@
+"""
+FrozenDatasets (data_store.py): data bersama read-only tapi tetap bisa dipakai seperti dict hasil load
+"""
+import pytest
+
+from data_store import freeze_datasets
+
+
+def test_month_columns_select_dataframe(workbook, load_data):
+    data = load_data(workbook)
+    frozen = freeze_datasets(data)
+    cols = frozen['ecomm_forecast_month_cols']
+    assert cols == list(data['ecomm_forecast_month_cols']) and cols
+    assert list(frozen['ecomm_forecast'][cols].columns) == cols
+
+    # List yang dikembalikan milik caller, bukan milik store
+    cols.append('extra')
+    assert 'extra' not in frozen['ecomm_forecast_month_cols']
+
+
+def test_store_and_versions_are_read_only(workbook, load_data):
+    frozen = freeze_datasets(load_data(workbook))
+    with pytest.raises(TypeError):
+        frozen['sales'] = None
+    with pytest.raises(TypeError):
+        frozen['dataset_versions']['sales'] = 'stale'
+    assert frozen.get('dataset_versions')['sales'] == load_data(workbook)['dataset_versions']['sales']
+
+
+def test_dataframe_writes_stay_in_session_view(workbook, load_data):
+    frozen = freeze_datasets(load_data(workbook))
+    view = frozen['sales']
+    view['Sales_Qty'] = 0
+    assert (frozen['sales']['Sales_Qty'] != 0).any()
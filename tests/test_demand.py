@@ -0,0 +1,65 @@
+"""
+Demand-rate engine (demand.py) dan rata-rata 3 bulan di inventory metrics
+"""
+import numpy as np
+import pandas as pd
+
+import analytics
+from demand import ewma, rolling_mean, sales_matrix
+
+
+def old_avg_3m(df_sales):
+    """Perhitungan lama: mean baris Sales_Qty di 3 bulan sales terakhir per SKU"""
+    last_3 = sorted(df_sales['Month'].unique())[-3:]
+    return df_sales[df_sales['Month'].isin(last_3)].groupby('SKU_ID')['Sales_Qty'].mean()
+
+
+def inventory_avg(data, df_sales):
+    result = analytics.calculate_inventory_metrics_with_3month_avg(data['stock'], df_sales, data['product'])
+    return result['inventory_df'].set_index('SKU_ID')['Avg_Monthly_Sales_3M']
+
+
+def test_avg_3m_matches_old_groupby_mean(workbook, load_data):
+    data = load_data(workbook)
+    sales = data['sales']
+    assert not sales.duplicated(['SKU_ID', 'Month']).any()
+
+    new = inventory_avg(data, sales)
+    old = old_avg_3m(sales).reindex(new.index).fillna(0)
+    pd.testing.assert_series_equal(new, old, check_names=False, rtol=1e-12)
+
+
+def test_duplicate_rows_are_summed_per_month(workbook, load_data):
+    data = load_data(workbook)
+    sales = data['sales']
+    # Pecah setiap baris jadi dua baris setengah + satu baris NaN: total bulanan tetap
+    half = sales.assign(Sales_Qty=sales['Sales_Qty'] / 2)
+    split = pd.concat([half, half, sales.assign(Sales_Qty=np.nan)], ignore_index=True)
+
+    new = inventory_avg(data, split)
+    monthly = split.groupby(['SKU_ID', 'Month'], as_index=False)['Sales_Qty'].sum(min_count=1)
+    expected = old_avg_3m(monthly).reindex(new.index).fillna(0)
+    pd.testing.assert_series_equal(new, expected, check_names=False, rtol=1e-12)
+    pd.testing.assert_series_equal(new, inventory_avg(data, sales), rtol=1e-12)
+
+
+def test_rolling_mean_skips_months_without_data():
+    values = np.array([[10.0, 0.0, 30.0, 40.0]])
+    observed = np.array([[1, 0, 1, 1]])
+    np.testing.assert_allclose(rolling_mean(values, observed, 3)[0], [10.0, 10.0, 20.0, 35.0])
+
+
+def test_sales_matrix_months_follow_data():
+    df = pd.DataFrame({'SKU_ID': ['A', 'A', 'B'], 'Month': pd.to_datetime(['2024-01-01', '2024-03-01', '2024-03-01']),
+                       'Sales_Qty': [1.0, 2.0, 3.0]})
+    values, observed, skus, months = sales_matrix(df)
+    assert list(months) == list(pd.to_datetime(['2024-01-01', '2024-03-01']))
+    np.testing.assert_array_equal(values, [[1.0, 2.0], [0.0, 3.0]])
+    np.testing.assert_array_equal(observed, [[1, 1], [0, 1]])
+
+
+def test_ewma_matches_pandas_and_carries_gaps():
+    values = np.array([[10.0, 20.0, 0.0, 40.0]])
+    observed = np.array([[1, 1, 0, 1]])
+    expected = pd.Series([10.0, 20.0, np.nan, 40.0]).ewm(span=3, adjust=False, ignore_na=True).mean().ffill()
+    np.testing.assert_allclose(ewma(values, observed, span=3)[0], expected.to_numpy())
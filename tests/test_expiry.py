@@ -0,0 +1,81 @@
+"""
+Expiry risk & FEFO (expiry.py) dibanding simulasi naif per batch
+"""
+import numpy as np
+import pandas as pd
+
+from expiry import (BUCKET_OVER, BUCKET_UNKNOWN, DAYS_PER_MONTH, calculate_expiry_risk, expiry_bucket,
+                    fefo_at_risk)
+
+
+def naive_at_risk(qty, days, rate):
+    """Satu SKU, batch terurut expiry terdekat: jual batch demi batch, sisa saat expired = at risk"""
+    t, lost = 0.0, []
+    for q, d in zip(qty, days):
+        remaining = max(d, 0) - t
+        sold = min(q, rate * remaining) if remaining > 0 else 0.0
+        t += sold / rate if rate > 0 else 0.0
+        lost.append(q - sold)
+    return np.array(lost)
+
+
+def test_fefo_at_risk_matches_per_batch_loop():
+    rng = np.random.default_rng(11)
+    sku_codes = np.sort(rng.integers(0, 25, 300))
+    qty = rng.integers(1, 200, 300).astype('float64')
+    days = rng.integers(-30, 400, 300).astype('float64')
+    rates = rng.choice([0.0, 0.3, 1.5, 4.0], 25)
+    order = np.lexsort((days, sku_codes))
+    sku_codes, qty, days = sku_codes[order], qty[order], days[order]
+
+    result = fefo_at_risk(sku_codes, qty, days, rates[sku_codes])
+    expected = np.concatenate([naive_at_risk(qty[sku_codes == c], days[sku_codes == c], rates[c])
+                               for c in np.unique(sku_codes)])
+    np.testing.assert_allclose(result, expected, atol=1e-9)
+
+
+def test_expiry_bucket_edges():
+    days = [-5, 0, 1, 30, 31, 90, 180, 365, 366, np.nan]
+    assert list(expiry_bucket(days)) == [
+        'Expired', 'Expired', '0-30 days', '0-30 days', '31-90 days', '31-90 days',
+        '91-180 days', '181-365 days', BUCKET_OVER, BUCKET_UNKNOWN,
+    ]
+
+
+def test_calculate_expiry_risk_matches_per_batch_loop(workbook, load_data):
+    data = load_data(workbook)
+    stock = data['stock'].copy()
+    stock.loc[stock.index[::7], 'Stock_Category'] = 'Damaged'
+    stock.loc[stock.index[3::11], 'Expiry_Date'] = None
+    result = calculate_expiry_risk(stock, data['sales'], data['product'])
+    batches = result['batches']
+
+    sales = data['sales']
+    last_3 = sorted(sales['Month'].unique())[-3:]
+    rate = sales[sales['Month'].isin(last_3)].groupby('SKU_ID')['Sales_Qty'].mean() / DAYS_PER_MONTH
+
+    expected = pd.Series(0.0, index=batches.index)
+    queue = batches[(batches['Stock_Category'] != 'Damaged') & batches['Days_To_Expiry'].notna()]
+    for sku, group in queue.groupby('SKU_ID'):
+        group = group.sort_values('Days_To_Expiry', kind='stable')
+        expected[group.index] = naive_at_risk(group['Stock_Qty'].to_numpy(dtype='float64'),
+                                              group['Days_To_Expiry'].to_numpy(), rate.get(sku, 0.0))
+
+    assert expected.gt(0).any() and (expected < batches['Stock_Qty']).any()
+    np.testing.assert_allclose(batches['At_Risk_Qty'], expected, atol=1e-6)
+    np.testing.assert_allclose(batches['Daily_Sales_Rate'], batches['SKU_ID'].map(rate).fillna(0), rtol=1e-12)
+
+    sku = result['sku'].set_index('SKU_ID')
+    np.testing.assert_allclose(sku['At_Risk_Qty'], expected.groupby(batches['SKU_ID']).sum().loc[sku.index], atol=1e-6)
+    assert result['buckets']['Batches'].sum() == len(stock)
+    assert result['buckets'].set_index('Expiry_Bucket').loc[BUCKET_UNKNOWN, 'At_Risk_Qty'] == 0
+
+
+def test_as_of_defaults_to_month_after_last_sales(workbook, load_data):
+    data = load_data(workbook)
+    result = calculate_expiry_risk(data['stock'], data['sales'], data['product'])
+    assert result['as_of'] == data['sales']['Month'].max() + pd.DateOffset(months=1)
+
+    later = calculate_expiry_risk(data['stock'], data['sales'], data['product'], as_of='2030-01-01')
+    expired = (pd.to_datetime(data['stock']['Expiry_Date']) <= '2030-01-01').sum()
+    assert later['buckets'].set_index('Expiry_Bucket').loc['Expired', 'Batches'] == expired
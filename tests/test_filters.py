@@ -0,0 +1,49 @@
+"""
+Global filter index (filters.py) terhadap filter pandas langsung
+"""
+import pandas as pd
+
+from filters import apply_filters, build_filter_index, make_filter_key
+
+
+def test_month_range_on_month_labels():
+    labels = pd.DataFrame({'SKU_ID': ['A'] * 5, 'Month': ['Jan-25', 'Mar-25', 'Apr-25', 'May-25', 'Dec-24'],
+                           'Cost': [1, 2, 3, 4, 5]})
+    product = pd.DataFrame({'SKU_ID': ['A'], 'Brand': ['Aurora']})
+    index = build_filter_index({'costs': labels}, product)
+
+    key = make_filter_key({}, (pd.Timestamp('2025-03-01'), pd.Timestamp('2025-04-30')))
+    result = apply_filters({'costs': labels}, index, key)['costs']
+    assert list(result['Month']) == ['Mar-25', 'Apr-25']
+
+    key = make_filter_key({}, (pd.Timestamp('2024-12-01'), pd.Timestamp('2025-01-01')))
+    assert list(apply_filters({'costs': labels}, index, key)['costs']['Month']) == ['Jan-25', 'Dec-24']
+
+
+def test_datetime_column_preferred_over_label():
+    df = pd.DataFrame({'Month': ['Apr-25', 'May-25'], 'Month_Date': pd.to_datetime(['2025-04-01', '2025-05-01'])})
+    index = build_filter_index({'bs': df}, pd.DataFrame())
+    key = make_filter_key({}, (pd.Timestamp('2025-05-01'), pd.Timestamp('2025-05-01')))
+    assert list(apply_filters({'bs': df}, index, key)['bs']['Month']) == ['May-25']
+
+
+def test_filters_match_pandas(workbook, load_data):
+    data = load_data(workbook)
+    product = data['product']
+    brands = sorted(product['Brand'].unique())[:2]
+    start, end = pd.Timestamp('2023-06-01'), pd.Timestamp('2023-11-01')
+
+    index = build_filter_index(data, product)
+    key = make_filter_key({'Brand': brands, 'SKU_Tier': []}, (start, end))
+    filtered = apply_filters(data, index, key)
+
+    skus = set(product.loc[product['Brand'].isin(brands), 'SKU_ID'])
+    for name in ['sales', 'forecast', 'po']:
+        df = data[name]
+        months = pd.to_datetime(df['Month'])
+        expected = df[df['SKU_ID'].isin(skus) & (months >= start) & (months <= end)]
+        pd.testing.assert_frame_equal(filtered[name], expected)
+        assert filtered['dataset_versions'][name] != data['dataset_versions'][name]
+
+    stock = data['stock']
+    pd.testing.assert_frame_equal(filtered['stock'], stock[stock['SKU_ID'].isin(skus)])
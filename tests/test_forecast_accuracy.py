@@ -0,0 +1,26 @@
+"""
+Tracking signal per SKU x bulan di calculate_accuracy_metrics
+"""
+import numpy as np
+import pandas as pd
+
+import forecast_accuracy
+
+
+def test_sku_month_tracking_signal_is_cumulative_per_sku():
+    months = pd.to_datetime(['2024-01-01', '2024-02-01', '2024-03-01'] * 2)
+    skus = ['A'] * 3 + ['B'] * 3
+    forecast = pd.DataFrame({'SKU_ID': skus, 'Month': months, 'Forecast_Qty': 100.0})
+    po = pd.DataFrame({'SKU_ID': skus, 'Month': months, 'PO_Qty': [110.0, 90.0, 130.0, 80.0, 80.0, 80.0]})
+
+    result = forecast_accuracy.calculate_accuracy_metrics(forecast, po, pd.DataFrame())
+    sku_month = result['sku_month'].set_index(['SKU_ID', 'Month'])['Tracking_Signal']
+
+    # A: error 10, -10, 30 -> kumulatif 10, 0, 30 / MAD 10, 10, 50/3
+    np.testing.assert_allclose(sku_month.loc['A'].to_numpy(), [1.0, 0.0, 30 / (50 / 3)])
+    np.testing.assert_allclose(sku_month.loc['B'].to_numpy(), [-1.0, -2.0, -3.0])
+
+    # Bulan terakhir sama dengan rollup per SKU
+    latest = result['sku'].set_index('SKU_ID')['Tracking_Signal']
+    assert sku_month.loc[('A', months[2])] == latest['A']
+    assert sku_month.loc[('B', months[2])] == latest['B']
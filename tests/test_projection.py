@@ -0,0 +1,74 @@
+"""
+Projected stock timeline (projection.py) dibanding simulasi naif per bulan
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+import analytics
+from projection import NO_DEMAND_WEEKS, WEEKS_PER_MONTH, calculate_stock_projection, project_stock
+
+
+def naive_projection(stock, forecast, po):
+    """Loop per SKU per bulan: lost sales, stok tidak bisa negatif"""
+    n_skus, n_months = forecast.shape
+    projected = np.zeros(forecast.shape)
+    shortage = np.zeros(forecast.shape)
+    stockout_idx = np.full(n_skus, -1)
+    for i in range(n_skus):
+        level, lost = stock[i], 0.0
+        for t in range(n_months):
+            level = level + po[i, t] - forecast[i, t]
+            if level < 0:
+                lost -= level
+                level = 0.0
+            projected[i, t], shortage[i, t] = level, lost
+            if stockout_idx[i] < 0 and level <= 0 and forecast[i, t] > 0:
+                stockout_idx[i] = t
+    return projected, shortage, stockout_idx
+
+
+def test_project_stock_matches_naive_loop():
+    rng = np.random.default_rng(3)
+    stock = rng.integers(0, 300, 40).astype('float64')
+    forecast = rng.integers(0, 120, (40, 9)).astype('float64')
+    po = np.where(rng.random((40, 9)) < 0.3, rng.integers(50, 400, (40, 9)), 0).astype('float64')
+
+    result = project_stock(stock, forecast, po)
+    projected, shortage, stockout_idx = naive_projection(stock, forecast, po)
+    np.testing.assert_allclose(result['projected'], projected)
+    np.testing.assert_allclose(result['shortage'], shortage)
+    np.testing.assert_array_equal(result['stockout_idx'], stockout_idx)
+
+
+def test_weeks_of_cover_uses_next_month_forecast():
+    result = project_stock(np.array([100.0, 50.0]), np.array([[10.0, 20.0, 40.0], [0.0, 0.0, 0.0]]), np.zeros((2, 3)))
+    expected = [90 / (20 / WEEKS_PER_MONTH), 70 / (40 / WEEKS_PER_MONTH), 30 / (40 / WEEKS_PER_MONTH)]
+    np.testing.assert_allclose(result['weeks_cover'][0], expected)
+    assert np.all(result['weeks_cover'][1] == NO_DEMAND_WEEKS)
+    assert list(result['stockout_idx']) == [-1, -1]
+
+
+@pytest.mark.parametrize('start_month', [None, '2024-03-01'])
+def test_calculate_stock_projection_matches_naive_loop(workbook, load_data, start_month):
+    data = load_data(workbook)
+    inventory = analytics.calculate_inventory_metrics_with_3month_avg(data['stock'], data['sales'], data['product'])
+    result = calculate_stock_projection(inventory, data['forecast'], data['po'], data['sales'], start_month)
+    timeline = result['timeline']
+
+    last_actual = data['sales']['Month'].max() if start_month is None else pd.Timestamp(start_month) - pd.DateOffset(months=1)
+    months = sorted(m for m in data['forecast']['Month'].unique() if m > last_actual)
+    assert sorted(timeline['Month'].unique()) == months
+
+    skus = inventory['inventory_df'].drop_duplicates('SKU_ID')
+    stock = skus.set_index('SKU_ID')['Stock_Qty'].fillna(0)
+    forecast = data['forecast'].pivot_table(index='SKU_ID', columns='Month', values='Forecast_Qty', aggfunc='sum')
+    po = data['po'].pivot_table(index='SKU_ID', columns='Month', values='PO_Qty', aggfunc='sum')
+    forecast = forecast.reindex(index=stock.index, columns=months).fillna(0).to_numpy(dtype='float64')
+    po = po.reindex(index=stock.index, columns=months).fillna(0).to_numpy(dtype='float64')
+    projected, shortage, _ = naive_projection(stock.to_numpy(dtype='float64'), forecast, po)
+
+    np.testing.assert_allclose(timeline['Projected_Stock'].to_numpy().reshape(projected.shape), projected)
+    np.testing.assert_allclose(timeline['Shortage_Qty'].to_numpy().reshape(shortage.shape), shortage)
+    np.testing.assert_allclose(result['summary']['Ending_Stock'], projected[:, -1])
+    np.testing.assert_allclose(result['monthly']['Projected_Stock'], projected.sum(axis=0))
@@ -0,0 +1,67 @@
+"""
+Prefix-sum index (range_index.py) dibanding groupby langsung pada data long
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from range_index import build_prefix_index
+
+
+@pytest.fixture
+def prefix(workbook, load_data):
+    data = load_data(workbook)
+    index = build_prefix_index(data['sales'], data['forecast'], data['po'], data['product'])
+    assert index is not None and not index.empty
+    return data, index
+
+
+def in_range(df, start, end):
+    """Filter referensi per bulan kalender: bulan dari `start` s/d bulan dari `end`"""
+    months = df['Month'].dt.to_period('M')
+    return df[(months >= pd.Period(start, 'M')) & (months <= pd.Period(end, 'M'))]
+
+
+@pytest.mark.parametrize('start, end', [(None, None), ('2023-03-01', '2023-08-31'), ('2023-05-15', '2023-05-20')])
+def test_totals_match_groupby_sum(prefix, start, end):
+    data, index = prefix
+    for name, metric in [('sales', 'Sales_Qty'), ('forecast', 'Forecast_Qty'), ('po', 'PO_Qty')]:
+        df = data[name] if start is None else in_range(data[name], start, end)
+        assert index.total(metric, start, end) == pytest.approx(df[metric].sum(), rel=1e-12)
+
+        expected = df.groupby('SKU_ID')[metric].sum().reindex(index.skus).fillna(0)
+        pd.testing.assert_series_equal(index.sku_totals(metric, start, end), expected,
+                                       check_names=False, check_dtype=False, rtol=1e-12)
+
+
+def test_subset_and_group_totals(prefix):
+    data, index = prefix
+    sales = in_range(data['sales'], '2023-02-01', '2023-12-31')
+    skus = sorted(sales['SKU_ID'].unique())[:7] + ['NOT-A-SKU']
+    expected = sales.loc[sales['SKU_ID'].isin(skus), 'Sales_Qty'].sum()
+    assert index.total('Sales_Qty', '2023-02-01', '2023-12-31', skus=skus) == pytest.approx(expected, rel=1e-12)
+
+    for level in ['Brand', 'SKU_Tier']:
+        expected = sales.groupby(level)['Sales_Qty'].sum()
+        result = index.group_totals('Sales_Qty', level, '2023-02-01', '2023-12-31')
+        pd.testing.assert_series_equal(result.reindex(expected.index).fillna(0), expected,
+                                       check_names=False, check_dtype=False, check_index_type=False, rtol=1e-12)
+
+
+def test_sku_means_and_revenue(prefix):
+    data, index = prefix
+    sales = in_range(data['sales'], '2023-04-01', '2023-09-30')
+    expected = sales.groupby('SKU_ID')['Sales_Qty'].mean().reindex(index.skus)
+    pd.testing.assert_series_equal(index.sku_means('Sales_Qty', '2023-04-01', '2023-09-30'), expected,
+                                   check_names=False, check_dtype=False, rtol=1e-12)
+
+    price = pd.to_numeric(sales['Floor_Price'], errors='coerce').fillna(0)
+    revenue = (sales['Sales_Qty'] * price).sum()
+    assert index.total('Revenue', '2023-04-01', '2023-09-30') == pytest.approx(revenue, rel=1e-9)
+
+
+def test_range_outside_data_is_empty(prefix):
+    _, index = prefix
+    assert index.total('Sales_Qty', '2030-01-01', '2030-12-31') == 0.0
+    assert index.monthly_average('Sales_Qty', '2030-01-01', '2030-12-31') == 0.0
+    assert np.all(index.sku_totals('PO_Qty', '2030-01-01', '2030-12-31') == 0)
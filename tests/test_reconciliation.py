@@ -0,0 +1,71 @@
+"""
+Rekonsiliasi forecast hierarkis (reconciliation.py) terhadap solusi langsung
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from reconciliation import Hierarchy, apply_overrides, least_squares, reconcile, top_down
+
+
+@pytest.fixture
+def hierarchy():
+    attributes = pd.DataFrame({
+        'SKU_Tier': ['Tier 1', 'Tier 1', 'Tier 2', 'Tier 2', 'Tier 3', 'Tier 3', 'Tier 1'],
+        'Brand': ['Aurora', 'Bloom', 'Aurora', 'Cerise', 'Bloom', 'Cerise', 'Dahlia'],
+    })
+    return Hierarchy([f"SKU{i}" for i in range(len(attributes))], attributes)
+
+
+@pytest.fixture
+def bottom():
+    rng = np.random.default_rng(11)
+    return rng.uniform(0, 200, size=(7, 4))
+
+
+def direct_gls(hierarchy, bottom, upper, weights):
+    """b~ = (S'WS)^-1 S'W y dengan S = [A; I] dan W diagonal, di-solve langsung (n x n)"""
+    A = hierarchy.aggregation
+    S = np.vstack([A, np.eye(A.shape[1])])
+    w_upper = np.ones(A.shape[0]) if weights == 'ols' else 1.0 / hierarchy.sizes
+    W = np.diag(np.r_[w_upper, np.ones(A.shape[1])])
+    y = np.vstack([upper, bottom])
+    return np.linalg.solve(S.T @ W @ S, S.T @ W @ y)
+
+
+@pytest.mark.parametrize('weights', ['ols', 'struct'])
+def test_woodbury_matches_direct_solve(hierarchy, bottom, weights):
+    upper = apply_overrides(hierarchy, hierarchy.aggregate(bottom),
+                            {('Brand', 'Aurora'): 900.0, ('SKU_Tier', 'Tier 3'): 50.0, ('Total', 'Total'): 3000.0})
+    result = least_squares(hierarchy, bottom, upper, weights)
+    np.testing.assert_allclose(result, direct_gls(hierarchy, bottom, upper, weights), rtol=1e-10, atol=1e-9)
+
+
+def test_coherent_input_is_unchanged(hierarchy, bottom):
+    for method in ['bottom_up', 'top_down', 'ols', 'wls_struct']:
+        np.testing.assert_allclose(reconcile(hierarchy, bottom, method=method), bottom, atol=1e-9)
+
+
+def test_top_down_meets_brand_targets(hierarchy, bottom):
+    overrides = {('Brand', 'Aurora'): 900.0, ('Brand', 'Bloom'): np.array([10.0, 20.0, 30.0, 40.0])}
+    upper = apply_overrides(hierarchy, hierarchy.aggregate(bottom), overrides)
+    result = top_down(hierarchy, bottom, upper, 'Brand')
+
+    rows = hierarchy.node_rows('Brand')
+    np.testing.assert_allclose(hierarchy.aggregate(result)[rows], upper[rows], rtol=1e-12)
+    assert hierarchy.aggregate(result)[rows].sum(axis=1)[0] == pytest.approx(900.0)
+    # Proporsi antar SKU dalam satu brand tetap mengikuti forecast SKU
+    aurora = [0, 2]
+    np.testing.assert_allclose(result[aurora] / result[aurora].sum(axis=0), bottom[aurora] / bottom[aurora].sum(axis=0))
+
+
+def test_top_down_splits_zero_forecast_group_evenly(hierarchy, bottom):
+    bottom = bottom.copy()
+    cerise = [3, 5]
+    bottom[cerise] = 0.0
+    upper = apply_overrides(hierarchy, hierarchy.aggregate(bottom), {('Brand', 'Cerise'): 400.0})
+    result = top_down(hierarchy, bottom, upper, 'Brand')
+
+    # Node tanpa forecast: target horizon disebar rata per bulan, lalu rata per SKU
+    np.testing.assert_allclose(result[cerise], np.full((2, 4), 50.0))
+    assert np.isfinite(result).all()
@@ -0,0 +1,69 @@
+"""
+Replenishment engine (replenishment.py) terhadap rumus per SKU
+"""
+import math
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from replenishment import DEFAULT_WINDOW, calculate_replenishment, plan_replenishment, service_level_z
+
+
+def test_service_level_validation():
+    assert service_level_z(0.95) == pytest.approx(1.6449, abs=1e-4)
+    with pytest.raises(ValueError):
+        service_level_z(95)
+
+    diagnostics = []
+    assert service_level_z(0.3, diagnostics) == 0.0
+    assert service_level_z(0.99999, diagnostics) == pytest.approx(NormalDist().inv_cdf(0.9999))
+    assert [d['level'] for d in diagnostics] == ['warning', 'warning']
+
+
+def test_invalid_service_level_becomes_error_diagnostic(workbook, load_data):
+    data = load_data(workbook)
+    diagnostics = []
+    result = calculate_replenishment(data['sales'], data['stock'], data['po'], data['product_active'],
+                                     diagnostics=diagnostics, service_level=95)
+    assert result.empty
+    assert diagnostics[-1]['level'] == 'error' and '0.95' in diagnostics[-1]['message']
+
+
+def test_plan_matches_per_sku_formulas(workbook, load_data):
+    data = load_data(workbook)
+    params = {'service_level': 0.9, 'lead_time_months': 2.0, 'order_cost': 100000.0, 'holding_rate': 0.2}
+    plan = calculate_replenishment(data['sales'], data['stock'], data['po'], data['product_active'], **params)
+    assert len(plan) == data['product_active']['SKU_ID'].nunique()
+
+    sales = data['sales'].assign(Month=pd.to_datetime(data['sales']['Month']))
+    last_months = sorted(sales['Month'].unique())[-DEFAULT_WINDOW:]
+    recent = sales[sales['Month'].isin(last_months)].groupby(['SKU_ID', 'Month'])['Sales_Qty'].sum()
+    z = NormalDist().inv_cdf(0.9)
+
+    for row in plan.sample(20, random_state=0).itertuples():
+        history = recent.loc[row.SKU_ID] if row.SKU_ID in recent.index.get_level_values(0) else pd.Series(dtype='float64')
+        mean = history.mean() if len(history) else 0.0
+        std = history.std(ddof=1) if len(history) > 1 else 0.0
+        assert row.Avg_Monthly_Demand == pytest.approx(mean)
+        assert row.Demand_Std == pytest.approx(std)
+
+        rop = mean * 2.0 + z * std * math.sqrt(2.0)
+        assert row.Reorder_Point == math.ceil(rop)
+        holding = 0.2 * row.Unit_Cost
+        eoq = math.ceil(math.sqrt(2 * mean * 12 * 100000.0 / holding)) if mean > 0 and holding > 0 else 0
+        assert row.EOQ == eoq
+        if mean > 0 and row.Inventory_Position <= rop:
+            assert row.Action == 'Reorder Now'
+            assert row.Suggested_Order == max(math.ceil(rop + eoq - row.Inventory_Position), 0)
+        else:
+            assert row.Suggested_Order == 0
+
+
+def test_replan_reuses_statistics(workbook, load_data):
+    data = load_data(workbook)
+    plan = calculate_replenishment(data['sales'], data['stock'], data['po'], data['product_active'])
+    higher = plan_replenishment(plan, service_level=0.99)
+    assert (higher['Safety_Stock'] >= plan['Safety_Stock']).all()
+    np.testing.assert_array_equal(higher['EOQ'], plan['EOQ'])
@@ -0,0 +1,43 @@
+"""
+What-if scenario (scenarios.py): presisi delta dan invalidasi saat data / segmen berubah
+"""
+import numpy as np
+
+from scenarios import build_scenario, compare_results, make_adjustment, run_scenario
+from segmentation import attach_segments, calculate_abc_xyz
+
+
+def test_noop_scenario_matches_baseline(workbook, load_data):
+    data = load_data(workbook)
+    scenario = build_scenario('noop', data, data['product'], [make_adjustment('forecast', 'multiply', 1.0),
+                                                              make_adjustment('sales', 'add', 0)])
+    assert scenario.changed_rows() == {'forecast': 0, 'sales': 0}
+
+    baseline, _ = run_scenario(None, data)
+    alt, _ = run_scenario(scenario, data)
+    table = compare_results(baseline, alt)
+    assert (table['Change'].fillna(0) == 0).all(), table
+
+
+def test_deltas_keep_full_precision(workbook, load_data):
+    data = load_data(workbook)
+    sales = data['sales'].assign(Sales_Qty=data['sales']['Sales_Qty'] + 12_345_678.9)
+    data = dict(data, sales=sales)
+    adjustment = make_adjustment('sales', 'multiply', 1.1)
+    scenario = build_scenario('big', data, data['product'], [adjustment])
+
+    applied = scenario.apply(data)['sales']['Sales_Qty'].to_numpy()
+    np.testing.assert_allclose(applied, sales['Sales_Qty'].to_numpy() * 1.1, rtol=1e-15, atol=1e-8)
+
+
+def test_segment_change_invalidates_abc_scenario(workbook, load_data):
+    data = load_data(workbook)
+    segments = calculate_abc_xyz(data['sales'], data['product'])
+    product = attach_segments(data['product'], segments)
+    scenario = build_scenario('abc', data, product, [make_adjustment('forecast', 'multiply', 1.2, 'ABC_Class', ['A'])],
+                              segments_version='v1')
+
+    assert scenario.changed_rows()['forecast'] > 0
+    assert scenario.is_current(data, 'v1')
+    assert not scenario.is_current(data, 'v2')
+    assert not scenario.is_current(dict(data, dataset_versions={**data['dataset_versions'], 'forecast': 'x'}), 'v1')
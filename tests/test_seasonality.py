@@ -0,0 +1,78 @@
+"""
+Seasonal index (seasonality.py) dibanding perhitungan langsung per bulan kalender
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from seasonality import DEFAULT_SHRINKAGE, MONTH_NAMES, calculate_seasonal_indices
+
+
+def monthly_table(sales, by):
+    """Total Sales_Qty per `by` x bulan, bulan tanpa baris = 0 di sepanjang rentang data"""
+    months = pd.date_range(sales['Month'].min(), sales['Month'].max(), freq='MS')
+    return sales.pivot_table(index=by, columns='Month', values='Sales_Qty', aggfunc='sum').reindex(columns=months).fillna(0)
+
+
+def direct_index(table):
+    """Rata-rata per bulan kalender / rata-rata semua bulan"""
+    calendar_mean = table.T.groupby(table.columns.month).mean().T.reindex(columns=range(1, 13))
+    index = calendar_mean.div(table.mean(axis=1), axis=0)
+    index.columns = MONTH_NAMES
+    return index.fillna(1.0)
+
+
+def weight(n_obs):
+    return n_obs / (n_obs + DEFAULT_SHRINKAGE)
+
+
+@pytest.fixture
+def seasonal(workbook, load_data):
+    data = load_data(workbook)
+    sales = data['sales'].copy()
+    sales['Brand'] = sales['SKU_ID'].map(data['product'].drop_duplicates('SKU_ID').set_index('SKU_ID')['Brand'])
+    return sales, calculate_seasonal_indices(data['sales'], data['product'])
+
+
+def test_global_and_brand_profiles_match_direct(seasonal):
+    sales, result = seasonal
+    global_raw = direct_index(monthly_table(sales.assign(All='All'), 'All')).loc['All']
+    np.testing.assert_allclose(result['global'][MONTH_NAMES].to_numpy()[0], global_raw.to_numpy(), rtol=1e-10)
+
+    sku_table = monthly_table(sales, 'SKU_ID')
+    brand_obs = (sku_table > 0).sum(axis=1).groupby(sales.groupby('SKU_ID')['Brand'].first()).sum()
+    brand_raw = direct_index(monthly_table(sales, 'Brand'))
+    w = weight(brand_obs.reindex(brand_raw.index)).to_numpy()[:, None]
+    expected = w * brand_raw.to_numpy() + (1 - w) * global_raw.to_numpy()
+
+    brand = result['brand'].set_index('Brand').loc[brand_raw.index, MONTH_NAMES]
+    np.testing.assert_allclose(brand.to_numpy(), expected, rtol=1e-10)
+
+
+def test_sku_index_shrinks_toward_brand(seasonal):
+    sales, result = seasonal
+    sku_table = monthly_table(sales, 'SKU_ID')
+    raw = direct_index(sku_table)
+    n_obs = (sku_table > 0).sum(axis=1)
+
+    sku = result['sku'].set_index('SKU_ID').loc[raw.index]
+    brand = result['brand'].set_index('Brand')[MONTH_NAMES]
+    prior = brand.loc[sku['Brand']].to_numpy()
+    w = weight(n_obs).to_numpy()[:, None]
+
+    np.testing.assert_allclose(sku['Raw_Weight'], w[:, 0])
+    np.testing.assert_allclose(sku[MONTH_NAMES].to_numpy(), w * raw.to_numpy() + (1 - w) * prior, rtol=1e-10)
+
+
+def test_peak_month_of_seasonal_sku():
+    months = pd.date_range('2022-01-01', periods=36, freq='MS')
+    sales = pd.DataFrame({
+        'SKU_ID': 'A', 'Month': months,
+        'Sales_Qty': np.where(months.month == 11, 500.0, 100.0),
+    })
+    product = pd.DataFrame({'SKU_ID': ['A'], 'Brand': ['X'], 'SKU_Tier': ['T1']})
+    sku = calculate_seasonal_indices(sales, product)['sku'].iloc[0]
+    assert sku['Peak_Month'] == 'Nov'
+    # Tanpa grup lain, profil Brand = profil global = SKU itu sendiri -> shrinkage tidak mengubah index
+    assert sku['Nov'] == pytest.approx(500 / (100 * 11 + 500) * 12)
+    assert sku['Jan'] == pytest.approx(100 / (100 * 11 + 500) * 12)
@@ -0,0 +1,63 @@
+"""
+ABC/XYZ segmentation (segmentation.py) dibanding Pareto dan CV yang dihitung langsung
+"""
+import numpy as np
+import pandas as pd
+
+from filters import apply_filters, build_filter_index, make_filter_key
+from segmentation import abc_classes, attach_segments, calculate_abc_xyz, segment_matrix
+
+
+def direct_segments(sales, product, window=12):
+    """Loop Pareto per SKU + CV pandas di `window` bulan terakhir (bulan tanpa baris = 0)"""
+    months = pd.date_range(sales['Month'].max() - pd.DateOffset(months=window - 1), sales['Month'].max(), freq='MS')
+    product = product.drop_duplicates('SKU_ID').set_index('SKU_ID')
+    y = sales.pivot_table(index='SKU_ID', columns='Month', values='Sales_Qty', aggfunc='sum')
+    y = y.reindex(index=product.index, columns=months).fillna(0)
+
+    revenue = y.sum(axis=1) * pd.to_numeric(product['Floor_Price'], errors='coerce').fillna(0)
+    total, cumulative, abc = revenue.sum(), 0.0, {}
+    for sku, value in revenue.sort_values(ascending=False, kind='stable').items():
+        abc[sku] = 'C' if value <= 0 else 'A' if cumulative < 0.80 else 'B' if cumulative < 0.95 else 'C'
+        cumulative += value / total
+
+    cv = y.std(axis=1, ddof=1) / y.mean(axis=1)
+    xyz = np.where(cv <= 0.5, 'X', np.where(cv <= 1.0, 'Y', 'Z'))
+    return pd.DataFrame({'Revenue': revenue, 'ABC_Class': pd.Series(abc), 'XYZ_Class': xyz, 'Demand_CV': cv})
+
+
+def test_segments_match_direct_computation(workbook, load_data):
+    data = load_data(workbook)
+    segments = calculate_abc_xyz(data['sales'], data['product']).set_index('SKU_ID')
+    expected = direct_segments(data['sales'], data['product']).loc[segments.index]
+
+    np.testing.assert_allclose(segments['Revenue'], expected['Revenue'], rtol=1e-12)
+    np.testing.assert_allclose(segments['Demand_CV'], expected['Demand_CV'].fillna(np.inf), rtol=1e-12)
+    assert (segments['ABC_Class'] == expected['ABC_Class']).all()
+    assert (segments['XYZ_Class'] == expected['XYZ_Class']).all()
+    assert (segments['ABC_XYZ'] == segments['ABC_Class'] + segments['XYZ_Class']).all()
+    assert segment_matrix(segments.reset_index()).to_numpy().sum() == len(segments)
+
+
+def test_abc_boundary_uses_share_before_sku():
+    # Share 0.7, 0.15, 0.1, 0.05: SKU ke-2 mulai di 70% -> A, ke-3 mulai di 85% -> B
+    classes, share, cumulative = abc_classes([15, 70, 0, 10, 5])
+    assert list(classes) == ['A', 'A', 'C', 'B', 'C']
+    np.testing.assert_allclose(cumulative, [0.85, 0.70, 1.0, 0.95, 1.0])
+
+
+def test_attach_segments_feeds_filter_index(workbook, load_data):
+    data = load_data(workbook)
+    product = data['product'].assign(ABC_Class='stale')
+    segments = calculate_abc_xyz(data['sales'], product)
+    attached = attach_segments(product, segments)
+
+    assert (product['ABC_Class'] == 'stale').all()
+    assert len(attached) == len(product)
+    assert set(attached['ABC_Class']) <= {'A', 'B', 'C'}
+
+    datasets = {'sales': data['sales'], 'product': attached}
+    index = build_filter_index(datasets, attached)
+    filtered = apply_filters(datasets, index, make_filter_key({'ABC_Class': ['A']}))
+    a_skus = set(segments.loc[segments['ABC_Class'] == 'A', 'SKU_ID'])
+    assert set(filtered['sales']['SKU_ID']) == a_skus & set(data['sales']['SKU_ID'])
@@ -0,0 +1,68 @@
+"""
+Dead stock & slow mover (slow_movers.py) dibanding loop per SKU dan np.polyfit
+"""
+import numpy as np
+import pandas as pd
+
+import analytics
+from slow_movers import calculate_slow_movers, classify_movers, trailing_run, velocity_slope
+
+
+def naive_trailing_run(row):
+    run = 0
+    for value in row[::-1]:
+        if not value:
+            break
+        run += 1
+    return run
+
+
+def test_trailing_run_matches_loop():
+    rng = np.random.default_rng(5)
+    mask = rng.random((200, 12)) < 0.6
+    mask[0], mask[1] = True, False
+    np.testing.assert_array_equal(trailing_run(mask), [naive_trailing_run(row) for row in mask])
+
+
+def test_velocity_slope_matches_polyfit():
+    rng = np.random.default_rng(8)
+    y = rng.integers(0, 100, (50, 15)).astype('float64')
+    slope, mean = velocity_slope(y, window=6)
+    expected = [np.polyfit(np.arange(6), row[-6:], 1)[0] for row in y]
+    np.testing.assert_allclose(slope, expected, atol=1e-10)
+    np.testing.assert_allclose(mean, y[:, -6:].mean(axis=1))
+
+
+def test_classify_movers_thresholds():
+    stats = pd.DataFrame({'Quiet_Months': [6, 5, 3, 0, 0], 'Velocity_Trend_Pct': [0.0, -50.0, 0.0, -10.0, -9.9]})
+    assert list(classify_movers(stats)['Mover_Class']) == [
+        'Dead Stock', 'Slow Mover', 'Slow Mover', 'Declining', 'Active',
+    ]
+    assert list(classify_movers(stats, dead_months=3)['Mover_Class'])[:3] == ['Dead Stock'] * 3
+
+
+def test_calculate_slow_movers_on_workbook(workbook, load_data):
+    data = load_data(workbook)
+    sales = data['sales'].copy()
+    months = sorted(sales['Month'].unique())
+    monthly = sales[sales['Sales_Qty'] > 0].groupby('SKU_ID')['Month'].nunique()
+    dead, fading = sorted(set(monthly[monthly == len(months)].index) & set(data['stock']['SKU_ID']))[:2]
+    # SKU `dead` tidak terjual 7 bulan terakhir, SKU `fading` hanya 1 unit per bulan 4 bulan terakhir
+    sales = sales[~((sales['SKU_ID'] == dead) & sales['Month'].isin(months[-7:]))]
+    sales.loc[(sales['SKU_ID'] == fading) & sales['Month'].isin(months[-4:]), 'Sales_Qty'] = 1
+
+    financial = analytics.calculate_inventory_financial(data['stock'], data['product'])
+    result = calculate_slow_movers(sales, financial, data['product']).set_index('SKU_ID')
+
+    assert result.loc[dead, 'Months_Since_Last_Sale'] == 7
+    assert result.loc[dead, 'Last_Sale_Month'] == months[-8]
+    assert result.loc[dead, 'Mover_Class'] == 'Dead Stock'
+    assert result.loc[fading, 'Quiet_Months'] >= 4
+    assert result.loc[fading, 'Mover_Class'] == 'Slow Mover'
+
+    y = sales.pivot_table(index='SKU_ID', columns='Month', values='Sales_Qty', aggfunc='sum')
+    y = y.reindex(index=result.index, columns=months).fillna(0)
+    np.testing.assert_allclose(result['Avg_Monthly_Sales'], y.mean(axis=1))
+    np.testing.assert_array_equal(result['Months_Since_Last_Sale'], [naive_trailing_run(row) for row in (y <= 0).to_numpy()])
+    stock = financial.groupby('SKU_ID')['Stock_Qty'].sum()
+    np.testing.assert_allclose(result['Stock_Qty'], stock.loc[result.index])
@@ -0,0 +1,59 @@
+"""
+Baseline forecast (stat_forecast.py): model per SKU dan MAE in-sample
+"""
+import numpy as np
+
+from stat_forecast import SEASON_LENGTH, fit_holt_winters, fit_ses, forecast_all
+
+
+def ses_errors(series, alpha):
+    level, errors = series[0], []
+    for value in series[1:]:
+        errors.append(abs(value - level))
+        level += alpha * (value - level)
+    return np.array(errors)
+
+
+def test_ses_mae_is_scored_on_requested_window():
+    rng = np.random.default_rng(5)
+    y = rng.uniform(50, 150, size=(3, 30))
+    _, full_mae, alphas = fit_ses(y, 3)
+    _, late_mae, late_alphas = fit_ses(y, 3, score_from=SEASON_LENGTH)
+
+    np.testing.assert_array_equal(alphas, late_alphas)
+    for i in range(len(y)):
+        errors = ses_errors(y[i], alphas[i])
+        assert np.isclose(full_mae[i], errors.mean())
+        assert np.isclose(late_mae[i], errors[SEASON_LENGTH - 1:].mean())
+
+
+def test_selection_by_demand_pattern():
+    rng = np.random.default_rng(9)
+    months = np.arange(36)
+    smooth = 100 + rng.normal(0, 5, size=36)
+    seasonal = 100 + 60 * np.sin(2 * np.pi * months / SEASON_LENGTH) + rng.normal(0, 2, size=36)
+    intermittent = np.where(rng.random(36) < 0.3, rng.uniform(5, 20, size=36), 0.0)
+    y = np.vstack([smooth, seasonal, intermittent])
+
+    result = forecast_all(y, 6)
+    assert list(result['selected']) == ['SES', 'Holt_Winters', 'Croston']
+    np.testing.assert_array_equal(result['Auto'][2], result['Croston'][2])
+    assert (result['Croston'][2] > 0).all()
+
+
+def test_warm_up_errors_do_not_favour_holt_winters():
+    # Level lompat di bulan kedua: error warm-up SES besar. Atas seluruh histori
+    # SES kalah dari HW, tapi di window yang sama (t >= satu musim) SES lebih baik
+    months = np.arange(36)
+    y = (100 + np.where(months >= 1, 100.0, 0.0) + 27 * np.sin(2 * np.pi * months / SEASON_LENGTH))[None, :]
+    _, ses_full_mae, _ = fit_ses(y, 1)
+    _, ses_mae, _ = fit_ses(y, 1, score_from=SEASON_LENGTH)
+    _, hw_mae, _ = fit_holt_winters(y, 1)
+    assert ses_mae[0] < hw_mae[0] < ses_full_mae[0]
+    assert forecast_all(y, 1)['selected'][0] == 'SES'
+
+
+def test_short_history_skips_holt_winters():
+    y = np.random.default_rng(1).uniform(10, 20, size=(2, SEASON_LENGTH + 3))
+    result = forecast_all(y, 2)
+    assert set(result['selected']) == {'SES'}
@@ -0,0 +1,55 @@
+"""
+Data versioning - fingerprint isi dataset untuk key cache per hasil load
+"""
+import hashlib
+
+import pandas as pd
+
+
+def dataset_fingerprint(df):
+    """Hash stabil dari kolom + isi DataFrame (tanpa index)"""
+    h = hashlib.blake2b(digest_size=8)
+    h.update(repr(list(df.columns)).encode())
+    h.update(str(df.shape).encode())
+
+    if len(df) > 0:
+        try:
+            row_hashes = pd.util.hash_pandas_object(df, index=False).values
+        except TypeError:
+            # Kolom berisi nilai unhashable (list/dict) - hash versi string-nya
+            row_hashes = pd.util.hash_pandas_object(df.astype(str), index=False).values
+        h.update(row_hashes.tobytes())
+
+    return h.hexdigest()
+
+
+def compute_dataset_versions(data):
+    """Fingerprint per dataset (DataFrame) - versi input untuk invalidasi per node di DAG"""
+    return {key: dataset_fingerprint(value) for key, value in data.items() if isinstance(value, pd.DataFrame)}
+
+
+def derive_version(*parts):
+    """Version string turunan dari beberapa bagian (versi input, nama fungsi, filter)"""
+    h = hashlib.blake2b(digest_size=8)
+    for part in parts:
+        h.update(f"{part};".encode())
+    return h.hexdigest()
+
+
+def compute_data_version(data, dataset_versions=None):
+    """Gabungkan fingerprint semua dataset dalam dict hasil load menjadi satu version string"""
+    if dataset_versions is None:
+        dataset_versions = compute_dataset_versions(data)
+    h = hashlib.blake2b(digest_size=8)
+
+    for key in sorted(data):
+        if key == 'dataset_versions':
+            continue
+        value = data[key]
+        if isinstance(value, pd.DataFrame):
+            part = dataset_versions[key]
+        else:
+            part = repr(value)
+        h.update(f"{key}={part};".encode())
+
+    return h.hexdigest()